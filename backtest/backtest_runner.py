@@ -6,26 +6,258 @@ It calculates scores for options on historical dates and tracks outcomes.
 
 Usage:
     python backtest_runner.py --start-date 2025-12-01 --end-date 2026-01-17
+    python backtest_runner.py snapshot --output cache/data_snapshot.bin
+    python backtest_runner.py run --start-date 2025-12-01 --end-date 2026-01-17 --snapshot cache/data_snapshot.bin
 
 Author: Put Options SE
 Date: January 2026
 """
 
+from __future__ import annotations
+
 import argparse
-import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 import sys
 
-from scoring_engine import ScoringEngine, get_probability_bin, get_dte_bin
-from data_loader import DataLoader
+# pandas, numpy and the scoring modules are imported where they are used, so
+# --help and argument errors do not pay for them
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    from data_loader import DataLoader
+
+
+# Subcommands; without one, the arguments are those of 'run'
+COMMANDS = ['run', 'snapshot', 'iv-screening', 'lower-bound-stats', 'market-iv']
+
+# --historical-peak-threshold choices (all of them with --all-configs)
+HISTORICAL_PEAK_THRESHOLDS = [0.80, 0.90, 0.95]
+
+# --rolling-period choices (all of them with --all-periods)
+ROLLING_PERIODS = [30, 90, 180, 270, 365]
+
+# --exclude-events choices -> event flag column
+EVENT_FILTERS = {
+    'earnings': 'earnings_before_expiry',
+    'dividend': 'dividend_before_expiry',
+    'any': 'event_before_expiry'
+}
+
+# Result columns added by --event-flags
+EVENT_COLUMNS = ['earnings_before_expiry', 'dividend_before_expiry', 'days_to_earnings', 'days_to_dividend']
+
+# Result columns added by --event-risk (historical event-day moves of the stock)
+EVENT_RISK_COLUMNS = ['event_count', 'event_p05', 'event_worst_move', 'event_beyond_cushion']
+
+# Result columns added by --market-iv (MARKET_IV index as of the scoring date)
+MARKET_IV_COLUMNS = ['market_iv', 'market_iv_percentile', 'market_iv_regime']
+
+# Result columns added by --sample (stratum code and weight N_h / n_h of the sampled row)
+SAMPLE_COLUMNS = ['sample_stratum', 'sample_weight']
+
+# Result columns added by --iv-factors (IV_PotentialDecline.csv column -> result column)
+IV_COLUMNS = {
+    'ImpliedDownPct': 'implied_down_pct',
+    'SafetyMultiple': 'safety_multiple',
+    'SigmasToStrike': 'sigmas_to_strike',
+    'ProbAssignment': 'prob_assignment',
+    'SafetyCategory': 'safety_category',
+    'CushionMinusIVPct': 'cushion_minus_iv_pct'
+}
+
+# Configuration columns of long-format (--all-configs / --all-periods) results;
+# results carry the columns of the options that vary
+CONFIG_COLUMNS = ['rolling_period', 'probability_method', 'historical_peak_threshold']
+
+# Score buckets reported by analyze_results: (min, max, label), max exclusive
+SCORE_BUCKETS = [
+    (90, 100, "90-100"),
+    (80, 90, "80-90"),
+    (70, 80, "70-80"),
+    (60, 70, "60-70"),
+    (50, 60, "50-60"),
+    (0, 50, "<50")
+]
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    """
+    Parse command line arguments.
+
+    Args:
+        argv: Arguments (default: sys.argv[1:])
+
+    Returns:
+        Namespace with a 'command' attribute ('run', 'snapshot', 'iv-screening',
+        'lower-bound-stats' or 'market-iv')
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    command = argv.pop(0) if argv and argv[0] in COMMANDS else 'run'
+
+    parsers = {
+        'snapshot': build_snapshot_parser,
+        'iv-screening': build_iv_screening_parser,
+        'lower-bound-stats': build_lower_bound_stats_parser,
+        'market-iv': build_market_iv_parser
+    }
+    parser = parsers.get(command, build_run_parser)()
+    args = parser.parse_args(argv)
+    args.command = command
+
+    return args
+
+
+def build_snapshot_parser() -> argparse.ArgumentParser:
+    """Arguments of the 'snapshot' subcommand."""
+    parser = argparse.ArgumentParser(
+        prog='backtest_runner.py snapshot',
+        description='Load and index the data files once and save them to a memory-mappable snapshot'
+    )
+
+    parser.add_argument(
+        '--data-dir',
+        type=str,
+        default='../data',
+        help='Path to data directory (default: ../data)'
+    )
+
+    parser.add_argument(
+        '--output',
+        type=str,
+        default='./cache/data_snapshot.bin',
+        help='Snapshot file to write (default: ./cache/data_snapshot.bin)'
+    )
+
+    parser.add_argument(
+        '--tables',
+        type=str,
+        nargs='+',
+        default=None,
+        help='Tables to include (default: all available backtest tables)'
+    )
+
+    parser.add_argument(
+        '--load-workers',
+        type=int,
+        default=None,
+        help='Threads for parsing data files concurrently (default: one per file)'
+    )
+
+    return parser
+
+
+def build_iv_screening_parser() -> argparse.ArgumentParser:
+    """Arguments of the 'iv-screening' subcommand."""
+    parser = argparse.ArgumentParser(
+        prog='backtest_runner.py iv-screening',
+        description='Append the IV lower-bound screening rows of the current option chain (data.csv) '
+                    'to IV_PotentialDecline.csv'
+    )
+
+    parser.add_argument(
+        '--data-dir',
+        type=str,
+        default='../data',
+        help='Path to data directory (default: ../data)'
+    )
+
+    parser.add_argument(
+        '--output',
+        type=str,
+        default=None,
+        help='Screening file to append to (default: <data-dir>/IV_PotentialDecline.csv)'
+    )
+
+    parser.add_argument(
+        '--update-date',
+        type=str,
+        default=None,
+        help='Date of the data.csv prices, YYYY-MM-DD (default: optionsData in last_updated.json)'
+    )
+
+    return parser
 
 
-def parse_args():
-    """Parse command line arguments."""
+def build_lower_bound_stats_parser() -> argparse.ArgumentParser:
+    """Arguments of the 'lower-bound-stats' subcommand."""
     parser = argparse.ArgumentParser(
-        description='Backtest Automated Recommendations scoring system'
+        prog='backtest_runner.py lower-bound-stats',
+        description='Build all_stocks_expiry_stats.csv and hit_rate_trends_by_stock.csv from the daily '
+                    'lower-bound predictions and the expiry closes'
+    )
+
+    parser.add_argument(
+        '--data-dir',
+        type=str,
+        default='../data',
+        help='Path to data directory (default: ../data)'
+    )
+
+    parser.add_argument(
+        '--output-dir',
+        type=str,
+        default=None,
+        help='Directory for the two files (default: --data-dir)'
+    )
+
+    parser.add_argument(
+        '--source',
+        type=str,
+        default='predictions',
+        choices=['predictions', 'iv-screening'],
+        help='Predictions from all_stocks_daily_predictions.csv or, one per stock, date and expiry, '
+             'from IV_PotentialDecline.csv (default: predictions)'
+    )
+
+    parser.add_argument(
+        '--since',
+        type=str,
+        default=None,
+        help='Incremental update: recompute only expiries with predictions from this date (YYYY-MM-DD) '
+             'or a newly known close, keeping the rest of the existing expiry stats'
+    )
+
+    return parser
+
+
+def build_market_iv_parser() -> argparse.ArgumentParser:
+    """Arguments of the 'market-iv' subcommand."""
+    parser = argparse.ArgumentParser(
+        prog='backtest_runner.py market-iv',
+        description='Recompute the MARKET_IV index rows of iv_per_stock_per_day.csv from the per-stock IVs'
+    )
+
+    parser.add_argument(
+        '--data-dir',
+        type=str,
+        default='../data',
+        help='Path to data directory (default: ../data)'
+    )
+
+    parser.add_argument(
+        '--output',
+        type=str,
+        default=None,
+        help='File to write (default: <data-dir>/iv_per_stock_per_day.csv, updated in place)'
+    )
+
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Recompute every date (default: dates without a MARKET_IV row and the last 3 dates)'
+    )
+
+    return parser
+
+
+def build_run_parser() -> argparse.ArgumentParser:
+    """Arguments of the 'run' subcommand (the default)."""
+    parser = argparse.ArgumentParser(
+        description='Backtest Automated Recommendations scoring system',
+        epilog="Subcommands: 'run' (default, these arguments), 'snapshot', 'iv-screening', "
+               "'lower-bound-stats' and 'market-iv' (see 'backtest_runner.py <subcommand> --help')"
     )
 
     parser.add_argument(
@@ -60,7 +292,7 @@ def parse_args():
         '--rolling-period',
         type=int,
         default=365,
-        choices=[30, 90, 180, 270, 365],
+        choices=ROLLING_PERIODS,
         help='Rolling period for support levels (default: 365)'
     )
 
@@ -89,91 +321,232 @@ def parse_args():
         '--historical-peak-threshold',
         type=float,
         default=0.90,
-        choices=[0.80, 0.90, 0.95],
+        choices=HISTORICAL_PEAK_THRESHOLDS,
         help='Historical peak threshold (default: 0.90)'
     )
 
-    return parser.parse_args()
+    parser.add_argument(
+        '--all-configs',
+        action='store_true',
+        help='Score every probability method x historical peak threshold in one pass (long-format results)'
+    )
 
+    parser.add_argument(
+        '--all-periods',
+        action='store_true',
+        help='Score every support rolling period in one pass (long-format results; combines with --all-configs)'
+    )
 
-def map_prob_method_to_recovery_method(field_name: str) -> str:
-    """
-    Map probability field name to recovery data method name.
+    parser.add_argument(
+        '--per-stock-recovery',
+        action='store_true',
+        help='Use per-stock recovery rates where the stock has enough recovery candidates, '
+             'falling back to the aggregated scenario rates (default: scenario rates only)'
+    )
 
-    Args:
-        field_name: Field name from options data
+    parser.add_argument(
+        '--recovery-min-n',
+        type=int,
+        default=30,
+        help='Minimum RecoveryCandidate_N for a per-stock recovery rate (default: 30)'
+    )
 
-    Returns:
-        Method name used in recovery data
-    """
-    method_map = {
-        'ProbWorthless_Bayesian_IsoCal': 'Bayesian Calibrated',
-        '1_2_3_ProbOfWorthless_Weighted': 'Weighted Average',
-        '1_ProbOfWorthless_Original': 'Original Black-Scholes',
-        '2_ProbOfWorthless_Calibrated': 'Bias Corrected',
-        '3_ProbOfWorthless_Historical_IV': 'Historical IV'
-    }
-    return method_map.get(field_name, field_name)
+    parser.add_argument(
+        '--event-flags',
+        action='store_true',
+        help='Add earnings/dividend-before-expiry flags and days to the next event to the results'
+    )
 
+    parser.add_argument(
+        '--exclude-events',
+        type=str,
+        default=None,
+        choices=EVENT_FILTERS,
+        help='Skip options with an earnings report, ex-dividend date or either between the '
+             'scoring date and expiry (default: keep all)'
+    )
 
-def calculate_days_to_expiry(expiry_date: datetime, current_date: datetime) -> int:
-    """
-    Calculate business days to expiry.
+    parser.add_argument(
+        '--iv-factors',
+        action='store_true',
+        help='Add the IV lower-bound safety factors of IV_PotentialDecline.csv (implied decline, '
+             'safety multiple, sigmas to strike, assignment probability) to the results'
+    )
 
-    Note: This is a simplified version. The upstream team should implement
-    proper business day calculation excluding weekends and Swedish holidays.
+    parser.add_argument(
+        '--event-risk',
+        action='store_true',
+        help='Add the stock\'s historical earnings-day moves to the results: event count, 5%% quantile '
+             'and worst move, and the share of event moves that went beyond the strike cushion'
+    )
 
-    Args:
-        expiry_date: Option expiration date
-        current_date: Current date
+    parser.add_argument(
+        '--market-iv',
+        action='store_true',
+        help='Add the market IV index (MARKET_IV of iv_per_stock_per_day.csv), its trailing '
+             'percentile and regime on the scoring date to the results'
+    )
 
-    Returns:
-        Business days to expiry (approximate)
-    """
-    delta = (expiry_date - current_date).days
+    parser.add_argument(
+        '--pnl-rules',
+        type=str,
+        default=None,
+        help="Simulate the P&L of selling the options picked by each selection rule, e.g. "
+             "'score:70,score:80,top:5' (score threshold / best K scores per day)"
+    )
+
+    parser.add_argument(
+        '--top-k',
+        type=str,
+        default=None,
+        help="Select the K best-scoring options of every day and report precision@K, mean "
+             "premium and hit rate by rank decile, e.g. '5,10,20'"
+    )
 
-    # Rough approximation: 5/7 of calendar days
-    # Upstream team should use proper business day calculation
-    return int(delta * 5 / 7)
+    parser.add_argument(
+        '--top-k-per-stock',
+        type=int,
+        default=None,
+        help='With --top-k, at most this many options of one stock per day (default: no cap)'
+    )
 
+    parser.add_argument(
+        '--sample',
+        type=float,
+        default=None,
+        help='Score only a stratified sample of this share of the option-days, e.g. 0.02 (strata: stock x '
+             'DTE bin x probability bin), and report reweighted hit rates with 95%% confidence intervals '
+             '(default: score all)'
+    )
+
+    parser.add_argument(
+        '--sample-seed',
+        type=int,
+        default=0,
+        help='Random seed of --sample (default: 0)'
+    )
+
+    parser.add_argument(
+        '--backend',
+        type=str,
+        default='pandas',
+        choices=['pandas', 'sql'],
+        help='Data backend: pandas (load CSVs) or sql (embedded DuckDB/SQLite with filter pushdown) (default: pandas)'
+    )
+
+    parser.add_argument(
+        '--db-path',
+        type=str,
+        default=None,
+        help='Database file for --backend sql (default: ./cache/backtest_data.<engine>)'
+    )
+
+    parser.add_argument(
+        '--stream-probability-history',
+        action='store_true',
+        help='Ingest probability_history.csv in chunks instead of loading it whole'
+    )
+
+    parser.add_argument(
+        '--chunk-rows',
+        type=int,
+        default=None,
+        help='Rows per chunk for --stream-probability-history (default: 200000)'
+    )
+
+    parser.add_argument(
+        '--memory-budget-mb',
+        type=float,
+        default=None,
+        help='Memory budget for cached data tables; LRU tables are spilled to disk above it (default: no limit)'
+    )
+
+    parser.add_argument(
+        '--load-workers',
+        type=int,
+        default=None,
+        help='Threads for parsing data files concurrently at startup, 0 = load lazily (default: one per file)'
+    )
+
+    parser.add_argument(
+        '--snapshot',
+        type=str,
+        default=None,
+        help="Open tables and indexes from a file written by the 'snapshot' subcommand (pandas backend)"
+    )
+
+    parser.add_argument(
+        '--walk-forward-train-months',
+        type=int,
+        default=None,
+        help='Also evaluate walk-forward: refit calibration and score quartiles on N months, test on the next (default: off)'
+    )
+
+    parser.add_argument(
+        '--result-cache-dir',
+        type=str,
+        default='./cache/results',
+        help='Directory of the result cache (default: ./cache/results)'
+    )
+
+    parser.add_argument(
+        '--no-result-cache',
+        action='store_true',
+        help='Always recompute instead of reusing cached results for identical inputs'
+    )
+
+    parser.add_argument(
+        '--result-cache-max-age-days',
+        type=float,
+        default=30,
+        help='Evict cached results older than this (default: 30)'
+    )
+
+    parser.add_argument(
+        '--result-cache-max-mb',
+        type=float,
+        default=1024,
+        help='Evict least recently used cached results above this total size (default: 1024)'
+    )
 
-def determine_option_outcome(
-    option_name: str,
-    expiry_date: datetime,
-    strike_price: float,
-    stock_name: str,
-    stock_data: pd.DataFrame
-) -> Optional[str]:
+    return parser
+
+
+# Arguments that change backtest results (part of the result cache key)
+RESULT_PARAMETERS = [
+    'start_date', 'end_date', 'rolling_period', 'min_days_since_break', 'probability_method',
+    'historical_peak_threshold', 'all_configs', 'all_periods', 'per_stock_recovery', 'recovery_min_n',
+    'event_flags', 'exclude_events', 'iv_factors', 'event_risk', 'market_iv', 'sample', 'sample_seed', 'backend',
+    'stream_probability_history'
+]
+
+# Tables read only when an argument is set (fingerprinted into the result cache key with it)
+RESULT_TABLES = {
+    'event_flags': ['events', 'upcoming_events'],
+    'exclude_events': ['events', 'upcoming_events'],
+    'iv_factors': ['iv_decline'],
+    'event_risk': ['events'],
+    'market_iv': ['iv_per_stock']
+}
+
+
+def result_tables(args) -> List[str]:
     """
-    Determine if option expired worthless or ITM.
+    Tables whose files the results of a run depend on.
 
     Args:
-        option_name: Option name
-        expiry_date: Expiration date
-        strike_price: Strike price
-        stock_name: Stock name
-        stock_data: DataFrame with daily stock prices
+        args: Parsed run arguments
 
     Returns:
-        "worthless" if stock > strike at expiry, "ITM" if stock <= strike, None if data missing
+        PRELOAD_TABLES plus the RESULT_TABLES of the arguments that are set
     """
-    # Find stock price on expiry date
-    expiry_prices = stock_data[
-        (stock_data['name'] == stock_name) &
-        (stock_data['date'] == expiry_date)
-    ]
+    from data_loader import PRELOAD_TABLES
 
-    if len(expiry_prices) == 0:
-        print(f"⚠️ Warning: No stock price found for {stock_name} on {expiry_date}")
-        return None
-
-    final_price = expiry_prices.iloc[0]['close']
-
-    # Put option expires worthless if stock price > strike price
-    if final_price > strike_price:
-        return 'worthless'
-    else:
-        return 'ITM'
+    tables = list(PRELOAD_TABLES)
+    for name, option_tables in RESULT_TABLES.items():
+        if getattr(args, name, None):
+            tables += [table for table in option_tables if table not in tables]
+    return tables
 
 
 def run_backtest(
@@ -185,11 +558,19 @@ def run_backtest(
     """
     Run backtest over date range.
 
-    For each date in range:
-    1. Get all active options (not yet expired)
-    2. Calculate composite score for each option
-    3. Record scores
-    4. When options expire, record outcomes
+    1. Build the panel of active options per trading day (DataLoader.get_backtest_panel)
+    2. Calculate composite scores for each day's options in one batch call
+       (per probability method x peak threshold with --all-configs and per
+       rolling period with --all-periods, sharing the lookups that do not
+       depend on them)
+    3. Record scores (long format with CONFIG_COLUMNS for --all-configs /
+       --all-periods; earnings/dividend flags with --event-flags, and options
+       with events before expiry skipped with --exclude-events; IV safety
+       factors with --iv-factors; historical event-day moves against the
+       strike cushion with --event-risk; the market IV level and regime
+       with --market-iv; with --sample, only a stratified sample of the
+       option-days, with its stratum and weight)
+    4. For options that expired by end_date, record outcomes
 
     Args:
         start_date: Start date for backtest
@@ -200,14 +581,86 @@ def run_backtest(
     Returns:
         DataFrame with backtest results
     """
+    import numpy as np
+    import pandas as pd
+    from data_loader import PROBABILITY_METHODS
+    from scoring_engine import ScoringEngine
+
+    all_configs = getattr(args, 'all_configs', False)
+    all_periods = getattr(args, 'all_periods', False)
+    periods = ROLLING_PERIODS if all_periods else [args.rolling_period]
+    if all_configs:
+        pairs = [(method, threshold) for method in PROBABILITY_METHODS for threshold in HISTORICAL_PEAK_THRESHOLDS]
+    else:
+        pairs = [(args.probability_method, args.historical_peak_threshold)]
+    configs = [(period, method, threshold) for period in periods for method, threshold in pairs]
+    methods = list(dict.fromkeys(method for method, _ in pairs))
+    config_columns = ([CONFIG_COLUMNS[0]] if all_periods else []) + (CONFIG_COLUMNS[1:] if all_configs else [])
+    recovery_min_n = args.recovery_min_n if getattr(args, 'per_stock_recovery', False) else None
+
     print(f"\n{'='*80}")
     print(f"BACKTEST: {start_date.date()} to {end_date.date()}")
     print(f"{'='*80}\n")
 
-    # Load all data
+    # Build the (day, option) panel with the backtest filters applied
     print("Loading data files...")
-    options_df = data_loader.load_options_data()
-    stock_df = data_loader.load_stock_data()
+    panel = data_loader.get_backtest_panel(
+        start_date,
+        end_date,
+        rolling_period=periods if all_periods else args.rolling_period,
+        min_days_since_break=args.min_days_since_break,
+        probability_method=methods if all_configs else args.probability_method,
+        min_days_to_expiry=1,
+        max_days_to_expiry=45
+    )
+
+    # Earnings / ex-dividend dates between each scoring date and expiry
+    event_flags = getattr(args, 'event_flags', False)
+    exclude_events = getattr(args, 'exclude_events', None)
+    if event_flags or exclude_events:
+        flags = data_loader.get_event_flags(
+            panel['StockName'], panel['date'], panel['ExpiryDate'], panel['OptionName']
+        )
+        if event_flags:
+            panel = panel.assign(**{column: flags[column].to_numpy() for column in EVENT_COLUMNS})
+        if exclude_events:
+            keep = ~flags[EVENT_FILTERS[exclude_events]].to_numpy()
+            print(f"✓ Excluded {(~keep).sum()} option-days with {exclude_events} events before expiry")
+            panel = panel[keep]
+
+    # Stratified sample of the option-days (stock x DTE bin x probability bin)
+    sample = getattr(args, 'sample', None)
+    if sample:
+        from sampling import sample_strata, stratified_sample
+
+        strata = sample_strata(panel['StockName'], panel['DaysToExpiry'], panel[args.probability_method])
+        rows, weights = stratified_sample(strata, sample, seed=getattr(args, 'sample_seed', 0))
+        panel = panel.iloc[rows].assign(sample_stratum=strata[rows], sample_weight=weights)
+        print(f"✓ Sampled {len(rows)} of {len(strata)} option-days ({len(rows) / max(len(strata), 1):.1%}) "
+              f"from {strata.max() + 1 if len(strata) else 0} strata")
+
+    # IV lower-bound safety factors of each option-day (IV_PotentialDecline.csv)
+    iv_factors = getattr(args, 'iv_factors', False)
+    if iv_factors:
+        screening = data_loader.get_iv_screening(panel['OptionName'], panel['date'])
+        panel = panel.assign(**{column: screening[source].to_numpy() for source, column in IV_COLUMNS.items()})
+        print(f"✓ IV screening factors for {screening['SafetyCategory'].notna().sum()} of {len(panel)} option-days")
+
+    # Historical earnings-day moves against each option's cushion to the strike
+    event_risk = getattr(args, 'event_risk', False)
+    if event_risk:
+        closes = data_loader.get_closes(panel['StockName'], panel['date'])
+        cushions = 1 - panel['StrikePrice'].to_numpy(dtype=np.float64) / closes
+        risk = data_loader.get_event_risk(panel['StockName'], cushions)
+        panel = panel.assign(**{column: risk[column].to_numpy() for column in EVENT_RISK_COLUMNS})
+        print(f"✓ Event risk for {(risk['event_count'] > 0).sum()} of {len(panel)} option-days")
+
+    # Market-wide IV level and regime on each scoring date
+    market_iv = getattr(args, 'market_iv', False)
+    if market_iv:
+        market = data_loader.get_market_iv(panel['date'])
+        panel = panel.assign(**{column: market[column].to_numpy() for column in MARKET_IV_COLUMNS})
+        print(f"✓ Market IV for {market['market_iv'].notna().sum()} of {len(panel)} option-days")
 
     # Initialize scoring engine
     engine = ScoringEngine()
@@ -215,146 +668,136 @@ def run_backtest(
     # Results storage
     results = []
 
-    # Get date range (all trading days)
-    trading_days = stock_df['date'].unique()
-    trading_days = sorted([d for d in trading_days if start_date <= d <= end_date])
+    trading_days = panel['date'].unique()
+    print(f"\nProcessing {len(trading_days)} trading days ({len(panel)} option-days"
+          f"{f', {len(configs)} configurations' if config_columns else ''})...\n")
 
-    print(f"\nProcessing {len(trading_days)} trading days...\n")
-
-    # For each trading day
-    for i, current_date in enumerate(trading_days):
+    # Score each trading day in one vectorized call
+    for i, (current_date, day_panel) in enumerate(panel.groupby('date', sort=True)):
         current_date = pd.Timestamp(current_date)
 
         if (i + 1) % 10 == 0:
             print(f"Progress: {i+1}/{len(trading_days)} days ({(i+1)/len(trading_days)*100:.1f}%)")
 
-        # Get options active on this date (expiry date >= current date)
-        active_options = options_df[options_df['ExpiryDate'] >= current_date]
+        inputs_by_config = data_loader.get_scoring_inputs_by_config(
+            day_panel,
+            current_date,
+            configs,
+            days_to_expiry=day_panel['DaysToExpiry'].to_numpy(dtype=np.float64),
+            recovery_min_n=recovery_min_n
+        )
+
+        for (period, method, threshold), inputs in inputs_by_config.items():
+            # Rows passing this period's support filters
+            options = day_panel
+            if all_periods:
+                in_period = day_panel[f'in_period_{period}'].to_numpy()
+                options, inputs = day_panel[in_period], inputs[in_period]
+
+            composite_scores, score_breakdown = engine.calculate_scores_batch(
+                historical_peak_threshold=threshold,
+                **{column: inputs[column].to_numpy() for column in inputs.columns}
+            )
 
-        # Filter by min days to expiry (e.g., only look at options 1-45 days out)
-        # This can be adjusted based on your needs
-        options_to_score = []
+            day_results = pd.DataFrame({
+                'date': current_date,
+                'option_name': options['OptionName'].to_numpy(),
+                'stock_name': options['StockName'].to_numpy(),
+                'strike_price': options['StrikePrice'].to_numpy(),
+                'expiry_date': options['ExpiryDate'].to_numpy(),
+                'days_to_expiry': options['DaysToExpiry'].to_numpy(),
+                'current_probability': inputs['current_probability'].to_numpy(),
+                'composite_score': composite_scores,
+                'premium': options['Premium'].fillna(0).to_numpy(),
+                **{f'score_{factor}': score_breakdown[factor]['weighted'] for factor in score_breakdown.dtype.names},
+                **({column: options[column].to_numpy() for column in EVENT_COLUMNS} if event_flags else {}),
+                **({column: options[column].to_numpy() for column in IV_COLUMNS.values()} if iv_factors else {}),
+                **({column: options[column].to_numpy() for column in EVENT_RISK_COLUMNS} if event_risk else {}),
+                **({column: options[column].to_numpy() for column in MARKET_IV_COLUMNS} if market_iv else {}),
+                **({column: options[column].to_numpy() for column in SAMPLE_COLUMNS} if sample else {})
+            })
+            config = {'rolling_period': period, 'probability_method': method, 'historical_peak_threshold': threshold}
+            for position, column in enumerate(config_columns, start=1):
+                day_results.insert(position, column, config[column])
+            results.append(day_results)
+
+    if not results:
+        print("\n✓ Backtest complete. Generated 0 scored records.\n")
+        return pd.DataFrame()
+
+    results_df = pd.concat(results, ignore_index=True)
+
+    # Determine outcomes for options that expired by end_date
+    # ("worthless" if stock > strike at expiry, "ITM" otherwise)
+    expired = (results_df['expiry_date'] <= pd.Timestamp(end_date)).to_numpy()
+    expiry_closes = np.full(len(results_df), np.nan)
+    expiry_closes[expired] = data_loader.get_expiry_closes(
+        results_df.loc[expired, 'stock_name'],
+        results_df.loc[expired, 'expiry_date']
+    )
+    outcome = np.where(expiry_closes > results_df['strike_price'].to_numpy(), 'worthless', 'ITM').astype(object)
+    outcome[np.isnan(expiry_closes)] = None
+    results_df.insert(results_df.columns.get_loc('premium'), 'outcome', outcome)
+    results_df.insert(results_df.columns.get_loc('premium'), 'expiry_close', expiry_closes)
 
-        for _, option in active_options.iterrows():
-            days_to_expiry = calculate_days_to_expiry(option['ExpiryDate'], current_date)
+    missing = expired & np.isnan(expiry_closes)
+    if missing.any():
+        print(f"⚠️ Warning: No stock price found on expiry date for {missing.sum()} expired records")
 
-            # Filter criteria (adjust as needed)
-            if days_to_expiry < 1 or days_to_expiry > 45:
-                continue
+    print(f"\n✓ Backtest complete. Generated {len(results_df)} scored records.\n")
 
-            # Get support metrics
-            support_metrics = data_loader.get_support_metrics_for_stock(
-                option['StockName'],
-                args.rolling_period
-            )
+    return results_df
 
-            if support_metrics is None:
-                continue
-
-            # Filter by days since break
-            if support_metrics.get('days_since_last_break', 0) < args.min_days_since_break:
-                continue
-
-            # Filter by strike vs rolling low
-            rolling_low = support_metrics.get('rolling_low')
-            if rolling_low is None or option['StrikePrice'] > rolling_low:
-                continue
-
-            options_to_score.append(option)
-
-        # Score each option
-        for option in options_to_score:
-            try:
-                # Get all required data
-                stock_name = option['StockName']
-                option_name = option['OptionName']
-
-                # Support metrics
-                support_metrics = data_loader.get_support_metrics_for_stock(
-                    stock_name,
-                    args.rolling_period
-                )
-
-                # Probability peak
-                probability_peak = data_loader.get_probability_peak(
-                    option_name,
-                    args.probability_method
-                )
-
-                # Current probability
-                current_probability = option.get(args.probability_method, 0)
-
-                # Recovery rate
-                prob_bin = get_probability_bin(current_probability)
-                dte_bin = get_dte_bin(calculate_days_to_expiry(option['ExpiryDate'], current_date))
-
-                recovery_method = map_prob_method_to_recovery_method(args.probability_method)
-                recovery_rate = data_loader.get_recovery_rate(
-                    args.historical_peak_threshold,
-                    recovery_method,
-                    prob_bin,
-                    dte_bin
-                )
-
-                # Monthly stats
-                month = current_date.month
-                monthly_stats = data_loader.get_monthly_stats_for_stock(stock_name, month)
-
-                # Current month performance
-                current_month_perf = data_loader.get_current_month_performance(
-                    stock_name,
-                    current_date
-                )
-
-                # Calculate score
-                composite_score, score_breakdown = engine.calculate_score(
-                    support_strength_score=support_metrics.get('support_strength_score'),
-                    days_since_last_break=support_metrics.get('days_since_last_break'),
-                    trading_days_per_break=support_metrics.get('trading_days_per_break'),
-                    current_probability=current_probability,
-                    historical_peak_probability=probability_peak,
-                    historical_peak_threshold=args.historical_peak_threshold,
-                    recovery_advantage=recovery_rate,
-                    monthly_positive_rate=monthly_stats.get('pct_pos_return_months') if monthly_stats else None,
-                    monthly_avg_return=monthly_stats.get('return_month_mean_pct_return_month') if monthly_stats else None,
-                    typical_low_day=monthly_stats.get('day_low_day_of_month') if monthly_stats else None,
-                    current_day=current_date.day,
-                    current_month_performance=current_month_perf
-                )
-
-                # Determine outcome (if option has expired by end_date)
-                outcome = None
-                if option['ExpiryDate'] <= end_date:
-                    outcome = determine_option_outcome(
-                        option_name,
-                        option['ExpiryDate'],
-                        option['StrikePrice'],
-                        stock_name,
-                        stock_df
-                    )
-
-                # Store result
-                results.append({
-                    'date': current_date,
-                    'option_name': option_name,
-                    'stock_name': stock_name,
-                    'strike_price': option['StrikePrice'],
-                    'expiry_date': option['ExpiryDate'],
-                    'days_to_expiry': calculate_days_to_expiry(option['ExpiryDate'], current_date),
-                    'current_probability': current_probability,
-                    'composite_score': composite_score,
-                    'outcome': outcome,
-                    'premium': option.get('Premium', 0),
-                    **{f'score_{k}': v['weighted'] for k, v in score_breakdown.items()}
-                })
-
-            except Exception as e:
-                print(f"⚠️ Error scoring {option['OptionName']}: {e}")
-                continue
-
-    print(f"\n✓ Backtest complete. Generated {len(results)} scored records.\n")
-
-    return pd.DataFrame(results)
+
+def summarize_outcomes(with_outcomes: pd.DataFrame) -> Dict:
+    """
+    Hit rate statistics of results with known outcomes.
+
+    Args:
+        with_outcomes: Backtest results with a non-null outcome (non-empty)
+
+    Returns:
+        Dict with hit_rates (per SCORE_BUCKETS bucket), overall_hit_rate,
+        avg_score, quartile hit rates and their spread
+    """
+    worthless = with_outcomes['outcome'] == 'worthless'
+    scores = with_outcomes['composite_score']
+
+    hit_rate_results = []
+    for min_score, max_score, label in SCORE_BUCKETS:
+        in_bucket = (scores >= min_score) & (scores < max_score)
+        n = int(in_bucket.sum())
+        if n == 0:
+            continue
+
+        worthless_count = (worthless & in_bucket).sum()
+        hit_rate_results.append({
+            'score_bucket': label,
+            'min_score': min_score,
+            'max_score': max_score,
+            'n': n,
+            'worthless_count': worthless_count,
+            'hit_rate_pct': worthless_count / n * 100
+        })
+
+    # Top vs bottom quartile comparison
+    top_quartile = scores >= scores.quantile(0.75)
+    bottom_quartile = scores <= scores.quantile(0.25)
+    top_hit_rate = (worthless & top_quartile).sum() / top_quartile.sum() * 100
+    bottom_hit_rate = (worthless & bottom_quartile).sum() / bottom_quartile.sum() * 100
+
+    return {
+        'hit_rates': hit_rate_results,
+        'n': len(with_outcomes),
+        'worthless_count': int(worthless.sum()),
+        'overall_hit_rate': worthless.sum() / len(with_outcomes) * 100,
+        'avg_score': scores.mean(),
+        'top_quartile_n': int(top_quartile.sum()),
+        'bottom_quartile_n': int(bottom_quartile.sum()),
+        'top_quartile_hit_rate': top_hit_rate,
+        'bottom_quartile_hit_rate': bottom_hit_rate,
+        'score_spread': top_hit_rate - bottom_hit_rate
+    }
 
 
 def analyze_results(results_df: pd.DataFrame) -> Dict:
@@ -366,25 +809,34 @@ def analyze_results(results_df: pd.DataFrame) -> Dict:
     - Factor importance
     - Statistical metrics
 
+    Long-format results (--all-configs / --all-periods) are analyzed per
+    configuration and compared in one table.
+
     Args:
         results_df: DataFrame with backtest results
 
     Returns:
-        Dict with analysis results
+        Dict with analysis results; for long-format results, 'configurations'
+        holds one summary per configuration and 'hit_rates' is long format
     """
     print(f"\n{'='*80}")
     print("ANALYSIS")
     print(f"{'='*80}\n")
 
     # Filter to options with known outcomes
-    with_outcomes = results_df[results_df['outcome'].notna()]
+    with_outcomes = results_df[results_df['outcome'].notna()] if len(results_df) else results_df
 
     if len(with_outcomes) == 0:
         print("⚠️ No options with outcomes found. Cannot analyze.")
         return {}
 
-    print(f"Total options with outcomes: {len(with_outcomes)}")
-    print(f"  - Expired worthless: {(with_outcomes['outcome'] == 'worthless').sum()}")
+    if any(column in with_outcomes.columns for column in CONFIG_COLUMNS):
+        return analyze_configurations(with_outcomes)
+
+    summary = summarize_outcomes(with_outcomes)
+
+    print(f"Total options with outcomes: {summary['n']}")
+    print(f"  - Expired worthless: {summary['worthless_count']}")
     print(f"  - Expired ITM: {(with_outcomes['outcome'] == 'ITM').sum()}")
 
     # Hit rates by score bucket
@@ -392,78 +844,555 @@ def analyze_results(results_df: pd.DataFrame) -> Dict:
     print("HIT RATES BY SCORE BUCKET")
     print(f"{'='*80}\n")
 
-    score_buckets = [
-        (90, 100, "90-100"),
-        (80, 90, "80-90"),
-        (70, 80, "70-80"),
-        (60, 70, "60-70"),
-        (50, 60, "50-60"),
-        (0, 50, "<50")
+    for bucket in summary['hit_rates']:
+        print(f"Score {bucket['score_bucket']:>8}: {bucket['hit_rate_pct']:5.1f}% worthless (n={bucket['n']:4})")
+
+    # Overall statistics
+    print(f"\n{'='*80}")
+    print("OVERALL STATISTICS")
+    print(f"{'='*80}\n")
+
+    print(f"Overall hit rate: {summary['overall_hit_rate']:.1f}%")
+    print(f"Average composite score: {summary['avg_score']:.1f}")
+
+    print(f"\nTop 25% of scores: {summary['top_quartile_hit_rate']:.1f}% worthless (n={summary['top_quartile_n']})")
+    print(f"Bottom 25% of scores: {summary['bottom_quartile_hit_rate']:.1f}% worthless (n={summary['bottom_quartile_n']})")
+    print(f"Difference: {summary['score_spread']:+.1f} percentage points")
+
+    return {
+        'hit_rates': summary['hit_rates'],
+        'overall_hit_rate': summary['overall_hit_rate'],
+        'avg_score': summary['avg_score'],
+        'top_quartile_hit_rate': summary['top_quartile_hit_rate'],
+        'bottom_quartile_hit_rate': summary['bottom_quartile_hit_rate'],
+        'score_spread': summary['score_spread']
+    }
+
+
+def analyze_configurations(with_outcomes: pd.DataFrame) -> Dict:
+    """
+    Compare configurations of long-format results.
+
+    Args:
+        with_outcomes: Long-format results with known outcomes
+
+    Returns:
+        Dict with 'configurations' (one summary row per configuration) and
+        'hit_rates' (bucket hit rates with the configuration columns)
+    """
+    config_columns = [column for column in CONFIG_COLUMNS if column in with_outcomes.columns]
+    configurations, hit_rates = [], []
+    for key, group in with_outcomes.groupby(config_columns, sort=False):
+        summary = summarize_outcomes(group)
+        config = dict(zip(config_columns, key))
+        hit_rates += [{**config, **bucket} for bucket in summary.pop('hit_rates')]
+        configurations.append({**config, **summary})
+
+    print(f"Compared {len(configurations)} configurations "
+          f"({len(with_outcomes) / len(configurations):.0f} options with outcomes on average)\n")
+    print(f"{'Period':>6} {'Probability method':<34} {'Peak':>5} {'Hit rate':>9} {'Avg score':>10} "
+          f"{'Top 25%':>8} {'Bottom 25%':>11} {'Spread':>7}")
+    for config in sorted(configurations, key=lambda c: -c['score_spread']):
+        threshold = config.get('historical_peak_threshold')
+        print(f"{config.get('rolling_period', ''):>6} {config.get('probability_method', ''):<34} "
+              f"{'' if threshold is None else f'{threshold:.2f}':>5} "
+              f"{config['overall_hit_rate']:>8.1f}% {config['avg_score']:>10.1f} "
+              f"{config['top_quartile_hit_rate']:>7.1f}% {config['bottom_quartile_hit_rate']:>10.1f}% "
+              f"{config['score_spread']:>+7.1f}")
+
+    return {'configurations': configurations, 'hit_rates': hit_rates}
+
+
+def summarize_sample(results: pd.DataFrame) -> Dict:
+    """
+    Reweighted hit rate estimates of sampled results (see sampling.py).
+
+    Args:
+        results: Sampled backtest results of one configuration, with and
+            without outcomes (all rows count towards the stratum sample
+            sizes; with --all-periods, those of the period's rows)
+
+    Returns:
+        Dict as summarize_outcomes, with the estimated full-panel number of
+        options with outcomes (estimated_n), standard errors and 95% confidence
+        intervals; quartiles are weighted
+    """
+    import numpy as np
+    from sampling import hit_rate_estimates, spread_estimate, weighted_quantile
+
+    strata = results['sample_stratum'].to_numpy()
+    weights = results['sample_weight'].to_numpy(dtype=np.float64)
+    settled = results['outcome'].notna().to_numpy()
+    worthless = (results['outcome'] == 'worthless').to_numpy()
+    scores = results['composite_score'].to_numpy(dtype=np.float64)
+
+    settled_scores = np.where(settled, scores, np.nan)
+    top_quartile = scores >= weighted_quantile(settled_scores, weights, 0.75)
+    bottom_quartile = scores <= weighted_quantile(settled_scores, weights, 0.25)
+    domains = np.column_stack(
+        [(scores >= min_score) & (scores < max_score) for min_score, max_score, _ in SCORE_BUCKETS]
+        + [np.ones(len(results), dtype=bool), top_quartile, bottom_quartile]
+    )
+    estimates = hit_rate_estimates(strata, weights, settled, worthless, domains)
+    buckets = estimates.iloc[:len(SCORE_BUCKETS)]
+    overall, top, bottom = (estimates.iloc[len(SCORE_BUCKETS) + i] for i in range(3))
+    spread, spread_error = spread_estimate(strata, weights, settled, worthless, top_quartile, bottom_quartile)
+
+    hit_rate_results = [
+        {'score_bucket': label, 'min_score': min_score, 'max_score': max_score, **bucket._asdict()}
+        for (min_score, max_score, label), bucket in zip(SCORE_BUCKETS, buckets.itertuples(index=False))
+        if bucket.n > 0
     ]
 
-    hit_rate_results = []
+    return {
+        'hit_rates': hit_rate_results,
+        'n': int(overall['n']),
+        'estimated_n': overall['estimated_n'],
+        'overall_hit_rate': overall['hit_rate_pct'],
+        'overall_std_error': overall['std_error_pct'],
+        'overall_ci_low': overall['ci_low_pct'],
+        'overall_ci_high': overall['ci_high_pct'],
+        'avg_score': np.average(scores[settled], weights=weights[settled]) if settled.any() else np.nan,
+        'top_quartile_n': int(top['n']),
+        'bottom_quartile_n': int(bottom['n']),
+        'top_quartile_hit_rate': top['hit_rate_pct'],
+        'bottom_quartile_hit_rate': bottom['hit_rate_pct'],
+        'score_spread': spread,
+        'score_spread_std_error': spread_error
+    }
 
-    for min_score, max_score, label in score_buckets:
-        bucket_options = with_outcomes[
-            (with_outcomes['composite_score'] >= min_score) &
-            (with_outcomes['composite_score'] < max_score)
-        ]
 
-        if len(bucket_options) == 0:
-            continue
+def analyze_sample(results_df: pd.DataFrame) -> Dict:
+    """
+    Analyze the results of a --sample run.
 
-        worthless_count = (bucket_options['outcome'] == 'worthless').sum()
-        hit_rate = worthless_count / len(bucket_options) * 100
+    Hit rates are estimates for the full panel: every sampled row is weighted
+    by its stratum's size over its sample size, and the confidence intervals
+    show how far a full run may differ.
 
-        print(f"Score {label:>8}: {hit_rate:5.1f}% worthless (n={len(bucket_options):4})")
+    Args:
+        results_df: Sampled backtest results (SAMPLE_COLUMNS)
 
-        hit_rate_results.append({
-            'score_bucket': label,
-            'min_score': min_score,
-            'max_score': max_score,
-            'n': len(bucket_options),
-            'worthless_count': worthless_count,
-            'hit_rate_pct': hit_rate
-        })
+    Returns:
+        Dict as analyze_results, with estimated_n, std_error_pct and
+        ci_low_pct / ci_high_pct per bucket
+    """
+    import pandas as pd
+    from sampling import CONFIDENCE_Z
 
-    # Overall statistics
     print(f"\n{'='*80}")
-    print("OVERALL STATISTICS")
+    print("ANALYSIS (STRATIFIED SAMPLE, REWEIGHTED)")
     print(f"{'='*80}\n")
 
-    overall_hit_rate = (with_outcomes['outcome'] == 'worthless').sum() / len(with_outcomes) * 100
-    print(f"Overall hit rate: {overall_hit_rate:.1f}%")
+    if len(results_df) == 0 or results_df['outcome'].isna().all():
+        print("⚠️ No options with outcomes found. Cannot analyze.")
+        return {}
 
-    avg_score = with_outcomes['composite_score'].mean()
-    print(f"Average composite score: {avg_score:.1f}")
+    config_columns = [column for column in CONFIG_COLUMNS if column in results_df.columns]
+    if config_columns:
+        configurations, hit_rates = [], []
+        for key, rows in config_groups(results_df, config_columns):
+            summary = summarize_sample(results_df.iloc[rows])
+            config = dict(zip(config_columns, key))
+            hit_rates += [{**config, **bucket} for bucket in summary.pop('hit_rates')]
+            configurations.append({**config, **summary})
 
-    # Top vs bottom quartile comparison
-    top_quartile_threshold = with_outcomes['composite_score'].quantile(0.75)
-    bottom_quartile_threshold = with_outcomes['composite_score'].quantile(0.25)
+        table = pd.DataFrame(configurations)
+        table['ci_half_width'] = CONFIDENCE_Z * table['overall_std_error']
+        print(table.sort_values('score_spread', ascending=False)[
+            config_columns + ['n', 'estimated_n', 'overall_hit_rate', 'ci_half_width', 'score_spread']
+        ].round({'estimated_n': 0, 'overall_hit_rate': 1, 'ci_half_width': 1, 'score_spread': 1}).to_string(index=False))
+        return {'configurations': configurations, 'hit_rates': hit_rates}
 
-    top_quartile = with_outcomes[with_outcomes['composite_score'] >= top_quartile_threshold]
-    bottom_quartile = with_outcomes[with_outcomes['composite_score'] <= bottom_quartile_threshold]
+    summary = summarize_sample(results_df)
 
-    top_hit_rate = (top_quartile['outcome'] == 'worthless').sum() / len(top_quartile) * 100
-    bottom_hit_rate = (bottom_quartile['outcome'] == 'worthless').sum() / len(bottom_quartile) * 100
+    print(f"Sampled options with outcomes: {summary['n']} "
+          f"(estimated {summary['estimated_n']:,.0f} in the full panel)")
 
-    print(f"\nTop 25% of scores: {top_hit_rate:.1f}% worthless (n={len(top_quartile)})")
-    print(f"Bottom 25% of scores: {bottom_hit_rate:.1f}% worthless (n={len(bottom_quartile)})")
-    print(f"Difference: {top_hit_rate - bottom_hit_rate:+.1f} percentage points")
+    print(f"\n{'='*80}")
+    print("HIT RATES BY SCORE BUCKET (estimated, 95% confidence interval)")
+    print(f"{'='*80}\n")
+
+    for bucket in summary['hit_rates']:
+        print(f"Score {bucket['score_bucket']:>8}: {bucket['hit_rate_pct']:5.1f}% worthless "
+              f"± {CONFIDENCE_Z * bucket['std_error_pct']:4.1f} "
+              f"[{bucket['ci_low_pct']:5.1f}, {bucket['ci_high_pct']:5.1f}] "
+              f"(n={bucket['n']:4}, est. {bucket['estimated_n']:,.0f})")
+
+    print(f"\n{'='*80}")
+    print("OVERALL STATISTICS (estimated)")
+    print(f"{'='*80}\n")
+
+    print(f"Overall hit rate: {summary['overall_hit_rate']:.1f}% "
+          f"(95% CI {summary['overall_ci_low']:.1f}-{summary['overall_ci_high']:.1f}%)")
+    print(f"Average composite score: {summary['avg_score']:.1f}")
+
+    print(f"\nTop 25% of scores: {summary['top_quartile_hit_rate']:.1f}% worthless (n={summary['top_quartile_n']})")
+    print(f"Bottom 25% of scores: {summary['bottom_quartile_hit_rate']:.1f}% worthless (n={summary['bottom_quartile_n']})")
+    print(f"Difference: {summary['score_spread']:+.1f} ± {CONFIDENCE_Z * summary['score_spread_std_error']:.1f} "
+          f"percentage points")
+
+    return summary
+
+
+def create_snapshot(args):
+    """
+    Load the data files, build the lookup indexes and save a snapshot.
+
+    Args:
+        args: Arguments of the 'snapshot' subcommand
+    """
+    from data_loader import DataLoader
+
+    data_loader = DataLoader(args.data_dir)
+    data_loader.preload(tables=args.tables, max_workers=args.load_workers)
+    data_loader.save_snapshot(args.output, tables=args.tables)
 
-    return {
-        'hit_rates': hit_rate_results,
-        'overall_hit_rate': overall_hit_rate,
-        'avg_score': avg_score,
-        'top_quartile_hit_rate': top_hit_rate,
-        'bottom_quartile_hit_rate': bottom_hit_rate,
-        'score_spread': top_hit_rate - bottom_hit_rate
-    }
 
+def build_iv_screening_file(args):
+    """
+    Append the screening rows of the current option chain to IV_PotentialDecline.csv.
+
+    Args:
+        args: Parsed 'iv-screening' arguments
+    """
+    import pandas as pd
+    from data_loader import DataLoader
+    from iv_screening import append_iv_screening, chain_from_options
+
+    data_loader = DataLoader(args.data_dir)
+    update_date = args.update_date or data_loader.get_fingerprints(['options'])['options'][3]
+    if update_date is None:
+        print("Error: no --update-date and no optionsData timestamp in last_updated.json")
+        sys.exit(1)
+    update_date = pd.Timestamp(update_date).normalize()
 
-def main():
+    output = Path(args.output) if args.output else Path(args.data_dir) / 'IV_PotentialDecline.csv'
+    chain = chain_from_options(data_loader.load_options_data(), update_date)
+    appended = append_iv_screening(chain, output)
+    if len(appended) == 0:
+        print(f"✓ {output} already has {update_date.date()}, nothing to append")
+    else:
+        print(f"✓ Appended {len(appended)} screening rows for {update_date.date()} to {output}")
+
+
+def build_lower_bound_stats(args):
+    """
+    Build (or update) the lower-bound expiry statistics and hit rate trends.
+
+    Args:
+        args: Parsed 'lower-bound-stats' arguments
+    """
+    import time
+    import pandas as pd
+    from data_loader import DataLoader
+    from lower_bound_stats import expiry_stats, hit_rate_trends, predictions_from_iv_screening, update_expiry_stats
+
+    data_loader = DataLoader(args.data_dir)
+    output_dir = Path(args.output_dir or args.data_dir)
+    output_dir.mkdir(exist_ok=True, parents=True)
+    stats_file = output_dir / 'all_stocks_expiry_stats.csv'
+    trends_file = output_dir / 'hit_rate_trends_by_stock.csv'
+
+    try:
+        if args.source == 'iv-screening':
+            predictions = predictions_from_iv_screening(data_loader.load_iv_potential_decline())
+        else:
+            predictions = data_loader.load_lower_bound_predictions()
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    if args.since and stats_file.exists():
+        stats = pd.read_csv(stats_file, delimiter='|', parse_dates=['ExpiryDate'])
+        stats, recomputed = update_expiry_stats(stats, predictions, data_loader.get_expiry_closes, args.since)
+        print(f"✓ Recomputed {recomputed} of {len(stats)} expiries")
+    else:
+        if args.since:
+            print(f"⚠️ {stats_file} not found, rebuilding all expiries")
+        stats = expiry_stats(predictions, data_loader.get_expiry_closes)
+    trends = hit_rate_trends(stats)
+    elapsed = time.perf_counter() - start
+
+    stats.to_csv(stats_file, sep='|', index=False, date_format='%Y-%m-%d')
+    trends.to_csv(trends_file, index=False)
+    settled = stats.dropna(subset=['BreachCount'])
+    hit_rate = (1 - settled['BreachCount'].sum() / settled['PredictionCount'].sum()) * 100 if len(settled) else float('nan')
+    print(f"✓ {len(predictions)} predictions -> {len(stats)} expiries, {len(trends)} stock-months "
+          f"in {elapsed:.2f}s (hit rate {hit_rate:.1f}%)")
+    print(f"✓ Saved {stats_file} and {trends_file}")
+
+
+def build_market_iv_file(args):
+    """
+    Recompute the MARKET_IV rows of iv_per_stock_per_day.csv.
+
+    Args:
+        args: Parsed 'market-iv' arguments
+    """
+    import time
+    from data_loader import DataLoader
+    from market_iv import MARKET_IV_NAME, REFRESH_LAST_DATES, update_market_iv
+
+    data_loader = DataLoader(args.data_dir)
+    try:
+        iv_df = data_loader.load_iv_per_stock_per_day()
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    iv_df, recomputed = update_market_iv(iv_df, refresh_last=len(iv_df) if args.full else REFRESH_LAST_DATES)
+    elapsed = time.perf_counter() - start
+
+    # Keep the line endings of the source file (it is written on Windows)
+    source = Path(args.data_dir) / 'iv_per_stock_per_day.csv'
+    with open(source, 'rb') as f:
+        line_end = '\r\n' if f.readline().endswith(b'\r\n') else '\n'
+
+    output = Path(args.output) if args.output else source
+    iv_df.to_csv(output, sep='|', index=False, date_format='%Y-%m-%d', lineterminator=line_end)
+    market = iv_df[iv_df['Stock_Name'] == MARKET_IV_NAME]
+    print(f"✓ Recomputed MARKET_IV for {recomputed} of {len(market)} dates in {elapsed:.2f}s")
+    print(f"✓ Saved {output}")
+
+
+def analyze_walk_forward(results_df: pd.DataFrame, train_months: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Walk-forward evaluation of backtest results (see walk_forward.py).
+
+    Args:
+        results_df: DataFrame with backtest results
+        train_months: Training window length in months
+
+    Returns:
+        Tuple of (per-test-month statistics, per-bucket hit rates)
+    """
+    import pandas as pd
+    from walk_forward import WalkForwardStats
+
+    print(f"\n{'='*80}")
+    print(f"WALK-FORWARD ({train_months}-month training window, 1-month test)")
+    print(f"{'='*80}\n")
+
+    config_columns = [column for column in CONFIG_COLUMNS if column in results_df.columns]
+    if len(results_df) > 0 and config_columns:
+        # Long-format results: one set of accumulators per configuration
+        windows, buckets = [], []
+        for key, group in results_df.groupby(config_columns, sort=False):
+            stats = WalkForwardStats()
+            stats.add(group)
+            config_windows, config_buckets = stats.evaluate(train_months=train_months)
+            for frame, out in ((config_windows, windows), (config_buckets, buckets)):
+                out.append(frame.assign(**dict(zip(config_columns, key))))
+        windows = pd.concat(windows, ignore_index=True)
+        buckets = pd.concat(buckets, ignore_index=True)
+        if len(windows) > 0:
+            print(windows.groupby(config_columns, sort=False)
+                  .agg(test_months=('test_month', 'size'), spread=('score_spread', 'mean'),
+                       brier=('brier_raw', 'mean'), calibrated=('brier_calibrated', 'mean'))
+                  .round(4).to_string())
+        return windows, buckets
+
+    stats = WalkForwardStats()
+    if len(results_df) > 0:
+        stats.add(results_df)
+    windows, buckets = stats.evaluate(train_months=train_months)
+
+    if len(windows) == 0:
+        print("⚠️ Not enough months with outcomes for a walk-forward window.")
+        return windows, buckets
+
+    print(f"{'Month':>8} {'n':>6} {'Hit rate':>9} {'Spread':>8} {'Brier':>7} {'Calibrated':>11}")
+    for window in windows.itertuples():
+        print(f"{window.test_month:>8} {window.test_n:>6} {window.hit_rate_pct:>8.1f}% "
+              f"{window.score_spread:>+8.1f} {window.brier_raw:>7.4f} {window.brier_calibrated:>11.4f}")
+
+    weights = windows['test_n']
+    print(f"\nOut-of-sample hit rate: {(windows['worthless_count'].sum() / weights.sum()) * 100:.1f}% "
+          f"over {len(windows)} test months")
+    print(f"Mean quartile spread: {windows['score_spread'].mean():+.1f} percentage points")
+
+    return windows, buckets
+
+
+def config_groups(results_df: pd.DataFrame, config_columns: List[str]) -> List[Tuple[tuple, np.ndarray]]:
+    """Row positions of every configuration (one group of all rows for wide-format results)."""
+    import numpy as np
+
+    if not config_columns:
+        return [((), np.arange(len(results_df)))]
+    return [
+        (key if isinstance(key, tuple) else (key,), rows)
+        for key, rows in results_df.groupby(config_columns, sort=False).indices.items()
+    ]
+
+
+def analyze_pnl(
+    results_df: pd.DataFrame,
+    data_loader: DataLoader,
+    rules: str
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Strategy P&L per selection rule (see strategy_pnl.py).
+
+    Args:
+        results_df: DataFrame with backtest results; expiry_close is NaN for
+            positions expiring after the end date, which stay open
+        data_loader: DataLoader instance (contracts)
+        rules: Comma-separated selection rules
+
+    Returns:
+        Tuple of (per-rule summary, daily equity curves); with long-format
+        results, per configuration and rule
+    """
+    import numpy as np
+    import pandas as pd
+    from strategy_pnl import simulate_strategies
+
+    print(f"\n{'='*80}")
+    print("STRATEGY P&L")
+    print(f"{'='*80}\n")
+
+    if len(results_df) == 0:
+        print("⚠️ No scored options. Cannot simulate.")
+        return pd.DataFrame(), pd.DataFrame()
+
+    options_df = data_loader.load_options_data().drop_duplicates('OptionName').set_index('OptionName')
+    contracts = options_df['NumberOfContractsBasedOnLimit'].reindex(results_df['option_name'].to_numpy())
+
+    expiry_closes = results_df['expiry_close'].to_numpy(dtype=np.float64)
+
+    config_columns = [column for column in CONFIG_COLUMNS if column in results_df.columns]
+    groups = config_groups(results_df, config_columns)
+    summaries, curves = [], []
+    for key, rows in groups:
+        summary, equity = simulate_strategies(
+            results_df.iloc[rows], rules, contracts.to_numpy()[rows], expiry_closes[rows]
+        )
+        config = dict(zip(config_columns, key))
+        summaries.append(summary.assign(**config))
+        curves.append(equity.assign(**config))
+    summary = pd.concat(summaries, ignore_index=True)
+    equity = pd.concat(curves, ignore_index=True)
+
+    if config_columns:
+        print(summary[config_columns + ['rule', 'positions', 'hit_rate_pct', 'net_pnl',
+                                        'return_on_max_capital_pct', 'max_drawdown']]
+              .round({'hit_rate_pct': 1, 'net_pnl': 0, 'return_on_max_capital_pct': 1, 'max_drawdown': 0})
+              .to_string(index=False))
+        return summary, equity
+
+    print(f"{'Rule':<10} {'Positions':>9} {'Hit rate':>9} {'Premium':>12} {'Assignment':>12} "
+          f"{'Net P&L':>12} {'Max capital':>13} {'Return':>8} {'Max DD':>12}")
+    for row in summary.itertuples():
+        print(f"{row.rule:<10} {row.positions:>9} {row.hit_rate_pct:>8.1f}% {row.premium_collected:>12,.0f} "
+              f"{row.assignment_loss:>12,.0f} {row.net_pnl:>12,.0f} {row.max_capital:>13,.0f} "
+              f"{row.return_on_max_capital_pct:>7.1f}% {row.max_drawdown:>12,.0f}")
+
+    return summary, equity
+
+
+def analyze_top_k(
+    results_df: pd.DataFrame,
+    ks: List[int],
+    per_stock_cap: Optional[int] = None
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Daily top-K selections and rank metrics (see ranking.py).
+
+    Args:
+        results_df: DataFrame with backtest results
+        ks: K values
+        per_stock_cap: At most this many options per stock and day
+
+    Returns:
+        Tuple of (selections, metrics per K, hit rate per rank decile); with
+        long-format results, per configuration
+    """
+    import pandas as pd
+    from ranking import rank_metrics
+
+    cap_text = f", at most {per_stock_cap} per stock" if per_stock_cap else ""
+    print(f"\n{'='*80}")
+    print(f"TOP-K SELECTION (K = {', '.join(map(str, ks))}{cap_text})")
+    print(f"{'='*80}\n")
+
+    if len(results_df) == 0:
+        print("⚠️ No scored options. Cannot rank.")
+        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+
+    config_columns = [column for column in CONFIG_COLUMNS if column in results_df.columns]
+    groups = config_groups(results_df, config_columns)
+    selections, metrics, deciles = [], [], []
+    for key, rows in groups:
+        config = dict(zip(config_columns, key))
+        group_selections, group_metrics, group_deciles = rank_metrics(
+            results_df.iloc[rows], ks, per_stock_cap=per_stock_cap
+        )
+        selections.append(group_selections)
+        metrics.append(group_metrics.assign(**config))
+        deciles.append(group_deciles.assign(**config))
+    selections = pd.concat(selections, ignore_index=True)
+    metrics = pd.concat(metrics, ignore_index=True)
+    deciles = pd.concat(deciles, ignore_index=True)
+
+    if config_columns:
+        print(metrics[config_columns + ['k', 'selected', 'precision_at_k', 'lift', 'mean_premium']]
+              .round({'precision_at_k': 1, 'lift': 1, 'mean_premium': 0})
+              .to_string(index=False))
+        return selections, metrics, deciles
+
+    print(f"{'K':>4} {'Days':>6} {'Selected':>9} {'Settled':>8} {'Precision':>10} {'Daily mean':>11} "
+          f"{'Lift':>7} {'Mean premium':>13} {'Mean score':>11}")
+    for row in metrics.itertuples():
+        print(f"{row.k:>4} {row.days:>6} {row.selected:>9} {row.settled:>8} {row.precision_at_k:>9.1f}% "
+              f"{row.precision_at_k_daily_mean:>10.1f}% {row.lift:>+7.1f} {row.mean_premium:>13,.0f} "
+              f"{row.mean_score:>11.1f}")
+
+    print(f"\n{'Decile':>6} {'n':>8} {'Settled':>8} {'Hit rate':>9} {'Mean premium':>13} {'Mean score':>11}")
+    for row in deciles.itertuples():
+        print(f"{row.rank_decile:>6} {row.n:>8} {row.settled:>8} {row.hit_rate_pct:>8.1f}% "
+              f"{row.mean_premium:>13,.0f} {row.mean_score:>11.1f}")
+
+    return selections, metrics, deciles
+
+
+def parse_top_k(spec: str) -> List[int]:
+    """Parse a comma-separated list of positive K values."""
+    try:
+        ks = sorted({int(value) for value in spec.split(',') if value.strip()})
+    except ValueError:
+        raise ValueError(f"expected comma-separated integers, got '{spec}'")
+    if not ks or ks[0] < 1:
+        raise ValueError("K values must be positive integers")
+    return ks
+
+
+def main(argv: Optional[List[str]] = None):
     """Main entry point."""
-    args = parse_args()
+    args = parse_args(argv)
+
+    if args.command == 'snapshot':
+        create_snapshot(args)
+        return
+
+    if args.command == 'iv-screening':
+        build_iv_screening_file(args)
+        return
+
+    if args.command == 'lower-bound-stats':
+        build_lower_bound_stats(args)
+        return
+
+    if args.command == 'market-iv':
+        build_market_iv_file(args)
+        return
+
+    if args.snapshot and args.backend != 'pandas':
+        print("Error: --snapshot requires --backend pandas")
+        sys.exit(1)
 
     # Parse dates
     try:
@@ -473,15 +1402,83 @@ def main():
         print(f"Error parsing dates: {e}")
         sys.exit(1)
 
+    if args.pnl_rules:
+        from strategy_pnl import parse_rules
+        try:
+            parse_rules(args.pnl_rules)
+        except ValueError as e:
+            print(f"Error in --pnl-rules: {e}")
+            sys.exit(1)
+
+    top_ks = None
+    if args.top_k:
+        try:
+            top_ks = parse_top_k(args.top_k)
+        except ValueError as e:
+            print(f"Error in --top-k: {e}")
+            sys.exit(1)
+        if args.top_k_per_stock is not None and args.top_k_per_stock < 1:
+            print("Error: --top-k-per-stock must be at least 1")
+            sys.exit(1)
+
+    if args.sample is not None:
+        if not 0 < args.sample <= 1:
+            print("Error: --sample must be a share of the option-days in (0, 1], e.g. 0.02")
+            sys.exit(1)
+        if args.pnl_rules or args.top_k or args.walk_forward_train_months:
+            print("Error: --sample only estimates hit rates; it cannot be combined with --pnl-rules, "
+                  "--top-k or --walk-forward-train-months")
+            sys.exit(1)
+
     # Create output directory
     output_dir = Path(args.output_dir)
     output_dir.mkdir(exist_ok=True, parents=True)
 
+    import pandas as pd
+    from data_loader import DataLoader
+
     # Initialize data loader
-    data_loader = DataLoader(args.data_dir)
+    if args.backend == 'sql':
+        from sql_backend import SQLDataLoader
+        data_loader = SQLDataLoader(args.data_dir, db_path=args.db_path, memory_budget_mb=args.memory_budget_mb)
+    else:
+        data_loader = DataLoader(args.data_dir, memory_budget_mb=args.memory_budget_mb)
+
+    # Reuse results of an identical earlier run (same parameters, weights, code and data files)
+    result_cache = cache_key = cached = None
+    if not args.no_result_cache:
+        from result_cache import ResultCache
+        from scoring_engine import ScoringEngine
+
+        result_cache = ResultCache(
+            args.result_cache_dir,
+            max_age_days=args.result_cache_max_age_days,
+            max_size_mb=args.result_cache_max_mb
+        )
+        params = {name: getattr(args, name) for name in RESULT_PARAMETERS}
+        cache_key = result_cache.make_key(
+            params, ScoringEngine().weights, data_loader.get_fingerprints(result_tables(args))
+        )
+        cached = result_cache.get(cache_key)
+
+    if cached is not None:
+        results_df, analysis = cached
+        print(f"✓ Result cache hit ({cache_key[:12]}): {len(results_df)} scored records")
+        if 'overall_hit_rate' in analysis:
+            print(f"  Overall hit rate: {analysis['overall_hit_rate']:.1f}%, "
+                  f"score spread: {analysis['score_spread']:+.1f} percentage points")
+    else:
+        if args.snapshot:
+            data_loader.load_snapshot(args.snapshot)
 
-    # Run backtest
-    results_df = run_backtest(start_date, end_date, data_loader, args)
+        if args.stream_probability_history:
+            data_loader.stream_probability_history(chunk_rows=args.chunk_rows)
+
+        if args.backend == 'pandas' and args.load_workers != 0:
+            data_loader.preload(max_workers=args.load_workers)
+
+        # Run backtest
+        results_df = run_backtest(start_date, end_date, data_loader, args)
 
     # Save raw results
     results_file = output_dir / f"backtest_results_{args.start_date}_{args.end_date}.csv"
@@ -489,7 +1486,10 @@ def main():
     print(f"✓ Saved results to: {results_file}")
 
     # Analyze results
-    analysis = analyze_results(results_df)
+    if cached is None:
+        analysis = analyze_sample(results_df) if args.sample else analyze_results(results_df)
+        if result_cache is not None:
+            result_cache.put(cache_key, results_df, analysis, params)
 
     # Save analysis
     if analysis:
@@ -498,6 +1498,42 @@ def main():
         hit_rates_df.to_csv(hit_rates_file, index=False)
         print(f"✓ Saved hit rate analysis to: {hit_rates_file}")
 
+    if analysis.get('configurations'):
+        configurations_file = output_dir / f"configurations_{args.start_date}_{args.end_date}.csv"
+        pd.DataFrame(analysis['configurations']).to_csv(configurations_file, index=False)
+        print(f"✓ Saved configuration comparison to: {configurations_file}")
+
+    if args.walk_forward_train_months:
+        windows, buckets = analyze_walk_forward(results_df, args.walk_forward_train_months)
+        if len(windows) > 0:
+            walk_forward_file = output_dir / f"walk_forward_{args.start_date}_{args.end_date}.csv"
+            windows.to_csv(walk_forward_file, index=False)
+            buckets.to_csv(output_dir / f"walk_forward_buckets_{args.start_date}_{args.end_date}.csv", index=False)
+            print(f"✓ Saved walk-forward statistics to: {walk_forward_file}")
+
+    if args.pnl_rules:
+        summary, equity = analyze_pnl(results_df, data_loader, args.pnl_rules)
+        if len(summary) > 0:
+            pnl_file = output_dir / f"pnl_summary_{args.start_date}_{args.end_date}.csv"
+            summary.to_csv(pnl_file, index=False)
+            equity.to_csv(output_dir / f"pnl_equity_{args.start_date}_{args.end_date}.csv", index=False)
+            print(f"✓ Saved strategy P&L to: {pnl_file}")
+
+    if top_ks:
+        selections, metrics, deciles = analyze_top_k(results_df, top_ks, args.top_k_per_stock)
+        if len(metrics) > 0:
+            metrics_file = output_dir / f"top_k_metrics_{args.start_date}_{args.end_date}.csv"
+            metrics.to_csv(metrics_file, index=False)
+            selections.to_csv(output_dir / f"top_k_selections_{args.start_date}_{args.end_date}.csv", index=False)
+            deciles.to_csv(output_dir / f"rank_deciles_{args.start_date}_{args.end_date}.csv", index=False)
+            print(f"✓ Saved top-K selections and rank metrics to: {metrics_file}")
+
+    if args.memory_budget_mb is not None:
+        stats = data_loader.get_cache_stats()
+        print(f"\nData cache: {stats['used_mb']:.1f} / {stats['budget_mb']:.1f} MB, "
+              f"{stats['table_evictions']} table evictions, {stats['spill_reloads']} spill reloads, "
+              f"{stats['index_evictions']} index evictions")
+
     print(f"\n{'='*80}")
     print("BACKTEST COMPLETE")
     print(f"{'='*80}\n")
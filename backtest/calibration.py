@@ -0,0 +1,320 @@
+"""
+Isotonic Calibration for Probability Methods
+
+This module refits the isotonic calibration behind ProbWorthless_Bayesian_IsoCal
+(and any other probability method) on a training window of backtest results,
+and applies the fitted map to later dates.
+
+Key pieces:
+1. pava() - Pool Adjacent Violators in O(n) on data already sorted by the
+   predicted probability
+2. IsotonicMap - fitted monotone map, applied with np.interp (piecewise linear
+   between blocks, like scikit-learn) or np.searchsorted (step function)
+3. IsotonicCalibrator - sorts the data once per method, then fits any date
+   window in O(n) by masking the presorted arrays; fitted maps are cached by
+   (method, training window, DTE binning)
+
+Outcomes are 1 for 'worthless' and 0 for 'ITM', so a calibrated value is an
+empirical probability of the option expiring worthless.
+
+Author: Put Options SE
+Date: February 2026
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scoring_engine import DTE_BIN_LABELS, get_dte_bin_codes
+
+
+# ============================================================================
+# PAVA
+# ============================================================================
+
+def pava(
+    y: np.ndarray,
+    weights: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pool Adjacent Violators for a non-decreasing fit.
+
+    Input must already be ordered by the predictor. Each element is pushed
+    once and merged at most once, so the running time is O(n).
+
+    Args:
+        y: Observed values in predictor order
+        weights: Optional observation weights (default 1)
+
+    Returns:
+        Tuple of (block_values, block_weights, block_ends)
+        - block_values: fitted value of each block (non-decreasing)
+        - block_weights: total weight of each block
+        - block_ends: exclusive end index of each block in y
+    """
+    y = np.asarray(y, dtype=np.float64)
+    w = np.ones(len(y)) if weights is None else np.asarray(weights, dtype=np.float64)
+
+    # Plain lists are much faster than numpy scalar indexing in this loop
+    values: List[float] = []
+    block_weights: List[float] = []
+    ends: List[int] = []
+
+    for i, (value, weight) in enumerate(zip(y.tolist(), w.tolist())):
+        # Merge backwards while the new block violates monotonicity
+        while values and values[-1] > value:
+            previous_weight = block_weights.pop()
+            total = previous_weight + weight
+            value = (values.pop() * previous_weight + value * weight) / total
+            weight = total
+            ends.pop()
+
+        values.append(value)
+        block_weights.append(weight)
+        ends.append(i + 1)
+
+    return np.array(values), np.array(block_weights), np.array(ends, dtype=np.int64)
+
+
+# ============================================================================
+# FITTED MAP
+# ============================================================================
+
+class IsotonicMap:
+    """
+    Fitted monotone calibration map.
+
+    Stored as the x range [x_low, x_high] covered by each PAVA block and the
+    block's fitted value.
+    """
+
+    def __init__(self, x_low: np.ndarray, x_high: np.ndarray, y: np.ndarray, n_samples: int):
+        self.x_low = x_low
+        self.x_high = x_high
+        self.y = y
+        self.n_samples = n_samples
+
+        # Breakpoints for np.interp: flat within a block, linear between blocks
+        self._interp_x = np.column_stack([x_low, x_high]).ravel()
+        self._interp_y = np.repeat(y, 2)
+
+    @classmethod
+    def fit_sorted(
+        cls,
+        x_sorted: np.ndarray,
+        y_sorted: np.ndarray,
+        weights: Optional[np.ndarray] = None
+    ) -> 'IsotonicMap':
+        """
+        Fit on data already sorted by x, in O(n).
+
+        Ties in x are pooled first so equal predictions get equal output.
+
+        Args:
+            x_sorted: Predicted probabilities, ascending
+            y_sorted: Outcomes (1 = worthless, 0 = ITM) in the same order
+            weights: Optional observation weights
+
+        Returns:
+            IsotonicMap
+        """
+        x_sorted = np.asarray(x_sorted, dtype=np.float64)
+        y_sorted = np.asarray(y_sorted, dtype=np.float64)
+        w = np.ones(len(x_sorted)) if weights is None else np.asarray(weights, dtype=np.float64)
+
+        if len(x_sorted) == 0:
+            raise ValueError("Cannot fit calibration on an empty sample")
+
+        # Pool ties (linear on sorted input)
+        starts = np.flatnonzero(np.r_[True, x_sorted[1:] != x_sorted[:-1]])
+        unique_x = x_sorted[starts]
+        tie_weights = np.add.reduceat(w, starts)
+        tie_means = np.add.reduceat(y_sorted * w, starts) / tie_weights
+
+        values, _, ends = pava(tie_means, tie_weights)
+        block_starts = np.r_[0, ends[:-1]]
+
+        return cls(unique_x[block_starts], unique_x[ends - 1], values, len(x_sorted))
+
+    @classmethod
+    def fit(cls, x: np.ndarray, y: np.ndarray, weights: Optional[np.ndarray] = None) -> 'IsotonicMap':
+        """Fit on unsorted data (sorts first)."""
+        order = np.argsort(x, kind='stable')
+        w = None if weights is None else np.asarray(weights)[order]
+        return cls.fit_sorted(np.asarray(x)[order], np.asarray(y)[order], w)
+
+    def apply(self, x: np.ndarray, interpolate: bool = True) -> np.ndarray:
+        """
+        Map predicted probabilities to calibrated probabilities.
+
+        Values outside the training range are clamped to the end blocks.
+
+        Args:
+            x: Predicted probabilities
+            interpolate: Linear between blocks (True) or step function (False)
+
+        Returns:
+            Calibrated probabilities (NaN where x is NaN)
+        """
+        x = np.asarray(x, dtype=np.float64)
+
+        if interpolate:
+            return np.interp(x, self._interp_x, self._interp_y)
+
+        block = np.searchsorted(self.x_low, x, side='right') - 1
+        result = self.y[np.clip(block, 0, len(self.y) - 1)]
+        return np.where(np.isnan(x), np.nan, result)
+
+
+# ============================================================================
+# WINDOWED CALIBRATOR
+# ============================================================================
+
+class IsotonicCalibrator:
+    """
+    Fits and applies isotonic maps per probability method and DTE bin.
+
+    The training frame is sorted once per method at construction. Fitting a
+    date window masks the presorted arrays (order is preserved), so every
+    refit is O(n) and a walk-forward run pays for sorting only once.
+    """
+
+    def __init__(
+        self,
+        training_df: pd.DataFrame,
+        prob_columns: List[str],
+        outcome_col: str = 'outcome',
+        date_col: str = 'date',
+        dte_col: str = 'days_to_expiry',
+        min_samples: int = 50
+    ):
+        """
+        Initialize calibrator.
+
+        Args:
+            training_df: Frame with predictions, outcomes, dates and DTE
+                         (e.g., backtest results)
+            prob_columns: Probability columns to calibrate
+            outcome_col: Outcome column ('worthless' / 'ITM')
+            date_col: Date column used for training windows
+            dte_col: Days-to-expiry column used for DTE bins
+            min_samples: Minimum rows to fit a DTE-bin map; smaller bins fall
+                         back to the method's pooled map
+        """
+        known = training_df[training_df[outcome_col].notna()]
+
+        self.prob_columns = list(prob_columns)
+        self.min_samples = min_samples
+        self._cache: Dict[Tuple, Dict[Optional[str], IsotonicMap]] = {}
+        self._sorted: Dict[str, Dict[str, np.ndarray]] = {}
+
+        outcomes = (known[outcome_col] == 'worthless').to_numpy(dtype=np.float64)
+        dates = pd.to_datetime(known[date_col]).to_numpy(dtype='datetime64[ns]')
+        dte_codes = get_dte_bin_codes(known[dte_col].to_numpy())
+
+        for column in self.prob_columns:
+            probs = known[column].to_numpy(dtype=np.float64)
+            valid = ~np.isnan(probs)
+            order = np.flatnonzero(valid)[np.argsort(probs[valid], kind='stable')]
+            self._sorted[column] = {
+                'x': probs[order],
+                'y': outcomes[order],
+                'date': dates[order],
+                'dte_code': dte_codes[order]
+            }
+
+    def fit(
+        self,
+        prob_column: str,
+        train_start: Optional[pd.Timestamp] = None,
+        train_end: Optional[pd.Timestamp] = None,
+        by_dte_bin: bool = False
+    ) -> Dict[Optional[str], IsotonicMap]:
+        """
+        Fit (or fetch from cache) the maps for one method and training window.
+
+        Args:
+            prob_column: Probability method column
+            train_start: Inclusive window start (default: all history)
+            train_end: Exclusive window end (default: all history)
+            by_dte_bin: Also fit one map per DTE bin
+
+        Returns:
+            Dict mapping DTE bin label to IsotonicMap; key None is the pooled map
+        """
+        key = (
+            prob_column,
+            None if train_start is None else pd.Timestamp(train_start),
+            None if train_end is None else pd.Timestamp(train_end),
+            by_dte_bin
+        )
+        if key in self._cache:
+            return self._cache[key]
+
+        data = self._sorted[prob_column]
+        mask = np.ones(len(data['x']), dtype=bool)
+        if train_start is not None:
+            mask &= data['date'] >= np.datetime64(pd.Timestamp(train_start))
+        if train_end is not None:
+            mask &= data['date'] < np.datetime64(pd.Timestamp(train_end))
+
+        if not mask.any():
+            raise ValueError(f"No training rows for {prob_column} in window {key[1]} - {key[2]}")
+
+        maps: Dict[Optional[str], IsotonicMap] = {
+            None: IsotonicMap.fit_sorted(data['x'][mask], data['y'][mask])
+        }
+
+        if by_dte_bin:
+            for code, label in enumerate(DTE_BIN_LABELS):
+                bin_mask = mask & (data['dte_code'] == code)
+                if bin_mask.sum() >= self.min_samples:
+                    maps[label] = IsotonicMap.fit_sorted(data['x'][bin_mask], data['y'][bin_mask])
+
+        self._cache[key] = maps
+        return maps
+
+    def apply(
+        self,
+        df: pd.DataFrame,
+        prob_column: str,
+        train_start: Optional[pd.Timestamp] = None,
+        train_end: Optional[pd.Timestamp] = None,
+        by_dte_bin: bool = False,
+        dte_col: str = 'days_to_expiry',
+        interpolate: bool = True
+    ) -> np.ndarray:
+        """
+        Calibrate a probability column of any frame with a fitted window.
+
+        Args:
+            df: Frame to calibrate (any number of rows)
+            prob_column: Probability column in df (and in the training data)
+            train_start: Training window start
+            train_end: Training window end
+            by_dte_bin: Use per-DTE-bin maps where available
+            dte_col: Days-to-expiry column in df (used when by_dte_bin)
+            interpolate: Linear between blocks (True) or step function (False)
+
+        Returns:
+            Array of calibrated probabilities aligned with df
+        """
+        maps = self.fit(prob_column, train_start, train_end, by_dte_bin)
+        probs = df[prob_column].to_numpy(dtype=np.float64)
+        calibrated = maps[None].apply(probs, interpolate)
+
+        if by_dte_bin:
+            dte_codes = get_dte_bin_codes(df[dte_col].to_numpy())
+            for code, label in enumerate(DTE_BIN_LABELS):
+                if label not in maps:
+                    continue
+                rows = dte_codes == code
+                if rows.any():
+                    calibrated[rows] = maps[label].apply(probs[rows], interpolate)
+
+        return calibrated
+
+    def clear_cache(self):
+        """Drop all fitted maps."""
+        self._cache.clear()
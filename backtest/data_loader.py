@@ -8,11 +8,215 @@ Author: Generated from Put Options SE data structure
 Date: January 2026
 """
 
+import json
+import os
+import pickle
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple, Union
 from datetime import datetime
 
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+from event_index import EventIndex
+from event_volatility import EVENT_COLUMNS, EventVolatility
+from market_iv import market_iv_rows, market_regime
+from iv_screening import IV_FACTOR_COLUMNS
+from recovery_table import DEFAULT_MIN_RECOVERY_N, RecoveryTable
+from scoring_engine import (
+    DTE_BIN_LABELS,
+    PROBABILITY_BIN_LABELS,
+    get_dte_bin_codes,
+    get_probability_bin_codes
+)
+
+
+# Probability field name -> method name used in recovery_report_data.csv
+RECOVERY_METHOD_NAMES = {
+    'ProbWorthless_Bayesian_IsoCal': 'Bayesian Calibrated',
+    '1_2_3_ProbOfWorthless_Weighted': 'Weighted Average',
+    '1_ProbOfWorthless_Original': 'Original Black-Scholes',
+    '2_ProbOfWorthless_Calibrated': 'Bias Corrected',
+    '3_ProbOfWorthless_Historical_IV': 'Historical IV'
+}
+
+PROBABILITY_METHODS = list(RECOVERY_METHOD_NAMES)
+
+# Stocks_Monthly_Data.csv stores months as abbreviations
+MONTH_NUMBERS = {
+    'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+    'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12
+}
+
+# Cached tables: default file, read options, log wording and the
+# data/last_updated.json entry that is bumped when the file is refreshed
+TABLE_SPECS = {
+    'options': {
+        'file_name': 'data.csv', 'delimiter': '|', 'parse_dates': ['ExpiryDate'],
+        'label': 'options data', 'unit': 'options', 'timestamp_key': 'optionsData'
+    },
+    'support': {
+        'file_name': 'support_level_metrics.csv', 'delimiter': ',',
+        'parse_dates': ['last_break_date', 'last_calculated', 'data_through_date'],
+        'label': 'support metrics', 'unit': 'support metric records', 'timestamp_key': 'analysisCompleted'
+    },
+    'probability_history': {
+        'file_name': 'probability_history.csv', 'delimiter': '|', 'parse_dates': ['Update_date'],
+        'label': 'probability history', 'unit': 'probability records', 'timestamp_key': 'optionsData'
+    },
+    'recovery': {
+        'file_name': 'recovery_report_data.csv', 'delimiter': '|', 'parse_dates': None,
+        'label': 'recovery data', 'unit': 'recovery records', 'timestamp_key': 'analysisCompleted'
+    },
+    'monthly': {
+        'file_name': 'Stocks_Monthly_Data.csv', 'delimiter': '|', 'parse_dates': None,
+        'label': 'monthly stock data', 'unit': 'monthly records', 'timestamp_key': 'stockData'
+    },
+    'stock_data': {
+        'file_name': 'stock_data.csv', 'delimiter': '|', 'parse_dates': ['date'],
+        'label': 'stock data', 'unit': 'stock price records', 'timestamp_key': 'stockData'
+    },
+    'scored_options': {
+        'file_name': 'current_options_scored.csv', 'delimiter': '|', 'parse_dates': ['date', 'expiry_date'],
+        'label': 'scored options', 'unit': 'scored options', 'timestamp_key': 'analysisCompleted'
+    },
+    'iv_decline': {
+        'file_name': 'IV_PotentialDecline.csv', 'delimiter': '|', 'parse_dates': ['Update_date', 'ExpiryDate'],
+        'label': 'IV potential decline data', 'unit': 'IV potential decline records',
+        'timestamp_key': 'analysisCompleted'
+    },
+    'events': {
+        'file_name': 'Stock_Events_Volatility_Data.csv', 'delimiter': '|', 'parse_dates': ['date'],
+        'label': 'stock events data', 'unit': 'stock event records', 'timestamp_key': 'stockData'
+    },
+    'upcoming_events': {
+        'file_name': 'upcoming_events.csv', 'delimiter': '|', 'parse_dates': ['date'],
+        'label': 'upcoming events', 'unit': 'upcoming events', 'timestamp_key': 'analysisCompleted'
+    },
+    'lower_bound_predictions': {
+        'file_name': 'all_stocks_daily_predictions.csv', 'delimiter': '|',
+        'parse_dates': ['PredictionDate', 'ExpiryDate'],
+        'label': 'lower bound predictions', 'unit': 'lower bound predictions', 'timestamp_key': 'analysisCompleted'
+    },
+    'iv_per_stock': {
+        'file_name': 'iv_per_stock_per_day.csv', 'delimiter': '|', 'parse_dates': ['Date'],
+        'label': 'IV per stock per day', 'unit': 'IV records', 'timestamp_key': 'analysisCompleted'
+    }
+}
+
+# Tables the backtest and scoring read (default for DataLoader.preload)
+PRELOAD_TABLES = ['options', 'stock_data', 'support', 'recovery', 'monthly', 'probability_history']
+
+# data.csv columns carried into the backtest panel
+PANEL_OPTION_COLUMNS = [
+    'OptionName', 'StockName', 'StrikePrice', 'ExpiryDate', 'Premium', 'NumberOfContractsBasedOnLimit'
+]
+
+# Derived indexes built from each table (dropped/rebuilt when it changes)
+DERIVED_INDEXES = {
+    'support': ['_support_index', '_support_wide'],
+    'probability_history': ['_probability_peaks'],
+    'recovery': ['_recovery_index', '_recovery_table'],
+    'monthly': ['_monthly_stats'],
+    'stock_data': ['_stock_prices'],
+    'events': ['_event_index'],
+    'upcoming_events': ['_event_index'],
+    'iv_decline': ['_iv_screening_index'],
+    'iv_per_stock': ['_market_regime']
+}
+
+
+def estimate_memory_bytes(obj) -> int:
+    """
+    Estimate memory held by a cached table or index.
+
+    Args:
+        obj: DataFrame, Series, Index, ndarray, an object with an nbytes property
+            (e.g. RecoveryTable) or a dict/tuple of them
+
+    Returns:
+        Size in bytes (deep, i.e. including Python string objects)
+    """
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if hasattr(obj, 'nbytes'):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sum(estimate_memory_bytes(v) for v in obj.values())
+    if isinstance(obj, (tuple, list)):
+        return sum(estimate_memory_bytes(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+def read_csv_table(file_path, delimiter: str, parse_dates: Optional[List[str]], engine: Optional[str] = None):
+    """
+    Parse one data file and time it (module level so process pools can call it).
+
+    Args:
+        file_path: CSV path
+        delimiter: Field delimiter
+        parse_dates: Columns to parse as dates
+        engine: pandas CSV engine ('pyarrow' releases the GIL; None = default)
+
+    Returns:
+        Tuple of (DataFrame, seconds)
+    """
+    start = time.perf_counter()
+    kwargs = {'engine': engine} if engine else {}
+    df = pd.read_csv(file_path, delimiter=delimiter, parse_dates=parse_dates, **kwargs)
+    return df, time.perf_counter() - start
+
+
+def month_to_date_performance(stock_prices: Dict[str, tuple], stock_names, current_date: datetime) -> np.ndarray:
+    """
+    Price change (%) from the last close of the previous month to current_date.
+
+    Args:
+        stock_prices: Sorted (dates, closes) arrays per stock
+        stock_names: Sequence of stock names
+        current_date: Current date
+
+    Returns:
+        Array aligned with stock_names (NaN where data is not available)
+    """
+    current = np.datetime64(pd.Timestamp(current_date), 'ns')
+    month_start = np.datetime64(pd.Timestamp(current_date).replace(day=1).normalize(), 'ns')
+    previous_month_start = np.datetime64(
+        (pd.Timestamp(current_date).replace(day=1) - pd.Timedelta(days=1)).replace(day=1).normalize(), 'ns'
+    )
+
+    performance_by_stock = {}
+    for stock_name in pd.unique(np.asarray(stock_names, dtype=object)):
+        performance_by_stock[stock_name] = np.nan
+        if stock_name not in stock_prices:
+            continue
+
+        dates, closes = stock_prices[stock_name]
+        # Last close of the previous month and last close on/before current_date
+        previous_end = np.searchsorted(dates, month_start, side='left') - 1
+        current_end = np.searchsorted(dates, current, side='right') - 1
+
+        if previous_end < 0 or dates[previous_end] < previous_month_start or current_end < 0:
+            continue
+
+        previous_close = closes[previous_end]
+        performance_by_stock[stock_name] = (closes[current_end] - previous_close) / previous_close * 100
+
+    return np.array([performance_by_stock[s] for s in stock_names], dtype=np.float64)
+
 
 class DataLoader:
     """
@@ -22,24 +226,59 @@ class DataLoader:
     Paths are relative to the backtest/ directory.
     """
 
-    def __init__(self, data_dir: str = '../data'):
+    def __init__(
+        self,
+        data_dir: str = '../data',
+        memory_budget_mb: Optional[float] = None,
+        spill_dir: Optional[str] = None
+    ):
         """
         Initialize data loader.
 
         Args:
             data_dir: Path to data directory (default: ../data)
+            memory_budget_mb: Memory budget for cached tables and indexes;
+                least recently used entries are evicted above it (default: no limit)
+            spill_dir: Where evicted tables are written for fast reload
+                (default: a temporary directory)
         """
         self.data_dir = Path(data_dir)
         if not self.data_dir.exists():
             raise FileNotFoundError(f"Data directory not found: {self.data_dir}")
 
-        # Cache for loaded data
-        self._options_data = None
-        self._support_data = None
-        self._probability_history = None
-        self._recovery_data = None
-        self._monthly_data = None
-        self._stock_data = None
+        # Cache for loaded data: table -> (file name, fingerprint, DataFrame)
+        self._tables: Dict[str, Tuple[str, tuple, pd.DataFrame]] = {}
+        self._last_updated_stat = None
+        self._last_updated = {}
+
+        # Memory accounting: ('table' | 'index', name) -> bytes, least recent first
+        self.memory_budget = None if memory_budget_mb is None else int(memory_budget_mb * 1024 ** 2)
+        self._lru: OrderedDict = OrderedDict()
+        self._spill_dir = Path(spill_dir) if spill_dir else None
+        self._spilled: Dict[str, Tuple[str, tuple, Path]] = {}
+        self._cache_counts = {
+            'csv_loads': 0, 'spill_reloads': 0, 'table_evictions': 0,
+            'index_builds': 0, 'index_evictions': 0
+        }
+
+        # Streamed probability history: (file name, fingerprint, chunk rows, store dir, summary)
+        self._probability_summary = None
+
+        # Derived indexes (built on first lookup)
+        self._support_index = None
+        self._support_wide = None
+        self._probability_peaks = None
+        self._recovery_index = None
+        self._recovery_table = None
+        self._monthly_stats = None
+        self._stock_prices = None
+        self._event_index = None
+        self._iv_screening_index = None
+        self._market_regime = None
+
+        # Event-move statistics; not a DERIVED_INDEXES entry because they are
+        # refreshed per stock when the events file changes (see _get_event_volatility)
+        self._event_volatility = None
 
     def load_options_data(self, file_name: str = 'data.csv') -> pd.DataFrame:
         """
@@ -54,19 +293,7 @@ class DataLoader:
         Returns:
             DataFrame with options data
         """
-        if self._options_data is None:
-            file_path = self.data_dir / file_name
-            print(f"Loading options data from {file_path}...")
-
-            self._options_data = pd.read_csv(
-                file_path,
-                delimiter='|',
-                parse_dates=['ExpiryDate']
-            )
-
-            print(f"✓ Loaded {len(self._options_data)} options")
-
-        return self._options_data
+        return self._load_table('options', file_name)
 
     def load_support_metrics(self, file_name: str = 'support_level_metrics.csv') -> pd.DataFrame:
         """
@@ -81,19 +308,7 @@ class DataLoader:
         Returns:
             DataFrame with support metrics
         """
-        if self._support_data is None:
-            file_path = self.data_dir / file_name
-            print(f"Loading support metrics from {file_path}...")
-
-            self._support_data = pd.read_csv(
-                file_path,
-                delimiter=',',  # Note: support_level_metrics uses comma delimiter
-                parse_dates=['last_break_date', 'last_calculated', 'data_through_date']
-            )
-
-            print(f"✓ Loaded {len(self._support_data)} support metric records")
-
-        return self._support_data
+        return self._load_table('support', file_name)
 
     def load_probability_history(self, file_name: str = 'probability_history.csv') -> pd.DataFrame:
         """
@@ -107,19 +322,56 @@ class DataLoader:
         Returns:
             DataFrame with probability history
         """
-        if self._probability_history is None:
-            file_path = self.data_dir / file_name
-            print(f"Loading probability history from {file_path}...")
+        return self._load_table('probability_history', file_name)
 
-            self._probability_history = pd.read_csv(
-                file_path,
-                delimiter='|',
-                parse_dates=['Update_date']
-            )
+    def stream_probability_history(
+        self,
+        file_name: str = 'probability_history.csv',
+        chunk_rows: Optional[int] = None,
+        outcomes: Optional[pd.Series] = None,
+        store_dir: Optional[str] = None
+    ):
+        """
+        Ingest probability_history.csv in chunks instead of loading it whole.
+
+        Builds per-option peaks, a compact per-option series store and
+        recovery-bin counts (see probability_stream.py). Afterwards the
+        historical peak lookups and the backtest panel use these instead of
+        the raw table.
+
+        Args:
+            file_name: CSV file name (default: probability_history.csv)
+            chunk_rows: Rows per chunk (default: probability_stream.DEFAULT_CHUNK_ROWS)
+            outcomes: Optional True/False (expired worthless) per OptionName
+                for worthless counts
+            store_dir: Directory for the memory-mapped series store
+                (default: a temporary directory)
+
+        Returns:
+            ProbabilityHistorySummary
+        """
+        from probability_stream import DEFAULT_CHUNK_ROWS, stream_probability_history
+
+        chunk_rows = chunk_rows or DEFAULT_CHUNK_ROWS
+        file_path = self.data_dir / file_name
+        print(f"Streaming probability history from {file_path} ({chunk_rows} rows per chunk)...")
+
+        try:
+            options_df = self.load_options_data()
+            expiry_dates = options_df.drop_duplicates('OptionName').set_index('OptionName')['ExpiryDate']
+        except FileNotFoundError:
+            expiry_dates = None
+
+        fingerprint = self._fingerprint('probability_history', file_name)
+        summary = stream_probability_history(
+            file_path, chunk_rows=chunk_rows, expiry_dates=expiry_dates, outcomes=outcomes, store_dir=store_dir
+        )
 
-            print(f"✓ Loaded {len(self._probability_history)} probability records")
+        self._forget_table('probability_history')
+        self._drop_derived('probability_history')
+        self._probability_summary = (file_name, fingerprint, chunk_rows, store_dir, summary)
 
-        return self._probability_history
+        return summary
 
     def load_recovery_data(self, file_name: str = 'recovery_report_data.csv') -> pd.DataFrame:
         """
@@ -134,18 +386,7 @@ class DataLoader:
         Returns:
             DataFrame with recovery data
         """
-        if self._recovery_data is None:
-            file_path = self.data_dir / file_name
-            print(f"Loading recovery data from {file_path}...")
-
-            self._recovery_data = pd.read_csv(
-                file_path,
-                delimiter='|'
-            )
-
-            print(f"✓ Loaded {len(self._recovery_data)} recovery records")
-
-        return self._recovery_data
+        return self._load_table('recovery', file_name)
 
     def load_monthly_stock_data(self, file_name: str = 'Stocks_Monthly_Data.csv') -> pd.DataFrame:
         """
@@ -160,18 +401,7 @@ class DataLoader:
         Returns:
             DataFrame with monthly stock statistics
         """
-        if self._monthly_data is None:
-            file_path = self.data_dir / file_name
-            print(f"Loading monthly stock data from {file_path}...")
-
-            self._monthly_data = pd.read_csv(
-                file_path,
-                delimiter='|'
-            )
-
-            print(f"✓ Loaded {len(self._monthly_data)} monthly records")
-
-        return self._monthly_data
+        return self._load_table('monthly', file_name)
 
     def load_stock_data(self, file_name: str = 'stock_data.csv') -> pd.DataFrame:
         """
@@ -185,19 +415,678 @@ class DataLoader:
         Returns:
             DataFrame with daily stock prices
         """
-        if self._stock_data is None:
-            file_path = self.data_dir / file_name
-            print(f"Loading stock data from {file_path}...")
+        return self._load_table('stock_data', file_name)
 
-            self._stock_data = pd.read_csv(
-                file_path,
-                delimiter='|',
-                parse_dates=['date']
-            )
+    def load_scored_options(self, file_name: str = 'current_options_scored.csv') -> pd.DataFrame:
+        """
+        Load scored options from current_options_scored.csv.
+
+        Fields include: date, stock_name, option_name, strike_price, premium,
+        v21_score, ta_probability, combined_score, etc.
+
+        Args:
+            file_name: CSV file name (default: current_options_scored.csv)
+
+        Returns:
+            DataFrame with Probability Optimization Model and TA ML Model scores
+        """
+        return self._load_table('scored_options', file_name)
+
+    def load_iv_potential_decline(self, file_name: str = 'IV_PotentialDecline.csv') -> pd.DataFrame:
+        """
+        Load IV screening data from IV_PotentialDecline.csv.
+
+        Fields include: Name, OptionName, Update_date, ExpiryDate,
+        IV_ClosestToStrike, LowerBoundClosestToStrike, SafetyMultiple, etc.
+
+        Args:
+            file_name: CSV file name (default: IV_PotentialDecline.csv)
+
+        Returns:
+            DataFrame with IV-based lower bounds per option
+        """
+        return self._load_table('iv_decline', file_name)
+
+    def load_stock_events(self, file_name: str = 'Stock_Events_Volatility_Data.csv') -> pd.DataFrame:
+        """
+        Load historical earnings events from Stock_Events_Volatility_Data.csv.
+
+        Fields include: date, name, type_of_event, event_value, open, high,
+        low, close, volume, close_price_pct_change_from_previous_day, etc.
+
+        Args:
+            file_name: CSV file name (default: Stock_Events_Volatility_Data.csv)
+
+        Returns:
+            DataFrame with one row per stock and event day
+        """
+        return self._load_table('events', file_name)
+
+    def load_upcoming_events(self, file_name: str = 'upcoming_events.csv') -> pd.DataFrame:
+        """
+        Load scheduled earnings reports and ex-dividend dates from upcoming_events.csv.
+
+        Fields include: date, stock_name, event_type, event_category,
+        days_until_event, is_earnings, details.
+
+        Args:
+            file_name: CSV file name (default: upcoming_events.csv)
+
+        Returns:
+            DataFrame with one row per upcoming event
+        """
+        return self._load_table('upcoming_events', file_name)
+
+    def load_lower_bound_predictions(self, file_name: str = 'all_stocks_daily_predictions.csv') -> pd.DataFrame:
+        """
+        Load daily lower-bound predictions from all_stocks_daily_predictions.csv.
+
+        Fields: Stock, PredictionDate, ExpiryDate, StockPrice, LowerBound,
+        StrikePrice (one row per stock, prediction date and expiry).
+
+        Args:
+            file_name: CSV file name (default: all_stocks_daily_predictions.csv)
+
+        Returns:
+            DataFrame with one row per lower-bound prediction
+        """
+        return self._load_table('lower_bound_predictions', file_name)
+
+    def load_iv_per_stock_per_day(self, file_name: str = 'iv_per_stock_per_day.csv') -> pd.DataFrame:
+        """
+        Load constant-maturity 30-day IVs from iv_per_stock_per_day.csv.
+
+        Fields: Stock_Name, Date, Stock_Price, IV_30d, Near_Expiry_DTE,
+        Far_Expiry_DTE, Method, Country, N_Stocks, N_Excluded (one row per
+        stock and date, plus the MARKET_IV index rows).
+
+        Args:
+            file_name: CSV file name (default: iv_per_stock_per_day.csv)
+
+        Returns:
+            DataFrame with one row per stock and date
+        """
+        return self._load_table('iv_per_stock', file_name)
+
+    # ========================================================================
+    # TABLE CACHE
+    # ========================================================================
+
+    def _get_last_updated(self) -> Dict:
+        """Contents of data/last_updated.json (re-read only when it changes)."""
+        path = self.data_dir / 'last_updated.json'
+        try:
+            stat = path.stat()
+            stat_key = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stat_key = None
+
+        if stat_key != self._last_updated_stat:
+            self._last_updated_stat = stat_key
+            self._last_updated = {}
+            if stat_key is not None:
+                try:
+                    with open(path, encoding='utf-8') as f:
+                        self._last_updated = json.load(f)
+                except ValueError as e:
+                    print(f"⚠️ Could not parse {path}: {e}")
+
+        return self._last_updated
+
+    def _fingerprint(self, table: str, file_name: str) -> tuple:
+        """
+        Identify the current version of a table's file.
+
+        Args:
+            table: Table key in TABLE_SPECS
+            file_name: CSV file name
+
+        Returns:
+            Tuple of (path, mtime_ns, size, last_updated timestamp); mtime and
+            size are None when the file does not exist
+        """
+        file_path = self.data_dir / file_name
+        try:
+            stat = file_path.stat()
+            mtime, size = stat.st_mtime_ns, stat.st_size
+        except OSError:
+            mtime = size = None
 
-            print(f"✓ Loaded {len(self._stock_data)} stock price records")
+        entry = self._get_last_updated().get(TABLE_SPECS[table]['timestamp_key'])
+        timestamp = entry.get('lastUpdated') if isinstance(entry, dict) else None
 
-        return self._stock_data
+        return (str(file_path), mtime, size, timestamp)
+
+    def get_fingerprints(self, tables: Optional[List[str]] = None) -> Dict[str, tuple]:
+        """
+        Current fingerprints of the data files (see _fingerprint).
+
+        Args:
+            tables: Table keys (default: PRELOAD_TABLES)
+
+        Returns:
+            Dict of table -> (path, mtime_ns, size, last_updated timestamp)
+        """
+        return {
+            table: self._fingerprint(table, TABLE_SPECS[table]['file_name'])
+            for table in (tables if tables is not None else PRELOAD_TABLES)
+        }
+
+    def _drop_derived(self, table: str) -> List[str]:
+        """Drop the derived indexes built from a table; returns those that were built."""
+        built = []
+        for attr in DERIVED_INDEXES.get(table, []):
+            if getattr(self, attr) is not None:
+                built.append(attr)
+            setattr(self, attr, None)
+            self._lru.pop(('index', attr), None)
+        return built
+
+    def _forget_table(self, table: str):
+        """Remove a table from memory and from the spill directory."""
+        self._tables.pop(table, None)
+        self._lru.pop(('table', table), None)
+        spilled = self._spilled.pop(table, None)
+        if spilled is not None:
+            spilled[2].unlink(missing_ok=True)
+
+    # ========================================================================
+    # MEMORY BUDGET
+    # ========================================================================
+
+    def _track(self, key: tuple, obj):
+        """Record the size of a newly cached entry and enforce the budget."""
+        self._lru[key] = estimate_memory_bytes(obj)
+        self._lru.move_to_end(key)
+        self._enforce_budget(protect=key)
+
+    def _use_index(self, attr: str):
+        """Return a derived index, tracking it on first use after a build."""
+        key = ('index', attr)
+        if key in self._lru:
+            self._lru.move_to_end(key)
+        else:
+            self._cache_counts['index_builds'] += 1
+            self._track(key, getattr(self, attr))
+        return getattr(self, attr)
+
+    def _enforce_budget(self, protect: Optional[tuple] = None):
+        """Evict least recently used entries until the cache fits the budget."""
+        if self.memory_budget is None:
+            return
+
+        for key in list(self._lru):
+            if sum(self._lru.values()) <= self.memory_budget:
+                return
+            if key == protect:
+                continue
+
+            kind, name = key
+            size_mb = self._lru.pop(key) / 1024 ** 2
+            if kind == 'table':
+                self._spill_table(name)
+                self._cache_counts['table_evictions'] += 1
+            else:
+                setattr(self, name, None)
+                self._cache_counts['index_evictions'] += 1
+            print(f"  ↳ Evicted {kind} {name} ({size_mb:.1f} MB)")
+
+        if sum(self._lru.values()) > self.memory_budget:
+            print(f"⚠️ {protect[1]} alone exceeds the memory budget "
+                  f"({self._lru[protect] / 1024 ** 2:.1f} MB > {self.memory_budget / 1024 ** 2:.1f} MB)")
+
+    def _spill_table(self, table: str):
+        """Write an evicted table to the spill directory and drop it from memory."""
+        file_name, fingerprint, df = self._tables.pop(table)
+
+        if self._spill_dir is None:
+            self._spill_dir = Path(tempfile.mkdtemp(prefix='dataloader_spill_'))
+        self._spill_dir.mkdir(parents=True, exist_ok=True)
+
+        if HAS_PYARROW:
+            path = self._spill_dir / f"{table}.parquet"
+            df.to_parquet(path, index=False)
+        else:
+            path = self._spill_dir / f"{table}.pkl"
+            with open(path, 'wb') as f:
+                pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self._spilled[table] = (file_name, fingerprint, path)
+
+    @staticmethod
+    def _read_spill(path: Path) -> pd.DataFrame:
+        """Read a table written by _spill_table."""
+        if path.suffix == '.parquet':
+            return pd.read_parquet(path)
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def get_cache_stats(self) -> Dict:
+        """
+        Memory use and eviction/reload counts of the table cache.
+
+        Returns:
+            Dict with budget_mb, used_mb, per-entry sizes (MB, least recently
+            used first), spilled tables and counts of CSV loads, spill reloads,
+            table evictions, index builds and index evictions
+        """
+        return {
+            'budget_mb': None if self.memory_budget is None else self.memory_budget / 1024 ** 2,
+            'used_mb': sum(self._lru.values()) / 1024 ** 2,
+            'entries': {f"{kind}:{name}": size / 1024 ** 2 for (kind, name), size in self._lru.items()},
+            'spilled': list(self._spilled),
+            **self._cache_counts
+        }
+
+    def _load_table(
+        self,
+        table: str,
+        file_name: Optional[str] = None,
+        parsed: Optional[pd.DataFrame] = None
+    ) -> pd.DataFrame:
+        """
+        Return a cached table, re-reading it only if its fingerprint changed.
+
+        Args:
+            table: Table key in TABLE_SPECS
+            file_name: CSV file name (default: the table's standard file)
+            parsed: Already parsed file contents (used by preload)
+
+        Returns:
+            DataFrame with the table contents
+        """
+        spec = TABLE_SPECS[table]
+        file_name = file_name or spec['file_name']
+        fingerprint = self._fingerprint(table, file_name)
+
+        cached = self._tables.get(table)
+        if cached is not None and cached[:2] == (file_name, fingerprint):
+            self._lru.move_to_end(('table', table))
+            return cached[2]
+
+        spilled = self._spilled.pop(table, None)
+        if spilled is not None and spilled[:2] == (file_name, fingerprint):
+            df = self._read_spill(spilled[2])
+            self._cache_counts['spill_reloads'] += 1
+        else:
+            if cached is not None or spilled is not None:
+                self._drop_derived(table)
+            if spilled is not None:
+                spilled[2].unlink(missing_ok=True)
+
+            if parsed is not None:
+                df = parsed
+            else:
+                file_path = self.data_dir / file_name
+                print(f"Loading {spec['label']} from {file_path}...")
+                df, _ = read_csv_table(file_path, spec['delimiter'], spec['parse_dates'])
+                print(f"✓ Loaded {len(df)} {spec['unit']}")
+            self._cache_counts['csv_loads'] += 1
+
+        self._tables[table] = (file_name, fingerprint, df)
+        self._track(('table', table), df)
+
+        return df
+
+    def preload(
+        self,
+        tables: Optional[List[str]] = None,
+        max_workers: Optional[int] = None,
+        use_processes: bool = False
+    ) -> Dict[str, float]:
+        """
+        Parse several data files concurrently and cache them.
+
+        Uses a thread pool with pandas' pyarrow CSV engine when pyarrow is
+        installed (it releases the GIL), otherwise the default engine.
+        use_processes=True parses in worker processes instead, at the cost of
+        pickling each table back. Tables that are already cached and
+        unchanged, and files that do not exist, are skipped.
+
+        Args:
+            tables: Table keys in TABLE_SPECS (default: PRELOAD_TABLES)
+            max_workers: Pool size (default: one per table, up to the CPU count)
+            use_processes: Use a process pool instead of threads
+
+        Returns:
+            Dict of table -> parse time in seconds
+        """
+        tables = list(tables) if tables is not None else list(PRELOAD_TABLES)
+        unknown = [t for t in tables if t not in TABLE_SPECS]
+        if unknown:
+            raise ValueError(f"Unknown tables {unknown}. Valid: {list(TABLE_SPECS)}")
+
+        pending = {}
+        for table in tables:
+            file_name = TABLE_SPECS[table]['file_name']
+            fingerprint = self._fingerprint(table, file_name)
+            cached = self._tables.get(table)
+            if cached is not None and cached[:2] == (file_name, fingerprint):
+                continue
+            if table == 'probability_history' and self._probability_summary is not None:
+                continue
+            if fingerprint[1] is None:
+                print(f"⚠️ Skipping {TABLE_SPECS[table]['label']}: {self.data_dir / file_name} not found")
+                continue
+            pending[table] = file_name
+
+        if not pending:
+            return {}
+
+        engine = 'pyarrow' if HAS_PYARROW else None
+        workers = max_workers or min(len(pending), os.cpu_count() or 1)
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        print(f"Preloading {len(pending)} tables with {workers} "
+              f"{'processes' if use_processes else 'threads'} (engine: {engine or 'c'})...")
+
+        start = time.perf_counter()
+        timings = {}
+        with executor_class(max_workers=workers) as pool:
+            futures = {
+                pool.submit(
+                    read_csv_table,
+                    self.data_dir / file_name,
+                    TABLE_SPECS[table]['delimiter'],
+                    TABLE_SPECS[table]['parse_dates'],
+                    engine
+                ): table
+                for table, file_name in pending.items()
+            }
+            for future in as_completed(futures):
+                table = futures[future]
+                df, seconds = future.result()
+                self._load_table(table, pending[table], parsed=df)
+                timings[table] = seconds
+                print(f"  ✓ {TABLE_SPECS[table]['label']}: {len(df)} {TABLE_SPECS[table]['unit']} ({seconds:.2f}s)")
+
+        slowest = max(timings, key=timings.get)
+        print(f"✓ Preloaded {len(timings)} tables in {time.perf_counter() - start:.2f}s "
+              f"(largest: {TABLE_SPECS[slowest]['label']}, {timings[slowest]:.2f}s)")
+
+        return timings
+
+    def refresh(self) -> List[str]:
+        """
+        Reload cached tables whose files changed since they were loaded.
+
+        A table is considered changed when its path, mtime, size or its
+        data/last_updated.json timestamp differ. Unchanged tables are kept
+        as-is; derived indexes of changed tables are rebuilt if they had been
+        built before.
+
+        Returns:
+            Names of the reloaded tables
+        """
+        changed = []
+        entries = [(table, entry[0], entry[1]) for table, entry in self._tables.items()]
+        entries += [(table, entry[0], entry[1]) for table, entry in self._spilled.items()]
+
+        for table, file_name, fingerprint in entries:
+            if self._fingerprint(table, file_name) == fingerprint:
+                continue
+
+            rebuild = self._drop_derived(table)
+            self._forget_table(table)
+            changed.append(table)
+
+            try:
+                self._load_table(table, file_name)
+            except FileNotFoundError as e:
+                print(f"⚠️ {TABLE_SPECS[table]['label']} no longer available: {e}")
+                continue
+
+            for attr in rebuild:
+                getattr(self, '_get' + attr)()
+
+        if self._probability_summary is not None:
+            file_name, fingerprint, chunk_rows, store_dir, _ = self._probability_summary
+            if self._fingerprint('probability_history', file_name) != fingerprint:
+                self.stream_probability_history(file_name, chunk_rows, store_dir=store_dir)
+                changed.append('probability_history')
+
+        if changed:
+            print(f"✓ Refreshed tables: {', '.join(changed)}")
+
+        return changed
+
+    # ========================================================================
+    # SNAPSHOTS
+    # ========================================================================
+
+    def save_snapshot(self, path, tables: Optional[List[str]] = None, build_indexes: bool = True) -> Path:
+        """
+        Write loaded tables and their lookup indexes to one memory-mappable file.
+
+        Args:
+            path: Snapshot file (see data_snapshot.py for the format)
+            tables: Table keys to include (default: all loaded or spilled tables)
+            build_indexes: Build the derived indexes of the included tables first
+
+        Returns:
+            Path of the written snapshot
+        """
+        from data_snapshot import write_snapshot
+
+        tables = list(tables) if tables is not None else list(dict.fromkeys([*self._tables, *self._spilled]))
+        unknown = [t for t in tables if t not in TABLE_SPECS]
+        if unknown:
+            raise ValueError(f"Unknown tables {unknown}. Valid: {list(TABLE_SPECS)}")
+
+        objects, entries = {}, {}
+        for table in tables:
+            file_name = (self._tables.get(table) or self._spilled.get(table) or (TABLE_SPECS[table]['file_name'],))[0]
+            objects['table:' + table] = self._load_table(table, file_name)
+            entries[table] = {'file_name': file_name, 'fingerprint': list(self._tables[table][1])}
+            for attr in DERIVED_INDEXES.get(table, []):
+                if build_indexes and getattr(self, attr) is None:
+                    getattr(self, '_get' + attr)()
+                # Indexes that are not frames or price arrays (RecoveryTable)
+                # are rebuilt on first use instead
+                if isinstance(getattr(self, attr), (pd.DataFrame, pd.Series, dict)):
+                    objects['index:' + attr] = getattr(self, attr)
+
+        path = write_snapshot(
+            path, objects,
+            meta={'data_dir': str(self.data_dir), 'created': datetime.now().isoformat(), 'tables': entries}
+        )
+        print(f"✓ Saved snapshot of {len(entries)} tables to {path} ({path.stat().st_size / 1024 ** 2:.1f} MB)")
+
+        return path
+
+    def load_snapshot(self, path) -> List[str]:
+        """
+        Populate the cache from a snapshot written by save_snapshot.
+
+        Tables and indexes are memory-mapped views of the file. Tables whose
+        source file changed since the snapshot was taken are skipped, so they
+        are read from the CSV on first use as usual.
+
+        Args:
+            path: Snapshot file
+
+        Returns:
+            Names of the restored tables
+        """
+        from data_snapshot import read_snapshot
+
+        objects, meta = read_snapshot(path)
+        restored = []
+        for table, entry in meta['tables'].items():
+            file_name, fingerprint = entry['file_name'], tuple(entry['fingerprint'])
+            if table not in TABLE_SPECS or self._fingerprint(table, file_name) != fingerprint:
+                print(f"⚠️ Snapshot of {TABLE_SPECS.get(table, {}).get('label', table)} is stale; "
+                      f"it will be loaded from {file_name}")
+                continue
+
+            self._forget_table(table)
+            self._drop_derived(table)
+            df = objects['table:' + table]
+            self._tables[table] = (file_name, fingerprint, df)
+            self._track(('table', table), df)
+            for attr in DERIVED_INDEXES.get(table, []):
+                if 'index:' + attr in objects:
+                    setattr(self, attr, objects['index:' + attr])
+                    self._track(('index', attr), getattr(self, attr))
+            restored.append(table)
+
+        print(f"✓ Opened snapshot {path} ({len(restored)} of {len(meta['tables'])} tables current)")
+
+        return restored
+
+    # ========================================================================
+    # DERIVED INDEXES
+    # ========================================================================
+
+    def _get_support_index(self) -> pd.DataFrame:
+        """Support metrics indexed by (stock_name, rolling_period)."""
+        if self._support_index is None:
+            support_df = self.load_support_metrics()
+            self._support_index = (
+                support_df
+                .drop_duplicates(['stock_name', 'rolling_period'], keep='first')
+                .set_index(['stock_name', 'rolling_period'], drop=False)
+                .sort_index()
+            )
+        return self._use_index('_support_index')
+
+    def _get_support_wide(self) -> pd.DataFrame:
+        """Support metrics with one row per stock and (field, rolling_period) columns."""
+        if self._support_wide is None:
+            support_index = self._get_support_index()
+            self._support_wide = support_index.droplevel('stock_name').set_index(
+                support_index['stock_name'].to_numpy(), append=True
+            ).drop(columns='rolling_period').unstack('rolling_period')
+            self._support_wide.index.name = 'stock_name'
+        return self._use_index('_support_wide')
+
+    def _get_probability_peaks(self) -> pd.DataFrame:
+        """Peak probability per option for every probability method."""
+        if self._probability_peaks is None and self._probability_summary is not None:
+            self._probability_peaks = self._probability_summary[4].peaks
+        elif self._probability_peaks is None:
+            prob_history = self.load_probability_history()
+            methods = [m for m in PROBABILITY_METHODS if m in prob_history.columns]
+            self._probability_peaks = prob_history.groupby('OptionName')[methods].max()
+        return self._use_index('_probability_peaks')
+
+    def _get_recovery_index(self) -> pd.Series:
+        """Recovery candidate rates (0-1) keyed by DataType, Stock and bins."""
+        if self._recovery_index is None:
+            recovery_df = self.load_recovery_data()
+            keys = ['DataType', 'Stock', 'HistoricalPeakThreshold', 'ProbMethod', 'CurrentProb_Bin', 'DTE_Bin']
+            keyed = recovery_df.assign(Stock=recovery_df['Stock'].fillna(''))
+            keyed = keyed.drop_duplicates(keys, keep='first').set_index(keys).sort_index()
+            self._recovery_index = keyed['RecoveryCandidate_WorthlessRate_pct'] / 100
+        return self._use_index('_recovery_index')
+
+    def _recovery_table_frame(self) -> pd.DataFrame:
+        """Recovery rows the dense recovery table is built from."""
+        return self.load_recovery_data()
+
+    def _get_recovery_table(self, min_n: int = DEFAULT_MIN_RECOVERY_N) -> RecoveryTable:
+        """Dense recovery rates resolved per stock with scenario fallback (see recovery_table.py)."""
+        if self._recovery_table is not None and self._recovery_table.min_n != min_n:
+            self._recovery_table = None
+            self._lru.pop(('index', '_recovery_table'), None)
+        if self._recovery_table is None:
+            self._recovery_table = RecoveryTable.from_frame(self._recovery_table_frame(), min_n)
+        return self._use_index('_recovery_table')
+
+    def _get_event_index(self) -> EventIndex:
+        """Earnings and dividend days per stock from the event files that are available."""
+        if self._event_index is None:
+            frames = {}
+            for table, load in (('events', self.load_stock_events), ('upcoming_events', self.load_upcoming_events)):
+                try:
+                    frames[table] = load()
+                except FileNotFoundError as e:
+                    print(f"⚠️ {TABLE_SPECS[table]['label'].capitalize()} unavailable: {e}")
+            self._event_index = EventIndex.from_frames(frames.get('events'), frames.get('upcoming_events'))
+        return self._use_index('_event_index')
+
+    def _get_event_volatility(self) -> EventVolatility:
+        """Event-move statistics per stock, recomputed only for stocks whose events changed."""
+        try:
+            events = self.load_stock_events()
+        except FileNotFoundError as e:
+            print(f"⚠️ Stock events unavailable: {e}")
+            events = pd.DataFrame(columns=EVENT_COLUMNS)
+
+        if self._event_volatility is None:
+            self._event_volatility = EventVolatility.from_events(events)
+        elif self._event_volatility.source is not events:
+            refreshed = self._event_volatility.update(events)
+            if refreshed:
+                print(f"✓ Refreshed event statistics of {len(refreshed)} stocks")
+                self._lru.pop(('index', '_event_volatility'), None)
+        return self._use_index('_event_volatility')
+
+    def _get_iv_screening_index(self) -> pd.DataFrame:
+        """IV screening factors keyed by (OptionName, Update_date)."""
+        if self._iv_screening_index is None:
+            keys = ['OptionName', 'Update_date']
+            try:
+                iv_df = self.load_iv_potential_decline()
+            except FileNotFoundError as e:
+                print(f"⚠️ IV screening data unavailable: {e}")
+                iv_df = pd.DataFrame(columns=keys + IV_FACTOR_COLUMNS)
+            self._iv_screening_index = iv_df.drop_duplicates(keys, keep='last').set_index(keys)[IV_FACTOR_COLUMNS]
+        return self._use_index('_iv_screening_index')
+
+    def _get_market_regime(self) -> pd.DataFrame:
+        """Market IV level, trailing percentile and regime per date, recomputed from the stock IVs."""
+        if self._market_regime is None:
+            try:
+                iv_df = self.load_iv_per_stock_per_day()
+            except FileNotFoundError as e:
+                print(f"⚠️ IV per stock per day unavailable: {e}")
+                iv_df = pd.DataFrame(columns=['Stock_Name', 'Date', 'IV_30d'])
+            self._market_regime = market_regime(market_iv_rows(iv_df))
+        return self._use_index('_market_regime')
+
+    def _get_monthly_stats(self) -> pd.DataFrame:
+        """
+        Per (stock, calendar month) statistics, as calculated by the website.
+
+        Mirrors calculateMonthlyStats in useMonthlyStockData.ts: month names
+        are mapped to numbers, non-numeric returns and open-to-low moves count
+        as 0 (parseFloat(value) || 0), a month is positive when its return is
+        >= 0, the mean return is in percent and the open-to-low maximum is the
+        largest (least negative) move.
+        """
+        if self._monthly_stats is None:
+            monthly_df = self.load_monthly_stock_data()
+            month = monthly_df['month']
+            if not pd.api.types.is_numeric_dtype(month):
+                month = month.map(MONTH_NUMBERS)
+            monthly_df = monthly_df.assign(month=month.astype('Int64'), **{
+                column: monthly_df[column].replace([float('inf'), float('-inf')], float('nan')).fillna(0)
+                for column in ('pct_return_month', 'pct_open_to_low')
+            })
+
+            grouped = monthly_df.assign(is_positive=monthly_df['pct_return_month'] >= 0).groupby(['name', 'month'])
+            stats = monthly_df.drop_duplicates(['name', 'month'], keep='first').set_index(['name', 'month'])
+            stats['number_of_months_available'] = grouped.size()
+            stats['pct_pos_return_months'] = grouped['is_positive'].sum() / stats['number_of_months_available'] * 100
+            stats['return_month_mean_pct_return_month'] = grouped['pct_return_month'].mean() * 100
+            stats['open_to_low_max_pct_return_month'] = grouped['pct_open_to_low'].max()
+
+            self._monthly_stats = stats.sort_index()
+        return self._use_index('_monthly_stats')
+
+    def _get_stock_prices(self) -> Dict[str, tuple]:
+        """Sorted (dates, closes) arrays per stock."""
+        if self._stock_prices is None:
+            stock_df = self.load_stock_data().sort_values(['name', 'date'])
+            self._stock_prices = {
+                name: (prices['date'].to_numpy(dtype='datetime64[ns]'), prices['close'].to_numpy(dtype=np.float64))
+                for name, prices in stock_df.groupby('name', sort=False)
+            }
+        return self._use_index('_stock_prices')
+
+    # ========================================================================
+    # LOOKUPS
+    # ========================================================================
 
     def get_support_metrics_for_stock(
         self,
@@ -214,17 +1103,13 @@ class DataLoader:
         Returns:
             Dict with support metrics or None if not found
         """
-        support_df = self.load_support_metrics()
-
-        matching = support_df[
-            (support_df['stock_name'] == stock_name) &
-            (support_df['rolling_period'] == rolling_period)
-        ]
+        support_index = self._get_support_index()
+        key = (stock_name, rolling_period)
 
-        if len(matching) == 0:
+        if key not in support_index.index:
             return None
 
-        return matching.iloc[0].to_dict()
+        return support_index.loc[key].to_dict()
 
     def get_probability_peak(
         self,
@@ -241,14 +1126,12 @@ class DataLoader:
         Returns:
             Peak probability (0-1) or None if no history
         """
-        prob_history = self.load_probability_history()
+        peaks = self._get_probability_peaks()
 
-        option_history = prob_history[prob_history['OptionName'] == option_name]
-
-        if len(option_history) == 0:
+        if option_name not in peaks.index:
             return None
 
-        return option_history[probability_method].max()
+        return peaks.at[option_name, probability_method]
 
     def get_recovery_rate(
         self,
@@ -271,30 +1154,17 @@ class DataLoader:
         Returns:
             Recovery rate (0-1) or None if not found
         """
-        recovery_df = self.load_recovery_data()
+        recovery_index = self._get_recovery_index()
 
-        # Filter by data type
         if stock is None:
-            filtered = recovery_df[recovery_df['DataType'] == 'scenario']
+            key = ('scenario', '', threshold, prob_method, prob_bin, dte_bin)
         else:
-            filtered = recovery_df[
-                (recovery_df['DataType'] == 'stock') &
-                (recovery_df['Stock'] == stock)
-            ]
-
-        # Filter by criteria
-        matching = filtered[
-            (filtered['HistoricalPeakThreshold'] == threshold) &
-            (filtered['ProbMethod'] == prob_method) &
-            (filtered['CurrentProb_Bin'] == prob_bin) &
-            (filtered['DTE_Bin'] == dte_bin)
-        ]
+            key = ('stock', stock, threshold, prob_method, prob_bin, dte_bin)
 
-        if len(matching) == 0:
+        if key not in recovery_index.index:
             return None
 
-        # Return recovery candidate rate as decimal (0-1)
-        return matching.iloc[0]['RecoveryCandidate_WorthlessRate_pct'] / 100
+        return recovery_index.loc[key]
 
     def get_monthly_stats_for_stock(
         self,
@@ -311,35 +1181,15 @@ class DataLoader:
         Returns:
             Dict with monthly stats or None if not found
         """
-        monthly_df = self.load_monthly_stock_data()
+        monthly_stats = self._get_monthly_stats()
+        key = (stock_name, month)
 
-        matching = monthly_df[
-            (monthly_df['name'] == stock_name) &
-            (monthly_df['month'] == month)
-        ]
-
-        if len(matching) == 0:
+        if key not in monthly_stats.index:
             return None
 
-        # Calculate percentage of positive months
-        stock_month_data = monthly_df[
-            (monthly_df['name'] == stock_name) &
-            (monthly_df['month'] == month)
-        ]
-
-        positive_count = (stock_month_data['pct_return_month'] > 0).sum()
-        total_count = len(stock_month_data)
-
-        stats = matching.iloc[0].to_dict()
-        stats['pct_pos_return_months'] = (positive_count / total_count * 100) if total_count > 0 else None
-        stats['number_of_months_available'] = total_count
-
-        # Average return for this month
-        stats['return_month_mean_pct_return_month'] = stock_month_data['pct_return_month'].mean()
-
-        # Worst intra-month drawdown
-        stats['open_to_low_max_pct_return_month'] = stock_month_data['pct_open_to_low'].min()
-
+        stats = monthly_stats.loc[key].to_dict()
+        stats['name'] = stock_name
+        stats['month'] = month
         return stats
 
     def get_current_month_performance(
@@ -360,43 +1210,600 @@ class DataLoader:
         Returns:
             Current month performance (%) or None if data not available
         """
-        stock_df = self.load_stock_data()
+        performance = self.get_current_month_performance_batch([stock_name], current_date)[0]
+        return None if np.isnan(performance) else performance
 
-        # Get stock data
-        stock_prices = stock_df[stock_df['name'] == stock_name].sort_values('date')
+    # ========================================================================
+    # BATCH LOOKUPS
+    # ========================================================================
 
-        if len(stock_prices) == 0:
-            return None
+    def get_support_metrics_batch(
+        self,
+        stock_names,
+        rolling_period: int
+    ) -> pd.DataFrame:
+        """
+        Support metrics for many stocks at once.
 
-        # Find last trading day of previous month
-        previous_month = current_date.replace(day=1) - pd.Timedelta(days=1)
-        previous_month_data = stock_prices[
-            (stock_prices['date'].dt.year == previous_month.year) &
-            (stock_prices['date'].dt.month == previous_month.month)
-        ]
+        Args:
+            stock_names: Sequence of stock names
+            rolling_period: Rolling period (30, 90, 180, 270, or 365)
 
-        if len(previous_month_data) == 0:
-            return None
+        Returns:
+            DataFrame aligned with stock_names (NaN rows where not found)
+        """
+        keys = pd.MultiIndex.from_arrays([
+            np.asarray(stock_names, dtype=object),
+            np.full(len(stock_names), rolling_period)
+        ])
+        return self._get_support_index().reindex(keys).reset_index(drop=True)
 
-        previous_month_close = previous_month_data.iloc[-1]['close']
+    def get_support_metrics_wide(self, stock_names, rolling_periods: List[int]) -> pd.DataFrame:
+        """
+        Support metrics of several rolling periods for many stocks at once.
 
-        # Get current price (most recent date <= current_date)
-        current_data = stock_prices[stock_prices['date'] <= current_date]
+        Args:
+            stock_names: Sequence of stock names
+            rolling_periods: Rolling periods to include
 
-        if len(current_data) == 0:
-            return None
+        Returns:
+            DataFrame aligned with stock_names with (field, rolling_period)
+            columns; ('stock_name', period) is NaN where the stock has no
+            row for that period. wide.xs(period, axis=1, level=1) has the
+            columns of get_support_metrics_batch.
+        """
+        wide = self._get_support_wide()
+        periods = [p for p in rolling_periods if p in wide.columns.get_level_values(1)]
+        wide = wide.loc[:, wide.columns.get_level_values(1).isin(periods)]
+        wide = wide.reindex(np.asarray(stock_names, dtype=object)).reset_index(drop=True)
+
+        # Periods without any support rows: all-NaN columns like the batch lookup
+        missing = [p for p in rolling_periods if p not in periods]
+        if missing:
+            fields = self._get_support_index().columns.drop('rolling_period')
+            empty = pd.DataFrame(
+                np.nan, index=wide.index,
+                columns=pd.MultiIndex.from_product([fields, missing], names=wide.columns.names)
+            )
+            wide = pd.concat([wide, empty], axis=1)
+        return wide
 
-        current_price = current_data.iloc[-1]['close']
+    def get_probability_peaks_batch(
+        self,
+        option_names,
+        probability_method: str = 'ProbWorthless_Bayesian_IsoCal'
+    ) -> np.ndarray:
+        """
+        Peak probabilities for many options (NaN where there is no history).
 
-        # Calculate performance
-        return ((current_price - previous_month_close) / previous_month_close) * 100
+        Args:
+            option_names: Sequence of option names
+            probability_method: Probability field name
+
+        Returns:
+            Array aligned with option_names
+        """
+        peaks = self._get_probability_peaks()[probability_method]
+        return peaks.reindex(np.asarray(option_names, dtype=object)).to_numpy(dtype=np.float64)
+
+    def get_recovery_rates_batch(
+        self,
+        threshold: float,
+        prob_method: str,
+        prob_bins,
+        dte_bins,
+        stocks=None
+    ) -> np.ndarray:
+        """
+        Recovery rates for many (probability bin, DTE bin) pairs.
 
-    def clear_cache(self):
-        """Clear cached data to free memory."""
-        self._options_data = None
-        self._support_data = None
-        self._probability_history = None
-        self._recovery_data = None
-        self._monthly_data = None
-        self._stock_data = None
+        Args:
+            threshold: Historical peak threshold (e.g., 0.90)
+            prob_method: Recovery method name (e.g., "Bayesian Calibrated")
+            prob_bins: Sequence of probability bin labels
+            dte_bins: Sequence of DTE bin labels
+            stocks: Optional sequence of stock names (per-stock rows)
+
+        Returns:
+            Array of rates (0-1), NaN where not found
+        """
+        n = len(prob_bins)
+        if stocks is None:
+            data_type = np.full(n, 'scenario', dtype=object)
+            stock = np.full(n, '', dtype=object)
+        else:
+            data_type = np.full(n, 'stock', dtype=object)
+            stock = np.asarray(stocks, dtype=object)
+
+        keys = pd.MultiIndex.from_arrays([
+            data_type,
+            stock,
+            np.full(n, threshold),
+            np.full(n, prob_method, dtype=object),
+            np.asarray(prob_bins, dtype=object),
+            np.asarray(dte_bins, dtype=object)
+        ])
+        return self._get_recovery_index().reindex(keys).to_numpy(dtype=np.float64)
+
+    def get_recovery_rates_by_stock(
+        self,
+        stocks,
+        threshold: float,
+        prob_method: str,
+        prob_bins,
+        dte_bins,
+        min_n: int = DEFAULT_MIN_RECOVERY_N
+    ) -> np.ndarray:
+        """
+        Per-stock recovery rates with scenario fallback, in one vectorized gather.
+
+        A stock's own rate is used where its RecoveryCandidate_N is at least
+        min_n; otherwise (sparse cell, no stock rows) the scenario rate of the
+        same bins is used.
+
+        Args:
+            stocks: Sequence of stock names
+            threshold: Historical peak threshold (e.g., 0.90)
+            prob_method: Recovery method name (e.g., "Bayesian Calibrated")
+            prob_bins: Sequence of probability bin labels
+            dte_bins: Sequence of DTE bin labels
+            min_n: Minimum RecoveryCandidate_N for a per-stock rate
+
+        Returns:
+            Array of rates (0-1), NaN where neither rate exists
+        """
+        return self._get_recovery_table(min_n).lookup(stocks, threshold, prob_method, prob_bins, dte_bins)
+
+    def get_event_flags(self, stock_names, dates, expiry_dates, option_names=None) -> pd.DataFrame:
+        """
+        Whether an earnings report or ex-dividend date falls between each date and expiry.
+
+        Events in (date, expiry] are counted from the event index (see
+        event_index.py). With option_names, the FinancialReport / X-Day flags
+        of data.csv (an event between the data.csv date and expiry, hence
+        also after any earlier scoring date) are added to the earnings and
+        dividend flags.
+
+        Args:
+            stock_names: Sequence of stock names
+            dates: Scoring dates
+            expiry_dates: Expiry dates
+            option_names: Optional option names for the data.csv flags
+
+        Returns:
+            DataFrame (positional index) with earnings_before_expiry,
+            dividend_before_expiry, event_before_expiry (bool) and
+            days_to_earnings, days_to_dividend (next known event, NaN if none)
+        """
+        flags = self._get_event_index().flags(stock_names, dates, expiry_dates)
+
+        if option_names is not None:
+            options_df = self.load_options_data()
+            option_flags = options_df.drop_duplicates('OptionName').set_index('OptionName')
+            option_flags = option_flags.reindex(np.asarray(option_names, dtype=object))
+            for column, kind in (('FinancialReport', 'earnings'), ('X-Day', 'dividend')):
+                if column in option_flags.columns:
+                    flags[f'{kind}_before_expiry'] |= (option_flags[column] == 'Y').to_numpy()
+            flags['event_before_expiry'] = flags['earnings_before_expiry'] | flags['dividend_before_expiry']
+
+        return flags
+
+    def get_event_stats(self) -> pd.DataFrame:
+        """
+        Event-day move statistics per stock and event type.
+
+        See event_volatility.group_stats for the columns; event_type 'All'
+        pools the event types of a stock.
+
+        Returns:
+            DataFrame with one row per (stock_name, event_type)
+        """
+        return self._get_event_volatility().stats
+
+    def get_event_risk(self, stock_names, cushions, event_type: str = 'All',
+                       measure: str = 'close_change') -> pd.DataFrame:
+        """
+        Historical event-day risk of (stock, strike cushion) rows.
+
+        Args:
+            stock_names: Sequence of stock names
+            cushions: Decline from the price to the strike, 1 - strike / price
+            event_type: Event type whose moves are used (default: all types)
+            measure: 'close_change' or 'intraday_low' (see event_volatility.py)
+
+        Returns:
+            DataFrame (positional index) with event_count, event_p05,
+            event_worst_move and event_beyond_cushion (share of past event
+            moves at or beyond the cushion; NaN for stocks without events)
+        """
+        return self._get_event_volatility().event_risk(stock_names, cushions, event_type, measure)
+
+    def get_iv_screening(self, option_names, dates) -> pd.DataFrame:
+        """
+        IV lower-bound safety factors of (option, date) rows.
+
+        Rows come from IV_PotentialDecline.csv (see iv_screening.py for how
+        the columns are built and appended daily).
+
+        Args:
+            option_names: Sequence of option names
+            dates: Scoring dates
+
+        Returns:
+            DataFrame (positional index) with IV_FACTOR_COLUMNS, NaN where the
+            option has no screening row on that date
+        """
+        keys = pd.MultiIndex.from_arrays([
+            np.asarray(option_names, dtype=object),
+            pd.to_datetime(np.asarray(dates)).normalize()
+        ])
+        return self._get_iv_screening_index().reindex(keys).reset_index(drop=True)
+
+    def get_market_iv(self, dates) -> pd.DataFrame:
+        """
+        Market IV (MARKET_IV of iv_per_stock_per_day.csv) as of each date.
+
+        The index is recomputed from the stock IVs (see market_iv.py); each
+        date gets the last index value on or before it.
+
+        Args:
+            dates: Sequence of dates
+
+        Returns:
+            DataFrame (positional index) with market_iv, market_iv_percentile
+            (trailing percentile, 0-1) and market_iv_regime; NaN before the
+            first index value
+        """
+        regime = self._get_market_regime()
+        dates = pd.DatetimeIndex(dates).to_numpy(dtype='datetime64[ns]')
+        position = np.searchsorted(regime['date'].to_numpy(dtype='datetime64[ns]'), dates, side='right') - 1
+        # Position -1 (before the first value) is not in the index, giving a NaN row
+        rows = regime.reindex(position)[['market_iv', 'market_iv_percentile', 'market_iv_regime']]
+        return rows.reset_index(drop=True)
+
+    def get_monthly_stats_batch(self, stock_names, month: int) -> pd.DataFrame:
+        """
+        Monthly statistics for many stocks in one calendar month.
+
+        Args:
+            stock_names: Sequence of stock names
+            month: Calendar month (1-12)
+
+        Returns:
+            DataFrame aligned with stock_names (NaN rows where not found)
+        """
+        keys = pd.MultiIndex.from_arrays([
+            np.asarray(stock_names, dtype=object),
+            np.full(len(stock_names), month)
+        ])
+        return self._get_monthly_stats().reindex(keys).reset_index(drop=True)
+
+    def get_current_month_performance_batch(
+        self,
+        stock_names,
+        current_date: datetime
+    ) -> np.ndarray:
+        """
+        Current month performance (%) for many stocks on one date.
+
+        Args:
+            stock_names: Sequence of stock names
+            current_date: Current date
+
+        Returns:
+            Array aligned with stock_names (NaN where data is not available)
+        """
+        return month_to_date_performance(self._get_stock_prices(), stock_names, current_date)
+
+    def get_scoring_inputs(
+        self,
+        options_df: pd.DataFrame,
+        current_date: datetime,
+        rolling_period: int = 365,
+        probability_method: str = 'ProbWorthless_Bayesian_IsoCal',
+        historical_peak_threshold: float = 0.90,
+        days_to_expiry=None,
+        recovery_min_n: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Assemble the raw scoring inputs for many options with indexed lookups.
+
+        Columns match the keyword arguments of ScoringEngine.calculate_score,
+        with NaN where the scalar path would pass None. Tables that are not
+        available (e.g., no probability_history.csv) leave their factors empty.
+
+        Args:
+            options_df: Options to score (data.csv format)
+            current_date: Scoring date
+            rolling_period: Support level rolling period
+            probability_method: Probability field name
+            historical_peak_threshold: Threshold for recovery candidates
+            days_to_expiry: Optional DTE per option (default: DaysToExpiry column)
+            recovery_min_n: Use per-stock recovery rates with at least this
+                many candidates (None: scenario rates only)
+
+        Returns:
+            DataFrame aligned with options_df (same index)
+        """
+        config = (rolling_period, probability_method, historical_peak_threshold)
+        return self.get_scoring_inputs_by_config(
+            options_df, current_date, [config], days_to_expiry, recovery_min_n
+        )[config]
+
+    def get_scoring_inputs_by_config(
+        self,
+        options_df: pd.DataFrame,
+        current_date: datetime,
+        configs: List[Tuple[int, str, float]],
+        days_to_expiry=None,
+        recovery_min_n: Optional[int] = None
+    ) -> Dict[Tuple[int, str, float], pd.DataFrame]:
+        """
+        Scoring inputs for several (rolling period, method, peak threshold) configs.
+
+        Seasonality and current performance lookups are shared; support
+        metrics of all rolling periods come from one wide lookup, the current
+        probability and historical peak are looked up once per method and the
+        recovery advantage once per (method, threshold) pair.
+
+        Args:
+            options_df: Options to score (data.csv format, one column per method)
+            current_date: Scoring date
+            configs: (rolling period, probability method, historical peak
+                threshold) triples
+            days_to_expiry: Optional DTE per option (default: DaysToExpiry column)
+            recovery_min_n: Use per-stock recovery rates with at least this
+                many candidates, falling back to scenario rates (None:
+                scenario rates only)
+
+        Returns:
+            Dict of (period, method, threshold) -> inputs as in get_scoring_inputs
+        """
+        stock_names = options_df['StockName'].to_numpy(dtype=object)
+        option_names = options_df['OptionName'].to_numpy(dtype=object)
+        n = len(options_df)
+        current_date = pd.Timestamp(current_date)
+
+        if days_to_expiry is None:
+            days_to_expiry = options_df['DaysToExpiry'].to_numpy(dtype=np.float64)
+
+        periods = list(dict.fromkeys(period for period, _, _ in configs))
+        support_wide = self.get_support_metrics_wide(stock_names, periods)
+        support_by_period = {}
+        for period in periods:
+            support = support_wide.xs(period, axis=1, level=1)
+            support_by_period[period] = {
+                column: support[column].to_numpy(dtype=np.float64)
+                for column in ('support_strength_score', 'days_since_last_break', 'trading_days_per_break')
+            }
+        monthly = self.get_monthly_stats_batch(stock_names, current_date.month)
+
+        try:
+            current_month_perf = self.get_current_month_performance_batch(stock_names, current_date)
+        except FileNotFoundError as e:
+            print(f"⚠️ Current month performance unavailable: {e}")
+            current_month_perf = np.full(n, np.nan)
+
+        shared = {
+            'monthly_positive_rate': monthly['pct_pos_return_months'].to_numpy(dtype=np.float64),
+            'monthly_avg_return': monthly['return_month_mean_pct_return_month'].to_numpy(dtype=np.float64),
+            'typical_low_day': monthly['day_low_day_of_month'].to_numpy(dtype=np.float64),
+            'current_day': np.full(n, current_date.day),
+            'current_month_performance': current_month_perf
+        }
+        dte_bins = np.array(DTE_BIN_LABELS, dtype=object)[get_dte_bin_codes(days_to_expiry)]
+
+        # Per-method inputs: current probability, its bin and the historical peak
+        per_method = {}
+        peaks_available = True
+        for method in dict.fromkeys(method for _, method, _ in configs):
+            current_probability = options_df[method].fillna(0).to_numpy(dtype=np.float64)
+            peaks = np.full(n, np.nan)
+            if peaks_available:
+                try:
+                    peaks = self.get_probability_peaks_batch(option_names, method)
+                except FileNotFoundError as e:
+                    print(f"⚠️ Historical peak unavailable: {e}")
+                    peaks_available = False
+            prob_bins = np.array(PROBABILITY_BIN_LABELS, dtype=object)[get_probability_bin_codes(current_probability)]
+            per_method[method] = (current_probability, peaks, prob_bins)
+
+        recovery_by_pair = {}
+        for _, method, threshold in configs:
+            if (method, threshold) in recovery_by_pair:
+                continue
+            if recovery_min_n is None:
+                recovery_by_pair[(method, threshold)] = self.get_recovery_rates_batch(
+                    threshold,
+                    RECOVERY_METHOD_NAMES.get(method, method),
+                    per_method[method][2],
+                    dte_bins
+                )
+            else:
+                recovery_by_pair[(method, threshold)] = self.get_recovery_rates_by_stock(
+                    stock_names,
+                    threshold,
+                    RECOVERY_METHOD_NAMES.get(method, method),
+                    per_method[method][2],
+                    dte_bins,
+                    min_n=recovery_min_n
+                )
+
+        inputs = {}
+        for period, method, threshold in configs:
+            current_probability, peaks, _ = per_method[method]
+            support = support_by_period[period]
+            inputs[(period, method, threshold)] = pd.DataFrame({
+                'support_strength_score': support['support_strength_score'],
+                'days_since_last_break': support['days_since_last_break'],
+                'trading_days_per_break': support['trading_days_per_break'],
+                'current_probability': current_probability,
+                'historical_peak_probability': peaks,
+                'recovery_advantage': recovery_by_pair[(method, threshold)],
+                'monthly_positive_rate': shared['monthly_positive_rate'],
+                'monthly_avg_return': shared['monthly_avg_return'],
+                'typical_low_day': shared['typical_low_day'],
+                'current_day': shared['current_day'],
+                'current_month_performance': shared['current_month_performance']
+            }, index=options_df.index)
+
+        return inputs
+
+    # ========================================================================
+    # BACKTEST PANEL
+    # ========================================================================
+
+    def get_trading_days(self, start_date: datetime, end_date: datetime) -> List[pd.Timestamp]:
+        """
+        Trading days (dates present in stock_data.csv) within a window.
+
+        Args:
+            start_date: First date (inclusive)
+            end_date: Last date (inclusive)
+
+        Returns:
+            Sorted list of dates
+        """
+        dates = self.load_stock_data()['date']
+        dates = dates[(dates >= pd.Timestamp(start_date)) & (dates <= pd.Timestamp(end_date))]
+        return sorted(pd.unique(dates))
+
+    def get_backtest_panel(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        rolling_period: Union[int, List[int]] = 365,
+        min_days_since_break: int = 10,
+        probability_method: Union[str, List[str]] = 'ProbWorthless_Bayesian_IsoCal',
+        min_days_to_expiry: int = 1,
+        max_days_to_expiry: int = 45,
+        stocks: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        All (trading day, option) rows the backtest scores, in one table.
+
+        Applies the backtest filters: DTE window (business days approximated
+        as 5/7 of calendar days), a support row for the stock, days since
+        last break >= min_days_since_break and strike at or below the rolling
+        low. The probability column holds the value from
+        probability_history.csv for that day when available, otherwise the
+        data.csv value.
+
+        With a list of rolling periods, a row is kept when it passes the
+        support filters of any of them and an in_period_<period> boolean
+        column tells which.
+
+        Args:
+            start_date: First date (inclusive)
+            end_date: Last date (inclusive)
+            rolling_period: Support level rolling period, or a list of them
+            min_days_since_break: Minimum days since last support break
+            probability_method: Probability field name, or a list of them
+            min_days_to_expiry: Minimum business days to expiry
+            max_days_to_expiry: Maximum business days to expiry
+            stocks: Optional stock names to restrict to
+
+        Returns:
+            DataFrame with date, PANEL_OPTION_COLUMNS, DaysToExpiry, one
+            column per probability method (and in_period_<period> columns for
+            a list of periods), sorted by date and option
+        """
+        methods = [probability_method] if isinstance(probability_method, str) else list(probability_method)
+        periods = [rolling_period] if np.isscalar(rolling_period) else list(rolling_period)
+        options_df = self.load_options_data()
+        columns = [c for c in PANEL_OPTION_COLUMNS if c in options_df.columns]
+        options_df = options_df[columns + methods]
+        if stocks is not None:
+            options_df = options_df[options_df['StockName'].isin(stocks)]
+
+        support = self.get_support_metrics_wide(options_df['StockName'].to_numpy(), periods)
+        strikes = options_df['StrikePrice'].to_numpy()
+        in_period = {
+            period: (
+                support[('stock_name', period)].notna().to_numpy()
+                & ~(support[('days_since_last_break', period)] < min_days_since_break).to_numpy()
+                & ~(strikes > support[('rolling_low', period)].to_numpy(dtype=np.float64))
+            )
+            for period in periods
+        }
+        keep = np.logical_or.reduce(list(in_period.values()))
+        options_df = options_df[keep]
+        if not np.isscalar(rolling_period):
+            options_df = options_df.assign(**{
+                f'in_period_{period}': mask[keep] for period, mask in in_period.items()
+            })
+
+        days = pd.DataFrame({'date': self.get_trading_days(start_date, end_date)})
+        panel = days.merge(options_df, how='cross')
+        panel['DaysToExpiry'] = (panel['ExpiryDate'] - panel['date']).dt.days * 5 // 7
+        panel = panel[
+            (panel['ExpiryDate'] >= panel['date'])
+            & panel['DaysToExpiry'].between(min_days_to_expiry, max_days_to_expiry)
+        ]
+
+        if self._probability_summary is not None:
+            store = self._probability_summary[4].store
+            for method in methods:
+                history_values = store.lookup(panel['OptionName'], panel['date'], method)
+                panel[method] = np.where(np.isnan(history_values), panel[method], history_values)
+            history = None
+        else:
+            try:
+                history = self.load_probability_history()[['OptionName', 'Update_date'] + methods]
+            except FileNotFoundError:
+                history = None
+
+        if history is not None:
+            history = history.drop_duplicates(['OptionName', 'Update_date'], keep='last')
+            history_columns = {method: f'_history_{i}' for i, method in enumerate(methods)}
+            panel = panel.merge(
+                history.rename(columns={'Update_date': 'date', **history_columns}),
+                on=['OptionName', 'date'],
+                how='left'
+            )
+            for method, column in history_columns.items():
+                panel[method] = panel[column].fillna(panel[method])
+            panel = panel.drop(columns=list(history_columns.values()))
+
+        return panel.sort_values(['date', 'OptionName']).reset_index(drop=True)
+
+    def get_closes(self, stock_names, dates) -> np.ndarray:
+        """
+        Closing price of each stock on each date.
+
+        Args:
+            stock_names: Sequence of stock names
+            dates: Sequence of dates (aligned with stock_names)
+
+        Returns:
+            Array of closes, NaN where there is no price on that date
+        """
+        closes = self.load_stock_data().drop_duplicates(['name', 'date']).set_index(['name', 'date'])['close']
+        keys = pd.MultiIndex.from_arrays([
+            np.asarray(stock_names, dtype=object),
+            pd.DatetimeIndex(dates)
+        ])
+        return closes.reindex(keys).to_numpy(dtype=np.float64)
+
+    def get_expiry_closes(self, stock_names, expiry_dates) -> np.ndarray:
+        """Closing price of each stock on each expiry date (see get_closes)."""
+        return self.get_closes(stock_names, expiry_dates)
+
+    def clear_cache(self, tables: Optional[List[str]] = None):
+        """
+        Clear cached data to free memory.
+
+        Args:
+            tables: Table keys to drop (default: all tables)
+        """
+        for table in tables if tables is not None else list(TABLE_SPECS):
+            if table not in TABLE_SPECS:
+                raise ValueError(f"Unknown table '{table}'. Valid: {list(TABLE_SPECS)}")
+            self._forget_table(table)
+            self._drop_derived(table)
+            if table == 'probability_history':
+                self._probability_summary = None
+            if table == 'events':
+                self._event_volatility = None
+                self._lru.pop(('index', '_event_volatility'), None)
         print("✓ Data cache cleared")
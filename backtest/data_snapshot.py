@@ -0,0 +1,272 @@
+"""
+Memory-Mappable Data Snapshots
+
+This module writes loaded DataLoader tables and lookup indexes to a single
+file that later processes open without parsing any CSV:
+
+    [magic 'PUTSNAP1'][uint64 header length][JSON header][column buffers]
+
+The JSON header describes every stored object (DataFrame, Series or the
+per-stock price arrays) and, per column, its dtype and the offset of its
+buffer. Buffers are 64-byte aligned raw arrays; opening a snapshot maps the
+file once (np.memmap) and numeric and date columns are zero-copy views into
+it. String columns are stored as int32 codes with their distinct values in
+the header.
+
+Usage:
+    from data_snapshot import write_snapshot, read_snapshot
+
+    write_snapshot('cache/data.snapshot', {'options': options_df}, meta={'data_dir': '../data'})
+    objects, meta = read_snapshot('cache/data.snapshot')
+
+Author: Put Options SE
+Date: February 2026
+"""
+
+import json
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+SNAPSHOT_MAGIC = b'PUTSNAP1'
+SNAPSHOT_VERSION = 1
+
+# Buffer alignment in bytes
+ALIGNMENT = 64
+
+_HEADER_PREFIX = struct.Struct('<8sQ')
+
+
+# ============================================================================
+# COLUMN ENCODING
+# ============================================================================
+
+def _encode_column(values, name, buffers: List[np.ndarray]) -> Dict:
+    """
+    Describe one column and queue its buffers for writing.
+
+    Args:
+        values: Series, Index or array
+        name: Column name (JSON serializable)
+        buffers: Output list of arrays to write (appended to)
+
+    Returns:
+        Column spec for the header
+    """
+    values = pd.Series(values) if not isinstance(values, pd.Series) else values
+    dtype = values.dtype
+    spec = {'name': name, 'dtype': str(dtype), 'length': len(values)}
+
+    def add(array: np.ndarray) -> int:
+        buffers.append(np.ascontiguousarray(array))
+        return len(buffers) - 1
+
+    if dtype.kind in 'biuf' and isinstance(dtype, np.dtype):
+        spec.update(kind='numeric', buffer=add(values.to_numpy()))
+    elif dtype.kind in 'mM' and isinstance(dtype, np.dtype):
+        spec.update(kind='datetime', buffer=add(values.to_numpy().view(np.int64)))
+    elif pd.api.types.is_extension_array_dtype(dtype) and (
+            pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype)):
+        mask = values.isna().to_numpy()
+        data = values.to_numpy(dtype=dtype.numpy_dtype, na_value=0)
+        spec.update(kind='masked', buffer=add(data), mask=add(mask))
+    elif pd.api.types.is_string_dtype(dtype) or dtype == object:
+        codes, categories = pd.factorize(values, use_na_sentinel=True)
+        categories = [c.item() if isinstance(c, np.generic) else c for c in categories]
+        try:
+            json.dumps(categories)
+        except TypeError as e:
+            raise ValueError(f"Column '{name}' has values that cannot be stored in a snapshot: {e}")
+        spec.update(kind='strings', buffer=add(codes.astype(np.int32)), categories=categories)
+    else:
+        raise ValueError(f"Column '{name}' has unsupported dtype {dtype} for snapshots")
+
+    return spec
+
+
+def _decode_column(spec: Dict, buffers: List[np.ndarray]):
+    """Rebuild a column from its spec (numeric and date columns are views)."""
+    kind = spec['kind']
+    if kind == 'numeric':
+        return buffers[spec['buffer']]
+    if kind == 'datetime':
+        return buffers[spec['buffer']].view(spec['dtype'])
+    if kind == 'masked':
+        data, mask = buffers[spec['buffer']], buffers[spec['mask']]
+        if spec['dtype'] == 'boolean':
+            return pd.arrays.BooleanArray(data, mask)
+        return pd.arrays.IntegerArray(data, mask)
+
+    categories = pd.Index(spec['categories'], dtype=object)
+    values = pd.Categorical.from_codes(buffers[spec['buffer']], categories=categories)
+    return pd.array(np.asarray(values, dtype=object), dtype=spec['dtype'])
+
+
+def _encode_index(index: pd.Index, buffers: List[np.ndarray]) -> List[Dict]:
+    """Describe the levels of a (Multi)Index."""
+    return [
+        _encode_column(index.get_level_values(i), index.names[i], buffers)
+        for i in range(index.nlevels)
+    ]
+
+
+def _decode_index(specs: List[Dict], buffers: List[np.ndarray]) -> pd.Index:
+    """Rebuild a (Multi)Index from its level specs."""
+    levels = [_decode_column(spec, buffers) for spec in specs]
+    names = [spec['name'] for spec in specs]
+    if len(levels) == 1:
+        return pd.Index(levels[0], name=names[0], copy=False)
+    return pd.MultiIndex.from_arrays(levels, names=names)
+
+
+def _encode_object(obj, buffers: List[np.ndarray]) -> Dict:
+    """Describe a DataFrame, Series or dict of (dates, closes) arrays."""
+    if isinstance(obj, pd.DataFrame):
+        if not obj.columns.is_unique:
+            raise ValueError("Snapshots need unique column names")
+        spec = {
+            'kind': 'frame',
+            'columns': [
+                _encode_column(obj.iloc[:, i], list(c) if isinstance(c, tuple) else c, buffers)
+                for i, c in enumerate(obj.columns)
+            ],
+            'index': _encode_index(obj.index, buffers)
+        }
+        if isinstance(obj.columns, pd.MultiIndex):
+            # Tuple column names are stored as lists
+            spec['column_levels'] = list(obj.columns.names)
+        return spec
+    if isinstance(obj, pd.Series):
+        return {
+            'kind': 'series',
+            'values': _encode_column(obj, obj.name, buffers),
+            'index': _encode_index(obj.index, buffers)
+        }
+    if isinstance(obj, dict):
+        # Per-stock sorted (dates, closes) arrays, stored as CSR slices
+        names = list(obj)
+        lengths = [len(obj[name][0]) for name in names]
+        offsets = np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)]).astype(np.int64)
+        dates = np.concatenate([obj[name][0] for name in names]) if names else np.empty(0, 'datetime64[ns]')
+        closes = np.concatenate([obj[name][1] for name in names]) if names else np.empty(0)
+        return {
+            'kind': 'price_arrays',
+            'names': names,
+            'offsets': _encode_column(offsets, 'offsets', buffers),
+            'dates': _encode_column(dates, 'dates', buffers),
+            'closes': _encode_column(closes, 'closes', buffers)
+        }
+    raise ValueError(f"Cannot snapshot objects of type {type(obj).__name__}")
+
+
+def _decode_object(spec: Dict, buffers: List[np.ndarray]):
+    """Rebuild an object written by _encode_object."""
+    if spec['kind'] == 'frame':
+        index = _decode_index(spec['index'], buffers)
+        if 'column_levels' in spec:
+            columns = {tuple(c['name']): _decode_column(c, buffers) for c in spec['columns']}
+            frame = pd.DataFrame(columns, index=index, copy=False)
+            frame.columns = pd.MultiIndex.from_tuples(list(columns), names=spec['column_levels'])
+            return frame
+        columns = {c['name']: _decode_column(c, buffers) for c in spec['columns']}
+        return pd.DataFrame(columns, index=index, copy=False)
+    if spec['kind'] == 'series':
+        values = spec['values']
+        return pd.Series(
+            _decode_column(values, buffers), index=_decode_index(spec['index'], buffers),
+            name=values['name'], copy=False
+        )
+
+    offsets = _decode_column(spec['offsets'], buffers)
+    dates = _decode_column(spec['dates'], buffers)
+    closes = _decode_column(spec['closes'], buffers)
+    return {
+        name: (dates[offsets[i]:offsets[i + 1]], closes[offsets[i]:offsets[i + 1]])
+        for i, name in enumerate(spec['names'])
+    }
+
+
+# ============================================================================
+# READ / WRITE
+# ============================================================================
+
+def write_snapshot(path, objects: Dict[str, object], meta: Optional[Dict] = None) -> Path:
+    """
+    Write objects to a snapshot file.
+
+    Args:
+        path: Output file (parent directories are created)
+        objects: Name -> DataFrame, Series or dict of (dates, closes) arrays
+        meta: Extra JSON-serializable information stored in the header
+
+    Returns:
+        Path of the written file
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    buffers: List[np.ndarray] = []
+    header = {
+        'version': SNAPSHOT_VERSION,
+        'meta': meta or {},
+        'objects': {name: _encode_object(obj, buffers) for name, obj in objects.items()}
+    }
+
+    # Buffer offsets relative to the (aligned) end of the header
+    layout, position = [], 0
+    for array in buffers:
+        layout.append({'offset': position, 'dtype': array.dtype.str, 'count': int(array.size)})
+        position += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+    header['buffers'] = layout
+
+    header_bytes = json.dumps(header, default=str).encode('utf-8')
+    data_start = -(-(_HEADER_PREFIX.size + len(header_bytes)) // ALIGNMENT) * ALIGNMENT
+
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER_PREFIX.pack(SNAPSHOT_MAGIC, len(header_bytes)))
+        f.write(header_bytes)
+        for array, entry in zip(buffers, layout):
+            f.seek(data_start + entry['offset'])
+            f.write(array.tobytes())
+        f.truncate(data_start + position)
+    tmp_path.replace(path)
+
+    return path
+
+
+def read_snapshot(path) -> Tuple[Dict[str, object], Dict]:
+    """
+    Open a snapshot file (memory-mapped, read-only).
+
+    Args:
+        path: Snapshot file written by write_snapshot
+
+    Returns:
+        Tuple of (name -> object, meta dict)
+    """
+    path = Path(path)
+    with open(path, 'rb') as f:
+        magic, header_length = _HEADER_PREFIX.unpack(f.read(_HEADER_PREFIX.size))
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a data snapshot")
+        header = json.loads(f.read(header_length))
+
+    if header.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {header.get('version')} in {path}")
+
+    data_start = -(-(_HEADER_PREFIX.size + header_length) // ALIGNMENT) * ALIGNMENT
+    data = np.asarray(np.memmap(path, dtype=np.uint8, mode='r')) if path.stat().st_size > data_start else np.empty(0, np.uint8)
+
+    buffers = []
+    for entry in header['buffers']:
+        dtype = np.dtype(entry['dtype'])
+        start = data_start + entry['offset']
+        buffers.append(data[start:start + entry['count'] * dtype.itemsize].view(dtype))
+
+    objects = {name: _decode_object(spec, buffers) for name, spec in header['objects'].items()}
+    return objects, header['meta']
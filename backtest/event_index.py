@@ -0,0 +1,194 @@
+"""
+Earnings and Dividend Event Index
+
+This module answers "does an earnings report or ex-dividend date fall between
+the scoring date and expiry?" for every (date, option) row of a backtest
+panel at once.
+
+Events come from:
+- Stock_Events_Volatility_Data.csv: historical reports (Kvartalsrapport,
+  Bokslutskommuniké) -> earnings
+- upcoming_events.csv: scheduled events (is_earnings -> earnings, Ex-Date ->
+  dividend)
+
+Per event kind, the event days of all stocks are kept in one array sorted by
+(stock, day), with CSR offsets per stock. Encoding a query as stock code and
+day, two np.searchsorted calls over that array count the events in
+(date, expiry] for the whole panel; the first of them also gives the next
+event day.
+
+Usage:
+    from event_index import EventIndex
+
+    index = EventIndex.from_frames(history_df, upcoming_df)
+    flags = index.flags(panel['StockName'], panel['date'], panel['ExpiryDate'])
+
+Author: Put Options SE
+Date: February 2026
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+EVENT_KINDS = ['earnings', 'dividend']
+
+# Stock_Events_Volatility_Data.csv type_of_event values that are earnings reports
+EARNINGS_EVENT_TYPES = ['Kvartalsrapport', 'Bokslutskommuniké']
+
+# upcoming_events.csv event_type of ex-dividend dates
+DIVIDEND_EVENT_TYPE = 'Ex-Date'
+
+
+def _days(values) -> np.ndarray:
+    """Dates as int64 days since the epoch."""
+    return pd.to_datetime(np.asarray(values)).to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+
+class EventIndex:
+    """
+    Sorted event days per stock and kind.
+
+    Attributes:
+        stocks: Stock names (codes are positions)
+        days: Dict of kind -> int64 event days sorted by (stock, day)
+        offsets: Dict of kind -> CSR offsets (len(stocks) + 1); the events of
+            stock i are days[offsets[i]:offsets[i + 1]]
+    """
+
+    def __init__(self, stocks: pd.Index, days: Dict[str, np.ndarray], offsets: Dict[str, np.ndarray]):
+        self.stocks = stocks
+        self.days = days
+        self.offsets = offsets
+
+        # Event (stock code, day) pairs as one sortable int64 key per kind
+        self._keys = {
+            kind: (np.repeat(np.arange(len(stocks), dtype=np.int64), np.diff(offsets[kind])) << 32) + days[kind]
+            for kind in days
+        }
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the day, offset and key arrays and the stock labels."""
+        arrays = [*self.days.values(), *self.offsets.values(), *self._keys.values()]
+        return int(self.stocks.memory_usage(deep=True)) + sum(array.nbytes for array in arrays)
+
+    @classmethod
+    def from_events(cls, events: pd.DataFrame) -> 'EventIndex':
+        """
+        Build the index from a stock_name / date / kind table.
+
+        Args:
+            events: DataFrame with stock_name, date and kind (EVENT_KINDS)
+
+        Returns:
+            EventIndex
+        """
+        events = events.dropna(subset=['stock_name', 'date']).drop_duplicates(['stock_name', 'date', 'kind'])
+        stocks = pd.Index(np.unique(events['stock_name'].to_numpy(dtype=object)), dtype=object)
+        stock_codes = stocks.get_indexer(events['stock_name'].to_numpy(dtype=object))
+        days = _days(events['date'])
+        kinds = events['kind'].to_numpy(dtype=object)
+
+        by_kind, offsets = {}, {}
+        for kind in EVENT_KINDS:
+            selected = kinds == kind
+            order = np.lexsort((days[selected], stock_codes[selected]))
+            by_kind[kind] = days[selected][order]
+            counts = np.bincount(stock_codes[selected], minlength=len(stocks))
+            offsets[kind] = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return cls(stocks, by_kind, offsets)
+
+    @classmethod
+    def from_frames(
+        cls,
+        history_df: Optional[pd.DataFrame] = None,
+        upcoming_df: Optional[pd.DataFrame] = None
+    ) -> 'EventIndex':
+        """
+        Build the index from the event files.
+
+        Args:
+            history_df: Stock_Events_Volatility_Data.csv rows (optional)
+            upcoming_df: upcoming_events.csv rows (optional)
+
+        Returns:
+            EventIndex
+        """
+        parts = [pd.DataFrame({'stock_name': [], 'date': pd.to_datetime([]), 'kind': []})]
+        if history_df is not None and len(history_df) > 0:
+            earnings = history_df[history_df['type_of_event'].isin(EARNINGS_EVENT_TYPES)]
+            parts.append(pd.DataFrame({
+                'stock_name': earnings['name'].to_numpy(dtype=object),
+                'date': pd.to_datetime(earnings['date']).to_numpy(),
+                'kind': 'earnings'
+            }))
+        if upcoming_df is not None and len(upcoming_df) > 0:
+            is_earnings = upcoming_df['is_earnings'].astype(str).str.lower() == 'true'
+            kind = np.where(
+                is_earnings, 'earnings',
+                np.where(upcoming_df['event_type'] == DIVIDEND_EVENT_TYPE, 'dividend', None)
+            )
+            parts.append(pd.DataFrame({
+                'stock_name': upcoming_df['stock_name'].to_numpy(dtype=object),
+                'date': pd.to_datetime(upcoming_df['date']).to_numpy(),
+                'kind': kind
+            }).dropna(subset=['kind']))
+        return cls.from_events(pd.concat(parts, ignore_index=True))
+
+    def count_between(self, stock_names, start_dates, end_dates, kind: str):
+        """
+        Number of events of one kind with start < event date <= end, and the first of them.
+
+        Args:
+            stock_names: Sequence of stock names
+            start_dates: Sequence of start dates (exclusive)
+            end_dates: Sequence of end dates (inclusive)
+            kind: 'earnings' or 'dividend'
+
+        Returns:
+            Tuple of (int64 counts, float64 days from start to the next event
+            after start, NaN if none is known)
+        """
+        stock_codes = self.stocks.get_indexer(np.asarray(stock_names, dtype=object)).astype(np.int64)
+        known = stock_codes >= 0
+        base = np.where(known, stock_codes, 0) << 32
+        start, end = _days(start_dates), _days(end_dates)
+
+        keys = self._keys[kind]
+        first = np.searchsorted(keys, base + start, side='right')
+        last = np.searchsorted(keys, base + end, side='right')
+        counts = np.where(known, last - first, 0).astype(np.int64)
+
+        # Next event after start: the key at `first`, if it belongs to the same stock
+        next_key = keys[np.minimum(first, len(keys) - 1)] if len(keys) else np.zeros(len(first), np.int64)
+        has_next = known & (first < len(keys)) & ((next_key >> 32) == (base >> 32))
+        days_to_next = np.where(has_next, (next_key & 0xFFFFFFFF) - start, np.nan)
+        return counts, days_to_next
+
+    def flags(self, stock_names, dates, expiry_dates) -> pd.DataFrame:
+        """
+        Event flags for (stock, scoring date, expiry) rows.
+
+        Args:
+            stock_names: Sequence of stock names
+            dates: Scoring dates
+            expiry_dates: Expiry dates
+
+        Returns:
+            DataFrame (positional index) with <kind>_before_expiry (bool),
+            days_to_<kind> (days to the next known event, NaN if none) per
+            kind and event_before_expiry (any kind)
+        """
+        columns = {}
+        for kind in EVENT_KINDS:
+            counts, days_to_next = self.count_between(stock_names, dates, expiry_dates, kind)
+            columns[f'{kind}_before_expiry'] = counts > 0
+            columns[f'days_to_{kind}'] = days_to_next
+        flags = pd.DataFrame(columns)
+        flags['event_before_expiry'] = np.logical_or.reduce(
+            [flags[f'{kind}_before_expiry'].to_numpy() for kind in EVENT_KINDS]
+        )
+        return flags
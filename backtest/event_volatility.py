@@ -0,0 +1,296 @@
+"""
+Event-Window Volatility Statistics
+
+This module turns Stock_Events_Volatility_Data.csv (one row per earnings
+report day and stock, back to 2009) into per-stock event-risk
+distributions:
+
+- Per (stock, event type), plus 'All' event types of a stock: number of
+  events, mean / std / quantiles / worst of the close-to-close move on the
+  event day, the worst intraday low relative to the previous close, mean
+  absolute move, share of down moves, mean intraday high-low range and
+  volume change, and the share of events whose move went beyond fixed
+  strike cushions (CUSHION_LEVELS)
+- For any (stock, cushion) rows - e.g. the scoring panel with the cushion
+  1 - strike / price - the share of the stock's past event moves that went
+  beyond that cushion
+
+All groups are aggregated from one sort by (group, move): quantiles are
+read at each group's offsets (linear interpolation, as np.quantile) and
+sums come from np.bincount. Exceedance for a whole panel is one
+np.searchsorted over the sorted moves, offset by group so that the groups
+do not overlap - no per-stock or per-option loop.
+
+Statistics are kept per stock: update() recomputes only the stocks whose
+event rows changed (e.g. newly appended report days).
+
+Usage:
+    from event_volatility import EventVolatility
+
+    volatility = EventVolatility.from_events(data_loader.load_stock_events())
+    volatility.stats                                   # per stock and event type
+    risk = volatility.event_risk(panel['StockName'], cushions)
+
+Author: Put Options SE
+Date: February 2026
+"""
+
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Event type of the statistics over all event types of a stock
+ALL_EVENTS = 'All'
+
+# Quantiles of the event-day close move in the statistics (column p05, ...)
+QUANTILES = [0.05, 0.10, 0.25, 0.50, 0.75, 0.90, 0.95]
+
+# Strike cushions with a share-of-events-beyond column (share_below_5pct, ...)
+CUSHION_LEVELS = [0.05, 0.10, 0.15]
+
+# Event moves the exceedance can be measured on
+MEASURES = ['close_change', 'intraday_low']
+
+# Stock_Events_Volatility_Data.csv columns the statistics read
+EVENT_COLUMNS = ['date', 'name', 'type_of_event', 'low', 'close', 'volume_pct_change_from_previous_day',
+                 'close_price_pct_change_from_previous_day', 'pct_intraday_high_low_movement']
+
+# Moves are clipped to this range when groups are offset for searchsorted
+_OFFSET = 4.0
+
+
+# ============================================================================
+# STATISTICS
+# ============================================================================
+
+def _moves(events: pd.DataFrame) -> pd.DataFrame:
+    """Per event: stock, type, date and the moves relative to the previous close."""
+    events = events.reset_index(drop=True)
+    close_change = pd.to_numeric(events['close_price_pct_change_from_previous_day'], errors='coerce')
+    previous_close = events['close'] / (1 + close_change)
+    volume_change = pd.to_numeric(events['volume_pct_change_from_previous_day'], errors='coerce')
+    return pd.DataFrame({
+        'stock_name': events['name'].to_numpy(dtype=object),
+        'event_type': events['type_of_event'].to_numpy(dtype=object),
+        'date': pd.to_datetime(events['date']).to_numpy(),
+        'close_change': close_change.to_numpy(dtype=np.float64),
+        'intraday_low': (events['low'] / previous_close - 1).to_numpy(dtype=np.float64),
+        'intraday_range': np.abs(events['pct_intraday_high_low_movement'].to_numpy(dtype=np.float64)),
+        'volume_change': volume_change.where(np.isfinite(volume_change)).to_numpy(dtype=np.float64)
+    }).dropna(subset=['stock_name', 'close_change'])
+
+
+def _with_all_events(moves: pd.DataFrame) -> pd.DataFrame:
+    """Moves once per own event type and once under ALL_EVENTS."""
+    return pd.concat([moves, moves.assign(event_type=ALL_EVENTS)], ignore_index=True)
+
+
+def _group_quantiles(sorted_values: np.ndarray, start: np.ndarray, count: np.ndarray, q: float) -> np.ndarray:
+    """Quantile q of every group of a (group, value)-sorted array (linear interpolation)."""
+    position = q * (count - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, count - 1)
+    fraction = position - lower
+    return sorted_values[start + lower] * (1 - fraction) + sorted_values[start + upper] * fraction
+
+
+def group_stats(moves: pd.DataFrame) -> pd.DataFrame:
+    """
+    Event-move statistics per (stock, event type).
+
+    Args:
+        moves: Event moves (see _moves), event_type already including
+            ALL_EVENTS rows where wanted
+
+    Returns:
+        DataFrame sorted by stock_name and event_type
+    """
+    keys = pd.MultiIndex.from_arrays([moves['stock_name'].to_numpy(), moves['event_type'].to_numpy()])
+    group, groups = keys.factorize(sort=True)
+    n_groups = len(groups)
+    close_change = moves['close_change'].to_numpy()
+
+    order = np.lexsort((close_change, group))
+    sorted_changes = close_change[order]
+    count = np.bincount(group, minlength=n_groups)
+    start = np.cumsum(count) - count
+
+    def mean_of(values):
+        valid = ~np.isnan(values)
+        sums = np.bincount(group[valid], weights=values[valid], minlength=n_groups)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return sums / np.bincount(group[valid], minlength=n_groups)
+
+    mean = mean_of(close_change)
+    low = moves['intraday_low'].to_numpy()
+    worst_low = np.full(n_groups, np.inf)
+    np.minimum.at(worst_low, group, np.where(np.isnan(low), np.inf, low))
+    dates = moves['date'].to_numpy(dtype='datetime64[D]').astype(np.int64)
+    first_date = np.full(n_groups, np.iinfo(np.int64).max)
+    last_date = np.full(n_groups, np.iinfo(np.int64).min)
+    np.minimum.at(first_date, group, dates)
+    np.maximum.at(last_date, group, dates)
+
+    stats = pd.DataFrame({
+        'stock_name': groups.get_level_values(0),
+        'event_type': groups.get_level_values(1),
+        'events': count,
+        'first_event': first_date.astype('datetime64[D]').astype('datetime64[ns]'),
+        'last_event': last_date.astype('datetime64[D]').astype('datetime64[ns]'),
+        'mean_change': mean,
+        # Population standard deviation, as the Volatility Analysis page
+        'std_change': np.sqrt(mean_of((close_change - mean[group]) ** 2)),
+        'worst_change': sorted_changes[start],
+        'best_change': sorted_changes[start + count - 1],
+        **{f'p{round(q * 100):02d}': _group_quantiles(sorted_changes, start, count, q) for q in QUANTILES},
+        'worst_intraday_low': np.where(np.isinf(worst_low), np.nan, worst_low),
+        'mean_abs_change': mean_of(np.abs(close_change)),
+        'negative_rate': mean_of((close_change < 0).astype(np.float64)),
+        'mean_intraday_range': mean_of(moves['intraday_range'].to_numpy()),
+        'mean_volume_change': mean_of(moves['volume_change'].to_numpy())
+    })
+    for level in CUSHION_LEVELS:
+        stats[f'share_below_{round(level * 100)}pct'] = mean_of((close_change <= -level).astype(np.float64))
+    return stats
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+class EventVolatility:
+    """
+    Per-stock event-move distributions with incremental refresh.
+
+    Attributes:
+        stats: Statistics per (stock_name, event_type), see group_stats
+        moves: Event moves the statistics were computed from
+        source: Events table the object was last built or updated from
+    """
+
+    def __init__(self, moves: pd.DataFrame, stats: pd.DataFrame, source: Optional[pd.DataFrame] = None):
+        self.moves = moves
+        self.stats = stats
+        self.source = source
+        self._build_sorted()
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the moves, statistics and sorted arrays (source is the loader's events table)."""
+        sorted_arrays = sum(values.nbytes + offsets.nbytes for values, offsets in self._sorted.values())
+        return (int(self.moves.memory_usage(deep=True).sum()) + int(self.stats.memory_usage(deep=True).sum())
+                + int(self._groups.memory_usage(deep=True)) + sorted_arrays)
+
+    @classmethod
+    def from_events(cls, events: pd.DataFrame) -> 'EventVolatility':
+        """
+        Build the statistics from Stock_Events_Volatility_Data.csv rows.
+
+        Args:
+            events: Events table (DataLoader.load_stock_events)
+
+        Returns:
+            EventVolatility
+        """
+        moves = _moves(events)
+        return cls(moves, group_stats(_with_all_events(moves)), source=events)
+
+    def _build_sorted(self):
+        """Moves sorted by (group, value) per measure, offset by group, for searchsorted."""
+        moves = _with_all_events(self.moves)
+        self._groups = pd.MultiIndex.from_arrays([self.stats['stock_name'], self.stats['event_type']])
+        group = self._groups.get_indexer(
+            pd.MultiIndex.from_arrays([moves['stock_name'].to_numpy(), moves['event_type'].to_numpy()])
+        ).astype(np.int64)
+        self._sorted = {}
+        for measure in MEASURES:
+            values = moves[measure].to_numpy()
+            valid = ~np.isnan(values)
+            offset = group[valid] * _OFFSET + np.clip(values[valid], -1, 1)
+            counts = np.bincount(group[valid], minlength=len(self._groups))
+            self._sorted[measure] = (np.sort(offset), np.concatenate([[0], np.cumsum(counts)]))
+
+    def update(self, events: pd.DataFrame) -> List[str]:
+        """
+        Refresh the statistics of stocks whose event rows changed.
+
+        Args:
+            events: Full events table (with newly appended rows)
+
+        Returns:
+            Names of the stocks that were recomputed
+        """
+        moves = _moves(events)
+        key_columns = ['stock_name', 'event_type', 'date', 'close_change']
+        old_keys = pd.MultiIndex.from_frame(self.moves[key_columns])
+        new_keys = pd.MultiIndex.from_frame(moves[key_columns])
+        changed = pd.Index(np.concatenate([
+            moves.loc[~new_keys.isin(old_keys), 'stock_name'].to_numpy(),
+            self.moves.loc[~old_keys.isin(new_keys), 'stock_name'].to_numpy()
+        ])).unique()
+
+        self.source = events
+        if len(changed) == 0:
+            return []
+
+        touched = moves['stock_name'].isin(changed).to_numpy()
+        self.moves = moves
+        kept = self.stats[~self.stats['stock_name'].isin(changed)]
+        recomputed = group_stats(_with_all_events(moves[touched]))
+        self.stats = pd.concat([kept, recomputed], ignore_index=True).sort_values(
+            ['stock_name', 'event_type'], ignore_index=True
+        )
+        self._build_sorted()
+        return sorted(changed)
+
+    def event_risk(
+        self,
+        stock_names,
+        cushions,
+        event_type: str = ALL_EVENTS,
+        measure: str = 'close_change'
+    ) -> pd.DataFrame:
+        """
+        Event risk of (stock, strike cushion) rows.
+
+        Args:
+            stock_names: Sequence of stock names
+            cushions: Decline to the strike (1 - strike / price) per row
+            event_type: Event type whose moves are used (default: all types)
+            measure: 'close_change' (event-day close) or 'intraday_low'
+                (event-day low vs the previous close)
+
+        Returns:
+            DataFrame (positional index) with event_count, event_p05,
+            event_worst_move and event_beyond_cushion (share of the stock's
+            event moves at or beyond -cushion); NaN for unknown stocks
+        """
+        if measure not in MEASURES:
+            raise ValueError(f"Unknown measure '{measure}'. Valid: {MEASURES}")
+
+        group = self._groups.get_indexer(pd.MultiIndex.from_arrays([
+            np.asarray(stock_names, dtype=object),
+            np.full(len(stock_names), event_type, dtype=object)
+        ]))
+        rows = np.flatnonzero(group >= 0)
+        group = group[rows]
+        cushions = np.asarray(cushions, dtype=np.float64)[rows]
+
+        sorted_moves, offsets = self._sorted[measure]
+        start = offsets[group]
+        count = offsets[group + 1] - start
+        beyond = np.searchsorted(sorted_moves, group * _OFFSET + np.clip(-cushions, -1, 1), side='right') - start
+
+        risk = pd.DataFrame({
+            'event_count': np.zeros(len(stock_names), dtype=np.int64),
+            **{column: np.full(len(stock_names), np.nan)
+               for column in ['event_p05', 'event_worst_move', 'event_beyond_cushion']}
+        })
+        risk.loc[rows, 'event_count'] = count
+        risk.loc[rows, 'event_p05'] = self.stats['p05'].to_numpy()[group]
+        risk.loc[rows, 'event_worst_move'] = self.stats['worst_change'].to_numpy()[group]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            risk.loc[rows, 'event_beyond_cushion'] = np.where(np.isnan(cushions), np.nan, beyond / count)
+        return risk
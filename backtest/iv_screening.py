@@ -0,0 +1,231 @@
+"""
+IV Screening Builder (IV_PotentialDecline.csv)
+
+This module computes the IV-based lower bound and safety columns of
+IV_PotentialDecline.csv for every (option, date) of an option chain in one
+vectorized pass:
+
+- IV_ClosestToStrike: implied volatility of the option whose strike is
+  closest to the stock price, per (stock, expiry, date) - ties go to the
+  lower strike
+- IV_UntilExpiryClosestToStrike: that IV scaled to the remaining trading
+  days, IV x sqrt(DaysToExpiry / 252)
+- LowerBoundClosestToStrike: stock price x (1 - IV until expiry), rounded
+  to 0.1; ImpliedDownPct is the decline to it
+- ToStrikePct, SafetyMultiple (cushion / implied decline) and
+  CushionMinusIVPct compare the strike's cushion with the implied decline
+- SigmasToStrike: ln(S / K) in units of a lognormal sigma that puts the
+  lower bound at the one-sided 95% level, sigma = ln(S / lower bound) / 1.645
+- ProbAssignment = N(-SigmasToStrike) and SafetyCategory (bands of
+  SigmasToStrike; strikes at or above the stock price are ITM)
+
+The stock price S is the chain's StockPrice (data.csv for the daily
+append). The published file used another underlying price for some stocks,
+so the lower bound and the columns derived from it differ there.
+
+The closest-to-strike option of every group is found with one lexsort over
+(group, distance, strike) and broadcast back to the rows of its group, so
+there is no per-stock or per-expiry loop.
+
+append_iv_screening adds the rows of dates that are not in the file yet
+(the daily update), leaving existing rows untouched.
+
+Usage:
+    from iv_screening import build_iv_screening, chain_from_options, append_iv_screening
+
+    chain = chain_from_options(data_loader.load_options_data(), '2026-08-21')
+    screening = build_iv_screening(chain)
+    append_iv_screening(chain, '../data/IV_PotentialDecline.csv')
+
+Author: Put Options SE
+Date: February 2026
+"""
+
+import math
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from monte_carlo import TRADING_DAYS_PER_YEAR
+
+
+# One-sided 95% quantile of the standard normal: the lower bound is read as
+# the 5% lognormal quantile of the price at expiry
+LOWER_BOUND_Z = 1.645
+
+# SafetyCategory by SigmasToStrike: (min sigmas, label), first match wins;
+# strikes at or above the stock price are ITM_CATEGORY
+SAFETY_CATEGORIES = [
+    (2.5, 'Very Safe'),
+    (1.5, 'Safe'),
+    (1.0, 'Borderline'),
+    (-np.inf, 'Elevated')
+]
+ITM_CATEGORY = 'ITM (High Risk)'
+
+# Columns of IV_PotentialDecline.csv, in file order
+SCREENING_COLUMNS = [
+    'Name', 'OptionName', 'Update_date', 'ExpiryDate',
+    'IV_ClosestToStrike', 'IV_UntilExpiryClosestToStrike', 'LowerBoundClosestToStrike',
+    'LowerBoundDistanceFromCurrentPrice', 'LowerBoundDistanceFromStrike', 'ImpliedDownPct',
+    'ToStrikePct', 'SafetyMultiple', 'SigmasToStrike', 'ProbAssignment', 'SafetyCategory',
+    'CushionMinusIVPct'
+]
+
+# Columns a chain needs (DaysToExpiry is optional, see build_iv_screening)
+CHAIN_COLUMNS = ['StockName', 'OptionName', 'Update_date', 'ExpiryDate', 'StockPrice', 'StrikePrice',
+                 'ImpliedVolatility']
+
+# Screening columns usable as backtest factors (DataLoader.get_iv_screening)
+IV_FACTOR_COLUMNS = ['ImpliedDownPct', 'SafetyMultiple', 'SigmasToStrike', 'ProbAssignment',
+                     'SafetyCategory', 'CushionMinusIVPct']
+
+_erfc = np.frompyfunc(math.erfc, 1, 1)
+
+
+def normal_cdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal CDF (NaN stays NaN)."""
+    return (0.5 * _erfc(-np.asarray(x, dtype=np.float64) / math.sqrt(2))).astype(np.float64)
+
+
+# ============================================================================
+# CHAIN
+# ============================================================================
+
+def chain_from_options(options_df: pd.DataFrame, update_date) -> pd.DataFrame:
+    """
+    Option chain of one day from data.csv.
+
+    Args:
+        options_df: data.csv rows (StockName, OptionName, ExpiryDate,
+            StockPrice, StrikePrice, ImpliedVolatility, DaysToExpiry)
+        update_date: Date the prices were taken (data/last_updated.json
+            optionsData)
+
+    Returns:
+        DataFrame with CHAIN_COLUMNS and DaysToExpiry
+    """
+    chain = options_df[[column for column in CHAIN_COLUMNS + ['DaysToExpiry'] if column in options_df.columns]]
+    return chain.assign(Update_date=pd.Timestamp(update_date).normalize())
+
+
+# ============================================================================
+# BUILDER
+# ============================================================================
+
+def build_iv_screening(chain: pd.DataFrame) -> pd.DataFrame:
+    """
+    IV_PotentialDecline.csv rows for every option and date of a chain.
+
+    Args:
+        chain: Options with CHAIN_COLUMNS; DaysToExpiry (trading days) is
+            used when present, otherwise weekdays from Update_date to
+            ExpiryDate are counted
+
+    Returns:
+        DataFrame with SCREENING_COLUMNS (rows without a price or IV dropped)
+    """
+    missing = [column for column in CHAIN_COLUMNS if column not in chain.columns]
+    if missing:
+        raise ValueError(f"Option chain is missing columns: {missing}")
+
+    chain = chain.dropna(subset=['StockPrice', 'StrikePrice', 'ImpliedVolatility'])
+    chain = chain[(chain['StockPrice'] > 0) & (chain['StrikePrice'] > 0)]
+    if len(chain) == 0:
+        return pd.DataFrame(columns=SCREENING_COLUMNS)
+
+    dates = pd.to_datetime(chain['Update_date']).to_numpy(dtype='datetime64[D]')
+    expiries = pd.to_datetime(chain['ExpiryDate']).to_numpy(dtype='datetime64[D]')
+    price = chain['StockPrice'].to_numpy(dtype=np.float64)
+    strike = chain['StrikePrice'].to_numpy(dtype=np.float64)
+    iv = chain['ImpliedVolatility'].to_numpy(dtype=np.float64)
+    if 'DaysToExpiry' in chain.columns:
+        days_to_expiry = chain['DaysToExpiry'].to_numpy(dtype=np.float64)
+    else:
+        days_to_expiry = np.busday_count(dates, expiries).astype(np.float64)
+
+    # The option closest to the money of every (stock, expiry, date) group,
+    # with the group as one int64 key of the three codes
+    stock_codes = pd.factorize(chain['StockName'].to_numpy(dtype=object))[0].astype(np.int64)
+    expiry_codes, expiry_values = pd.factorize(expiries)
+    date_codes, date_values = pd.factorize(dates)
+    group = (stock_codes * len(expiry_values) + expiry_codes) * len(date_values) + date_codes
+    order = np.lexsort((strike, np.abs(strike - price), group))
+    sorted_groups = group[order]
+    starts = np.r_[True, sorted_groups[1:] != sorted_groups[:-1]]
+    closest = np.empty(len(order), dtype=np.int64)
+    closest[order] = order[np.flatnonzero(starts)[np.cumsum(starts) - 1]]
+
+    iv_closest = iv[closest]
+    iv_until_expiry = iv_closest * np.sqrt(days_to_expiry[closest] / TRADING_DAYS_PER_YEAR)
+    lower_bound = np.round(price * (1 - iv_until_expiry), 1)
+    implied_down = 1 - lower_bound / price
+    to_strike = 1 - strike / price
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigmas = LOWER_BOUND_Z * np.log(price / strike) / np.log(price / lower_bound)
+        safety_multiple = to_strike / implied_down
+
+    in_the_money = to_strike <= 0
+    category = np.select(
+        [in_the_money] + [sigmas >= minimum for minimum, _ in SAFETY_CATEGORIES],
+        [ITM_CATEGORY] + [label for _, label in SAFETY_CATEGORIES],
+        default=SAFETY_CATEGORIES[-1][1]
+    )
+
+    return pd.DataFrame({
+        'Name': chain['StockName'].to_numpy(),
+        'OptionName': chain['OptionName'].to_numpy(),
+        'Update_date': dates.astype('datetime64[ns]'),
+        'ExpiryDate': expiries.astype('datetime64[ns]'),
+        'IV_ClosestToStrike': iv_closest,
+        'IV_UntilExpiryClosestToStrike': iv_until_expiry,
+        'LowerBoundClosestToStrike': lower_bound,
+        'LowerBoundDistanceFromCurrentPrice': -implied_down,
+        'LowerBoundDistanceFromStrike': (lower_bound - strike) / strike,
+        'ImpliedDownPct': implied_down,
+        'ToStrikePct': to_strike,
+        'SafetyMultiple': safety_multiple,
+        'SigmasToStrike': sigmas,
+        'ProbAssignment': normal_cdf(-sigmas),
+        'SafetyCategory': category,
+        'CushionMinusIVPct': to_strike - implied_down
+    })
+
+
+def append_iv_screening(
+    chain: pd.DataFrame,
+    path: Union[str, Path],
+    dates: Optional[List] = None
+) -> pd.DataFrame:
+    """
+    Append the screening rows of new dates to IV_PotentialDecline.csv.
+
+    Dates already in the file are skipped, so re-running the daily update
+    is a no-op. Only the Update_date column of the existing file is read.
+
+    Args:
+        chain: Option chain (see build_iv_screening)
+        path: IV_PotentialDecline.csv (created if missing)
+        dates: Restrict to these dates (default: all dates of the chain)
+
+    Returns:
+        The appended rows
+    """
+    path = Path(path)
+    chain_dates = pd.to_datetime(chain['Update_date']).dt.normalize()
+    new = np.ones(len(chain), dtype=bool)
+    if dates is not None:
+        new &= chain_dates.isin(pd.to_datetime(dates).normalize()).to_numpy()
+    if path.exists():
+        existing = pd.read_csv(path, delimiter='|', usecols=['Update_date'], parse_dates=['Update_date'])
+        new &= ~chain_dates.isin(existing['Update_date'].unique()).to_numpy()
+
+    screening = build_iv_screening(chain[new])
+    if len(screening) > 0:
+        screening.to_csv(
+            path, sep='|', index=False, mode='a', header=not path.exists(), date_format='%Y-%m-%d'
+        )
+    return screening
@@ -0,0 +1,212 @@
+"""
+Lower Bound Breach Analytics
+
+This module derives the two Lower Bound Analysis files from the daily
+lower-bound predictions (all_stocks_daily_predictions.csv, one row per
+stock, prediction date and expiry) and the closes on the expiry dates:
+
+- all_stocks_expiry_stats.csv: per (stock, expiry), the min / max / median /
+  mean predicted lower bound, the number of predictions, how many of them
+  the expiry close breached (close < lower bound) and the expiry close
+- hit_rate_trends_by_stock.csv: per stock and expiry month, the share of
+  predictions that held (HitRate, %) and their number, over expiries with a
+  known close
+
+Predictions are sorted once by (stock-expiry group, lower bound); min, max
+and median are read at each group's offsets in that order and sums come
+from np.bincount, so all groups are aggregated in one pass. Closes are
+looked up once per (stock, expiry), not per prediction.
+
+update_expiry_stats recomputes only the expiries touched by new data:
+groups with predictions made on or after a date, and expired groups whose
+close has become known since the last run.
+
+Usage:
+    from lower_bound_stats import expiry_stats, hit_rate_trends
+
+    stats = expiry_stats(predictions, data_loader.get_expiry_closes)
+    trends = hit_rate_trends(stats)
+
+Author: Put Options SE
+Date: February 2026
+"""
+
+from typing import Callable, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Columns of all_stocks_expiry_stats.csv
+EXPIRY_STATS_COLUMNS = [
+    'Stock', 'ExpiryDate', 'LowerBound_Min', 'LowerBound_Max', 'LowerBound_Median', 'LowerBound_Mean',
+    'PredictionCount', 'BreachCount', 'ExpiryClosePrice'
+]
+
+# Columns of hit_rate_trends_by_stock.csv (Date is the expiry month, YYYY-MM)
+TREND_COLUMNS = ['Stock', 'Date', 'HitRate', 'Total']
+
+# Columns of all_stocks_daily_predictions.csv
+PREDICTION_COLUMNS = ['Stock', 'PredictionDate', 'ExpiryDate', 'StockPrice', 'LowerBound', 'StrikePrice']
+
+
+# ============================================================================
+# PREDICTIONS
+# ============================================================================
+
+def predictions_from_iv_screening(iv_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Daily lower-bound predictions from IV_PotentialDecline.csv rows.
+
+    Every (stock, date, expiry) of the screening file carries one lower
+    bound (LowerBoundClosestToStrike); the stock price is recovered from
+    ImpliedDownPct and the strike is the one closest to that price.
+
+    Args:
+        iv_df: IV_PotentialDecline.csv rows
+
+    Returns:
+        DataFrame with PREDICTION_COLUMNS
+    """
+    price = iv_df['LowerBoundClosestToStrike'] / (1 - iv_df['ImpliedDownPct'])
+    closest = iv_df.assign(
+        StockPrice=price,
+        StrikePrice=price * (1 - iv_df['ToStrikePct']),
+        distance=iv_df['ToStrikePct'].abs()
+    ).sort_values('distance', kind='stable').drop_duplicates(['Name', 'Update_date', 'ExpiryDate'])
+
+    return pd.DataFrame({
+        'Stock': closest['Name'].to_numpy(),
+        'PredictionDate': pd.to_datetime(closest['Update_date']).to_numpy(),
+        'ExpiryDate': pd.to_datetime(closest['ExpiryDate']).to_numpy(),
+        'StockPrice': closest['StockPrice'].to_numpy(),
+        'LowerBound': closest['LowerBoundClosestToStrike'].to_numpy(),
+        'StrikePrice': closest['StrikePrice'].round(2).to_numpy()
+    }).sort_values(['Stock', 'PredictionDate', 'ExpiryDate'], ignore_index=True)
+
+
+# ============================================================================
+# AGGREGATION
+# ============================================================================
+
+def expiry_stats(
+    predictions: pd.DataFrame,
+    get_expiry_closes: Callable[[np.ndarray, np.ndarray], np.ndarray]
+) -> pd.DataFrame:
+    """
+    Lower-bound statistics and breaches per (stock, expiry).
+
+    Args:
+        predictions: Daily predictions (Stock, ExpiryDate, LowerBound)
+        get_expiry_closes: Close of each (stock, expiry date) pair, NaN if
+            unknown (e.g. DataLoader.get_expiry_closes)
+
+    Returns:
+        DataFrame with EXPIRY_STATS_COLUMNS sorted by stock and expiry;
+        BreachCount is NaN where the expiry close is unknown
+    """
+    predictions = predictions.dropna(subset=['Stock', 'ExpiryDate', 'LowerBound'])
+    if len(predictions) == 0:
+        return pd.DataFrame(columns=EXPIRY_STATS_COLUMNS)
+
+    stocks = predictions['Stock'].to_numpy(dtype=object)
+    expiries = pd.to_datetime(predictions['ExpiryDate']).to_numpy(dtype='datetime64[D]')
+    lower_bound = predictions['LowerBound'].to_numpy(dtype=np.float64)
+
+    # Groups numbered in (stock, expiry) order
+    stock_codes, stock_values = pd.factorize(stocks, sort=True)
+    expiry_codes, expiry_values = pd.factorize(expiries, sort=True)
+    keys = stock_codes.astype(np.int64) * len(expiry_values) + expiry_codes
+    key_values, group = np.unique(keys, return_inverse=True)
+    n_groups = len(key_values)
+
+    order = np.lexsort((lower_bound, group))
+    sorted_bounds = lower_bound[order]
+    count = np.bincount(group, minlength=n_groups)
+    start = np.concatenate([[0], np.cumsum(count)[:-1]])
+    median = (sorted_bounds[start + (count - 1) // 2] + sorted_bounds[start + count // 2]) / 2
+
+    group_stocks = stock_values[key_values // len(expiry_values)]
+    group_expiries = expiry_values[key_values % len(expiry_values)]
+    closes = np.asarray(get_expiry_closes(group_stocks, group_expiries), dtype=np.float64)
+    breached = lower_bound > closes[group]
+    breaches = np.where(np.isnan(closes), np.nan, np.bincount(group, weights=breached, minlength=n_groups))
+
+    return pd.DataFrame({
+        'Stock': group_stocks,
+        'ExpiryDate': group_expiries.astype('datetime64[ns]'),
+        'LowerBound_Min': sorted_bounds[start],
+        'LowerBound_Max': sorted_bounds[start + count - 1],
+        'LowerBound_Median': median,
+        'LowerBound_Mean': np.bincount(group, weights=lower_bound, minlength=n_groups) / count,
+        'PredictionCount': count,
+        'BreachCount': breaches,
+        'ExpiryClosePrice': closes
+    })
+
+
+def hit_rate_trends(stats: pd.DataFrame) -> pd.DataFrame:
+    """
+    Monthly hit rate per stock, by expiry month.
+
+    Args:
+        stats: Output of expiry_stats
+
+    Returns:
+        DataFrame with TREND_COLUMNS over expiries with a known close
+    """
+    settled = stats.dropna(subset=['ExpiryClosePrice'])
+    if len(settled) == 0:
+        return pd.DataFrame(columns=TREND_COLUMNS)
+
+    trends = settled.assign(
+        Date=pd.to_datetime(settled['ExpiryDate']).dt.strftime('%Y-%m')
+    ).groupby(['Stock', 'Date'], sort=True).agg(
+        Total=('PredictionCount', 'sum'), breaches=('BreachCount', 'sum')
+    ).reset_index()
+    trends['HitRate'] = (trends['Total'] - trends['breaches']) / trends['Total'] * 100
+    return trends[TREND_COLUMNS]
+
+
+def update_expiry_stats(
+    stats: pd.DataFrame,
+    predictions: pd.DataFrame,
+    get_expiry_closes: Callable[[np.ndarray, np.ndarray], np.ndarray],
+    since
+) -> Tuple[pd.DataFrame, int]:
+    """
+    Recompute only the expiries touched by new data.
+
+    An expiry is touched when it has predictions made on or after `since`,
+    or when its close was unknown in stats and is known now.
+
+    Args:
+        stats: Earlier output of expiry_stats
+        predictions: All daily predictions (Stock, PredictionDate,
+            ExpiryDate, LowerBound)
+        get_expiry_closes: See expiry_stats
+        since: First prediction date that is new
+
+    Returns:
+        Tuple of (updated stats sorted by stock and expiry, number of
+        recomputed expiries)
+    """
+    stats = stats.assign(ExpiryDate=pd.to_datetime(stats['ExpiryDate']))
+    predictions = predictions.assign(ExpiryDate=pd.to_datetime(predictions['ExpiryDate']))
+
+    new = predictions[pd.to_datetime(predictions['PredictionDate']) >= pd.Timestamp(since)]
+    touched = pd.MultiIndex.from_frame(new[['Stock', 'ExpiryDate']]).unique()
+
+    open_stats = stats[stats['ExpiryClosePrice'].isna()]
+    closes = np.asarray(get_expiry_closes(open_stats['Stock'].to_numpy(dtype=object),
+                                          open_stats['ExpiryDate'].to_numpy()), dtype=np.float64)
+    settled_now = pd.MultiIndex.from_frame(open_stats.loc[~np.isnan(closes), ['Stock', 'ExpiryDate']])
+    touched = touched.union(settled_now)
+
+    prediction_keys = pd.MultiIndex.from_frame(predictions[['Stock', 'ExpiryDate']])
+    recomputed = expiry_stats(predictions[prediction_keys.isin(touched)], get_expiry_closes)
+
+    stats_keys = pd.MultiIndex.from_frame(stats[['Stock', 'ExpiryDate']])
+    updated = pd.concat([stats[~stats_keys.isin(touched)], recomputed], ignore_index=True)
+    updated = updated.sort_values(['Stock', 'ExpiryDate'], ignore_index=True)
+    return updated[EXPIRY_STATS_COLUMNS], len(recomputed)
@@ -0,0 +1,256 @@
+"""
+Market IV Index (MARKET_IV rows of iv_per_stock_per_day.csv)
+
+This module computes the Swedish equity implied volatility index - the
+synthetic MARKET_IV row per date of iv_per_stock_per_day.csv - from the
+per-stock 30-day IVs, for all dates at once:
+
+- Stocks with a valid IV_30d on the date are counted; with fewer than
+  MIN_STOCKS the index is NaN
+- Outliers are stocks above median + 4 x MAD x 1.4826 (MAD = median absolute
+  deviation from the cross-sectional median); the exclusion is cancelled
+  when it would leave fewer than MIN_STOCKS stocks
+- The index is the variance average sqrt(mean(IV^2)) of the remaining
+  stocks; N_Stocks counts them and N_Excluded the outliers
+
+The per-stock rows are laid out as one (date x stock) matrix with NaN where a
+stock has no IV. Medians of every date come from one sort along the stock
+axis (NaN sorts last, so a date's median is read at the middle of its valid
+count), and the MAD from a second sort of the absolute deviations - no
+per-date groupby.
+
+Every date depends only on its own stock rows, so update_market_iv
+recomputes only new dates (plus the last REFRESH_LAST_DATES, as the
+generator refreshes them) and keeps the other MARKET_IV rows.
+
+market_regime adds the trailing percentile of the index and a regime
+label, the market-level input for scoring (DataLoader.get_market_iv).
+
+Usage:
+    from market_iv import market_iv_rows, update_market_iv
+
+    market = market_iv_rows(iv_df)                  # MARKET_IV rows of every date
+    iv_df, n_recomputed = update_market_iv(iv_df)   # daily update of the file
+
+Author: Put Options SE
+Date: February 2026
+"""
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+
+MARKET_IV_NAME = 'MARKET_IV'
+MARKET_METHOD = 'market_equal_weight'
+MARKET_COUNTRY = 'SE'
+
+# Minimum stocks with an IV for the index (also after outlier exclusion)
+MIN_STOCKS = 30
+
+# Outlier threshold: median + MAD_MULTIPLIER x MAD x MAD_SCALE (MAD_SCALE makes
+# the MAD a standard deviation estimate for normal data)
+MAD_MULTIPLIER = 4.0
+MAD_SCALE = 1.4826
+
+# Latest dates recomputed on every update, even if they have MARKET_IV rows
+REFRESH_LAST_DATES = 3
+
+# Columns of iv_per_stock_per_day.csv
+IV_FILE_COLUMNS = [
+    'Stock_Name', 'Date', 'Stock_Price', 'IV_30d', 'Near_Expiry_DTE', 'Far_Expiry_DTE', 'Method', 'Country',
+    'N_Stocks', 'N_Excluded'
+]
+
+# Trailing window (dates with an index value) for the market IV percentile
+REGIME_WINDOW = 252
+
+# Index values needed before a percentile is given
+MIN_REGIME_HISTORY = 20
+
+# Market regime by trailing percentile: (max percentile, label), first match wins
+MARKET_REGIMES = [
+    (0.25, 'low'),
+    (0.75, 'normal'),
+    (0.90, 'elevated'),
+    (np.inf, 'stress')
+]
+
+
+# ============================================================================
+# CROSS-SECTION
+# ============================================================================
+
+def iv_matrix(stock_rows: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-stock IV_30d as a (date x stock) matrix.
+
+    Args:
+        stock_rows: Stock rows of iv_per_stock_per_day.csv (Stock_Name,
+            Date, IV_30d)
+
+    Returns:
+        Tuple of (sorted dates, float64 matrix with NaN where a stock has no IV)
+    """
+    date_codes, dates = pd.factorize(pd.to_datetime(stock_rows['Date']).to_numpy(dtype='datetime64[D]'), sort=True)
+    stock_codes, stocks = pd.factorize(stock_rows['Stock_Name'].to_numpy(dtype=object))
+    matrix = np.full((len(dates), len(stocks)), np.nan)
+    matrix[date_codes, stock_codes] = stock_rows['IV_30d'].to_numpy(dtype=np.float64)
+    return dates, matrix
+
+
+def _row_medians(sorted_values: np.ndarray, count: np.ndarray) -> np.ndarray:
+    """Median of every row of a row-sorted matrix whose NaN are at the end of each row."""
+    lower = np.clip((count - 1) // 2, 0, None)[:, None]
+    upper = np.clip(count // 2, 0, None)[:, None]
+    with np.errstate(invalid='ignore'):
+        medians = (np.take_along_axis(sorted_values, lower, 1) + np.take_along_axis(sorted_values, upper, 1))[:, 0] / 2
+    return np.where(count > 0, medians, np.nan)
+
+
+def market_iv(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Market IV of every row of a (date x stock) IV matrix.
+
+    Args:
+        matrix: IV_30d per date and stock (NaN = no IV)
+
+    Returns:
+        Tuple of (market IV, NaN below MIN_STOCKS; N_Stocks; N_Excluded)
+    """
+    valid = ~np.isnan(matrix)
+    count = valid.sum(axis=1)
+    if matrix.shape[1] == 0:
+        return np.full(len(matrix), np.nan), count, np.zeros(len(matrix), dtype=np.int64)
+
+    median = _row_medians(np.sort(matrix, axis=1), count)
+    mad = _row_medians(np.sort(np.abs(matrix - median[:, None]), axis=1), count)
+    threshold = median + MAD_MULTIPLIER * mad * MAD_SCALE
+
+    outlier = valid & (matrix > threshold[:, None])
+    n_excluded = outlier.sum(axis=1)
+    # Keep all stocks where the exclusion would leave too few
+    cancelled = count - n_excluded < MIN_STOCKS
+    outlier &= ~cancelled[:, None]
+    n_excluded = np.where(cancelled, 0, n_excluded)
+
+    used = valid & ~outlier
+    n_stocks = used.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        index = np.sqrt(np.square(np.where(used, matrix, 0.0)).sum(axis=1) / n_stocks)
+    return np.where(count >= MIN_STOCKS, index, np.nan), n_stocks, n_excluded
+
+
+def market_iv_rows(iv_df: pd.DataFrame, dates=None) -> pd.DataFrame:
+    """
+    MARKET_IV rows computed from the stock rows of iv_per_stock_per_day.csv.
+
+    Args:
+        iv_df: iv_per_stock_per_day.csv rows (existing MARKET_IV rows are ignored)
+        dates: Compute only these dates (default: every date with stock rows)
+
+    Returns:
+        DataFrame with IV_FILE_COLUMNS, one row per date
+    """
+    stock_rows = iv_df[(iv_df['Stock_Name'] != MARKET_IV_NAME) & iv_df['IV_30d'].notna()]
+    if dates is not None:
+        keep = pd.to_datetime(stock_rows['Date']).isin(pd.to_datetime(pd.Index(dates)))
+        stock_rows = stock_rows[keep.to_numpy()]
+
+    row_dates, matrix = iv_matrix(stock_rows)
+    index, n_stocks, n_excluded = market_iv(matrix)
+    n_dates = len(row_dates)
+
+    return pd.DataFrame({
+        'Stock_Name': np.full(n_dates, MARKET_IV_NAME, dtype=object),
+        'Date': row_dates.astype('datetime64[ns]'),
+        'Stock_Price': np.nan,
+        'IV_30d': index,
+        'Near_Expiry_DTE': np.nan,
+        'Far_Expiry_DTE': np.nan,
+        'Method': MARKET_METHOD,
+        'Country': MARKET_COUNTRY,
+        'N_Stocks': n_stocks.astype(np.float64),
+        'N_Excluded': n_excluded.astype(np.float64)
+    }, columns=IV_FILE_COLUMNS)
+
+
+def update_market_iv(iv_df: pd.DataFrame, refresh_last: int = REFRESH_LAST_DATES) -> Tuple[pd.DataFrame, int]:
+    """
+    Recompute the MARKET_IV rows of new dates in iv_per_stock_per_day.csv.
+
+    Dates with stock rows but no MARKET_IV row, and the last refresh_last
+    dates, are recomputed; other MARKET_IV rows are kept. Rows stay in the
+    file's stock order (MARKET_IV rows in their block, by date; appended at
+    the end when the file has none yet).
+
+    Args:
+        iv_df: iv_per_stock_per_day.csv rows
+        refresh_last: Latest dates to recompute regardless
+
+    Returns:
+        Tuple of (all rows, number of recomputed dates)
+    """
+    iv_df = iv_df.assign(Date=pd.to_datetime(iv_df['Date']))
+    is_market = (iv_df['Stock_Name'] == MARKET_IV_NAME).to_numpy()
+    stock_dates = pd.Index(iv_df.loc[~is_market, 'Date'].unique()).sort_values()
+    new_dates = stock_dates.difference(pd.Index(iv_df.loc[is_market, 'Date'].unique()))
+    dates = new_dates.union(stock_dates[max(len(stock_dates) - refresh_last, 0):] if refresh_last > 0 else new_dates)
+
+    kept = iv_df[~(is_market & iv_df['Date'].isin(dates).to_numpy())]
+    recomputed = market_iv_rows(iv_df[~is_market], dates)
+    updated = pd.concat([kept, recomputed], ignore_index=True)
+
+    # Stocks in their order of first appearance in the file, then dates
+    blocks = pd.Index(pd.unique(iv_df['Stock_Name'])).append(pd.Index([MARKET_IV_NAME])).unique()
+    block = blocks.get_indexer(updated['Stock_Name'])
+    order = np.lexsort((updated['Date'].to_numpy(), block))
+    updated = updated.iloc[order].reset_index(drop=True)
+    return updated[[column for column in IV_FILE_COLUMNS if column in updated.columns]], len(recomputed)
+
+
+# ============================================================================
+# REGIME
+# ============================================================================
+
+def market_regime(market: pd.DataFrame, window: int = REGIME_WINDOW) -> pd.DataFrame:
+    """
+    Market IV level, trailing percentile and regime per date.
+
+    The percentile of a date is the share of the last `window` index values
+    (dates with a value, including the date itself) at or below its value;
+    it is NaN until MIN_REGIME_HISTORY values are available.
+
+    Args:
+        market: MARKET_IV rows (Date, IV_30d)
+        window: Trailing window length in index values
+
+    Returns:
+        DataFrame sorted by date with date, market_iv, market_iv_percentile
+        and market_iv_regime (dates without an index value dropped)
+    """
+    market = market.dropna(subset=['IV_30d']).sort_values('Date')
+    values = market['IV_30d'].to_numpy(dtype=np.float64)
+
+    # Rows of the trailing window: values[i - window + 1 .. i], NaN-padded at the start
+    percentile = np.full(len(values), np.nan)
+    if len(values) > 0:
+        padded = np.concatenate([np.full(window - 1, np.nan), values])
+        windows = np.lib.stride_tricks.sliding_window_view(padded, window)
+        filled = np.minimum(np.arange(1, len(values) + 1), window)
+        percentile = (windows <= values[:, None]).sum(axis=1) / filled
+        percentile[filled < min(MIN_REGIME_HISTORY, window)] = np.nan
+
+    regime = np.select(
+        [percentile <= maximum for maximum, _ in MARKET_REGIMES],
+        [label for _, label in MARKET_REGIMES],
+        default=MARKET_REGIMES[-1][1]
+    ).astype(object)
+    regime[np.isnan(percentile)] = None
+    return pd.DataFrame({
+        'date': pd.to_datetime(market['Date']).to_numpy(),
+        'market_iv': values,
+        'market_iv_percentile': percentile,
+        'market_iv_regime': regime
+    })
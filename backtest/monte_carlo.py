@@ -0,0 +1,360 @@
+"""
+Monte Carlo Probability-of-Worthless Simulator
+
+This module simulates terminal stock prices and evaluates every put option on
+the same underlying against one shared set of price paths. It reproduces the
+kind of output found in data.csv (PoW_Simulation_Mean_Earnings,
+100k_Invested_Loss_Mean), which is generated upstream and not part of this
+package.
+
+Two return models are supported:
+1. Lognormal - geometric Brownian motion with volatility taken from the
+   options' ImpliedVolatility (median per stock) unless given explicitly
+2. Bootstrap - daily log returns resampled with replacement from the stock's
+   own price history (stock_data.csv)
+
+Paths are generated in chunks so memory stays bounded regardless of the
+number of paths. Each chunk is built from fixed-size blocks seeded by
+(seed, stock, block index), so results are reproducible and do not depend on
+the chunk size chosen.
+
+P&L per option follows the data.csv convention:
+    pnl = Premium - max(0, Strike - S_T) * contracts * 100
+
+Author: Put Options SE
+Date: February 2026
+"""
+
+import zlib
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+TRADING_DAYS_PER_YEAR = 252
+SHARES_PER_CONTRACT = 100
+
+# Paths per seeded block. Chunks are always a whole number of blocks.
+BLOCK_PATHS = 1000
+
+
+# ============================================================================
+# HELPER FUNCTIONS
+# ============================================================================
+
+def historical_log_returns(
+    stock_df: pd.DataFrame,
+    lookback_days: Optional[int] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Build daily log returns per stock from stock_data.csv.
+
+    Args:
+        stock_df: DataFrame with date, name and close columns
+        lookback_days: Optional number of most recent returns to keep per stock
+
+    Returns:
+        Dict mapping stock name to a float64 array of daily log returns
+    """
+    prices = stock_df[['name', 'date', 'close']].dropna().sort_values(['name', 'date'])
+    log_close = np.log(prices['close'].to_numpy(dtype=np.float64))
+    names = prices['name'].to_numpy()
+
+    returns = np.diff(log_close)
+    same_stock = names[1:] == names[:-1]
+
+    result = {}
+    stock_of_return = names[1:][same_stock]
+    valid_returns = returns[same_stock]
+    for stock_name in pd.unique(stock_of_return):
+        stock_returns = valid_returns[stock_of_return == stock_name]
+        stock_returns = stock_returns[np.isfinite(stock_returns)]
+        if lookback_days is not None:
+            stock_returns = stock_returns[-lookback_days:]
+        if len(stock_returns) > 0:
+            result[stock_name] = stock_returns
+
+    return result
+
+
+def _stock_seed(seed: int, stock_name: str, block: int) -> np.random.Generator:
+    """Create the generator for one block of paths of one stock."""
+    return np.random.default_rng([seed, zlib.crc32(stock_name.encode('utf-8')), block])
+
+
+# ============================================================================
+# MAIN SIMULATOR CLASS
+# ============================================================================
+
+class MonteCarloSimulator:
+    """
+    Simulates terminal prices per stock and evaluates all its options at once.
+
+    All options on one underlying share the same paths: prices are generated
+    once per chunk at every distinct days-to-expiry, and the payoff for every
+    strike and expiry is evaluated as one (paths x options) array operation.
+    """
+
+    METHODS = ('lognormal', 'bootstrap')
+
+    def __init__(
+        self,
+        n_paths: int = 100_000,
+        method: str = 'lognormal',
+        seed: int = 42,
+        max_chunk_mb: float = 64.0,
+        annual_drift: float = 0.0
+    ):
+        """
+        Initialize simulator.
+
+        Args:
+            n_paths: Number of simulated paths per stock (rounded up to whole blocks)
+            method: 'lognormal' or 'bootstrap'
+            seed: Base random seed
+            max_chunk_mb: Upper bound on working memory per chunk (MB)
+            annual_drift: Annualized log drift for the lognormal model (default 0)
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown method '{method}'. Expected one of {self.METHODS}")
+        if n_paths <= 0:
+            raise ValueError("n_paths must be positive")
+
+        self.n_blocks = -(-n_paths // BLOCK_PATHS)
+        self.n_paths = self.n_blocks * BLOCK_PATHS
+        self.method = method
+        self.seed = seed
+        self.max_chunk_bytes = int(max_chunk_mb * 1024 * 1024)
+        self.annual_drift = annual_drift
+
+    def _blocks_per_chunk(self, n_steps: int, n_options: int) -> int:
+        """Number of blocks that fit in the chunk memory budget."""
+        # Per path: the bootstrap step matrices (draw indices, returns and
+        # their cumulative sum) and a few (paths x options) payoff temporaries
+        step_columns = 3 * n_steps if self.method == 'bootstrap' else 3
+        bytes_per_path = 8 * (step_columns + 5 * n_options + 8)
+        paths = max(BLOCK_PATHS, self.max_chunk_bytes // bytes_per_path)
+        return max(1, min(self.n_blocks, paths // BLOCK_PATHS))
+
+    def _terminal_log_returns(
+        self,
+        stock_name: str,
+        block: int,
+        dte_points: np.ndarray,
+        daily_vol: Optional[float],
+        returns: Optional[np.ndarray]
+    ) -> np.ndarray:
+        """
+        Draw cumulative log returns at each distinct DTE for one block.
+
+        Args:
+            stock_name: Stock name (part of the seed)
+            block: Block index (part of the seed)
+            dte_points: Sorted distinct days-to-expiry (trading days, >= 0)
+            daily_vol: Daily volatility for the lognormal model
+            returns: Historical daily log returns for the bootstrap model
+
+        Returns:
+            Array of shape (BLOCK_PATHS, len(dte_points))
+        """
+        rng = _stock_seed(self.seed, stock_name, block)
+
+        if self.method == 'lognormal':
+            # Independent increments between consecutive expiries: only one
+            # normal draw per distinct expiry is needed, not one per day
+            steps = np.diff(dte_points, prepend=0).astype(np.float64)
+            daily_drift = self.annual_drift / TRADING_DAYS_PER_YEAR - 0.5 * daily_vol ** 2
+            shocks = rng.standard_normal((BLOCK_PATHS, len(dte_points)))
+            increments = daily_drift * steps + daily_vol * np.sqrt(steps) * shocks
+            return np.cumsum(increments, axis=1)
+
+        n_steps = int(dte_points[-1])
+        if n_steps == 0:
+            return np.zeros((BLOCK_PATHS, len(dte_points)))
+
+        picks = rng.integers(0, len(returns), size=(BLOCK_PATHS, n_steps))
+        cumulative = np.cumsum(returns[picks], axis=1)
+        # Column d-1 holds the return after d days; DTE 0 means no move
+        cumulative = np.concatenate([np.zeros((BLOCK_PATHS, 1)), cumulative], axis=1)
+        return cumulative[:, dte_points]
+
+    def simulate_stock(
+        self,
+        stock_name: str,
+        spot: float,
+        options_df: pd.DataFrame,
+        volatility: Optional[float] = None,
+        returns: Optional[np.ndarray] = None
+    ) -> pd.DataFrame:
+        """
+        Simulate all options of one stock on shared paths.
+
+        Args:
+            stock_name: Stock name (e.g., "ERIC B")
+            spot: Current stock price
+            options_df: Options for this stock with StrikePrice, DaysToExpiry,
+                        Premium and NumberOfContractsBasedOnLimit columns
+            volatility: Annualized volatility (lognormal model)
+            returns: Daily log returns to resample (bootstrap model)
+
+        Returns:
+            DataFrame with one row per option (same index as options_df)
+        """
+        if self.method == 'lognormal':
+            if volatility is None or not np.isfinite(volatility) or volatility <= 0:
+                raise ValueError(f"No valid volatility for {stock_name}")
+            daily_vol = volatility / np.sqrt(TRADING_DAYS_PER_YEAR)
+        else:
+            if returns is None or len(returns) == 0:
+                raise ValueError(f"No historical returns for {stock_name}")
+            daily_vol = None
+            returns = np.asarray(returns, dtype=np.float64)
+
+        strikes = options_df['StrikePrice'].to_numpy(dtype=np.float64)
+        premiums = options_df['Premium'].to_numpy(dtype=np.float64)
+        contracts = options_df['NumberOfContractsBasedOnLimit'].to_numpy(dtype=np.float64)
+        dte = np.clip(options_df['DaysToExpiry'].to_numpy(dtype=np.int64), 0, None)
+
+        # Each option reads the price column of its own expiry
+        dte_points, option_column = np.unique(dte, return_inverse=True)
+        shares = contracts * SHARES_PER_CONTRACT
+        underlying_value = strikes * shares
+
+        n_options = len(strikes)
+        worthless_count = np.zeros(n_options)
+        pnl_sum = np.zeros(n_options)
+        pnl_sq_sum = np.zeros(n_options)
+        loss_sum = np.zeros(n_options)
+
+        blocks_per_chunk = self._blocks_per_chunk(int(dte_points[-1]), n_options)
+
+        for first_block in range(0, self.n_blocks, blocks_per_chunk):
+            blocks = range(first_block, min(first_block + blocks_per_chunk, self.n_blocks))
+            log_moves = np.concatenate([
+                self._terminal_log_returns(stock_name, b, dte_points, daily_vol, returns)
+                for b in blocks
+            ])
+
+            terminal = spot * np.exp(log_moves)[:, option_column]
+            intrinsic = np.maximum(strikes - terminal, 0.0)
+            pnl = premiums - intrinsic * shares
+
+            worthless_count += (terminal > strikes).sum(axis=0)
+            pnl_sum += pnl.sum(axis=0)
+            pnl_sq_sum += np.square(pnl).sum(axis=0)
+            loss_sum += np.minimum(pnl, 0.0).sum(axis=0)
+
+        n = float(self.n_paths)
+        mean_pnl = pnl_sum / n
+        variance = np.maximum(pnl_sq_sum / n - mean_pnl ** 2, 0.0)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            loss_per_100k = np.where(
+                underlying_value > 0,
+                loss_sum / n * 100_000 / underlying_value,
+                np.nan
+            )
+
+        return pd.DataFrame({
+            'OptionName': options_df['OptionName'].to_numpy(),
+            'StockName': stock_name,
+            'method': self.method,
+            'n_paths': self.n_paths,
+            'prob_worthless': worthless_count / n,
+            'expected_pnl': mean_pnl,
+            'pnl_std': np.sqrt(variance),
+            'expected_loss': loss_sum / n,
+            'expected_loss_per_100k': loss_per_100k
+        }, index=options_df.index)
+
+    def simulate(
+        self,
+        options_df: pd.DataFrame,
+        returns_by_stock: Optional[Dict[str, np.ndarray]] = None,
+        volatility_by_stock: Optional[Dict[str, float]] = None
+    ) -> pd.DataFrame:
+        """
+        Simulate every option in the universe, one batch per underlying.
+
+        Args:
+            options_df: Options data (data.csv format)
+            returns_by_stock: Daily log returns per stock (bootstrap model),
+                              e.g. from historical_log_returns()
+            volatility_by_stock: Optional annualized volatility per stock
+                                 (lognormal model). Defaults to the median
+                                 ImpliedVolatility of the stock's options.
+
+        Returns:
+            DataFrame with one row per simulated option
+        """
+        if self.method == 'bootstrap' and returns_by_stock is None:
+            raise ValueError("Bootstrap method requires returns_by_stock")
+
+        results = []
+        skipped = []
+
+        for stock_name, stock_options in options_df.groupby('StockName', sort=True):
+            spot = stock_options['StockPrice'].iloc[0]
+
+            volatility = None
+            returns = None
+            if self.method == 'lognormal':
+                if volatility_by_stock is not None and stock_name in volatility_by_stock:
+                    volatility = volatility_by_stock[stock_name]
+                else:
+                    volatility = stock_options['ImpliedVolatility'].median()
+            else:
+                returns = returns_by_stock.get(stock_name)
+
+            try:
+                results.append(self.simulate_stock(
+                    stock_name, spot, stock_options, volatility=volatility, returns=returns
+                ))
+            except ValueError as e:
+                skipped.append(stock_name)
+                print(f"⚠️ Skipping {stock_name}: {e}")
+
+        print(f"✓ Simulated {sum(len(r) for r in results)} options "
+              f"({self.n_paths} paths, {self.method})")
+        if skipped:
+            print(f"⚠️ Skipped {len(skipped)} stocks without simulation inputs")
+
+        if not results:
+            return pd.DataFrame()
+
+        return pd.concat(results)
+
+
+# ============================================================================
+# CONVENIENCE FUNCTIONS
+# ============================================================================
+
+def simulate_options_data(
+    data_loader,
+    n_paths: int = 100_000,
+    method: str = 'lognormal',
+    seed: int = 42,
+    lookback_days: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Simulate the full options universe loaded by a DataLoader.
+
+    Args:
+        data_loader: DataLoader instance
+        n_paths: Number of paths per stock
+        method: 'lognormal' or 'bootstrap'
+        seed: Base random seed
+        lookback_days: History length for bootstrap returns (default: all)
+
+    Returns:
+        DataFrame with one row per option
+    """
+    options_df = data_loader.load_options_data()
+    simulator = MonteCarloSimulator(n_paths=n_paths, method=method, seed=seed)
+
+    returns_by_stock = None
+    if method == 'bootstrap':
+        returns_by_stock = historical_log_returns(data_loader.load_stock_data(), lookback_days)
+
+    return simulator.simulate(options_df, returns_by_stock=returns_by_stock)
@@ -0,0 +1,531 @@
+"""
+Portfolio Construction Engine
+
+This module replicates the Portfolio Generator page (PortfolioGenerator.tsx)
+so the backtest can build a portfolio for every scored day.
+
+Strategies (see docs/portfolio-generator.md):
+1. returns  - (Premium / PotentialLoss) x ProbOfWorthless
+2. capital  - capitalEfficiencyScore x (prob x 2)
+3. balanced - riskAdjustedScore x 0.6 + capitalEfficiencyScore x 0.4
+4. scored   - v21 score and TA ML probability blended by v21_weight
+5. column   - any precomputed score column (e.g., backtest composite_score)
+
+Selection:
+- greedy: the website algorithm - walk options by descending score, at most
+  one per stock, adding each option that still fits the premium target and
+  capital cap. Implemented as vectorized rounds instead of a per-option loop.
+- exact: multiple-choice knapsack dynamic program maximizing total score under
+  the premium target (and optional capital cap), for small budgets.
+
+Author: Put Options SE
+Date: February 2026
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+SHARES_PER_CONTRACT = 100
+
+STRATEGIES = ('returns', 'capital', 'balanced', 'scored', 'column')
+
+
+# ============================================================================
+# UNIVERSE PREPARATION
+# ============================================================================
+
+def recalculate_for_underlying_value(
+    options_df: pd.DataFrame,
+    underlying_value: float = 100_000,
+    transaction_cost: float = 150
+) -> pd.DataFrame:
+    """
+    Resize every option to the portfolio's underlying value.
+
+    Mirrors recalculateOptionsForPortfolio: contracts, premium, underlying
+    value and PotentialLossAtLowerBound are recomputed for the new position size.
+
+    Args:
+        options_df: Options data (data.csv format), optionally merged with
+                    LowerBoundClosestToStrike from IV_PotentialDecline.csv
+        underlying_value: Underlying value per option (SEK)
+        transaction_cost: Transaction cost per trade (SEK)
+
+    Returns:
+        Copy of options_df with recalculated position-size fields
+    """
+    df = options_df.copy()
+    strike = df['StrikePrice'].to_numpy(dtype=np.float64)
+
+    contracts = np.round(underlying_value / strike / SHARES_PER_CONTRACT)
+    bid = df['Bid'].to_numpy(dtype=np.float64)
+    ask = df['Ask'].to_numpy(dtype=np.float64)
+    ask = np.where(np.isnan(ask) | (ask == 0), bid, ask)
+    mid = (bid + ask) / 2
+    premium = np.round(mid * contracts * SHARES_PER_CONTRACT - transaction_cost)
+
+    df['NumberOfContractsBasedOnLimit'] = contracts
+    df['Bid_Ask_Mid_Price'] = mid
+    df['Premium'] = premium
+    df['Underlying_Value'] = contracts * strike * SHARES_PER_CONTRACT
+
+    if 'LowerBoundClosestToStrike' in df.columns:
+        lower_bound = df['LowerBoundClosestToStrike'].to_numpy(dtype=np.float64)
+        df['PotentialLossAtLowerBound'] = potential_loss_at_lower_bound(
+            premium, strike, contracts, lower_bound, transaction_cost
+        )
+
+    return df
+
+
+def potential_loss_at_lower_bound(
+    premium: np.ndarray,
+    strike: np.ndarray,
+    contracts: np.ndarray,
+    lower_bound: np.ndarray,
+    transaction_cost: float = 150
+) -> np.ndarray:
+    """
+    Loss if the stock finishes at the IV lower bound (0 if no loss).
+
+    Args:
+        premium: Position premium (SEK)
+        strike: Strike price
+        contracts: Number of contracts
+        lower_bound: LowerBoundClosestToStrike
+        transaction_cost: Transaction cost per trade (SEK)
+
+    Returns:
+        Array of potential losses (<= 0), NaN where lower_bound is missing
+    """
+    shares = contracts * SHARES_PER_CONTRACT
+    loss = premium + (lower_bound - strike) * shares
+    # Negative results also pay the exchange fee and the transaction cost
+    loss = np.where(loss >= 0, 0.0, loss - (loss * 0.000075 + transaction_cost))
+    return np.where(np.isnan(lower_bound) | (lower_bound == 0), np.nan, loss)
+
+
+# ============================================================================
+# STRATEGY SCORES
+# ============================================================================
+
+def compute_strategy_scores(
+    universe: pd.DataFrame,
+    strategy: str = 'returns',
+    probability_field: str = 'ProbWorthless_Bayesian_IsoCal',
+    v21_weight: float = 50,
+    score_column: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Calculate finalScore for every option, vectorized.
+
+    Args:
+        universe: Options with Premium, StrikePrice, NumberOfContractsBasedOnLimit
+                  and the columns the strategy needs
+        strategy: One of STRATEGIES
+        probability_field: PoW column (falls back to 1_2_3_ProbOfWorthless_Weighted)
+        v21_weight: Probability Optimization Model weight 0-100 (scored strategy)
+        score_column: Score column (column strategy)
+
+    Returns:
+        Copy of universe with capitalRequired, finalScore and strategy helper
+        columns; rows the strategy cannot score are dropped
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}'. Expected one of {STRATEGIES}")
+
+    df = universe.copy()
+    contracts = df['NumberOfContractsBasedOnLimit'].to_numpy(dtype=np.float64)
+    capital = contracts * df['StrikePrice'].to_numpy(dtype=np.float64) * SHARES_PER_CONTRACT
+    df['capitalRequired'] = capital
+
+    valid = (df['Premium'].to_numpy(dtype=np.float64) > 0) & (contracts > 0)
+
+    if strategy == 'scored':
+        v21 = df['v21_score'].fillna(0).to_numpy(dtype=np.float64)
+        ta = df['ta_probability'].fillna(0).to_numpy(dtype=np.float64) * 100
+        w = v21_weight / 100
+        df['finalScore'] = w * v21 + (1 - w) * ta
+        valid &= df['v21_score'].notna().to_numpy() | df['ta_probability'].notna().to_numpy()
+
+    elif strategy == 'column':
+        if score_column is None:
+            raise ValueError("column strategy requires score_column")
+        df['finalScore'] = df[score_column].to_numpy(dtype=np.float64)
+        valid &= df[score_column].notna().to_numpy()
+
+    else:
+        prob = df[probability_field].to_numpy(dtype=np.float64)
+        if '1_2_3_ProbOfWorthless_Weighted' in df.columns:
+            fallback = df['1_2_3_ProbOfWorthless_Weighted'].to_numpy(dtype=np.float64)
+            prob = np.where(np.isnan(prob) | (prob == 0), fallback, prob)
+
+        raw_loss = df['PotentialLossAtLowerBound'].to_numpy(dtype=np.float64)
+        potential_loss = np.abs(raw_loss)
+        premium = df['Premium'].to_numpy(dtype=np.float64)
+
+        expected_value = premium - (1 - prob) * potential_loss
+        with np.errstate(divide='ignore', invalid='ignore'):
+            capital_efficiency = np.where(capital > 0, expected_value / capital, 0.0)
+            risk_adjusted = np.where(potential_loss > 0, premium / potential_loss * prob, prob)
+
+        if strategy == 'returns':
+            final_score = risk_adjusted
+        elif strategy == 'capital':
+            final_score = capital_efficiency * (prob * 2)
+        else:
+            final_score = risk_adjusted * 0.6 + capital_efficiency * 0.4
+
+        df['expectedValue'] = expected_value
+        df['expectedValuePerCapital'] = capital_efficiency
+        df['capitalEfficiencyScore'] = capital_efficiency
+        df['riskAdjustedScore'] = risk_adjusted
+        df['finalScore'] = final_score
+        valid &= ~np.isnan(prob) & ~np.isnan(raw_loss)
+
+    return df[valid]
+
+
+# ============================================================================
+# SELECTION
+# ============================================================================
+
+def _rank_within_group(groups: np.ndarray) -> np.ndarray:
+    """Position of each element among earlier elements of the same group."""
+    order = np.argsort(groups, kind='stable')
+    sorted_groups = groups[order]
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    counts = np.diff(np.r_[starts, len(groups)])
+    ranks_sorted = np.arange(len(groups)) - np.repeat(starts, counts)
+    ranks = np.empty(len(groups), dtype=np.int64)
+    ranks[order] = ranks_sorted
+    return ranks
+
+
+def greedy_select(
+    premium: np.ndarray,
+    capital: np.ndarray,
+    stock_codes: np.ndarray,
+    premium_target: float,
+    max_total_capital: Optional[float] = None,
+    max_per_stock: int = 1
+) -> np.ndarray:
+    """
+    Website greedy selection over options already sorted by descending score.
+
+    Equivalent to walking the list once and taking every option that still
+    fits, but done in vectorized rounds: each round accepts the longest prefix
+    of eligible options that fits, drops the first option that does not (it
+    can never fit later, totals only grow), and prunes every option larger
+    than the remaining budget.
+
+    Args:
+        premium: Premium per option, in score order
+        capital: Capital required per option, in score order
+        stock_codes: Integer stock code per option, in score order
+        premium_target: Maximum total premium
+        max_total_capital: Optional maximum total capital
+        max_per_stock: Maximum options per stock (website: 1)
+
+    Returns:
+        Positions (into the sorted arrays) of selected options, in score order
+    """
+    capital_limit = np.inf if max_total_capital is None else max_total_capital
+    alive = np.ones(len(premium), dtype=bool)
+    per_stock = np.zeros(stock_codes.max() + 1 if len(stock_codes) else 0, dtype=np.int64)
+    selected = []
+    total_premium = 0.0
+    total_capital = 0.0
+
+    while True:
+        alive &= (premium <= premium_target - total_premium) & (capital <= capital_limit - total_capital)
+        alive &= per_stock[stock_codes] < max_per_stock
+        positions = np.flatnonzero(alive)
+        if len(positions) == 0:
+            break
+
+        # Eligible now: within each stock's remaining allowance, in score order
+        allowance = max_per_stock - per_stock[stock_codes[positions]]
+        candidates = positions[_rank_within_group(stock_codes[positions]) < allowance]
+
+        cum_premium = total_premium + np.cumsum(premium[candidates])
+        cum_capital = total_capital + np.cumsum(capital[candidates])
+        fits = (cum_premium <= premium_target) & (cum_capital <= capital_limit)
+        n_accepted = len(candidates) if fits.all() else int(np.argmin(fits))
+
+        accepted = candidates[:n_accepted]
+        if n_accepted:
+            selected.append(accepted)
+            total_premium = cum_premium[n_accepted - 1]
+            total_capital = cum_capital[n_accepted - 1]
+            np.add.at(per_stock, stock_codes[accepted], 1)
+            alive[accepted] = False
+
+        if n_accepted < len(candidates):
+            alive[candidates[n_accepted]] = False
+
+    if not selected:
+        return np.array([], dtype=np.int64)
+
+    return np.sort(np.concatenate(selected))
+
+
+def exact_select(
+    score: np.ndarray,
+    premium: np.ndarray,
+    capital: np.ndarray,
+    stock_codes: np.ndarray,
+    premium_target: float,
+    max_total_capital: Optional[float] = None,
+    premium_resolution: float = 1.0,
+    capital_resolution: float = 10_000.0,
+    max_cells: int = 5_000_000
+) -> np.ndarray:
+    """
+    Multiple-choice knapsack: maximize total score, at most one option per stock.
+
+    Dynamic program over the premium budget (and the capital budget when a cap
+    is given). Premium and capital are rounded up to their resolution, so every
+    returned portfolio is feasible; the optimum is exact on that grid.
+
+    Args:
+        score: finalScore per option (only positive scores are worth taking)
+        premium: Premium per option
+        capital: Capital required per option
+        stock_codes: Integer stock code per option
+        premium_target: Maximum total premium
+        max_total_capital: Optional maximum total capital
+        premium_resolution: Premium grid step (SEK)
+        capital_resolution: Capital grid step (SEK)
+        max_cells: Largest DP table allowed
+
+    Returns:
+        Indexes of selected options
+    """
+    premium_units = np.ceil(premium / premium_resolution).astype(np.int64)
+    premium_budget = int(premium_target // premium_resolution)
+
+    if max_total_capital is None:
+        capital_units = np.zeros(len(capital), dtype=np.int64)
+        capital_budget = 0
+    else:
+        capital_units = np.ceil(capital / capital_resolution).astype(np.int64)
+        capital_budget = int(max_total_capital // capital_resolution)
+
+    cells = (premium_budget + 1) * (capital_budget + 1)
+    if cells > max_cells:
+        raise ValueError(
+            f"Budget grid too large for exact selection ({cells} cells > {max_cells}); "
+            "use greedy selection or a coarser resolution"
+        )
+
+    useful = (score > 0) & (premium_units <= premium_budget) & (capital_units <= capital_budget)
+    candidates = np.flatnonzero(useful)
+    shape = (premium_budget + 1, capital_budget + 1)
+
+    best = np.zeros(shape)
+    choices = []
+    groups = []
+
+    for stock in np.unique(stock_codes[candidates]):
+        members = candidates[stock_codes[candidates] == stock]
+        new_best = best.copy()
+        choice = np.full(shape, -1, dtype=np.int32)
+
+        for member in members:
+            p, c = premium_units[member], capital_units[member]
+            shifted = np.full(shape, -np.inf)
+            shifted[p:, c:] = best[:shape[0] - p, :shape[1] - c] + score[member]
+            improved = shifted > new_best
+            new_best[improved] = shifted[improved]
+            choice[improved] = member
+
+        best = new_best
+        choices.append(choice)
+        groups.append(members)
+
+    # Walk the choices backwards from the best cell
+    p, c = np.unravel_index(np.argmax(best), shape)
+    selected = []
+    for choice in reversed(choices):
+        member = choice[p, c]
+        if member >= 0:
+            selected.append(member)
+            p -= premium_units[member]
+            c -= capital_units[member]
+
+    return np.sort(np.array(selected, dtype=np.int64))
+
+
+# ============================================================================
+# MAIN ENGINE CLASS
+# ============================================================================
+
+class PortfolioEngine:
+    """
+    Builds portfolios from a scored options universe.
+
+    One engine instance holds the settings; build() can then be called for
+    every backtest day.
+    """
+
+    def __init__(
+        self,
+        strategy: str = 'returns',
+        premium_target: float = 500,
+        max_total_capital: Optional[float] = None,
+        probability_field: str = 'ProbWorthless_Bayesian_IsoCal',
+        v21_weight: float = 50,
+        score_column: Optional[str] = None,
+        excluded_stocks: Optional[list] = None,
+        min_probability: Optional[float] = None,
+        max_probability: Optional[float] = None,
+        max_per_stock: int = 1,
+        method: str = 'greedy'
+    ):
+        """
+        Initialize portfolio engine.
+
+        Args:
+            strategy: returns, capital, balanced, scored or column
+            premium_target: Target total premium (SEK)
+            max_total_capital: Optional cap on total capital (SEK)
+            probability_field: PoW column for scoring and probability filters
+            v21_weight: Probability Optimization Model weight (scored strategy)
+            score_column: Score column for the column strategy
+            excluded_stocks: Stocks never selected
+            min_probability: Optional minimum PoW (0-1)
+            max_probability: Optional maximum PoW (0-1)
+            max_per_stock: Maximum options per stock (exact method supports 1)
+            method: 'greedy' (website algorithm) or 'exact' (knapsack)
+        """
+        if method not in ('greedy', 'exact'):
+            raise ValueError(f"Unknown method '{method}'. Expected 'greedy' or 'exact'")
+        if method == 'exact' and max_per_stock != 1:
+            raise ValueError("Exact selection supports max_per_stock=1 only")
+
+        self.strategy = strategy
+        self.premium_target = premium_target
+        self.max_total_capital = max_total_capital
+        self.probability_field = probability_field
+        self.v21_weight = v21_weight
+        self.score_column = score_column
+        self.excluded_stocks = set(excluded_stocks or [])
+        self.min_probability = min_probability
+        self.max_probability = max_probability
+        self.max_per_stock = max_per_stock
+        self.method = method
+
+    def _filter(self, universe: pd.DataFrame, stock_col: str) -> pd.DataFrame:
+        """Apply exclusion and probability filters."""
+        mask = ~universe[stock_col].isin(self.excluded_stocks)
+
+        if self.min_probability is not None or self.max_probability is not None:
+            prob = universe[self.probability_field]
+            mask &= prob.notna()
+            if self.min_probability is not None:
+                mask &= prob >= self.min_probability
+            if self.max_probability is not None:
+                mask &= prob <= self.max_probability
+
+        return universe[mask]
+
+    def build(self, universe: pd.DataFrame, stock_col: str = 'StockName') -> pd.DataFrame:
+        """
+        Build one portfolio.
+
+        Args:
+            universe: Options available on the day (one row per option)
+            stock_col: Stock name column
+
+        Returns:
+            Selected options in descending score order, with finalScore and
+            capitalRequired columns
+        """
+        scored = compute_strategy_scores(
+            self._filter(universe, stock_col),
+            self.strategy,
+            self.probability_field,
+            self.v21_weight,
+            self.score_column
+        )
+        if len(scored) == 0:
+            return scored
+
+        score = scored['finalScore'].to_numpy(dtype=np.float64)
+        capital = scored['capitalRequired'].to_numpy(dtype=np.float64)
+        premium = scored['Premium'].to_numpy(dtype=np.float64)
+
+        # Website tie-break: capital ascending for the capital strategy,
+        # otherwise expected value per capital descending
+        if 'expectedValuePerCapital' in scored.columns and self.strategy != 'capital':
+            tie_break = -scored['expectedValuePerCapital'].to_numpy(dtype=np.float64)
+        else:
+            tie_break = capital
+        order = np.lexsort((tie_break, -np.nan_to_num(score, nan=0.0)))
+
+        stock_codes = pd.factorize(scored[stock_col])[0]
+
+        if self.method == 'greedy':
+            positions = greedy_select(
+                premium[order], capital[order], stock_codes[order],
+                self.premium_target, self.max_total_capital, self.max_per_stock
+            )
+            return scored.iloc[order[positions]]
+
+        selected = exact_select(
+            score, premium, capital, stock_codes,
+            self.premium_target, self.max_total_capital
+        )
+        return scored.iloc[selected].sort_values('finalScore', ascending=False)
+
+    def build_daily(
+        self,
+        panel: pd.DataFrame,
+        date_col: str = 'date',
+        stock_col: str = 'stock_name'
+    ) -> pd.DataFrame:
+        """
+        Build one portfolio per date of a scored backtest panel.
+
+        Args:
+            panel: Scored (date, option) rows with the columns the strategy needs
+            date_col: Date column
+            stock_col: Stock name column
+
+        Returns:
+            Concatenated selections with the date column preserved
+        """
+        portfolios = [
+            self.build(day_options, stock_col=stock_col)
+            for _, day_options in panel.groupby(date_col, sort=True)
+        ]
+        portfolios = [p for p in portfolios if len(p) > 0]
+
+        if not portfolios:
+            return panel.iloc[0:0]
+
+        return pd.concat(portfolios)
+
+
+def summarize_portfolio(portfolio: pd.DataFrame) -> Dict[str, float]:
+    """
+    Portfolio totals as shown on the website.
+
+    Args:
+        portfolio: Output of PortfolioEngine.build()
+
+    Returns:
+        Dict with option count, total premium, capital and potential loss
+    """
+    summary = {
+        'n_options': len(portfolio),
+        'total_premium': float(portfolio['Premium'].sum()),
+        'total_capital': float(portfolio['capitalRequired'].sum())
+    }
+    if 'PotentialLossAtLowerBound' in portfolio.columns:
+        summary['total_potential_loss'] = float(portfolio['PotentialLossAtLowerBound'].fillna(0).sum())
+    return summary
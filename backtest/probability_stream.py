@@ -0,0 +1,673 @@
+"""
+Streaming Ingestion of Probability History
+
+This module reads probability_history.csv in chunks and builds only what the
+scoring path needs, without materializing the raw table:
+
+- Per-option peak probability for every method (historical peak factor)
+- Per-option daily series in a compact array store (float32 values, CSR
+  offsets by option), for as-of probability lookups
+- Recovery-bin counts: option-day observations per (peak threshold, method,
+  probability bin, DTE bin), split into recovery candidates (peak to date at
+  or above the threshold) and all options, with worthless counts when
+  outcomes are given
+
+Memory is proportional to the chunk size (plus a few values per option):
+series rows are spilled to disk per chunk and then arranged into
+memory-mapped .npy files (4 bytes per value plus 4 bytes per row).
+
+Usage:
+    from probability_stream import stream_probability_history
+
+    summary = stream_probability_history('../data/probability_history.csv',
+                                          expiry_dates=options_df.set_index('OptionName')['ExpiryDate'])
+    summary.peaks.loc['ERICB6U45']
+
+Author: Put Options SE
+Date: February 2026
+"""
+
+import json
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_loader import PROBABILITY_METHODS, RECOVERY_METHOD_NAMES
+from scoring_engine import (
+    DTE_BIN_LABELS,
+    PROBABILITY_BIN_LABELS,
+    get_dte_bin_codes,
+    get_probability_bin_codes
+)
+
+
+# Peak thresholds reported in recovery_report_data.csv
+RECOVERY_THRESHOLDS = [0.80, 0.85, 0.90, 0.95]
+
+# Rows per chunk (about 50 MB of parsed strings and floats)
+DEFAULT_CHUNK_ROWS = 200_000
+
+# Decimals kept when widening stored float32 probabilities to float64
+# (float32 holds ~7 significant digits; 0.9 must read back as 0.9 so bin and
+# threshold comparisons match the CSV values)
+VALUE_DECIMALS = 7
+
+_EPOCH = np.datetime64('1970-01-01', 'D')
+
+
+# ============================================================================
+# SERIES STORE
+# ============================================================================
+
+class ProbabilitySeriesStore:
+    """
+    Compact per-option probability series.
+
+    Option names are dictionary-encoded to integer ids and rows are sorted by
+    (option id, date); offsets[i]:offsets[i + 1] is the slice of option i.
+    Dates are days since 1970-01-01 (int32) and values are float32 with one
+    column per method, 24 bytes per row with five methods. days and values
+    are usually memory-mapped .npy files (see open()), so view() slices them
+    without copying and peaks to date are reduced over those slices.
+    """
+
+    def __init__(
+        self,
+        option_names: np.ndarray,
+        offsets: np.ndarray,
+        days: np.ndarray,
+        values: np.ndarray,
+        methods: List[str]
+    ):
+        self.option_names = option_names
+        self.offsets = offsets
+        self.days = days
+        self.values = values
+        self.methods = list(methods)
+        self._option_index = pd.Index(option_names)
+        self._method_index = {method: i for i, method in enumerate(self.methods)}
+
+    @classmethod
+    def open(cls, store_dir) -> 'ProbabilitySeriesStore':
+        """
+        Open a store written by stream_probability_history (memory-mapped).
+
+        Args:
+            store_dir: Directory with the store files
+
+        Returns:
+            ProbabilitySeriesStore
+        """
+        store_dir = Path(store_dir)
+        with open(store_dir / 'methods.json', encoding='utf-8') as f:
+            methods = json.load(f)
+        return cls(
+            np.load(store_dir / 'option_names.npy').astype(object),
+            np.load(store_dir / 'offsets.npy'),
+            np.load(store_dir / 'days.npy', mmap_mode='r'),
+            np.load(store_dir / 'values.npy', mmap_mode='r'),
+            methods
+        )
+
+    @classmethod
+    def from_frame(
+        cls,
+        history: pd.DataFrame,
+        store_dir,
+        methods: Optional[List[str]] = None
+    ) -> 'ProbabilitySeriesStore':
+        """
+        Write a store from an in-memory probability history table.
+
+        Rows of an option are sorted by date (rows of the same date keep
+        their order), as stream_probability_history does for a file in
+        date order.
+
+        Args:
+            history: probability_history.csv rows (OptionName, Update_date, methods)
+            store_dir: Directory for the store files
+            methods: Probability columns to keep (default: all known methods present)
+
+        Returns:
+            ProbabilitySeriesStore (memory-mapped)
+        """
+        if methods is None:
+            methods = [m for m in PROBABILITY_METHODS if m in history.columns]
+        store_dir = Path(store_dir)
+        store_dir.mkdir(parents=True, exist_ok=True)
+
+        ids, option_names = pd.factorize(history['OptionName'].to_numpy(dtype=object))
+        days = (pd.to_datetime(history['Update_date']).to_numpy(dtype='datetime64[D]') - _EPOCH).astype(np.int32)
+        order = np.lexsort((days, ids))
+        offsets = np.zeros(len(option_names) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(ids, minlength=len(option_names)))
+
+        np.save(store_dir / 'days.npy', days[order])
+        np.save(store_dir / 'values.npy', history[list(methods)].to_numpy(dtype=np.float32)[order])
+        _write_store_meta(store_dir, offsets, np.asarray(option_names, dtype=object), methods)
+        return cls.open(store_dir)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the arrays."""
+        return self.offsets.nbytes + self.days.nbytes + self.values.nbytes
+
+    def option_ids(self, option_names) -> np.ndarray:
+        """Integer id of each option name (-1 if unknown)."""
+        return self._option_index.get_indexer(np.asarray(option_names, dtype=object))
+
+    def view(self, option_name: str, method: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Zero-copy slices of one option's series.
+
+        Args:
+            option_name: Option name
+            method: One method's column (default: all methods)
+
+        Returns:
+            Tuple of (days since 1970-01-01, values) - views of the store
+            arrays, empty if the option is unknown
+        """
+        position = self._option_index.get_indexer([option_name])[0]
+        rows = slice(0, 0) if position < 0 else slice(self.offsets[position], self.offsets[position + 1])
+        columns = slice(None) if method is None else self._method_index[method]
+        return self.days[rows], self.values[rows, columns]
+
+    def series(self, option_name: str) -> pd.DataFrame:
+        """
+        Daily series of one option.
+
+        Args:
+            option_name: Option name
+
+        Returns:
+            DataFrame indexed by date with one column per method (empty if unknown)
+        """
+        position = self._option_index.get_indexer([option_name])[0]
+        if position < 0:
+            return pd.DataFrame(columns=self.methods, dtype=np.float32)
+
+        rows = slice(self.offsets[position], self.offsets[position + 1])
+        dates = _EPOCH + self.days[rows].astype('timedelta64[D]')
+        return pd.DataFrame(
+            self.values[rows].astype(np.float64).round(VALUE_DECIMALS),
+            index=pd.DatetimeIndex(dates, name='Update_date'),
+            columns=self.methods
+        )
+
+    def _search(self, option_ids: np.ndarray, days: np.ndarray, side: str) -> np.ndarray:
+        """
+        Position of each day within its option's slice, as np.searchsorted.
+
+        All queries are bisected together: each step halves every query's
+        [low, high) range of rows, so there is no loop over options.
+        """
+        known = option_ids >= 0
+        low = np.where(known, self.offsets[np.where(known, option_ids, 0)], 0)
+        high = np.where(known, self.offsets[np.where(known, option_ids, 0) + 1], 0)
+
+        active = np.flatnonzero(low < high)
+        while len(active):
+            middle = (low[active] + high[active]) // 2
+            middle_days = self.days[middle]
+            right = middle_days < days[active] if side == 'left' else middle_days <= days[active]
+            low[active] = np.where(right, middle + 1, low[active])
+            high[active] = np.where(right, high[active], middle)
+            active = active[low[active] < high[active]]
+        return low
+
+    def _query(self, option_names, dates) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Option ids, days since 1970-01-01 and slice starts of the queries."""
+        option_ids = self.option_ids(option_names)
+        days = (pd.DatetimeIndex(dates).to_numpy(dtype='datetime64[D]') - _EPOCH).astype(np.int32)
+        starts = np.where(option_ids >= 0, self.offsets[np.maximum(option_ids, 0)], 0)
+        return option_ids, days, starts
+
+    def lookup(self, option_names, dates, method: str) -> np.ndarray:
+        """
+        Probability of each option on each date (exact date match).
+
+        Args:
+            option_names: Sequence of option names
+            dates: Sequence of dates aligned with option_names
+            method: Probability method
+
+        Returns:
+            Array of probabilities, NaN where there is no row for that date
+        """
+        column = self._method_index[method]
+        option_ids, days, _ = self._query(option_names, dates)
+        ends = np.where(option_ids >= 0, self.offsets[np.maximum(option_ids, 0) + 1], 0)
+
+        positions = self._search(option_ids, days, 'left')
+        found = positions < ends
+        found[found] = self.days[positions[found]] == days[found]
+
+        result = np.full(len(option_ids), np.nan)
+        result[found] = self.values[positions[found], column]
+        return result.round(VALUE_DECIMALS)
+
+    def _slice_peaks(self, column: int, starts: np.ndarray, stops: np.ndarray) -> np.ndarray:
+        """
+        Maximum of values[start:stop, column] per query, NaN ignored (stop > start).
+
+        One np.fmax.reduceat over the column with the (start, stop) pairs as
+        boundaries; queries are taken in start order so the discarded gaps
+        between pairs read each row at most once.
+        """
+        values = self.values[:, column]
+        order = np.argsort(starts, kind='stable')
+        bounds = np.column_stack([starts[order], stops[order]]).ravel()
+        # reduceat boundaries must be valid rows: a slice ending at the last
+        # row stops one short and gets the last row added below
+        at_end = bounds[1::2] == len(values)
+        bounds[1::2][at_end] = len(values) - 1
+        peaks = np.fmax.reduceat(values, bounds)[0::2]
+        peaks[at_end] = np.fmax(peaks[at_end], values[-1])
+
+        result = np.empty(len(starts), dtype=np.float32)
+        result[order] = peaks
+        return result
+
+    def as_of(self, option_names, dates, method: str, peak: bool = False) -> np.ndarray:
+        """
+        Probability (or peak to date) of each option as of each date.
+
+        The last row on or before the date is used (the last one if an
+        option has several rows that day); the peak to date is the highest
+        value up to and including that row.
+
+        Args:
+            option_names: Sequence of option names
+            dates: Sequence of dates aligned with option_names
+            method: Probability method
+            peak: Return the peak to date instead of the value
+
+        Returns:
+            Array of probabilities, NaN before an option's first row
+        """
+        column = self._method_index[method]
+        option_ids, days, starts = self._query(option_names, dates)
+        positions = self._search(option_ids, days, 'right') - 1
+        found = (option_ids >= 0) & (positions >= starts)
+
+        result = np.full(len(option_ids), np.nan)
+        if peak:
+            result[found] = self._slice_peaks(column, starts[found], positions[found] + 1)
+        else:
+            result[found] = self.values[positions[found], column]
+        return result.round(VALUE_DECIMALS)
+
+
+# ============================================================================
+# STREAMING SUMMARY
+# ============================================================================
+
+class ProbabilityHistorySummary:
+    """
+    Result of stream_probability_history.
+
+    Attributes:
+        peaks: DataFrame of peak probability per option (index OptionName,
+            one column per method)
+        store: ProbabilitySeriesStore with the daily series
+        recovery_counts: Long-format recovery-bin counts (columns as in
+            recovery_report_data.csv, DataType 'scenario')
+        n_rows: Number of rows read
+        out_of_order_rows: Rows dated before an earlier row of the same option
+            (peak-to-date assumes the file is in date order)
+    """
+
+    def __init__(
+        self,
+        peaks: pd.DataFrame,
+        store: ProbabilitySeriesStore,
+        recovery_counts: pd.DataFrame,
+        n_rows: int,
+        out_of_order_rows: int
+    ):
+        self.peaks = peaks
+        self.store = store
+        self.recovery_counts = recovery_counts
+        self.n_rows = n_rows
+        self.out_of_order_rows = out_of_order_rows
+
+
+class _GrowableArray:
+    """Append-only array that doubles its capacity as needed."""
+
+    def __init__(self, dtype, columns: Optional[int] = None, fill=0):
+        self._shape_tail = () if columns is None else (columns,)
+        self._fill = fill
+        self.data = np.full((1024,) + self._shape_tail, fill, dtype=dtype)
+        self.size = 0
+
+    def reserve(self, size: int):
+        if size > len(self.data):
+            grown = np.full((max(size, 2 * len(self.data)),) + self._shape_tail, self._fill, dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.size = max(self.size, size)
+
+    def append(self, values: np.ndarray):
+        start = self.size
+        self.reserve(start + len(values))
+        self.data[start:self.size] = values
+
+    def view(self) -> np.ndarray:
+        return self.data[:self.size]
+
+
+def _business_days(start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """Business days from start to end (datetime64[D] arrays, NaT -> -1)."""
+    valid = ~(np.isnat(start) | np.isnat(end))
+    result = np.full(len(start), -1, dtype=np.int64)
+    result[valid] = np.busday_count(start[valid], end[valid])
+    return result
+
+
+def stream_probability_history(
+    file_path,
+    methods: Optional[List[str]] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    expiry_dates: Optional[pd.Series] = None,
+    outcomes: Optional[pd.Series] = None,
+    thresholds: Optional[List[float]] = None,
+    store_dir: Optional[str] = None
+) -> ProbabilityHistorySummary:
+    """
+    Read probability_history.csv in chunks and build the scoring aggregates.
+
+    Args:
+        file_path: Path to probability_history.csv
+        methods: Probability columns to keep (default: all known methods present)
+        chunk_rows: Rows per chunk
+        expiry_dates: ExpiryDate per OptionName, for DTE bins (used when the
+            file has no ExpiryDate column; rows without one are not binned)
+        outcomes: True (expired worthless) / False per OptionName, for the
+            worthless counts (optional)
+        thresholds: Peak thresholds for recovery counts (default: RECOVERY_THRESHOLDS)
+        store_dir: Directory for the series store files (default: a temporary directory)
+
+    Returns:
+        ProbabilityHistorySummary
+    """
+    file_path = Path(file_path)
+    thresholds = np.asarray(thresholds or RECOVERY_THRESHOLDS, dtype=np.float64)
+
+    header = pd.read_csv(file_path, delimiter='|', nrows=0).columns
+    if methods is None:
+        methods = [m for m in PROBABILITY_METHODS if m in header]
+    has_expiry = 'ExpiryDate' in header
+    use_columns = ['OptionName', 'Update_date'] + list(methods) + (['ExpiryDate'] if has_expiry else [])
+
+    n_methods = len(methods)
+    n_prob_bins = len(PROBABILITY_BIN_LABELS)
+    n_dte_bins = len(DTE_BIN_LABELS)
+    count_shape = (len(thresholds), n_methods, n_prob_bins, n_dte_bins)
+
+    option_ids: Dict[str, int] = {}
+    running_peaks = _GrowableArray(np.float64, n_methods, fill=np.nan)
+    last_day = _GrowableArray(np.int32, fill=np.iinfo(np.int32).min)
+    rows_per_option = _GrowableArray(np.int64)
+
+    # Series rows are spilled to disk in file order and arranged at the end
+    store_dir = Path(store_dir) if store_dir else Path(tempfile.mkdtemp(prefix='probability_store_'))
+    store_dir.mkdir(parents=True, exist_ok=True)
+    spill_paths = [store_dir / f'_spill_{name}.bin' for name in ('ids', 'days', 'values')]
+    spill_files = [open(path, 'wb') for path in spill_paths]
+
+    candidate_n = np.zeros(count_shape, dtype=np.int64)
+    candidate_worthless = np.zeros(count_shape, dtype=np.int64)
+    all_n = np.zeros(count_shape[1:], dtype=np.int64)
+    all_worthless = np.zeros(count_shape[1:], dtype=np.int64)
+
+    n_rows = 0
+    out_of_order = 0
+
+    reader = pd.read_csv(
+        file_path,
+        delimiter='|',
+        usecols=use_columns,
+        parse_dates=['Update_date'] + (['ExpiryDate'] if has_expiry else []),
+        chunksize=chunk_rows
+    )
+
+    for chunk in reader:
+        n = len(chunk)
+        n_rows += n
+
+        # Integer ids for option names (new names get the next id)
+        names = chunk['OptionName'].to_numpy(dtype=object)
+        for name in pd.unique(names):
+            if name not in option_ids:
+                option_ids[name] = len(option_ids)
+        ids = pd.Series(option_ids).reindex(names).to_numpy(dtype=np.int32)
+        running_peaks.reserve(len(option_ids))
+        last_day.reserve(len(option_ids))
+        rows_per_option.reserve(len(option_ids))
+
+        days = (chunk['Update_date'].to_numpy(dtype='datetime64[D]') - _EPOCH).astype(np.int32)
+        values = chunk[list(methods)].to_numpy(dtype=np.float64)
+
+        # Peak to date per row: order by (option, day) inside the chunk,
+        # cumulative max per option, combined with the peak carried over
+        order = np.lexsort((days, ids))
+        sorted_ids = ids[order]
+        sorted_values = pd.DataFrame(values[order]).groupby(sorted_ids).cummax()
+        sorted_values = sorted_values.groupby(sorted_ids).ffill().to_numpy(dtype=np.float64)
+        peak_to_date = np.empty_like(values)
+        peak_to_date[order] = np.fmax(sorted_values, running_peaks.data[sorted_ids])
+
+        # Rows dated before an earlier row of the same option
+        earlier = days < last_day.data[ids]
+        by_option = np.argsort(ids, kind='stable')
+        same_option = ids[by_option][1:] == ids[by_option][:-1]
+        earlier[by_option[1:]] |= same_option & (np.diff(days[by_option]) < 0)
+        out_of_order += int(earlier.sum())
+
+        # Carry the running state forward
+        last_of_option = np.r_[sorted_ids[1:] != sorted_ids[:-1], True]
+        final_ids = sorted_ids[last_of_option]
+        running_peaks.data[final_ids] = peak_to_date[order][last_of_option]
+        np.maximum.at(last_day.data, ids, days)
+
+        rows_per_option.data[:len(option_ids)] += np.bincount(ids, minlength=len(option_ids))
+        for spill_file, array in zip(spill_files, (ids, days, values.astype(np.float32))):
+            spill_file.write(np.ascontiguousarray(array).tobytes())
+
+        # Recovery-bin counts
+        if has_expiry:
+            expiry = chunk['ExpiryDate'].to_numpy(dtype='datetime64[D]')
+        elif expiry_dates is not None:
+            expiry = pd.DatetimeIndex(expiry_dates.reindex(names)).to_numpy(dtype='datetime64[D]')
+        else:
+            continue
+
+        dte = _business_days(chunk['Update_date'].to_numpy(dtype='datetime64[D]'), expiry)
+        binned = dte >= 0
+        dte_codes = get_dte_bin_codes(dte[binned])
+        worthless = None
+        if outcomes is not None:
+            worthless = outcomes.reindex(names[binned]).to_numpy(dtype=object) == True  # noqa: E712
+
+        for m in range(n_methods):
+            current = values[binned, m]
+            has_prob = ~np.isnan(current)
+            cell = get_probability_bin_codes(current[has_prob]) * n_dte_bins + dte_codes[has_prob]
+            all_n[m] += np.bincount(cell, minlength=n_prob_bins * n_dte_bins).reshape(n_prob_bins, n_dte_bins)
+            if worthless is not None:
+                all_worthless[m] += np.bincount(
+                    cell, weights=worthless[has_prob], minlength=n_prob_bins * n_dte_bins
+                ).reshape(n_prob_bins, n_dte_bins).astype(np.int64)
+
+            peaks = peak_to_date[binned, m][has_prob]
+            for t, threshold in enumerate(thresholds):
+                candidate = peaks >= threshold
+                candidate_n[t, m] += np.bincount(
+                    cell[candidate], minlength=n_prob_bins * n_dte_bins
+                ).reshape(n_prob_bins, n_dte_bins)
+                if worthless is not None:
+                    candidate_worthless[t, m] += np.bincount(
+                        cell[candidate], weights=worthless[has_prob][candidate], minlength=n_prob_bins * n_dte_bins
+                    ).reshape(n_prob_bins, n_dte_bins).astype(np.int64)
+
+    for spill_file in spill_files:
+        spill_file.close()
+
+    if out_of_order:
+        print(f"⚠️ {out_of_order} rows are dated before an earlier row of the same option; "
+              f"peak-to-date for recovery counts follows file order")
+
+    option_names = np.array(list(option_ids), dtype=object)
+    store = _build_store(
+        store_dir, spill_paths, rows_per_option.view()[:len(option_ids)], option_names,
+        methods, chunk_rows, sort_days=out_of_order > 0
+    )
+
+    peaks = pd.DataFrame(
+        running_peaks.view()[:len(option_ids)],
+        index=pd.Index(option_names, name='OptionName'),
+        columns=methods
+    )
+
+    recovery_counts = _recovery_counts_frame(
+        thresholds, methods, candidate_n, candidate_worthless, all_n, all_worthless, outcomes is not None
+    )
+
+    print(f"✓ Streamed {n_rows} probability records for {len(option_ids)} options "
+          f"(series store {store.nbytes / 1024 ** 2:.1f} MB, CSV {file_path.stat().st_size / 1024 ** 2:.1f} MB)")
+
+    return ProbabilityHistorySummary(peaks, store, recovery_counts, n_rows, out_of_order)
+
+
+def _build_store(
+    store_dir: Path,
+    spill_paths: List[Path],
+    rows_per_option: np.ndarray,
+    option_names: np.ndarray,
+    methods: List[str],
+    chunk_rows: int,
+    sort_days: bool
+) -> ProbabilitySeriesStore:
+    """
+    Arrange spilled rows into CSR order (counting sort by option id).
+
+    Rows are read back chunk by chunk and scattered into memory-mapped
+    output files, so anonymous memory stays proportional to chunk_rows (the
+    output pages are file-backed). Within an option, rows keep
+    file order unless sort_days is set, in which case options whose days
+    are out of order are sorted afterwards.
+    """
+    n_rows = int(rows_per_option.sum())
+    n_methods = len(methods)
+    offsets = np.zeros(len(rows_per_option) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(rows_per_option)
+
+    days_out = np.lib.format.open_memmap(store_dir / 'days.npy', mode='w+', dtype=np.int32, shape=(n_rows,))
+    values_out = np.lib.format.open_memmap(
+        store_dir / 'values.npy', mode='w+', dtype=np.float32, shape=(n_rows, n_methods)
+    )
+
+    if n_rows:
+        spill_files = [open(path, 'rb') for path in spill_paths]
+
+        next_free = offsets[:-1].copy()
+        for start in range(0, n_rows, chunk_rows):
+            stop = min(start + chunk_rows, n_rows)
+            ids, days, values = (
+                np.fromfile(spill_file, dtype=dtype, count=(stop - start) * width).reshape(stop - start, -1)
+                for spill_file, dtype, width in zip(spill_files, (np.int32, np.int32, np.float32), (1, 1, n_methods))
+            )
+            ids = ids[:, 0]
+            order = np.argsort(ids, kind='stable')
+            sorted_ids = ids[order]
+
+            # Destination = next free slot of the option + rank within this chunk
+            group_starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+            rank = np.arange(len(ids)) - np.repeat(group_starts, np.diff(np.r_[group_starts, len(ids)]))
+            destination = next_free[sorted_ids] + rank
+
+            days_out[destination] = days[order, 0]
+            values_out[destination] = values[order]
+            next_free += np.bincount(ids, minlength=len(next_free))
+            days_out.flush()
+            values_out.flush()
+
+        for spill_file in spill_files:
+            spill_file.close()
+
+    if sort_days:
+        for start in range(0, n_rows, chunk_rows):
+            stop = min(start + chunk_rows + 1, n_rows)
+            row_options = np.searchsorted(offsets, np.arange(start, stop), side='right') - 1
+            decreasing = (np.diff(days_out[start:stop]) < 0) & (row_options[1:] == row_options[:-1])
+            for option in np.unique(row_options[1:][decreasing]):
+                rows = slice(offsets[option], offsets[option + 1])
+                order = np.argsort(days_out[rows], kind='stable')
+                days_out[rows] = days_out[rows][order]
+                values_out[rows] = values_out[rows][order]
+        days_out.flush()
+        values_out.flush()
+
+    for path in spill_paths:
+        path.unlink(missing_ok=True)
+
+    _write_store_meta(store_dir, offsets, option_names, methods)
+
+    del days_out, values_out
+    return ProbabilitySeriesStore.open(store_dir)
+
+
+def _write_store_meta(store_dir: Path, offsets: np.ndarray, option_names: np.ndarray, methods: List[str]):
+    """Write the offsets, option names (id -> name) and methods next to days.npy / values.npy."""
+    np.save(store_dir / 'offsets.npy', offsets)
+    np.save(store_dir / 'option_names.npy', option_names.astype(str))
+    with open(store_dir / 'methods.json', 'w', encoding='utf-8') as f:
+        json.dump(list(methods), f)
+
+
+def _recovery_counts_frame(
+    thresholds: np.ndarray,
+    methods: List[str],
+    candidate_n: np.ndarray,
+    candidate_worthless: np.ndarray,
+    all_n: np.ndarray,
+    all_worthless: np.ndarray,
+    with_outcomes: bool
+) -> pd.DataFrame:
+    """Long-format recovery counts in recovery_report_data.csv layout."""
+    t, m, p, d = np.meshgrid(
+        np.arange(len(thresholds)), np.arange(len(methods)),
+        np.arange(len(PROBABILITY_BIN_LABELS)), np.arange(len(DTE_BIN_LABELS)),
+        indexing='ij'
+    )
+    t, m, p, d = t.ravel(), m.ravel(), p.ravel(), d.ravel()
+
+    counts = pd.DataFrame({
+        'DataType': 'scenario',
+        'Stock': '',
+        'HistoricalPeakThreshold': thresholds[t],
+        'ProbMethod': [RECOVERY_METHOD_NAMES.get(methods[i], methods[i]) for i in m],
+        'CurrentProb_Bin': np.array(PROBABILITY_BIN_LABELS, dtype=object)[p],
+        'DTE_Bin': np.array(DTE_BIN_LABELS, dtype=object)[d],
+        'RecoveryCandidate_N': candidate_n.ravel(),
+        'AllOptions_N': all_n[m, p, d]
+    })
+
+    if with_outcomes:
+        counts['RecoveryCandidate_WorthlessCount'] = candidate_worthless.ravel()
+        counts['AllOptions_WorthlessCount'] = all_worthless[m, p, d]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            counts['RecoveryCandidate_WorthlessRate_pct'] = (
+                counts['RecoveryCandidate_WorthlessCount'] / counts['RecoveryCandidate_N'] * 100
+            )
+            counts['AllOptions_WorthlessRate_pct'] = counts['AllOptions_WorthlessCount'] / counts['AllOptions_N'] * 100
+        counts['RecoveryAdvantage_pp'] = (
+            counts['RecoveryCandidate_WorthlessRate_pct'] - counts['AllOptions_WorthlessRate_pct']
+        )
+
+    return counts[counts['AllOptions_N'] > 0].reset_index(drop=True)
@@ -0,0 +1,249 @@
+"""
+Daily Top-K Selection and Rank Metrics
+
+This module answers "which are the best N options today?" for every day of
+a backtest and measures how well the ranking works:
+
+- Top-K per day by partial selection: np.partition finds each day's K-th
+  best score in linear time and only the K candidates are sorted. Ties at
+  the boundary are taken in row order, so the selection is deterministic.
+  An optional per-stock cap keeps at most N options of one stock; the
+  candidate set is widened until K options survive the cap.
+- Ranks are prefix positions, so several K (e.g. 5, 10, 20) are served by
+  one selection with the largest K.
+- Rank deciles per day come from np.partition at the nine decile positions
+  (no full sort), and metrics are aggregated with np.bincount.
+
+Usage:
+    from ranking import daily_top_k, rank_metrics
+
+    rows, ranks = daily_top_k(day_index, scores, k=10, stock_codes=codes, per_stock_cap=2)
+    selections, metrics, deciles = rank_metrics(results_df, ks=[5, 10, 20])
+
+Author: Put Options SE
+Date: February 2026
+"""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+N_DECILES = 10
+
+
+# ============================================================================
+# SELECTION
+# ============================================================================
+
+def _day_bounds(day_index: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Stable order of rows by day and the start of every day in it (plus the end)."""
+    order = np.argsort(day_index, kind='stable')
+    sorted_days = day_index[order]
+    starts = np.flatnonzero(np.r_[True, sorted_days[1:] != sorted_days[:-1]]) if len(order) else np.array([], int)
+    return order, np.r_[starts, len(order)]
+
+
+def _top_m(scores: np.ndarray, m: int) -> np.ndarray:
+    """Positions of the m best scores, best first, ties in position order (NaN never selected)."""
+    valid = np.flatnonzero(~np.isnan(scores))
+    m = min(m, len(valid))
+    if m == 0:
+        return valid[:0]
+    values = scores[valid]
+    threshold = np.partition(values, len(values) - m)[len(values) - m]
+    above = valid[values > threshold]
+    ties = valid[values == threshold][:m - len(above)]
+    candidates = np.concatenate([above, ties])
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+
+def _apply_cap(candidates: np.ndarray, stocks: np.ndarray, cap: int) -> np.ndarray:
+    """Drop candidates beyond the cap-th of their stock (candidates are in rank order)."""
+    by_stock = np.argsort(stocks[candidates], kind='stable')
+    sorted_stocks = stocks[candidates][by_stock]
+    first = np.searchsorted(sorted_stocks, sorted_stocks, side='left')
+    occurrence = np.empty(len(candidates), dtype=np.int64)
+    occurrence[by_stock] = np.arange(len(candidates)) - first
+    return candidates[occurrence < cap]
+
+
+def daily_top_k(
+    day_index: np.ndarray,
+    scores: np.ndarray,
+    k: int,
+    stock_codes: Optional[np.ndarray] = None,
+    per_stock_cap: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The k best-scoring rows of every day.
+
+    Args:
+        day_index: Day of every row (any sortable values)
+        scores: Score of every row (NaN rows are never selected)
+        k: Rows to select per day
+        stock_codes: Stock of every row (needed for per_stock_cap)
+        per_stock_cap: At most this many rows per stock and day
+
+    Returns:
+        Tuple of (row positions, rank within the day starting at 0), grouped
+        by day in day order and by rank within a day
+    """
+    if k < 1:
+        raise ValueError("k must be at least 1")
+    if per_stock_cap is not None and stock_codes is None:
+        raise ValueError("per_stock_cap needs stock_codes")
+
+    scores = np.asarray(scores, dtype=np.float64)
+    order, bounds = _day_bounds(np.asarray(day_index))
+    if per_stock_cap is not None:
+        stock_codes = pd.factorize(np.asarray(stock_codes, dtype=object))[0]
+
+    rows, ranks = [], []
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        day_rows = order[start:end]
+        day_scores = scores[day_rows]
+        m = k
+        while True:
+            selected = _top_m(day_scores, m)
+            if per_stock_cap is not None:
+                capped = _apply_cap(selected, stock_codes[day_rows], per_stock_cap)
+                # Widen the candidate set until k rows survive the cap
+                if len(capped) < k and len(selected) == m < len(day_rows):
+                    m = min(2 * m, len(day_rows))
+                    continue
+                selected = capped
+            break
+        selected = selected[:k]
+        rows.append(day_rows[selected])
+        ranks.append(np.arange(len(selected)))
+
+    if not rows:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    return np.concatenate(rows).astype(np.int64), np.concatenate(ranks).astype(np.int64)
+
+
+def daily_rank_deciles(day_index: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    """
+    Rank decile of every row within its day (0 = best tenth, NaN scores -> -1).
+
+    A row of rank r (0-based, best first) among n rows of its day is in
+    decile floor(10 r / n). The values at the decile boundary ranks
+    ceil(j n / 10) come from one np.partition per day; rows tied with a
+    boundary value fall into the worse decile.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    deciles = np.full(len(scores), -1, dtype=np.int64)
+    order, bounds = _day_bounds(np.asarray(day_index))
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        day_rows = order[start:end]
+        day_rows = day_rows[~np.isnan(scores[day_rows])]
+        n = len(day_rows)
+        if n == 0:
+            continue
+        values = -scores[day_rows]
+        positions = -(-np.arange(1, N_DECILES) * n // N_DECILES)
+        positions = positions[positions < n]
+        boundaries = np.partition(values, np.unique(positions))[positions] if len(positions) else positions
+        deciles[day_rows] = np.searchsorted(boundaries, values, side='right')
+    return deciles
+
+
+# ============================================================================
+# METRICS
+# ============================================================================
+
+def rank_metrics(
+    results_df: pd.DataFrame,
+    ks: List[int],
+    per_stock_cap: Optional[int] = None,
+    score_col: str = 'composite_score',
+    outcome_col: str = 'outcome',
+    premium_col: str = 'premium',
+    date_col: str = 'date',
+    stock_col: str = 'stock_name'
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Top-K selections and rank-based metrics over all days.
+
+    Args:
+        results_df: Backtest results
+        ks: K values (one selection with max(ks) serves all of them)
+        per_stock_cap: At most this many options per stock and day
+        score_col: Ranking score
+        outcome_col: Outcome column ('worthless' / 'ITM' / missing)
+        premium_col: Premium column
+        date_col: Day column
+        stock_col: Stock column (for per_stock_cap)
+
+    Returns:
+        Tuple of (selections, metrics, deciles)
+        - selections: rows in the top max(ks) of their day with a 1-based rank
+        - metrics: per K, precision@K (pooled and mean of daily values),
+          base hit rate, lift, mean premium and mean score of the selection
+        - deciles: per rank decile, count, hit rate, mean premium and score
+    """
+    ks = sorted({int(k) for k in ks})
+    if not ks or ks[0] < 1:
+        raise ValueError("ks must be positive integers")
+
+    day_index = pd.factorize(results_df[date_col], sort=True)[0]
+    n_days = int(day_index.max()) + 1 if len(day_index) else 0
+    scores = results_df[score_col].to_numpy(dtype=np.float64)
+    outcome = results_df[outcome_col]
+    settled = outcome.notna().to_numpy()
+    worthless = (outcome == 'worthless').to_numpy()
+    premium = results_df[premium_col].fillna(0).to_numpy(dtype=np.float64)
+
+    rows, ranks = daily_top_k(
+        day_index, scores, ks[-1],
+        stock_codes=results_df[stock_col].to_numpy() if per_stock_cap is not None else None,
+        per_stock_cap=per_stock_cap
+    )
+    selections = results_df.iloc[rows].copy()
+    selections.insert(1, 'rank', ranks + 1)
+
+    base_hit_rate = worthless.sum() / settled.sum() * 100 if settled.any() else np.nan
+    metrics = []
+    for k in ks:
+        chosen = rows[ranks < k]
+        days = day_index[chosen]
+        daily_settled = np.bincount(days, weights=settled[chosen], minlength=n_days)
+        daily_worthless = np.bincount(days, weights=worthless[chosen], minlength=n_days)
+        with_outcomes = daily_settled > 0
+        n_settled = int(daily_settled.sum())
+        metrics.append({
+            'k': k,
+            'days': int(len(np.unique(days))),
+            'selected': len(chosen),
+            'settled': n_settled,
+            'precision_at_k': daily_worthless.sum() / n_settled * 100 if n_settled else np.nan,
+            'precision_at_k_daily_mean': (
+                np.mean(daily_worthless[with_outcomes] / daily_settled[with_outcomes]) * 100
+                if with_outcomes.any() else np.nan
+            ),
+            'base_hit_rate': base_hit_rate,
+            'mean_premium': premium[chosen].mean() if len(chosen) else np.nan,
+            'mean_score': scores[chosen].mean() if len(chosen) else np.nan
+        })
+    metrics = pd.DataFrame(metrics)
+    metrics['lift'] = metrics['precision_at_k'] - metrics['base_hit_rate']
+
+    deciles = daily_rank_deciles(day_index, scores)
+    ranked = deciles >= 0
+    codes = deciles[ranked]
+    count = np.bincount(codes, minlength=N_DECILES)
+    decile_settled = np.bincount(codes, weights=settled[ranked], minlength=N_DECILES)
+    decile_worthless = np.bincount(codes, weights=worthless[ranked], minlength=N_DECILES)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        deciles_df = pd.DataFrame({
+            'rank_decile': np.arange(1, N_DECILES + 1),
+            'n': count,
+            'settled': decile_settled.astype(np.int64),
+            'hit_rate_pct': decile_worthless / decile_settled * 100,
+            'mean_premium': np.bincount(codes, weights=premium[ranked], minlength=N_DECILES) / count,
+            'mean_score': np.bincount(codes, weights=scores[ranked], minlength=N_DECILES) / count
+        })
+
+    return selections, metrics, deciles_df
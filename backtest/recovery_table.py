@@ -0,0 +1,210 @@
+"""
+Dense Recovery Rate Table with Per-Stock Fallback
+
+This module resolves recovery candidate worthless rates from
+recovery_report_data.csv for (stock, threshold, method, probability bin,
+DTE bin) keys ahead of time:
+
+- The per-stock rate is used when its RecoveryCandidate_N reaches a minimum
+  sample size
+- Otherwise (sparse or missing stock cell, or an unknown stock) the
+  aggregated scenario rate of the same bins is used
+
+The resolved rates are one dense float array indexed by integer codes of the
+five key dimensions (the last stock row holds the scenario rates), so a
+lookup for a whole panel is a code conversion per dimension and one gather.
+
+Usage:
+    from recovery_table import RecoveryTable
+
+    table = RecoveryTable.from_frame(recovery_df, min_n=30)
+    rates = table.lookup(stocks, 0.90, 'Bayesian Calibrated', prob_bins, dte_bins)
+
+Author: Put Options SE
+Date: February 2026
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Minimum RecoveryCandidate_N for a per-stock rate to be used
+DEFAULT_MIN_RECOVERY_N = 30
+
+# Values of the source array
+SOURCE_MISSING = 0
+SOURCE_SCENARIO = 1
+SOURCE_STOCK = 2
+
+KEY_COLUMNS = ['DataType', 'Stock', 'HistoricalPeakThreshold', 'ProbMethod', 'CurrentProb_Bin', 'DTE_Bin']
+
+
+class RecoveryTable:
+    """
+    Recovery rates (0-1) resolved per stock with scenario fallback.
+
+    Attributes:
+        stocks, thresholds, methods, prob_bins, dte_bins: Axis labels
+        rates: float64 array (stocks + 1, thresholds, methods, prob bins,
+            DTE bins); the last stock row holds the scenario rates
+        sources: int8 array of the same shape (SOURCE_* of every cell)
+        min_n: Minimum sample size the table was resolved with
+    """
+
+    def __init__(
+        self,
+        stocks: pd.Index,
+        thresholds: pd.Index,
+        methods: pd.Index,
+        prob_bins: pd.Index,
+        dte_bins: pd.Index,
+        rates: np.ndarray,
+        sources: np.ndarray,
+        min_n: int
+    ):
+        self.stocks = stocks
+        self.thresholds = thresholds
+        self.methods = methods
+        self.prob_bins = prob_bins
+        self.dte_bins = dte_bins
+        self.rates = rates
+        self.sources = sources
+        self.min_n = min_n
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the rate and source arrays and the axis labels."""
+        axes = (self.stocks, self.thresholds, self.methods, self.prob_bins, self.dte_bins)
+        return self.rates.nbytes + self.sources.nbytes + sum(axis.memory_usage(deep=True) for axis in axes)
+
+    @classmethod
+    def from_frame(cls, recovery_df: pd.DataFrame, min_n: int = DEFAULT_MIN_RECOVERY_N) -> 'RecoveryTable':
+        """
+        Build the table from recovery_report_data.csv rows.
+
+        Args:
+            recovery_df: Recovery data (KEY_COLUMNS, RecoveryCandidate_N and
+                RecoveryCandidate_WorthlessRate_pct)
+            min_n: Minimum RecoveryCandidate_N for a per-stock rate
+
+        Returns:
+            RecoveryTable
+        """
+        if min_n < 0:
+            raise ValueError("min_n must be non-negative")
+
+        recovery_df = recovery_df.assign(Stock=recovery_df['Stock'].fillna(''))
+        recovery_df = recovery_df.drop_duplicates(KEY_COLUMNS, keep='first')
+        is_stock = (recovery_df['DataType'] == 'stock').to_numpy()
+        is_scenario = (recovery_df['DataType'] == 'scenario').to_numpy()
+
+        stocks = pd.Index(np.unique(recovery_df.loc[is_stock, 'Stock'].to_numpy(dtype=object)), dtype=object)
+        axes = [
+            pd.Index(np.unique(recovery_df[column].to_numpy(dtype=dtype)), dtype=dtype)
+            for column, dtype in (
+                ('HistoricalPeakThreshold', np.float64),
+                ('ProbMethod', object),
+                ('CurrentProb_Bin', object),
+                ('DTE_Bin', object)
+            )
+        ]
+        shape = (len(stocks) + 1,) + tuple(len(axis) for axis in axes)
+
+        codes = [axis.get_indexer(recovery_df[column].to_numpy(dtype=axis.dtype))
+                 for axis, column in zip(axes, KEY_COLUMNS[2:])]
+        rate = recovery_df['RecoveryCandidate_WorthlessRate_pct'].to_numpy(dtype=np.float64) / 100
+        sample_size = recovery_df['RecoveryCandidate_N'].to_numpy(dtype=np.float64)
+
+        rates = np.full(shape, np.nan)
+        sources = np.full(shape, SOURCE_MISSING, dtype=np.int8)
+
+        # Scenario rates on every stock row (the fallback), then the stock
+        # cells with enough samples on top
+        scenario = np.full(shape[1:], np.nan)
+        scenario[tuple(c[is_scenario] for c in codes)] = rate[is_scenario]
+        rates[:] = scenario
+        sources[:] = np.where(np.isnan(scenario), SOURCE_MISSING, SOURCE_SCENARIO)
+
+        use_stock = is_stock & (sample_size >= min_n) & ~np.isnan(rate)
+        stock_codes = stocks.get_indexer(recovery_df.loc[use_stock, 'Stock'].to_numpy(dtype=object))
+        cells = (stock_codes,) + tuple(c[use_stock] for c in codes)
+        rates[cells] = rate[use_stock]
+        sources[cells] = SOURCE_STOCK
+
+        return cls(stocks, *axes, rates, sources, min_n)
+
+    def codes(self, stocks, threshold: float, prob_method: str, prob_bins, dte_bins) -> Optional[tuple]:
+        """
+        Integer codes of the lookup keys (None if threshold or method is unknown).
+
+        Stocks without per-stock rows (or stocks=None) map to the scenario
+        row; unknown bins map to -1.
+        """
+        threshold_code = self.thresholds.get_indexer([threshold])[0]
+        method_code = self.methods.get_indexer([prob_method])[0]
+        if threshold_code < 0 or method_code < 0:
+            return None
+
+        n = len(prob_bins)
+        if stocks is None:
+            stock_codes = np.full(n, len(self.stocks), dtype=np.intp)
+        else:
+            stock_codes = self.stocks.get_indexer(np.asarray(stocks, dtype=object))
+            stock_codes[stock_codes < 0] = len(self.stocks)
+
+        return (
+            stock_codes,
+            threshold_code,
+            method_code,
+            self.prob_bins.get_indexer(np.asarray(prob_bins, dtype=object)),
+            self.dte_bins.get_indexer(np.asarray(dte_bins, dtype=object))
+        )
+
+    def lookup(
+        self,
+        stocks,
+        threshold: float,
+        prob_method: str,
+        prob_bins,
+        dte_bins,
+        return_sources: bool = False
+    ):
+        """
+        Resolved recovery rates for many keys in one gather.
+
+        Args:
+            stocks: Sequence of stock names (None: scenario rates only)
+            threshold: Historical peak threshold (e.g., 0.90)
+            prob_method: Recovery method name (e.g., "Bayesian Calibrated")
+            prob_bins: Sequence of probability bin labels
+            dte_bins: Sequence of DTE bin labels
+            return_sources: Also return the SOURCE_* of every rate
+
+        Returns:
+            Array of rates (0-1), NaN where neither a stock nor a scenario
+            rate exists; with return_sources, a (rates, sources) tuple
+        """
+        n = len(prob_bins)
+        codes = self.codes(stocks, threshold, prob_method, prob_bins, dte_bins)
+        if codes is None:
+            rates, sources = np.full(n, np.nan), np.full(n, SOURCE_MISSING, dtype=np.int8)
+        else:
+            stock_codes, threshold_code, method_code, prob_codes, dte_codes = codes
+            found = (prob_codes >= 0) & (dte_codes >= 0)
+            index = (stock_codes, threshold_code, method_code, np.maximum(prob_codes, 0), np.maximum(dte_codes, 0))
+            rates = np.where(found, self.rates[index], np.nan)
+            sources = np.where(found, self.sources[index], SOURCE_MISSING).astype(np.int8)
+
+        return (rates, sources) if return_sources else rates
+
+    def coverage(self) -> Dict[str, float]:
+        """Share of stock cells resolved from per-stock rates and from the scenario fallback."""
+        stock_cells = self.sources[:-1]
+        total = stock_cells.size or 1
+        return {
+            'stock_pct': float((stock_cells == SOURCE_STOCK).sum() / total * 100),
+            'scenario_pct': float((stock_cells == SOURCE_SCENARIO).sum() / total * 100),
+            'missing_pct': float((stock_cells == SOURCE_MISSING).sum() / total * 100)
+        }
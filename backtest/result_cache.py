@@ -0,0 +1,235 @@
+"""
+Content-Addressed Backtest Result Cache
+
+This module stores backtest results and their analysis under a key that hashes
+everything the results depend on:
+
+- The run parameters (dates, rolling period, probability method, ...)
+- The scoring weights
+- The source code of the modules that produce the results
+- The fingerprints of the input data files (see DataLoader.get_fingerprints)
+
+A rerun with the same inputs returns the stored results instantly; any change
+to a parameter, the code or a data file gives a new key and therefore a miss.
+Entries are evicted by age and, above a size limit, least recently used
+first.
+
+Usage:
+    from result_cache import ResultCache
+
+    cache = ResultCache('cache/results', max_age_days=30, max_size_mb=1024)
+    key = cache.make_key(params, weights, data_loader.get_fingerprints())
+    hit = cache.get(key)
+    if hit is None:
+        cache.put(key, results_df, analysis, params)
+
+Author: Put Options SE
+Date: February 2026
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+
+# Bump when the stored entry layout changes
+CACHE_FORMAT_VERSION = 1
+
+# Modules whose code determines backtest results
+RESULT_SOURCE_FILES = [
+    'backtest_runner.py',
+    'scoring_engine.py',
+    'data_loader.py',
+    'sql_backend.py',
+    'probability_stream.py',
+    'data_snapshot.py',
+    'recovery_table.py',
+    'event_index.py',
+    'iv_screening.py',
+    'event_volatility.py',
+    'market_iv.py',
+    'sampling.py'
+]
+
+
+def source_fingerprint(source_dir: Optional[Path] = None, file_names: Optional[List[str]] = None) -> str:
+    """
+    Hash the source of the result-producing modules.
+
+    Args:
+        source_dir: Directory of the modules (default: this module's directory)
+        file_names: Module files to hash (default: RESULT_SOURCE_FILES)
+
+    Returns:
+        SHA-256 hex digest
+    """
+    source_dir = Path(source_dir) if source_dir else Path(__file__).resolve().parent
+    digest = hashlib.sha256()
+    for file_name in file_names or RESULT_SOURCE_FILES:
+        digest.update(file_name.encode('utf-8') + b'\0')
+        try:
+            digest.update((source_dir / file_name).read_bytes())
+        except OSError:
+            digest.update(b'<missing>')
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Stores backtest results keyed by a hash of their inputs.
+
+    Each entry is one pickle file (results DataFrame, analysis dict and the
+    parameters that produced them) named by its key. The file modification
+    time is refreshed on every hit and drives the LRU eviction.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = './cache/results',
+        max_age_days: Optional[float] = 30,
+        max_size_mb: Optional[float] = 1024
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory for cache entries (created if missing)
+            max_age_days: Entries older than this are evicted (None: no limit)
+            max_size_mb: Total size above which least recently used entries
+                are evicted (None: no limit)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_age_days = max_age_days
+        self.max_size = None if max_size_mb is None else int(max_size_mb * 1024 ** 2)
+
+    def make_key(self, params: Dict, weights: Dict[str, float], fingerprints: Dict[str, tuple]) -> str:
+        """
+        Build the cache key for a run.
+
+        Args:
+            params: Result-affecting run parameters (JSON serializable)
+            weights: Scoring weights
+            fingerprints: Table -> input file fingerprint
+
+        Returns:
+            SHA-256 hex digest
+        """
+        payload = {
+            'format': CACHE_FORMAT_VERSION,
+            'params': params,
+            'weights': weights,
+            'source': source_fingerprint(),
+            'inputs': fingerprints
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+
+    def get(self, key: str) -> Optional[Tuple[pd.DataFrame, Dict]]:
+        """
+        Look up stored results.
+
+        Args:
+            key: Output of make_key()
+
+        Returns:
+            Tuple of (results DataFrame, analysis dict), or None on a miss
+        """
+        path = self._path(key)
+        if self.max_age_days is not None and path.exists():
+            if time.time() - path.stat().st_mtime > self.max_age_days * 86400:
+                path.unlink(missing_ok=True)
+                return None
+
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError) as e:
+            print(f"⚠️ Dropping unreadable result cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        os.utime(path)
+        return entry['results'], entry['analysis']
+
+    def put(self, key: str, results_df: pd.DataFrame, analysis: Dict, params: Optional[Dict] = None) -> Path:
+        """
+        Store results and evict old entries.
+
+        Args:
+            key: Output of make_key()
+            results_df: Backtest results
+            analysis: Output of analyze_results
+            params: Run parameters (stored for inspection)
+
+        Returns:
+            Path of the entry
+        """
+        path = self._path(key)
+        tmp_path = path.with_name(path.name + '.tmp')
+        entry = {
+            'results': results_df,
+            'analysis': analysis,
+            'params': params,
+            'created': datetime.now().isoformat()
+        }
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(path)
+
+        self.evict()
+        return path
+
+    def evict(self) -> List[str]:
+        """
+        Remove expired entries, then least recently used ones above the size limit.
+
+        Returns:
+            Keys of the removed entries
+        """
+        now = time.time()
+        entries = []
+        for path in self.cache_dir.glob('*.pkl'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        removed = []
+        if self.max_age_days is not None:
+            expired = [e for e in entries if now - e[0] > self.max_age_days * 86400]
+            entries = [e for e in entries if now - e[0] <= self.max_age_days * 86400]
+            for _, _, path in expired:
+                path.unlink(missing_ok=True)
+                removed.append(path.stem)
+
+        if self.max_size is not None:
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_size:
+                    break
+                path.unlink(missing_ok=True)
+                removed.append(path.stem)
+                total -= size
+
+        return removed
+
+    def clear(self):
+        """Remove all entries."""
+        for path in self.cache_dir.glob('*.pkl'):
+            path.unlink(missing_ok=True)
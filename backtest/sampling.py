@@ -0,0 +1,241 @@
+"""
+Stratified Sampling of Backtest Option-Days
+
+This module lets a backtest score a small stratified sample of the
+(date, option) panel and still estimate the hit rates of a full run, with
+standard errors:
+
+- Strata are stock x DTE bin x probability bin (the bins of the recovery
+  table; options without a probability form their own bin)
+- Each stratum is sampled without replacement in proportion to its size,
+  with at least MIN_PER_STRATUM rows (all of them in smaller strata), so
+  every stratum is represented and its variance can be estimated
+- Every sampled row carries the weight N_h / n_h (rows of its stratum /
+  sampled rows), so weighted sums estimate full-panel totals
+- Hit rates of a domain (e.g. a score bucket) are ratio estimates over the
+  settled rows; their variance comes from the linearized residuals of the
+  ratio, summed over strata with the finite population correction
+
+The sample is drawn in one pass: a random permutation of the rows is
+stable-sorted by stratum and the first n_h of each stratum are kept - no
+per-stratum loop.
+
+Usage:
+    from sampling import sample_strata, stratified_sample, hit_rate_estimates
+
+    strata = sample_strata(panel['StockName'], panel['DaysToExpiry'], panel[method])
+    rows, weights = stratified_sample(strata, fraction=0.02, seed=0)
+    estimates = hit_rate_estimates(strata[rows], weights, settled, worthless, domains)
+
+Author: Put Options SE
+Date: February 2026
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scoring_engine import DTE_BIN_LABELS, PROBABILITY_BIN_LABELS, get_dte_bin_codes, get_probability_bin_codes
+
+
+# Rows sampled at least from every stratum (two are needed for its variance)
+MIN_PER_STRATUM = 2
+
+# Normal quantile of the reported confidence intervals (95%, two-sided)
+CONFIDENCE_Z = 1.96
+
+
+# ============================================================================
+# SAMPLING
+# ============================================================================
+
+def sample_strata(stock_names, days_to_expiry, probabilities) -> np.ndarray:
+    """
+    Stratum of every option-day: stock x DTE bin x probability bin.
+
+    Args:
+        stock_names: Stock of each row
+        days_to_expiry: Business days to expiry of each row
+        probabilities: Current probability of each row (NaN = own bin)
+
+    Returns:
+        Integer stratum codes 0..n_strata - 1, numbered in (stock, DTE bin,
+        probability bin) order
+    """
+    stock_codes = pd.factorize(np.asarray(stock_names, dtype=object), sort=True)[0].astype(np.int64)
+    dte_codes = get_dte_bin_codes(days_to_expiry)
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    probability_codes = np.where(
+        np.isnan(probabilities), len(PROBABILITY_BIN_LABELS), get_probability_bin_codes(probabilities)
+    )
+    n_probability_bins = len(PROBABILITY_BIN_LABELS) + 1
+
+    keys = (stock_codes * len(DTE_BIN_LABELS) + dte_codes) * n_probability_bins + probability_codes
+    return np.unique(keys, return_inverse=True)[1].reshape(-1)
+
+
+def stratified_sample(
+    strata: np.ndarray,
+    fraction: float,
+    seed: Optional[int] = None,
+    min_per_stratum: int = MIN_PER_STRATUM
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Proportional stratified sample without replacement.
+
+    Stratum h of N_h rows gets n_h = round(fraction x N_h) rows, at least
+    min_per_stratum and at most N_h.
+
+    Args:
+        strata: Stratum code of every row (see sample_strata)
+        fraction: Share of rows to sample, in (0, 1]
+        seed: Random seed (the same seed gives the same sample)
+        min_per_stratum: Minimum rows per stratum
+
+    Returns:
+        Tuple of (sampled row positions in ascending order, weight N_h / n_h
+        of each sampled row)
+    """
+    if not 0 < fraction <= 1:
+        raise ValueError(f"Sample fraction must be in (0, 1], got {fraction}")
+
+    strata = np.asarray(strata, dtype=np.int64)
+    counts = np.bincount(strata)
+    take = np.minimum(counts, np.maximum(np.round(fraction * counts), min_per_stratum)).astype(np.int64)
+
+    # Random order within each stratum (a stable sort of a random permutation); keep the first n_h
+    order = np.random.default_rng(seed).permutation(len(strata))
+    order = order[np.argsort(strata[order], kind='stable')]
+    sorted_strata = strata[order]
+    rank = np.arange(len(order)) - (np.cumsum(counts) - counts)[sorted_strata]
+    rows = np.sort(order[rank < take[sorted_strata]])
+
+    weights = counts[strata[rows]] / take[strata[rows]]
+    return rows, weights
+
+
+# ============================================================================
+# ESTIMATION
+# ============================================================================
+
+def _total_variance(strata: np.ndarray, weights: np.ndarray, z: np.ndarray) -> float:
+    """
+    Variance of the weighted total sum(w x z) under stratified sampling.
+
+    N_h is the sum of the weights of a stratum's rows and n_h their number;
+    strata with a single row add nothing (no within-stratum variance).
+    """
+    n = np.bincount(strata).astype(np.float64)
+    present = n > 0
+    size = np.bincount(strata, weights=weights)[present]
+    sums = np.bincount(strata, weights=z)[present]
+    squares = np.bincount(strata, weights=z * z)[present]
+    n = n[present]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        within = np.where(n > 1, (squares - sums * sums / n) / (n - 1), 0.0)
+        sampled = np.where(size > 0, n / size, 1.0)
+        return float(np.sum(size * size * (1 - np.minimum(sampled, 1)) * np.maximum(within, 0) / n))
+
+
+def weighted_quantile(values: np.ndarray, weights: np.ndarray, q: float) -> float:
+    """Smallest value whose weighted cumulative share reaches q (NaN values ignored)."""
+    valid = ~np.isnan(values)
+    values, weights = values[valid], weights[valid]
+    if len(values) == 0:
+        return np.nan
+    order = np.argsort(values, kind='stable')
+    cumulative = np.cumsum(weights[order])
+    return float(values[order][np.searchsorted(cumulative, q * cumulative[-1], side='left')])
+
+
+def hit_rate_estimates(
+    strata: np.ndarray,
+    weights: np.ndarray,
+    settled: np.ndarray,
+    worthless: np.ndarray,
+    domains: np.ndarray
+) -> pd.DataFrame:
+    """
+    Estimated full-panel hit rate of every domain, with standard errors.
+
+    The hit rate of a domain is the ratio estimate sum(w x worthless) /
+    sum(w x settled) over its rows. Its variance is that of the total of the
+    linearized residuals (worthless - rate x settled) / estimated settled
+    rows. Pass all sampled rows (settled or not), so each stratum's sample
+    size is complete.
+
+    Args:
+        strata: Stratum code of every sampled row
+        weights: Sampling weight of every row
+        settled: Rows with a known outcome
+        worthless: Rows that expired worthless
+        domains: Boolean matrix (rows x domains), e.g. one column per score bucket
+
+    Returns:
+        DataFrame with one row per domain: n (settled sampled rows),
+        estimated_n (settled rows in the full panel), hit_rate_pct,
+        std_error_pct, ci_low_pct and ci_high_pct (NaN for empty domains)
+    """
+    strata = np.asarray(strata, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+    settled = np.asarray(settled, dtype=bool)
+    worthless = np.asarray(worthless, dtype=bool) & settled
+    domains = np.asarray(domains, dtype=bool).reshape(len(strata), -1)
+
+    rows = []
+    for column in domains.T:
+        x = (column & settled).astype(np.float64)
+        y = (column & worthless).astype(np.float64)
+        estimated_n = np.sum(weights * x)
+        if estimated_n == 0:
+            rows.append({'n': 0, 'estimated_n': 0.0, 'hit_rate_pct': np.nan, 'std_error_pct': np.nan})
+            continue
+        rate = np.sum(weights * y) / estimated_n
+        std_error = np.sqrt(_total_variance(strata, weights, (y - rate * x) / estimated_n))
+        rows.append({
+            'n': int(x.sum()),
+            'estimated_n': estimated_n,
+            'hit_rate_pct': rate * 100,
+            'std_error_pct': std_error * 100
+        })
+
+    estimates = pd.DataFrame(rows, columns=['n', 'estimated_n', 'hit_rate_pct', 'std_error_pct'])
+    estimates['ci_low_pct'] = np.maximum(estimates['hit_rate_pct'] - CONFIDENCE_Z * estimates['std_error_pct'], 0)
+    estimates['ci_high_pct'] = np.minimum(estimates['hit_rate_pct'] + CONFIDENCE_Z * estimates['std_error_pct'], 100)
+    return estimates
+
+
+def spread_estimate(
+    strata: np.ndarray,
+    weights: np.ndarray,
+    settled: np.ndarray,
+    worthless: np.ndarray,
+    top: np.ndarray,
+    bottom: np.ndarray
+) -> Tuple[float, float]:
+    """
+    Hit rate difference of two domains (top - bottom, in percentage points).
+
+    The residuals of both ratios are combined before the variance, so the
+    covariance of the two estimates within strata is accounted for.
+
+    Returns:
+        Tuple of (spread, standard error)
+    """
+    strata = np.asarray(strata, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+    worthless = np.asarray(worthless, dtype=bool) & settled
+
+    z = np.zeros(len(strata))
+    rates = []
+    for sign, domain in ((1, top), (-1, bottom)):
+        x = (domain & settled).astype(np.float64)
+        y = (domain & worthless).astype(np.float64)
+        estimated_n = np.sum(weights * x)
+        if estimated_n == 0:
+            return np.nan, np.nan
+        rates.append(np.sum(weights * y) / estimated_n)
+        z += sign * (y - rates[-1] * x) / estimated_n
+    return (rates[0] - rates[1]) * 100, np.sqrt(_total_variance(strata, weights, z)) * 100
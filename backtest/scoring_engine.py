@@ -22,6 +22,8 @@ from typing import Dict, Optional, Tuple
 from datetime import datetime
 import math
 
+import numpy as np
+
 
 # ============================================================================
 # HELPER FUNCTIONS
@@ -75,12 +77,109 @@ def get_dte_bin(days_to_expiry: int) -> str:
         return '36+'
 
 
+# Bin labels in code order, with the upper edges used by the vectorized helpers.
+# Probability bins are half-open [lower, upper); DTE bins are closed (<= upper).
+PROBABILITY_BIN_LABELS = ['<50%', '50-60%', '60-70%', '70-80%', '80-90%', '90%+']
+PROBABILITY_BIN_EDGES = np.array([0.5, 0.6, 0.7, 0.8, 0.9])
+
+DTE_BIN_LABELS = ['0-7', '8-14', '15-21', '22-28', '29-35', '36+']
+DTE_BIN_EDGES = np.array([7, 14, 21, 28, 35])
+
+
+def get_probability_bin_codes(probs: np.ndarray) -> np.ndarray:
+    """
+    Vectorized get_probability_bin returning integer codes.
+
+    Args:
+        probs: Array of probabilities (0-1 range)
+
+    Returns:
+        Array of indexes into PROBABILITY_BIN_LABELS
+    """
+    return np.searchsorted(PROBABILITY_BIN_EDGES, np.asarray(probs, dtype=np.float64), side='right')
+
+
+def get_dte_bin_codes(days_to_expiry: np.ndarray) -> np.ndarray:
+    """
+    Vectorized get_dte_bin returning integer codes.
+
+    Args:
+        days_to_expiry: Array of business days until expiration
+
+    Returns:
+        Array of indexes into DTE_BIN_LABELS
+    """
+    return np.searchsorted(DTE_BIN_EDGES, np.asarray(days_to_expiry, dtype=np.float64), side='left')
+
+
+# ============================================================================
+# SCORE BREAKDOWN
+# ============================================================================
+
+# Factors in breakdown order (keys of ScoringEngine.DEFAULT_WEIGHTS)
+FACTOR_NAMES = [
+    'support_strength', 'days_since_break', 'recovery_advantage',
+    'historical_peak', 'monthly_seasonality', 'current_performance'
+]
+
+# NormalizationResult.data_status values, indexed by the breakdown 'status' code
+DATA_STATUS_LABELS = ['unavailable', 'available', 'insufficient']
+
+# Per-factor record of the batch breakdown (26 bytes; NaN raw = no input)
+FACTOR_BREAKDOWN_DTYPE = np.dtype([
+    ('raw', np.float64),
+    ('normalized', np.float64),
+    ('weighted', np.float64),
+    ('has_data', np.bool_),
+    ('status', np.uint8)
+])
+
+# One record per scored option: breakdown[factor]['weighted'] etc.
+BREAKDOWN_DTYPE = np.dtype([(factor, FACTOR_BREAKDOWN_DTYPE) for factor in FACTOR_NAMES])
+
+
+def breakdown_to_dict(breakdown: np.ndarray, row: Optional[int] = None) -> Dict:
+    """
+    Convert a batch breakdown (BREAKDOWN_DTYPE array) to the legacy dicts.
+
+    Args:
+        breakdown: Structured array from ScoringEngine.calculate_scores_batch
+        row: Row to convert; None converts the whole array
+
+    Returns:
+        For a row, the calculate_score breakdown (factor -> raw, normalized,
+        weighted, has_data, data_status; raw is None without input).
+        Without a row, factor -> dict of arrays (raw, normalized, weighted,
+        has_data).
+    """
+    if row is None:
+        return {
+            factor: {field: breakdown[factor][field] for field in ('raw', 'normalized', 'weighted', 'has_data')}
+            for factor in breakdown.dtype.names
+        }
+
+    record = breakdown[row]
+    result = {}
+    for factor in breakdown.dtype.names:
+        raw = float(record[factor]['raw'])
+        result[factor] = {
+            'raw': None if math.isnan(raw) else raw,
+            'normalized': float(record[factor]['normalized']),
+            'weighted': float(record[factor]['weighted']),
+            'has_data': bool(record[factor]['has_data']),
+            'data_status': DATA_STATUS_LABELS[record[factor]['status']]
+        }
+    return result
+
+
 # ============================================================================
 # NORMALIZATION FUNCTIONS
 # ============================================================================
 
 class NormalizationResult:
     """Result of normalizing a factor."""
+    __slots__ = ('normalized', 'has_data', 'data_status')
+
     def __init__(self, normalized: float, has_data: bool, data_status: str):
         self.normalized = normalized
         self.has_data = has_data
@@ -454,6 +553,114 @@ class ScoringEngine:
 
         return composite_score, score_breakdown
 
+    def calculate_scores_batch(
+        self,
+        support_strength_score: np.ndarray,
+        days_since_last_break: np.ndarray,
+        trading_days_per_break: np.ndarray,
+        current_probability: np.ndarray,
+        historical_peak_probability: np.ndarray,
+        historical_peak_threshold: float,
+        recovery_advantage: np.ndarray,
+        monthly_positive_rate: np.ndarray,
+        monthly_avg_return: np.ndarray,
+        typical_low_day: np.ndarray,
+        current_day,
+        current_month_performance: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate composite scores for many options at once.
+
+        Vectorized equivalent of calculate_score: every argument is an array
+        (or scalar) with NaN wherever the scalar path would receive None.
+
+        Args:
+            Same as calculate_score, as arrays
+
+        Returns:
+            Tuple of (composite_scores, score_breakdown)
+            - composite_scores: float array (0-100)
+            - score_breakdown: BREAKDOWN_DTYPE structured array, one record
+              per option (breakdown['recovery_advantage']['weighted'] is an
+              array); breakdown_to_dict converts it for display
+        """
+        def as_array(values):
+            return np.asarray(values, dtype=np.float64)
+
+        support_strength_score = as_array(support_strength_score)
+        days_since_last_break = as_array(days_since_last_break)
+        trading_days_per_break = as_array(trading_days_per_break)
+        current_probability = as_array(current_probability)
+        historical_peak_probability = as_array(historical_peak_probability)
+        recovery_advantage = as_array(recovery_advantage)
+        monthly_positive_rate = as_array(monthly_positive_rate)
+        monthly_avg_return = as_array(monthly_avg_return)
+        typical_low_day = as_array(typical_low_day)
+        current_day = as_array(current_day)
+        current_month_performance = as_array(current_month_performance)
+
+        n = len(current_probability)
+        normalized = {}
+        has_data = {}
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Support strength: already 0-100
+            has_data['support_strength'] = ~np.isnan(support_strength_score)
+            normalized['support_strength'] = np.clip(support_strength_score, 0, 100)
+
+            # Days since break: (days / avgGap) * 50, avgGap defaults to 30
+            avg_gap = np.where(np.isnan(trading_days_per_break), 30.0, trading_days_per_break)
+            has_data['days_since_break'] = ~np.isnan(days_since_last_break)
+            normalized['days_since_break'] = np.clip(days_since_last_break / avg_gap * 50, 0, 100)
+
+            # Recovery advantage: rate * 100
+            has_data['recovery_advantage'] = ~np.isnan(recovery_advantage)
+            normalized['recovery_advantage'] = np.clip(recovery_advantage * 100, 0, 100)
+
+            # Historical peak: 30 below threshold, otherwise 50 + drop * 200
+            peak_available = ~np.isnan(historical_peak_probability) & (self.weights['historical_peak'] != 0)
+            drop = historical_peak_probability - current_probability
+            has_data['historical_peak'] = peak_available
+            normalized['historical_peak'] = np.where(
+                historical_peak_probability < historical_peak_threshold,
+                30.0,
+                np.minimum(100, 50 + drop * 200)
+            )
+
+            # Seasonality: positive rate + 10 within 3 days of the typical low day
+            near_low = np.abs(current_day - typical_low_day) <= 3
+            has_data['monthly_seasonality'] = ~np.isnan(monthly_positive_rate)
+            normalized['monthly_seasonality'] = np.minimum(100, monthly_positive_rate + np.where(near_low, 10, 0))
+
+            # Current performance: 50 + underperformance * 10
+            has_data['current_performance'] = ~np.isnan(current_month_performance) & ~np.isnan(monthly_avg_return)
+            normalized['current_performance'] = np.clip(
+                50 + (monthly_avg_return - current_month_performance) * 10, 0, 100
+            )
+
+        raw = {
+            'support_strength': support_strength_score,
+            'days_since_break': days_since_last_break,
+            'recovery_advantage': recovery_advantage,
+            'historical_peak': historical_peak_probability,
+            'monthly_seasonality': monthly_positive_rate,
+            'current_performance': current_month_performance
+        }
+
+        score_breakdown = np.empty(n, dtype=BREAKDOWN_DTYPE)
+        composite_scores = np.zeros(n)
+
+        for factor in FACTOR_NAMES:
+            record = score_breakdown[factor]
+            record['raw'] = raw[factor]
+            record['normalized'] = np.where(has_data[factor], normalized[factor], 0.0)
+            record['weighted'] = record['normalized'] * (self.weights[factor] / 100)
+            record['has_data'] = has_data[factor]
+            record['status'] = has_data[factor]  # 1 = 'available', 0 = 'unavailable'
+            composite_scores += record['weighted']
+
+        return composite_scores, score_breakdown
+
     def get_score_interpretation(self, score: float) -> str:
         """
         Get interpretation of composite score.
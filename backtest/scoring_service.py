@@ -0,0 +1,545 @@
+"""
+Scoring Service for Automated Recommendations
+
+This script runs a long-lived local HTTP/JSON service that keeps the data
+tables and their lookup indexes warm, so consumers can score options without
+re-parsing every CSV.
+
+Endpoints:
+    GET  /health            - Service status and data timestamp
+    GET  /score?option=NAME - Score one option (default settings)
+    POST /score             - Score one option ("option") or a list ("options")
+    POST /score/universe    - Score every option in data.csv
+    POST /reload            - Reload data now
+
+POST bodies may override the scoring settings:
+    {"options": ["AAK6U184"], "weights": {...}, "probability_method": "...",
+     "historical_peak_threshold": 0.9, "rolling_period": 365}
+
+Concurrent /score requests are collected by a batcher and scored together
+with one vectorized ScoringEngine call per settings group. Data is reloaded
+automatically when a data file (or data/last_updated.json) changes.
+
+Usage:
+    python scoring_service.py --data-dir ../data --port 8765
+
+Author: Put Options SE
+Date: February 2026
+"""
+
+import argparse
+import json
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DataLoader, PROBABILITY_METHODS
+from scoring_engine import ScoringEngine, breakdown_to_dict
+
+# Settings a request may choose (the --rolling-period and
+# --historical-peak-threshold choices); each one is a cached input set
+ROLLING_PERIODS = [30, 90, 180, 270, 365]
+HISTORICAL_PEAK_THRESHOLDS = [0.80, 0.90, 0.95]
+
+
+# ============================================================================
+# SERVICE STATE
+# ============================================================================
+
+class _ServiceState:
+    """
+    One warm, immutable-after-build view of the data.
+
+    A reload builds a new state and swaps it in, so requests in flight keep
+    using the state they started with. States share one DataLoader, so
+    tables that did not change are not re-read.
+    """
+
+    def __init__(self, loader: DataLoader, as_of: Optional[datetime], lock: threading.RLock):
+        self.loader = loader
+        self.as_of = pd.Timestamp(as_of or datetime.now()).normalize()
+        self.options = self.loader.load_options_data().reset_index(drop=True)
+        self.positions = pd.Series(np.arange(len(self.options)), index=self.options['OptionName'])
+        self.positions = self.positions[~self.positions.index.duplicated(keep='first')]
+        # Result fields of every option, sliced by position when formatting
+        self.option_names = self.options['OptionName'].to_numpy()
+        self.stock_names = self.options['StockName'].to_numpy()
+        self.strike_prices = self.options['StrikePrice'].to_numpy(dtype=np.float64)
+        self.expiry_dates = self.options['ExpiryDate'].dt.strftime('%Y-%m-%d').to_numpy()
+        self.last_updated = loader._get_last_updated()
+        self._inputs: Dict[Tuple, Dict[str, np.ndarray]] = {}
+        # Shared with reloads, which mutate the loader
+        self._inputs_lock = lock
+
+    def inputs(self, rolling_period: int, probability_method: str, threshold: float) -> Dict[str, np.ndarray]:
+        """Raw scoring inputs for the whole universe (cached per settings)."""
+        key = (rolling_period, probability_method, threshold)
+        with self._inputs_lock:
+            if key not in self._inputs:
+                frame = self.loader.get_scoring_inputs(
+                    self.options,
+                    self.as_of,
+                    rolling_period=rolling_period,
+                    probability_method=probability_method,
+                    historical_peak_threshold=threshold
+                )
+                self._inputs[key] = {column: frame[column].to_numpy() for column in frame.columns}
+            return self._inputs[key]
+
+
+def _json_value(value):
+    """Convert numpy scalars and NaN to JSON-safe values."""
+    if isinstance(value, (np.floating, float)):
+        value = float(value)
+        return None if math.isnan(value) or math.isinf(value) else value
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.bool_):
+        return bool(value)
+    return value
+
+
+# ============================================================================
+# SCORING SERVICE
+# ============================================================================
+
+class ScoringService:
+    """
+    Keeps data warm and scores options with vectorized ScoringEngine calls.
+    """
+
+    def __init__(
+        self,
+        data_dir: str = '../data',
+        rolling_period: int = 365,
+        probability_method: str = 'ProbWorthless_Bayesian_IsoCal',
+        historical_peak_threshold: float = 0.90,
+        as_of: Optional[datetime] = None
+    ):
+        """
+        Initialize service and load data.
+
+        Args:
+            data_dir: Path to data directory
+            rolling_period: Default support level rolling period
+            probability_method: Default probability method
+            historical_peak_threshold: Default historical peak threshold
+            as_of: Scoring date (default: today, refreshed on reload)
+        """
+        self.data_dir = Path(data_dir)
+        self.defaults = {
+            'rolling_period': rolling_period,
+            'probability_method': probability_method,
+            'historical_peak_threshold': historical_peak_threshold,
+            'weights': None
+        }
+        self.as_of = as_of
+        self._engines: Dict[Tuple, ScoringEngine] = {}
+        self._reload_lock = threading.RLock()
+        self.loader = DataLoader(str(self.data_dir))
+        self.loader.preload()
+        self.state = _ServiceState(self.loader, as_of, self._reload_lock)
+        # Warm the default settings so the first request does not pay for it
+        self.state.inputs(rolling_period, probability_method, historical_peak_threshold)
+
+    def settings_key(self, request: dict) -> Tuple:
+        """Normalized, hashable scoring settings of a request."""
+        settings = {k: request.get(k, v) if request.get(k) is not None else v for k, v in self.defaults.items()}
+
+        rolling_period = int(settings['rolling_period'])
+        if rolling_period not in ROLLING_PERIODS:
+            raise ValueError(f"rolling_period must be one of {ROLLING_PERIODS}, got {rolling_period}")
+
+        method = settings['probability_method']
+        if method not in PROBABILITY_METHODS:
+            raise ValueError(f"Unknown probability_method '{method}'")
+
+        threshold = float(settings['historical_peak_threshold'])
+        if threshold not in HISTORICAL_PEAK_THRESHOLDS:
+            raise ValueError(
+                f"historical_peak_threshold must be one of {HISTORICAL_PEAK_THRESHOLDS}, got {threshold}"
+            )
+
+        weights = settings['weights']
+        if weights is not None:
+            if not isinstance(weights, dict):
+                raise ValueError("'weights' must be an object of factor weights")
+            unknown = set(weights) - set(ScoringEngine.DEFAULT_WEIGHTS)
+            if unknown:
+                raise ValueError(f"Unknown weight factors: {sorted(unknown)}")
+            # Factors missing from a custom weight set count as 0
+            weights = tuple(sorted((f, float(weights.get(f, 0))) for f in ScoringEngine.DEFAULT_WEIGHTS))
+
+        return rolling_period, method, threshold, weights
+
+    def _engine(self, weights: Optional[Tuple]) -> ScoringEngine:
+        if weights not in self._engines:
+            self._engines[weights] = ScoringEngine(None if weights is None else dict(weights))
+        return self._engines[weights]
+
+    def score_positions(
+        self,
+        positions: np.ndarray,
+        settings: Tuple,
+        state: Optional[_ServiceState] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score options by row position with one vectorized call.
+
+        Args:
+            positions: Row positions in the options table
+            settings: Output of settings_key()
+            state: State to use (default: current)
+
+        Returns:
+            Tuple of (composite_scores, score_breakdown structured array) for those rows
+        """
+        state = state or self.state
+        rolling_period, method, threshold, weights = settings
+        inputs = state.inputs(rolling_period, method, threshold)
+        selected = {name: values[positions] for name, values in inputs.items()}
+        return self._engine(weights).calculate_scores_batch(historical_peak_threshold=threshold, **selected)
+
+    def format_results(
+        self,
+        positions: np.ndarray,
+        scores: np.ndarray,
+        breakdown: np.ndarray,
+        state: _ServiceState,
+        include_breakdown: bool = True
+    ) -> List[dict]:
+        """Build JSON-ready result dicts for scored rows."""
+        engine = self._engine(None)
+        option_names = state.option_names[positions]
+        stock_names = state.stock_names[positions]
+        strike_prices = state.strike_prices[positions]
+        expiry_dates = state.expiry_dates[positions]
+        results = []
+
+        for i in range(len(positions)):
+            result = {
+                'option_name': option_names[i],
+                'stock_name': stock_names[i],
+                'strike_price': _json_value(strike_prices[i]),
+                'expiry_date': _json_value(expiry_dates[i]),
+                'composite_score': _json_value(scores[i]),
+                'interpretation': engine.get_score_interpretation(scores[i])
+            }
+            if include_breakdown:
+                result['breakdown'] = breakdown_to_dict(breakdown, i)
+            results.append(result)
+
+        return results
+
+    def score_universe(self, request: dict) -> List[dict]:
+        """Score every option, highest composite score first."""
+        state = self.state
+        settings = self.settings_key(request)
+        positions = np.arange(len(state.options))
+        scores, breakdown = self.score_positions(positions, settings, state)
+
+        order = np.argsort(-scores, kind='stable')
+        min_score = request.get('min_score')
+        if min_score is not None:
+            order = order[scores[order] >= float(min_score)]
+
+        return self.format_results(
+            positions[order],
+            scores[order],
+            breakdown[order],
+            state,
+            include_breakdown=bool(request.get('include_breakdown', False))
+        )
+
+    def reload_if_changed(self, force: bool = False) -> bool:
+        """
+        Rebuild the warm state if any loaded data file changed.
+
+        Only the changed tables are re-read (see DataLoader.refresh).
+
+        Args:
+            force: Rebuild even if no file changed
+
+        Returns:
+            True if the state was rebuilt
+        """
+        with self._reload_lock:
+            changed = self.loader.refresh()
+            if not force and not changed:
+                return False
+
+            new_state = _ServiceState(self.loader, self.as_of, self._reload_lock)
+            rolling_period, method, threshold, _ = self.settings_key({})
+            new_state.inputs(rolling_period, method, threshold)
+
+            self.state = new_state
+            print(f"✓ Reloaded {len(new_state.options)} options")
+            return True
+
+
+# ============================================================================
+# REQUEST BATCHING
+# ============================================================================
+
+class RequestBatcher:
+    """
+    Collects concurrent score requests and scores them together.
+
+    The worker waits up to max_wait_ms after the first request for more to
+    arrive, groups the batch by scoring settings and makes one vectorized call
+    per group.
+    """
+
+    def __init__(self, service: ScoringService, max_batch: int = 512, max_wait_ms: float = 2.0):
+        self.service = service
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: queue.Queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name='score-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, option_names: List[str], request: dict) -> Future:
+        """
+        Queue a score request.
+
+        Args:
+            option_names: Options to score
+            request: Request body with optional settings
+
+        Returns:
+            Future resolving to a list of result dicts (None for unknown options)
+        """
+        future: Future = Future()
+        try:
+            settings = self.service.settings_key(request)
+        except ValueError as e:
+            future.set_exception(e)
+            return future
+
+        include_breakdown = bool(request.get('include_breakdown', True))
+        self._queue.put((option_names, settings, include_breakdown, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self._score_batch(batch)
+            except Exception as e:
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _score_batch(self, batch: list):
+        state = self.service.state
+        groups: Dict[Tuple, list] = {}
+        for item in batch:
+            groups.setdefault(item[1], []).append(item)
+
+        for settings, items in groups.items():
+            # Resolve names to row positions; unknown names become -1
+            positions_per_request = [
+                state.positions.reindex(names).fillna(-1).to_numpy(dtype=np.int64)
+                for names, *_ in items
+            ]
+            all_positions = np.concatenate(positions_per_request)
+            known = all_positions >= 0
+            scores, breakdown = self.service.score_positions(all_positions[known], settings, state)
+
+            # Split the vectorized result back to each request
+            offset = 0
+            known_offset = 0
+            for (names, _, include_breakdown, future), positions in zip(items, positions_per_request):
+                request_known = known[offset:offset + len(positions)]
+                n_known = int(request_known.sum())
+                window = slice(known_offset, known_offset + n_known)
+                formatted = iter(self.service.format_results(
+                    positions[request_known],
+                    scores[window],
+                    breakdown[window],
+                    state,
+                    include_breakdown
+                ))
+                future.set_result([next(formatted) if is_known else None for is_known in request_known])
+                offset += len(positions)
+                known_offset += n_known
+
+
+# ============================================================================
+# HTTP LAYER
+# ============================================================================
+
+def make_handler(service: ScoringService, batcher: RequestBatcher):
+    """Create a request handler class bound to a service."""
+
+    class ScoringRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            # Per-request logging would dominate at high request rates
+            pass
+
+        def _send(self, status: int, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_json(self) -> dict:
+            length = int(self.headers.get('Content-Length') or 0)
+            if length == 0:
+                return {}
+            request = json.loads(self.rfile.read(length))
+            if not isinstance(request, dict):
+                raise ValueError("Body must be a JSON object")
+            return request
+
+        def _score(self, names: List[str], request: dict, single: bool):
+            results = batcher.submit(names, request).result()
+            if single:
+                if results[0] is None:
+                    self._send(404, {'error': f"Unknown option '{names[0]}'"})
+                else:
+                    self._send(200, results[0])
+            else:
+                self._send(200, {'results': results})
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            try:
+                if url.path == '/health':
+                    state = service.state
+                    self._send(200, {
+                        'status': 'ok',
+                        'options': len(state.options),
+                        'as_of': str(state.as_of.date()),
+                        'last_updated': state.last_updated
+                    })
+                elif url.path == '/score':
+                    query = parse_qs(url.query)
+                    if 'option' not in query:
+                        self._send(400, {'error': "Missing 'option' query parameter"})
+                        return
+                    self._score(query['option'][:1], {}, single=True)
+                else:
+                    self._send(404, {'error': f"Unknown path {url.path}"})
+            except ValueError as e:
+                self._send(400, {'error': str(e)})
+            except Exception as e:
+                # Any other failure still gets a JSON response instead of a dropped connection
+                self._send(500, {'error': f"{type(e).__name__}: {e}"})
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            try:
+                request = self._read_json()
+                if url.path == '/score':
+                    if 'option' in request:
+                        if not isinstance(request['option'], str):
+                            self._send(400, {'error': "'option' must be an option name"})
+                            return
+                        self._score([request['option']], request, single=True)
+                    elif 'options' in request:
+                        names = request['options']
+                        if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+                            self._send(400, {'error': "'options' must be a list of option names"})
+                            return
+                        self._score(names, request, single=False)
+                    else:
+                        self._send(400, {'error': "Body needs 'option' or 'options'"})
+                elif url.path == '/score/universe':
+                    self._send(200, {'results': service.score_universe(request)})
+                elif url.path == '/reload':
+                    service.reload_if_changed(force=True)
+                    self._send(200, {'status': 'reloaded', 'options': len(service.state.options)})
+                else:
+                    self._send(404, {'error': f"Unknown path {url.path}"})
+            except ValueError as e:
+                self._send(400, {'error': str(e)})
+            except Exception as e:
+                # Any other failure still gets a JSON response instead of a dropped connection
+                self._send(500, {'error': f"{type(e).__name__}: {e}"})
+
+    return ScoringRequestHandler
+
+
+def _watch_for_updates(service: ScoringService, interval: float):
+    """Poll the data files and reload when they change."""
+    while True:
+        time.sleep(interval)
+        try:
+            service.reload_if_changed()
+        except Exception as e:
+            print(f"⚠️ Reload failed, keeping previous data: {e}")
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Serve option scores over a local HTTP/JSON API')
+    parser.add_argument('--data-dir', type=str, default='../data', help='Path to data directory (default: ../data)')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Bind address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port (default: 8765)')
+    parser.add_argument('--rolling-period', type=int, default=365, choices=ROLLING_PERIODS,
+                        help='Default rolling period for support levels (default: 365)')
+    parser.add_argument('--probability-method', type=str, default='ProbWorthless_Bayesian_IsoCal',
+                        choices=PROBABILITY_METHODS, help='Default probability method')
+    parser.add_argument('--historical-peak-threshold', type=float, default=0.90, choices=HISTORICAL_PEAK_THRESHOLDS,
+                        help='Default historical peak threshold (default: 0.90)')
+    parser.add_argument('--reload-interval', type=float, default=30.0,
+                        help='Seconds between checks for changed data files (default: 30)')
+    parser.add_argument('--max-batch', type=int, default=512, help='Maximum requests per scoring batch')
+    parser.add_argument('--max-wait-ms', type=float, default=2.0,
+                        help='How long to wait for more requests before scoring a batch (default: 2)')
+    return parser.parse_args()
+
+
+def main():
+    """Main entry point."""
+    args = parse_args()
+
+    service = ScoringService(
+        args.data_dir,
+        rolling_period=args.rolling_period,
+        probability_method=args.probability_method,
+        historical_peak_threshold=args.historical_peak_threshold
+    )
+    batcher = RequestBatcher(service, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+
+    watcher = threading.Thread(target=_watch_for_updates, args=(service, args.reload_interval), daemon=True)
+    watcher.start()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service, batcher))
+    print(f"✓ Scoring service listening on http://{args.host}:{args.port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down")
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
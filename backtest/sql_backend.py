@@ -0,0 +1,543 @@
+"""
+Embedded SQL Backend for DataLoader
+
+This module provides SQLDataLoader, a DataLoader that imports the data files
+into an embedded database (DuckDB if installed, otherwise SQLite from the
+standard library) and answers lookups and the backtest panel join with SQL.
+Filters on dates, stocks and options are pushed into the queries, so only the
+requested rows are materialized in pandas.
+
+The database is kept next to the backtest (default: ./cache/) and a table is
+re-imported only when its file fingerprint changes (see DataLoader.refresh).
+
+Usage:
+    from sql_backend import SQLDataLoader
+
+    loader = SQLDataLoader('../data')
+    panel = loader.get_backtest_panel('2025-12-01', '2026-01-17')
+
+Author: Put Options SE
+Date: February 2026
+"""
+
+import json
+import math
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Union
+
+import numpy as np
+import pandas as pd
+
+from data_loader import (
+    DataLoader,
+    PANEL_OPTION_COLUMNS,
+    PROBABILITY_METHODS,
+    TABLE_SPECS,
+    month_to_date_performance
+)
+
+try:
+    import duckdb
+    HAS_DUCKDB = True
+except ImportError:
+    HAS_DUCKDB = False
+
+
+# Tables imported into the database and the indexes created on them
+SQL_INDEXES = {
+    'options': [['StockName'], ['ExpiryDate']],
+    'support': [['stock_name', 'rolling_period']],
+    'probability_history': [['OptionName', 'Update_date'], ['Update_date']],
+    'recovery': [['DataType', 'HistoricalPeakThreshold', 'ProbMethod']],
+    'stock_data': [['name', 'date'], ['date']]
+}
+
+# Rows per chunk when importing CSV files into SQLite
+IMPORT_CHUNK_ROWS = 250_000
+
+# Values per IN (...) list (SQLite limits bound parameters per statement)
+MAX_IN_VALUES = 900
+
+# Calendar-day difference between two date columns, per engine
+DATE_DIFF_SQL = {
+    'sqlite': "(julianday({end}) - julianday({start}))",
+    'duckdb': "date_diff('day', {start}, {end})"
+}
+
+
+# ============================================================================
+# HELPER FUNCTIONS
+# ============================================================================
+
+def quote(identifier: str) -> str:
+    """Quote a column or table name (names like 1_ProbOfWorthless_Original need it)."""
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _check_method(probability_method: str):
+    """Probability columns are interpolated into SQL, so only known names are allowed."""
+    if probability_method not in PROBABILITY_METHODS:
+        raise ValueError(f"Unknown probability method '{probability_method}'. Valid: {PROBABILITY_METHODS}")
+
+
+# ============================================================================
+# SQL DATA LOADER
+# ============================================================================
+
+class SQLDataLoader(DataLoader):
+    """
+    DataLoader that serves lookups from an embedded SQL database.
+
+    Lookups over support metrics, probability history, recovery data and
+    stock prices, and the backtest panel, are SQL queries restricted to the
+    requested stocks, options and dates. Monthly statistics (a small table)
+    and whole-table load_* calls use the pandas implementation.
+    """
+
+    def __init__(
+        self,
+        data_dir: str = '../data',
+        db_path: Optional[str] = None,
+        engine: str = 'auto',
+        **kwargs
+    ):
+        """
+        Initialize loader and import changed data files into the database.
+
+        Args:
+            data_dir: Path to data directory (default: ../data)
+            db_path: Database file (default: ./cache/backtest_data.<engine>)
+            engine: 'duckdb', 'sqlite' or 'auto' (DuckDB if installed)
+            **kwargs: Passed to DataLoader (memory_budget_mb, spill_dir)
+        """
+        super().__init__(data_dir, **kwargs)
+
+        if engine == 'auto':
+            engine = 'duckdb' if HAS_DUCKDB else 'sqlite'
+        if engine not in DATE_DIFF_SQL:
+            raise ValueError(f"Unknown engine '{engine}'. Valid: ['auto', 'duckdb', 'sqlite']")
+        if engine == 'duckdb' and not HAS_DUCKDB:
+            raise ImportError("engine='duckdb' requires the duckdb package (pip install duckdb)")
+        self.engine = engine
+
+        self.db_path = Path(db_path) if db_path else Path('cache') / f'backtest_data.{engine}'
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        if engine == 'duckdb':
+            self._conn = duckdb.connect(str(self.db_path))
+        else:
+            self._conn = sqlite3.connect(str(self.db_path))
+
+        self._execute(
+            "CREATE TABLE IF NOT EXISTS _table_fingerprints (name VARCHAR PRIMARY KEY, fingerprint VARCHAR)"
+        )
+        self._sql_tables: Set[str] = set()
+        self._sync_tables()
+
+    # ========================================================================
+    # DATABASE
+    # ========================================================================
+
+    def _execute(self, sql: str, params=()):
+        self._conn.execute(sql, list(params))
+        if self.engine == 'sqlite':
+            self._conn.commit()
+
+    def _query(self, sql: str, params=(), parse_dates: Optional[List[str]] = None) -> pd.DataFrame:
+        """Run a query and return the result as a DataFrame."""
+        if self.engine == 'duckdb':
+            df = self._conn.execute(sql, list(params)).df()
+        else:
+            df = pd.read_sql_query(sql, self._conn, params=list(params))
+
+        for column in parse_dates or []:
+            if column in df.columns:
+                df[column] = pd.to_datetime(df[column])
+        return df
+
+    def _query_in(
+        self,
+        sql: str,
+        values,
+        params_before=(),
+        params_after=(),
+        parse_dates: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Run a query with an IN list, in chunks of MAX_IN_VALUES.
+
+        Args:
+            sql: Query with a {values} placeholder inside IN (...)
+            values: Values for the IN list (duplicates are removed)
+            params_before: Parameters bound before the IN list
+            params_after: Parameters bound after the IN list
+            parse_dates: Columns to convert to datetime
+
+        Returns:
+            Concatenated results
+        """
+        values = [v for v in pd.unique(np.asarray(values, dtype=object)) if isinstance(v, str) or pd.notna(v)]
+        chunks = [values[i:i + MAX_IN_VALUES] for i in range(0, len(values), MAX_IN_VALUES)] or [[]]
+
+        frames = []
+        for chunk in chunks:
+            placeholders = ', '.join('?' * len(chunk)) or 'NULL'
+            frames.append(self._query(
+                sql.format(values=placeholders),
+                [*params_before, *chunk, *params_after],
+                parse_dates
+            ))
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    def _date_param(self, value) -> object:
+        """Bind dates as datetimes (DuckDB) or as the text pandas writes (SQLite)."""
+        timestamp = pd.Timestamp(value)
+        if self.engine == 'duckdb':
+            return timestamp.to_pydatetime()
+        return timestamp.strftime('%Y-%m-%d %H:%M:%S')
+
+    def _import_table(self, table: str, file_path: Path):
+        """(Re)create a database table from a CSV file."""
+        spec = TABLE_SPECS[table]
+        print(f"Importing {spec['label']} from {file_path} into {self.engine}...")
+
+        self._execute(f"DROP TABLE IF EXISTS {quote(table)}")
+
+        if self.engine == 'duckdb':
+            # DuckDB streams the CSV itself and detects column types
+            path = str(file_path).replace("'", "''")
+            self._execute(
+                f"CREATE TABLE {quote(table)} AS "
+                f"SELECT * FROM read_csv('{path}', delim='{spec['delimiter']}', header=true)"
+            )
+        else:
+            reader = pd.read_csv(
+                file_path,
+                delimiter=spec['delimiter'],
+                parse_dates=spec['parse_dates'],
+                chunksize=IMPORT_CHUNK_ROWS
+            )
+            for chunk in reader:
+                chunk.to_sql(table, self._conn, if_exists='append', index=False)
+            self._conn.commit()
+
+        for i, columns in enumerate(SQL_INDEXES[table]):
+            self._execute(
+                f"CREATE INDEX IF NOT EXISTS {quote(f'idx_{table}_{i}')} "
+                f"ON {quote(table)} ({', '.join(quote(c) for c in columns)})"
+            )
+
+        rows = self._query(f"SELECT COUNT(*) AS n FROM {quote(table)}")['n'].iloc[0]
+        print(f"✓ Imported {rows} {spec['unit']}")
+
+    def _sync_tables(self) -> List[str]:
+        """
+        Import data files whose fingerprint differs from the stored one.
+
+        Returns:
+            Names of the tables that were (re)imported or dropped
+        """
+        stored = self._query("SELECT name, fingerprint FROM _table_fingerprints")
+        stored = dict(zip(stored['name'], stored['fingerprint']))
+
+        changed = []
+        for table in SQL_INDEXES:
+            file_name = TABLE_SPECS[table]['file_name']
+            fingerprint = self._fingerprint(table, file_name)
+            encoded = json.dumps(fingerprint)
+
+            if fingerprint[1] is None:
+                # File does not exist: lookups on it raise FileNotFoundError
+                self._sql_tables.discard(table)
+                if table in stored:
+                    self._execute(f"DROP TABLE IF EXISTS {quote(table)}")
+                    self._execute("DELETE FROM _table_fingerprints WHERE name = ?", [table])
+                    changed.append(table)
+                continue
+
+            if stored.get(table) != encoded:
+                self._import_table(table, self.data_dir / file_name)
+                self._execute("DELETE FROM _table_fingerprints WHERE name = ?", [table])
+                self._execute("INSERT INTO _table_fingerprints VALUES (?, ?)", [table, encoded])
+                changed.append(table)
+
+            self._sql_tables.add(table)
+
+        return changed
+
+    def _require(self, table: str):
+        """Raise FileNotFoundError (as the pandas path does) for a missing table."""
+        if table not in self._sql_tables:
+            raise FileNotFoundError(f"No such file: '{self.data_dir / TABLE_SPECS[table]['file_name']}'")
+
+    def refresh(self) -> List[str]:
+        """
+        Re-import changed files into the database and reload changed cached tables.
+
+        Returns:
+            Names of the tables that changed
+        """
+        changed = self._sync_tables()
+        return sorted(set(changed) | set(super().refresh()))
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
+
+    # ========================================================================
+    # LOOKUPS
+    # ========================================================================
+
+    def get_support_metrics_for_stock(self, stock_name: str, rolling_period: int) -> Optional[Dict]:
+        """Support metrics for one stock and rolling period (None if not found)."""
+        row = self.get_support_metrics_batch([stock_name], rolling_period).iloc[0]
+        return None if pd.isna(row['stock_name']) else row.to_dict()
+
+    def get_probability_peak(
+        self,
+        option_name: str,
+        probability_method: str = 'ProbWorthless_Bayesian_IsoCal'
+    ) -> Optional[float]:
+        """Historical peak probability for one option (None if no history)."""
+        peak = self.get_probability_peaks_batch([option_name], probability_method)[0]
+        return None if np.isnan(peak) else peak
+
+    def get_recovery_rate(
+        self,
+        threshold: float,
+        prob_method: str,
+        prob_bin: str,
+        dte_bin: str,
+        stock: Optional[str] = None
+    ) -> Optional[float]:
+        """Recovery candidate worthless rate (0-1) for one bin (None if not found)."""
+        rate = self.get_recovery_rates_batch(
+            threshold, prob_method, [prob_bin], [dte_bin], None if stock is None else [stock]
+        )[0]
+        return None if np.isnan(rate) else rate
+
+    def get_support_metrics_batch(self, stock_names, rolling_period: int) -> pd.DataFrame:
+        """Support metrics aligned with stock_names (NaN rows where not found)."""
+        self._require('support')
+        support = self._query_in(
+            "SELECT * FROM support WHERE rolling_period = ? AND stock_name IN ({values})",
+            stock_names,
+            params_before=[rolling_period],
+            parse_dates=TABLE_SPECS['support']['parse_dates']
+        )
+        support = support.drop_duplicates('stock_name', keep='first').set_index('stock_name', drop=False)
+        return support.reindex(np.asarray(stock_names, dtype=object)).reset_index(drop=True)
+
+    def get_support_metrics_wide(self, stock_names, rolling_periods: List[int]) -> pd.DataFrame:
+        """Support metrics of several rolling periods with (field, rolling_period) columns."""
+        wide = pd.concat(
+            {period: self.get_support_metrics_batch(stock_names, period).drop(columns='rolling_period')
+             for period in rolling_periods},
+            axis=1, names=['rolling_period', None]
+        )
+        return wide.swaplevel(axis=1)
+
+    def get_probability_peaks_batch(
+        self,
+        option_names,
+        probability_method: str = 'ProbWorthless_Bayesian_IsoCal'
+    ) -> np.ndarray:
+        """Peak probabilities aligned with option_names (NaN where there is no history)."""
+        _check_method(probability_method)
+        self._require('probability_history')
+        peaks = self._query_in(
+            f'SELECT "OptionName", MAX({quote(probability_method)}) AS peak '
+            f'FROM probability_history WHERE "OptionName" IN ({{values}}) GROUP BY "OptionName"',
+            option_names
+        )
+        peaks = peaks.set_index('OptionName')['peak']
+        return peaks.reindex(np.asarray(option_names, dtype=object)).to_numpy(dtype=np.float64)
+
+    def get_recovery_rates_batch(
+        self,
+        threshold: float,
+        prob_method: str,
+        prob_bins,
+        dte_bins,
+        stocks=None
+    ) -> np.ndarray:
+        """Recovery rates (0-1) for many bins, NaN where not found."""
+        self._require('recovery')
+        sql = (
+            'SELECT "Stock", "CurrentProb_Bin", "DTE_Bin", "RecoveryCandidate_WorthlessRate_pct" '
+            'FROM recovery WHERE "DataType" = ? AND "HistoricalPeakThreshold" = ? AND "ProbMethod" = ?'
+        )
+        if stocks is None:
+            rates = self._query(sql, ['scenario', threshold, prob_method])
+            stock_keys = np.full(len(prob_bins), '', dtype=object)
+        else:
+            rates = self._query_in(sql + ' AND "Stock" IN ({values})', stocks,
+                                   params_before=['stock', threshold, prob_method])
+            stock_keys = np.asarray(stocks, dtype=object)
+
+        keys = ['Stock', 'CurrentProb_Bin', 'DTE_Bin']
+        rates = rates.assign(Stock=rates['Stock'].fillna('')).drop_duplicates(keys, keep='first').set_index(keys)
+        lookup = pd.MultiIndex.from_arrays([
+            stock_keys,
+            np.asarray(prob_bins, dtype=object),
+            np.asarray(dte_bins, dtype=object)
+        ])
+        return (rates['RecoveryCandidate_WorthlessRate_pct'] / 100).reindex(lookup).to_numpy(dtype=np.float64)
+
+    def _recovery_table_frame(self) -> pd.DataFrame:
+        """Recovery rows for the dense recovery table (only the columns it needs)."""
+        self._require('recovery')
+        return self._query(
+            'SELECT "DataType", "Stock", "HistoricalPeakThreshold", "ProbMethod", "CurrentProb_Bin", '
+            '"DTE_Bin", "RecoveryCandidate_N", "RecoveryCandidate_WorthlessRate_pct" FROM recovery'
+        )
+
+    def get_current_month_performance_batch(self, stock_names, current_date: datetime) -> np.ndarray:
+        """Month-to-date performance (%) per stock, reading only this and last month's prices."""
+        self._require('stock_data')
+        current_date = pd.Timestamp(current_date)
+        previous_month_start = (current_date.replace(day=1) - pd.Timedelta(days=1)).replace(day=1).normalize()
+
+        prices = self._query_in(
+            'SELECT name, "date", close FROM stock_data '
+            'WHERE "date" >= ? AND "date" <= ? AND name IN ({values}) ORDER BY name, "date"',
+            stock_names,
+            params_before=[self._date_param(previous_month_start), self._date_param(current_date)],
+            parse_dates=['date']
+        )
+        stock_prices = {
+            name: (group['date'].to_numpy(dtype='datetime64[ns]'), group['close'].to_numpy(dtype=np.float64))
+            for name, group in prices.groupby('name', sort=False)
+        }
+        return month_to_date_performance(stock_prices, stock_names, current_date)
+
+    # ========================================================================
+    # BACKTEST PANEL
+    # ========================================================================
+
+    def get_trading_days(self, start_date: datetime, end_date: datetime) -> List[pd.Timestamp]:
+        """Trading days (dates present in stock_data) within a window."""
+        self._require('stock_data')
+        days = self._query(
+            'SELECT DISTINCT "date" FROM stock_data WHERE "date" >= ? AND "date" <= ? ORDER BY "date"',
+            [self._date_param(start_date), self._date_param(end_date)],
+            parse_dates=['date']
+        )
+        return list(days['date'])
+
+    def get_backtest_panel(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        rolling_period: Union[int, List[int]] = 365,
+        min_days_since_break: int = 10,
+        probability_method: Union[str, List[str]] = 'ProbWorthless_Bayesian_IsoCal',
+        min_days_to_expiry: int = 1,
+        max_days_to_expiry: int = 45,
+        stocks: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Backtest panel as one SQL join (same rows as DataLoader.get_backtest_panel).
+
+        The date window, stock list, support filters and a calendar-day bound
+        on the DTE window are applied in the query; the exact business-day
+        DTE filter is applied to the (already small) result. A list of
+        rolling periods runs the join per period and unions the rows.
+        """
+        if not np.isscalar(rolling_period):
+            keys = ['date', 'OptionName']
+            parts = {
+                period: self.get_backtest_panel(
+                    start_date, end_date, period, min_days_since_break, probability_method,
+                    min_days_to_expiry, max_days_to_expiry, stocks
+                )
+                for period in rolling_period
+            }
+            panel = pd.concat(list(parts.values())).drop_duplicates(keys)
+            panel_keys = pd.MultiIndex.from_frame(panel[keys])
+            for period, part in parts.items():
+                panel[f'in_period_{period}'] = panel_keys.isin(pd.MultiIndex.from_frame(part[keys]))
+            return panel.sort_values(keys).reset_index(drop=True)
+
+        methods = [probability_method] if isinstance(probability_method, str) else list(probability_method)
+        for method in methods:
+            _check_method(method)
+        for table in ('options', 'support', 'stock_data'):
+            self._require(table)
+
+        option_columns = set(self._query("SELECT * FROM options LIMIT 0").columns)
+        columns = [c for c in PANEL_OPTION_COLUMNS if c in option_columns]
+
+        with_history = 'probability_history' in self._sql_tables
+        if with_history:
+            probability = ', '.join(f"COALESCE(p.{quote(m)}, o.{quote(m)}) AS {quote(m)}" for m in methods)
+            history_join = (
+                'LEFT JOIN probability_history p '
+                'ON p."OptionName" = o."OptionName" AND p."Update_date" = d."date"'
+            )
+        else:
+            probability = ', '.join(f"o.{quote(m)} AS {quote(m)}" for m in methods)
+            history_join = ''
+
+        # int(days * 5 / 7) in [min, max]  =>  days in [floor(min*7/5), ceil((max+1)*7/5)]
+        date_diff = DATE_DIFF_SQL[self.engine].format(start='d."date"', end='o."ExpiryDate"')
+        min_calendar_days = math.floor(min_days_to_expiry * 7 / 5)
+        max_calendar_days = math.ceil((max_days_to_expiry + 1) * 7 / 5)
+
+        params = [
+            self._date_param(start_date), self._date_param(end_date),
+            min_calendar_days, max_calendar_days,
+            rolling_period,
+            min_days_since_break
+        ]
+        stock_filter = ''
+        if stocks is not None:
+            stock_filter = f'AND o."StockName" IN ({", ".join("?" * len(stocks)) or "NULL"})'
+            params += list(stocks)
+
+        sql = f"""
+            WITH days AS (
+                SELECT DISTINCT "date" FROM stock_data WHERE "date" >= ? AND "date" <= ?
+            )
+            SELECT d."date" AS "date", {', '.join(f'o.{quote(c)}' for c in columns)}, {probability}
+            FROM days d
+            JOIN options o ON {date_diff} BETWEEN ? AND ?
+            JOIN support s ON s.stock_name = o."StockName" AND s.rolling_period = ?
+            {history_join}
+            WHERE NOT COALESCE(s.days_since_last_break < ?, FALSE)
+              AND NOT COALESCE(o."StrikePrice" > s.rolling_low, FALSE)
+              {stock_filter}
+        """
+        panel = self._query(sql, params, parse_dates=['date', 'ExpiryDate'])
+
+        panel = panel.drop_duplicates(['date', 'OptionName'], keep='last')
+        panel['DaysToExpiry'] = (panel['ExpiryDate'] - panel['date']).dt.days * 5 // 7
+        panel = panel[
+            (panel['ExpiryDate'] >= panel['date'])
+            & panel['DaysToExpiry'].between(min_days_to_expiry, max_days_to_expiry)
+        ]
+
+        return panel.sort_values(['date', 'OptionName']).reset_index(drop=True)
+
+    def get_closes(self, stock_names, dates) -> np.ndarray:
+        """Closing price of each stock on each date (NaN where missing)."""
+        self._require('stock_data')
+        dates = pd.DatetimeIndex(dates)
+        if len(dates) == 0:
+            return np.array([], dtype=np.float64)
+
+        closes = self._query_in(
+            'SELECT name, "date", close FROM stock_data WHERE "date" >= ? AND "date" <= ? AND name IN ({values})',
+            stock_names,
+            params_before=[self._date_param(dates.min()), self._date_param(dates.max())],
+            parse_dates=['date']
+        )
+        closes = closes.drop_duplicates(['name', 'date']).set_index(['name', 'date'])['close']
+        keys = pd.MultiIndex.from_arrays([np.asarray(stock_names, dtype=object), dates])
+        return closes.reindex(keys).to_numpy(dtype=np.float64)
+
+    def get_expiry_closes(self, stock_names, expiry_dates) -> np.ndarray:
+        """Closing price of each stock on each expiry date (see get_closes)."""
+        return self.get_closes(stock_names, expiry_dates)
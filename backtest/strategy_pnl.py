@@ -0,0 +1,244 @@
+"""
+Strategy P&L Simulation over Backtest Scores
+
+This module turns scored backtest rows into the P&L of selling the selected
+puts, for many daily selection rules at once:
+
+- Premium collected on the scoring day (data.csv Premium, SEK per position)
+- Assignment loss at expiry: (expiry close - strike) x shares when the put
+  finishes in the money
+- Capital tied up while a position is open (strike x shares, the
+  Underlying_Value of data.csv)
+
+Selection rules are evaluated as one boolean matrix (rows x rules): a score
+threshold ('score:70') or the K best scores of each day ('top:5'). Daily
+premium, losses and capital changes per rule are sums over rows sorted by
+day, taken as differences of one cumulative sum, and the equity and capital
+curves are cumulative sums over the calendar - no per-day or per-rule loop
+over positions.
+
+Positions whose expiry close is unknown (not expired by the end of the
+backtest) keep their premium and capital but have no loss yet; they are
+reported as open positions.
+
+Usage:
+    from strategy_pnl import simulate_strategies
+
+    summary, equity = simulate_strategies(
+        results_df, ['score:70', 'top:5'], contracts, expiry_closes
+    )
+
+Author: Put Options SE
+Date: February 2026
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from portfolio_engine import SHARES_PER_CONTRACT
+from ranking import daily_top_k
+
+
+# Rule kinds: 'score:<min composite score>' and 'top:<options per day>'
+RULE_KINDS = ('score', 'top')
+
+DEFAULT_RULES = ['score:60', 'score:70', 'score:80', 'top:5', 'top:10']
+
+
+# ============================================================================
+# RULES
+# ============================================================================
+
+def parse_rules(specs) -> List[Tuple[str, str, float]]:
+    """
+    Parse selection rule specs.
+
+    Args:
+        specs: Rule strings ('score:70', 'top:5') or one comma-separated string
+
+    Returns:
+        List of (name, kind, value)
+    """
+    if isinstance(specs, str):
+        specs = [spec for spec in specs.split(',') if spec.strip()]
+
+    rules = []
+    for spec in specs:
+        kind, _, value = spec.strip().partition(':')
+        try:
+            value = float(value)
+        except ValueError:
+            raise ValueError(f"Invalid rule '{spec}': expected <kind>:<number>")
+        if kind not in RULE_KINDS:
+            raise ValueError(f"Unknown rule kind '{kind}'. Valid: {list(RULE_KINDS)}")
+        if kind == 'top' and (value < 1 or value != int(value)):
+            raise ValueError(f"Invalid rule '{spec}': top needs a positive integer")
+        rules.append((f"{kind}:{value:g}", kind, value))
+    return rules
+
+
+def selection_masks(day_index: np.ndarray, scores: np.ndarray, rules: List[Tuple[str, str, float]]) -> np.ndarray:
+    """
+    Rows selected by every rule.
+
+    Top-K ranks come from one partial selection with the largest K (score
+    descending within each day, ties in row order, see ranking.daily_top_k);
+    every top rule is then a comparison against that rank.
+
+    Args:
+        day_index: Integer day of every row
+        scores: Composite score of every row
+        rules: Output of parse_rules
+
+    Returns:
+        Boolean array (rows, rules)
+    """
+    masks = np.zeros((len(scores), len(rules)), dtype=bool)
+    valid = ~np.isnan(scores)
+
+    rank = None
+    top_ks = [int(value) for _, kind, value in rules if kind == 'top']
+    if top_ks:
+        rows, ranks = daily_top_k(day_index, scores, max(top_ks))
+        rank = np.full(len(scores), np.iinfo(np.int64).max)
+        rank[rows] = ranks
+
+    for i, (_, kind, value) in enumerate(rules):
+        if kind == 'score':
+            masks[:, i] = valid & (scores >= value)
+        else:
+            masks[:, i] = valid & (rank < value)
+    return masks
+
+
+# ============================================================================
+# SIMULATION
+# ============================================================================
+
+def position_pnl(
+    strike: np.ndarray,
+    contracts: np.ndarray,
+    expiry_close: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Assignment loss and capital of every position.
+
+    Args:
+        strike: Strike price
+        contracts: Number of contracts
+        expiry_close: Stock close on the expiry date (NaN if unknown)
+
+    Returns:
+        Tuple of (loss <= 0, NaN where the close is unknown; capital)
+    """
+    shares = contracts * SHARES_PER_CONTRACT
+    loss = np.minimum(expiry_close - strike, 0) * shares
+    return loss, strike * shares
+
+
+def _daily_sums(day_index: np.ndarray, values: np.ndarray, masks: np.ndarray, n_days: int) -> np.ndarray:
+    """Sum of values per (day, rule) over the selected rows (rows beyond n_days are ignored)."""
+    order = np.argsort(day_index, kind='stable')
+    weighted = masks[order] * values[order, None]
+    cumulative = np.concatenate([np.zeros((1, masks.shape[1])), np.cumsum(weighted, axis=0)])
+    bounds = np.searchsorted(day_index[order], np.arange(n_days + 1), side='left')
+    return cumulative[bounds[1:]] - cumulative[bounds[:-1]]
+
+
+def simulate_strategies(
+    results_df: pd.DataFrame,
+    rules,
+    contracts: np.ndarray,
+    expiry_closes: np.ndarray,
+    score_col: str = 'composite_score'
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    P&L of every selection rule over one set of backtest results.
+
+    Args:
+        results_df: Backtest results (date, strike_price, expiry_date,
+            premium and score_col)
+        rules: Rule specs (see parse_rules)
+        contracts: Contracts per row (data.csv NumberOfContractsBasedOnLimit)
+        expiry_closes: Stock close on each row's expiry date (NaN if unknown)
+        score_col: Score the rules select on
+
+    Returns:
+        Tuple of (summary, equity)
+        - summary: one row per rule (positions, hit rate, premium, assignment
+          loss, net P&L, capital, return on peak capital, max drawdown)
+        - equity: one row per calendar day and rule (cumulative premium,
+          loss and P&L, capital in use, drawdown)
+    """
+    rules = parse_rules(rules)
+    names = [name for name, _, _ in rules]
+    if len(results_df) == 0:
+        return pd.DataFrame({'rule': names}), pd.DataFrame()
+
+    dates = pd.to_datetime(results_df['date']).to_numpy(dtype='datetime64[D]')
+    expiries = pd.to_datetime(results_df['expiry_date']).to_numpy(dtype='datetime64[D]')
+    strike = results_df['strike_price'].to_numpy(dtype=np.float64)
+    premium = results_df['premium'].fillna(0).to_numpy(dtype=np.float64)
+    contracts = np.asarray(contracts, dtype=np.float64)
+    expiry_closes = np.asarray(expiry_closes, dtype=np.float64)
+
+    loss, capital = position_pnl(strike, contracts, expiry_closes)
+    settled = ~np.isnan(loss)
+    loss = np.nan_to_num(loss)
+    # Rows without a contract count have no position size
+    sized = ~np.isnan(contracts)
+    premium, capital = np.where(sized, premium, 0.0), np.nan_to_num(capital)
+
+    # Calendar: scoring days and the expiry days of settled positions; open
+    # positions release capital after the calendar ends
+    calendar = np.unique(np.concatenate([dates, expiries[settled]]))
+    n_days = len(calendar)
+    open_day = np.searchsorted(calendar, dates)
+    close_day = np.where(settled, np.searchsorted(calendar, expiries), n_days)
+
+    masks = selection_masks(open_day, results_df[score_col].to_numpy(dtype=np.float64), rules) & sized[:, None]
+
+    premium_daily = _daily_sums(open_day, premium, masks, n_days)
+    loss_daily = _daily_sums(close_day, loss, masks, n_days)
+    capital_in = _daily_sums(open_day, capital, masks, n_days)
+    capital_out = _daily_sums(close_day, capital, masks, n_days)
+
+    # Capital stays in use through the expiry day
+    capital_in_use = np.cumsum(capital_in - capital_out, axis=0) + capital_out
+    equity = np.cumsum(premium_daily + loss_daily, axis=0)
+    drawdown = equity - np.maximum(np.maximum.accumulate(equity, axis=0), 0)
+
+    worthless = settled & (expiry_closes > strike)
+    summary = pd.DataFrame({
+        'rule': names,
+        'positions': masks.sum(axis=0),
+        'settled': (masks & settled[:, None]).sum(axis=0),
+        'open_positions': (masks & ~settled[:, None]).sum(axis=0),
+        'worthless': (masks & worthless[:, None]).sum(axis=0),
+        'premium_collected': premium_daily.sum(axis=0),
+        'assignment_loss': loss_daily.sum(axis=0),
+        'net_pnl': equity[-1],
+        'max_capital': capital_in_use.max(axis=0),
+        'mean_capital': capital_in_use.mean(axis=0),
+        'max_drawdown': drawdown.min(axis=0),
+        'worst_position': np.where(masks, (premium + loss)[:, None], np.inf).min(axis=0)
+    })
+    summary['hit_rate_pct'] = summary['worthless'] / summary['settled'].replace(0, np.nan) * 100
+    summary['loss_to_premium'] = -summary['assignment_loss'] / summary['premium_collected'].replace(0, np.nan)
+    summary['return_on_max_capital_pct'] = summary['net_pnl'] / summary['max_capital'].replace(0, np.nan) * 100
+    summary['worst_position'] = summary['worst_position'].replace(np.inf, np.nan)
+
+    n_rules = len(rules)
+    equity_df = pd.DataFrame({
+        'date': np.repeat(calendar, n_rules).astype('datetime64[ns]'),
+        'rule': np.tile(names, n_days),
+        'premium_cum': np.cumsum(premium_daily, axis=0).ravel(),
+        'loss_cum': np.cumsum(loss_daily, axis=0).ravel(),
+        'equity': equity.ravel(),
+        'capital_in_use': capital_in_use.ravel(),
+        'drawdown': drawdown.ravel()
+    })
+
+    return summary, equity_df
@@ -0,0 +1,109 @@
+"""
+Checks the one-pass configuration sweeps of the backtest runner on the
+synthetic data directory of test_data_loader: each slice of an --all-configs
+or --all-periods run equals the run with that configuration, the
+multi-period panel marks the rows of each single-period panel, and the
+expiry_close column holds the close each outcome was taken from.
+"""
+
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from backtest_runner import CONFIG_COLUMNS, HISTORICAL_PEAK_THRESHOLDS, ROLLING_PERIODS, parse_args, run_backtest
+from data_loader import DataLoader, PROBABILITY_METHODS
+from test_data_loader import write_data_dir
+
+START, END = '2026-08-17', '2026-09-25'
+
+
+def run(loader: DataLoader, *options: str) -> pd.DataFrame:
+    """Results of a run with the given command line options, as main() calls run_backtest."""
+    args = parse_args(['--start-date', START, '--end-date', END, '--data-dir', str(loader.data_dir), *options])
+    return run_backtest(datetime.strptime(START, '%Y-%m-%d'), datetime.strptime(END, '%Y-%m-%d'), loader, args)
+
+
+def config_slice(results: pd.DataFrame, **config) -> pd.DataFrame:
+    """Rows of one configuration of long-format results, without the configuration columns."""
+    rows = results
+    for column, value in config.items():
+        rows = rows[rows[column] == value]
+    return rows.drop(columns=[column for column in CONFIG_COLUMNS if column in results]).reset_index(drop=True)
+
+
+def test_all_configs_match_single_runs():
+    """Each (method, threshold) slice of --all-configs is the run with that method and threshold."""
+    with tempfile.TemporaryDirectory() as tmp:
+        loader = DataLoader(str(write_data_dir(tmp)))
+        for options in ((), ('--per-stock-recovery', '--recovery-min-n', '40')):
+            results = run(loader, '--all-configs', *options)
+            assert list(results.columns[1:3]) == CONFIG_COLUMNS[1:]
+            assert len(results) > 0
+            for method in PROBABILITY_METHODS:
+                for threshold in HISTORICAL_PEAK_THRESHOLDS:
+                    expected = run(loader, '--probability-method', method,
+                                   '--historical-peak-threshold', str(threshold), *options)
+                    pd.testing.assert_frame_equal(
+                        config_slice(results, probability_method=method, historical_peak_threshold=threshold),
+                        expected, obj=f'{method} {threshold} {options}'
+                    )
+
+
+def test_all_periods_match_single_runs():
+    """Each period slice of --all-periods is the --rolling-period run; in_period_* marks that run's rows."""
+    with tempfile.TemporaryDirectory() as tmp:
+        loader = DataLoader(str(write_data_dir(tmp)))
+        panel_filters = {'min_days_since_break': 10, 'min_days_to_expiry': 1, 'max_days_to_expiry': 45}
+        panel = loader.get_backtest_panel(START, END, rolling_period=ROLLING_PERIODS, **panel_filters)
+        in_period = panel[[f'in_period_{period}' for period in ROLLING_PERIODS]].to_numpy()
+        assert in_period.any(axis=1).all() and not in_period.all(axis=1).all()
+        for period in ROLLING_PERIODS:
+            single = loader.get_backtest_panel(START, END, rolling_period=period, **panel_filters)
+            rows = panel[panel[f'in_period_{period}']]
+            assert np.array_equal(rows[['date', 'OptionName']].to_numpy(), single[['date', 'OptionName']].to_numpy())
+
+        results = run(loader, '--all-periods')
+        assert results.columns[1] == CONFIG_COLUMNS[0]
+        for period in ROLLING_PERIODS:
+            pd.testing.assert_frame_equal(
+                config_slice(results, rolling_period=period),
+                run(loader, '--rolling-period', str(period)), obj=str(period)
+            )
+
+        # Both sweeps together
+        results = run(loader, '--all-periods', '--all-configs')
+        assert list(results.columns[1:4]) == CONFIG_COLUMNS
+        method, threshold = PROBABILITY_METHODS[1], HISTORICAL_PEAK_THRESHOLDS[0]
+        for period in (30, 270):
+            pd.testing.assert_frame_equal(
+                config_slice(results, rolling_period=period, probability_method=method,
+                             historical_peak_threshold=threshold),
+                run(loader, '--rolling-period', str(period), '--probability-method', method,
+                    '--historical-peak-threshold', str(threshold)),
+                obj=f'{period} {method} {threshold}'
+            )
+
+
+
+def test_expiry_close_column():
+    """expiry_close is the close each outcome was taken from, NaN until expiry."""
+    with tempfile.TemporaryDirectory() as tmp:
+        loader = DataLoader(str(write_data_dir(tmp)))
+        results = run(loader)
+        closes = results['expiry_close'].to_numpy()
+        settled = results['outcome'].notna().to_numpy()
+        assert settled.any() and not settled.all()
+        assert np.array_equal(settled, ~np.isnan(closes))
+        worthless = (results['outcome'] == 'worthless').to_numpy()
+        assert np.array_equal(worthless[settled], (closes > results['strike_price'].to_numpy())[settled])
+        expected = loader.get_expiry_closes(results['stock_name'][settled], results['expiry_date'][settled])
+        assert np.array_equal(closes[settled], expected)
+
+
+if __name__ == '__main__':
+    test_all_configs_match_single_runs()
+    test_all_periods_match_single_runs()
+    test_expiry_close_column()
+    print("✓ All backtest runner tests passed")
@@ -0,0 +1,62 @@
+"""
+Quick test to validate the isotonic calibration subsystem.
+
+Uses synthetic backtest results so it runs without the data files.
+"""
+
+import numpy as np
+import pandas as pd
+
+from calibration import IsotonicCalibrator, IsotonicMap, pava
+
+
+def test_pava_pools_violators():
+    """Decreasing neighbours are pooled into their weighted mean."""
+    values, weights, ends = pava(np.array([0.0, 1.0, 0.0, 1.0]))
+
+    assert np.allclose(values, [0.0, 0.5, 1.0])
+    assert np.allclose(weights, [1, 2, 1])
+    assert list(ends) == [1, 3, 4]
+
+
+def test_map_is_monotone_and_clamped():
+    """Fitted maps are non-decreasing and clamp outside the training range."""
+    rng = np.random.default_rng(0)
+    x = rng.uniform(0.2, 0.9, 5000)
+    y = (rng.random(5000) < x).astype(float)
+
+    iso = IsotonicMap.fit(x, y)
+    grid = np.linspace(0, 1, 101)
+    calibrated = iso.apply(grid)
+
+    assert np.all(np.diff(calibrated) >= 0)
+    assert calibrated[0] == iso.y[0] and calibrated[-1] == iso.y[-1]
+    assert np.all(np.diff(iso.apply(grid, interpolate=False)) >= 0)
+
+
+def test_window_fit_is_cached_and_respects_dates():
+    """Each training window is fitted once and only sees its own rows."""
+    dates = pd.to_datetime(['2024-01-15'] * 100 + ['2024-02-15'] * 100)
+    results = pd.DataFrame({
+        'date': dates,
+        'current_probability': np.tile(np.linspace(0.5, 0.95, 100), 2),
+        'days_to_expiry': 20,
+        # January: every option worthless; February: every option ITM
+        'outcome': ['worthless'] * 100 + ['ITM'] * 100
+    })
+
+    calibrator = IsotonicCalibrator(results, ['current_probability'])
+    january = calibrator.fit('current_probability', '2024-01-01', '2024-02-01')
+
+    assert calibrator.fit('current_probability', '2024-01-01', '2024-02-01') is january
+    assert np.all(january[None].apply([0.6, 0.9]) == 1.0)
+
+    calibrated = calibrator.apply(results, 'current_probability', '2024-02-01', '2024-03-01')
+    assert np.all(calibrated == 0.0)
+
+
+if __name__ == '__main__':
+    test_pava_pools_violators()
+    test_map_is_monotone_and_clamped()
+    test_window_fit_is_cached_and_respects_dates()
+    print("✓ Calibration tests passed")
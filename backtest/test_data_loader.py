@@ -0,0 +1,433 @@
+"""
+Quick test to validate the DataLoader batch lookups against the per-option lookups.
+
+Uses a small synthetic data directory (write_data_dir, also used by the other
+DataLoader tests) so it runs without the data files.
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_loader import (
+    DataLoader,
+    DERIVED_INDEXES,
+    MONTH_NUMBERS,
+    PRELOAD_TABLES,
+    PROBABILITY_METHODS,
+    RECOVERY_METHOD_NAMES,
+    TABLE_SPECS
+)
+from scoring_engine import DTE_BIN_LABELS, PROBABILITY_BIN_LABELS
+
+STOCKS = ['AAK', 'ABB', 'ERIC B', 'SAND', 'VOLV B', 'TRATON']
+ROLLING_PERIODS = [30, 90, 180, 270, 365]
+EXPIRIES = ['2026-08-21', '2026-09-18', '2026-10-16']
+
+
+def write_data_dir(data_dir: Path, seed: int = 0, history_start: str = '2026-07-01', n_strikes: int = 5) -> Path:
+    """
+    Write a small data directory with every file the backtest and scoring read.
+
+    Prices run June-September 2026; options expire on EXPIRIES with n_strikes
+    strikes from 80% to 100% of the price; probability_history.csv has ~85% of the (option,
+    trading day) rows from history_start on. The last stock has no support
+    rows and one option has no history.
+    """
+    rng = np.random.default_rng(seed)
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    days = pd.bdate_range('2026-06-01', '2026-09-30')
+
+    # Daily prices: a random walk per stock
+    prices = {stock: 100 * (1 + 0.4 * i) * np.exp(np.cumsum(rng.normal(0, 0.015, len(days))))
+              for i, stock in enumerate(STOCKS)}
+    stock_data = pd.concat([
+        pd.DataFrame({'date': days, 'name': stock, 'open': close, 'high': close * 1.01, 'low': close * 0.99,
+                      'close': close, 'volume': 1000})
+        for stock, close in prices.items()
+    ], ignore_index=True)
+    stock_data.to_csv(data_dir / 'stock_data.csv', sep='|', index=False, date_format='%Y-%m-%d')
+
+    # Options: strikes at and below the price per stock and expiry
+    options = []
+    for stock in STOCKS:
+        price = prices[stock][days.get_loc(pd.Timestamp('2026-07-01'))]
+        for expiry in EXPIRIES:
+            for strike in np.round(price * np.linspace(0.8, 1.0, n_strikes), 1):
+                options.append({
+                    'OptionName': f"{stock.replace(' ', '')}{expiry[5:7]}{strike}",
+                    'StockName': stock,
+                    'StrikePrice': strike,
+                    'ExpiryDate': expiry,
+                    'Premium': int(rng.integers(50, 2000)),
+                    'NumberOfContractsBasedOnLimit': int(rng.integers(1, 20)),
+                    'DaysToExpiry': int(rng.integers(1, 60))
+                })
+    options = pd.DataFrame(options)
+    for method in PROBABILITY_METHODS:
+        options[method] = rng.uniform(0.3, 1.0, len(options)).round(4)
+    options.loc[3, PROBABILITY_METHODS[0]] = np.nan
+    options.to_csv(data_dir / 'data.csv', sep='|', index=False)
+
+    # Probability history: most (option, trading day) rows, without the first option
+    history_days = days[days >= pd.Timestamp(history_start)]
+    history = pd.DataFrame({
+        'OptionName': np.repeat(options['OptionName'].to_numpy()[1:], len(history_days)),
+        'Update_date': np.tile(history_days, len(options) - 1)
+    })
+    for method in PROBABILITY_METHODS:
+        history[method] = rng.uniform(0.3, 1.0, len(history)).round(4)
+    history = history[rng.random(len(history)) < 0.85].sort_values('Update_date', kind='stable')
+    history.to_csv(data_dir / 'probability_history.csv', sep='|', index=False, date_format='%Y-%m-%d')
+
+    # Support metrics per stock and rolling period (none for the last stock)
+    support = []
+    for stock in STOCKS[:-1]:
+        for period in ROLLING_PERIODS:
+            support.append({
+                'stock_name': stock,
+                'rolling_period': period,
+                'current_price': prices[stock][-1],
+                'rolling_low': round(prices[stock].min() * rng.uniform(0.9, 1.05), 1),
+                'days_since_last_break': float(rng.integers(0, 60)),
+                'last_break_date': '2026-08-19',
+                'support_strength_score': round(rng.uniform(20, 90), 2),
+                'trading_days_per_break': round(rng.uniform(5, 60), 1),
+                'last_calculated': '2026-09-30 23:45:00',
+                'data_through_date': '2026-09-30'
+            })
+    pd.DataFrame(support).to_csv(data_dir / 'support_level_metrics.csv', index=False)
+
+    # Recovery rates: scenario rows for every bin, stock rows for some
+    recovery = []
+    for threshold in (0.8, 0.9, 0.95):
+        for method in RECOVERY_METHOD_NAMES.values():
+            for prob_bin in PROBABILITY_BIN_LABELS:
+                for dte_bin in DTE_BIN_LABELS:
+                    for data_type, stock in [('scenario', '')] + [('stock', s) for s in STOCKS[:3]]:
+                        if data_type == 'stock' and rng.random() < 0.3:
+                            continue
+                        recovery.append({
+                            'DataType': data_type, 'Stock': stock, 'HistoricalPeakThreshold': threshold,
+                            'ProbMethod': method, 'CurrentProb_Bin': prob_bin, 'DTE_Bin': dte_bin,
+                            'RecoveryCandidate_N': int(rng.integers(0, 100)),
+                            'RecoveryCandidate_WorthlessRate_pct': round(rng.uniform(50, 100), 2),
+                            'RecoveryAdvantage_pp': round(rng.uniform(-5, 10), 2)
+                        })
+    pd.DataFrame(recovery).to_csv(data_dir / 'recovery_report_data.csv', sep='|', index=False)
+
+    # Monthly returns (fractions) for 2016-2025, month names abbreviated as in the file
+    monthly = pd.DataFrame([
+        {'name': stock, 'month': month, 'year': year}
+        for stock in STOCKS for year in range(2016, 2026) for month in MONTH_NUMBERS
+    ])
+    monthly['pct_return_month'] = rng.normal(0.005, 0.05, len(monthly))
+    monthly.loc[rng.random(len(monthly)) < 0.03, 'pct_return_month'] = np.nan
+    monthly['pct_open_to_low'] = -rng.uniform(0, 0.1, len(monthly))
+    monthly.loc[::37, 'pct_open_to_low'] = np.nan
+    monthly.loc[5::41, 'pct_open_to_low'] = np.inf
+    monthly['day_low_day_of_month'] = rng.integers(1, 29, len(monthly))
+    monthly.to_csv(data_dir / 'Stocks_Monthly_Data.csv', sep='|', index=False)
+
+    return data_dir
+
+
+def test_batch_lookups_match_single():
+    with tempfile.TemporaryDirectory() as tmp:
+        loader = DataLoader(str(write_data_dir(tmp)))
+        options = loader.load_options_data()
+        stocks = list(STOCKS) + ['UNKNOWN']
+
+        for period in (30, 365):
+            batch = loader.get_support_metrics_batch(stocks, period)
+            for i, stock in enumerate(stocks):
+                single = loader.get_support_metrics_for_stock(stock, period)
+                if single is None:
+                    assert batch.iloc[i].isna().all()
+                else:
+                    assert batch.iloc[i]['support_strength_score'] == single['support_strength_score']
+                    assert batch.iloc[i]['days_since_last_break'] == single['days_since_last_break']
+
+        names = list(options['OptionName']) + ['UNKNOWN']
+        history = loader.load_probability_history()
+        for method in PROBABILITY_METHODS[:2]:
+            peaks = loader.get_probability_peaks_batch(names, method)
+            assert np.allclose(peaks, history.groupby('OptionName')[method].max().reindex(names), equal_nan=True)
+            assert np.isnan(peaks[0]) and np.isnan(peaks[-1])
+            for name, peak in zip(names, peaks):
+                single = loader.get_probability_peak(name, method)
+                assert (np.isnan(peak) and single is None) or peak == single
+
+        prob_bins = np.repeat(PROBABILITY_BIN_LABELS, len(DTE_BIN_LABELS))
+        dte_bins = np.tile(DTE_BIN_LABELS, len(PROBABILITY_BIN_LABELS))
+        for stock in (None, 'AAK', 'TRATON'):
+            rates = loader.get_recovery_rates_batch(
+                0.9, 'Bias Corrected', prob_bins, dte_bins, None if stock is None else [stock] * len(prob_bins)
+            )
+            for rate, prob_bin, dte_bin in zip(rates, prob_bins, dte_bins):
+                single = loader.get_recovery_rate(0.9, 'Bias Corrected', prob_bin, dte_bin, stock)
+                assert (np.isnan(rate) and single is None) or rate == single
+
+        for month in (1, 9):
+            batch = loader.get_monthly_stats_batch(stocks, month)
+            for i, stock in enumerate(stocks):
+                single = loader.get_monthly_stats_for_stock(stock, month)
+                if single is None:
+                    assert batch.iloc[i].isna().all()
+                else:
+                    assert batch.iloc[i]['pct_pos_return_months'] == single['pct_pos_return_months']
+
+        performance = loader.get_current_month_performance_batch(stocks, pd.Timestamp('2026-09-15'))
+        closes = loader.load_stock_data().set_index(['name', 'date'])['close']
+        for stock, value in zip(stocks, performance):
+            if stock == 'UNKNOWN':
+                assert np.isnan(value)
+                continue
+            previous = closes.loc[(stock, pd.Timestamp('2026-08-31'))]
+            assert np.isclose(value, (closes.loc[(stock, pd.Timestamp('2026-09-15'))] - previous) / previous * 100)
+
+
+def test_monthly_stats_as_website():
+    """Months by name, missing values as 0, positive means >= 0, mean return in percent, open-to-low maximum."""
+    with tempfile.TemporaryDirectory() as tmp:
+        loader = DataLoader(str(write_data_dir(tmp)))
+        monthly = loader.load_monthly_stock_data()
+        assert np.isinf(monthly['pct_open_to_low']).any() and monthly['pct_open_to_low'].isna().any()
+
+        for stock, month in [('ERIC B', 'Sep'), ('AAK', 'Jan'), ('VOLV B', 'Jun'), ('AAK', 'Aug')]:
+            rows = monthly[(monthly['name'] == stock) & (monthly['month'] == month)]
+            returns = rows['pct_return_month'].fillna(0)
+            open_to_low = rows['pct_open_to_low'].replace([np.inf, -np.inf], np.nan).fillna(0)
+            stats = loader.get_monthly_stats_for_stock(stock, MONTH_NUMBERS[month])
+            assert stats['number_of_months_available'] == len(rows)
+            assert np.isclose(stats['pct_pos_return_months'], (returns >= 0).mean() * 100)
+            assert np.isclose(stats['return_month_mean_pct_return_month'], returns.mean() * 100)
+            assert np.isclose(stats['open_to_low_max_pct_return_month'], open_to_low.max())
+        # Without missing values the maximum is the smallest drop
+        assert loader.get_monthly_stats_for_stock('AAK', 8)['open_to_low_max_pct_return_month'] < 0
+        assert loader.get_monthly_stats_for_stock('ERIC B', 13) is None
+
+
+def touch(path: Path):
+    """Move a file's mtime forward (a rewrite within the mtime resolution would not show)."""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def table_loads(loader: DataLoader) -> dict:
+    """load_* method of each table the backtest reads."""
+    return {
+        'options': loader.load_options_data,
+        'stock_data': loader.load_stock_data,
+        'support': loader.load_support_metrics,
+        'recovery': loader.load_recovery_data,
+        'monthly': loader.load_monthly_stock_data,
+        'probability_history': loader.load_probability_history
+    }
+
+
+def cached_state(loader: DataLoader):
+    """Cached table and derived index objects, by name."""
+    tables = {table: loader._tables[table][2] for table in loader._tables}
+    indexes = {attr: getattr(loader, attr) for attrs in DERIVED_INDEXES.values() for attr in attrs}
+    return tables, indexes
+
+
+def test_refresh_reloads_only_changed_table():
+    """A changed file reloads its table and rebuilds only its derived indexes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = write_data_dir(tmp)
+        loader = DataLoader(str(data_dir))
+        loads = table_loads(loader)
+        for load in loads.values():
+            load()
+        loader.get_scoring_inputs(loader.load_options_data(), pd.Timestamp('2026-09-15'))
+        loader.get_support_metrics_wide(STOCKS, [30, 365])
+        assert loader.refresh() == []
+
+        tables, indexes = cached_state(loader)
+        assert set(tables) == set(loads)
+        csv_loads = loader.get_cache_stats()['csv_loads']
+
+        support_path = data_dir / 'support_level_metrics.csv'
+        support = pd.read_csv(support_path)
+        support.loc[support['stock_name'] == 'AAK', 'support_strength_score'] = 99.0
+        support.to_csv(support_path, index=False)
+        touch(support_path)
+
+        assert loader.refresh() == ['support']
+        assert loader.get_cache_stats()['csv_loads'] == csv_loads + 1
+        new_tables, new_indexes = cached_state(loader)
+        for table in loads:
+            assert (new_tables[table] is tables[table]) == (table != 'support'), table
+        for attr in indexes:
+            assert (new_indexes[attr] is indexes[attr]) == (attr not in DERIVED_INDEXES['support']), attr
+        # Support indexes that had been built are rebuilt from the new file
+        assert all(new_indexes[attr] is not None for attr in DERIVED_INDEXES['support'])
+        assert loader.get_support_metrics_for_stock('AAK', 90)['support_strength_score'] == 99.0
+        assert loader.refresh() == []
+
+        # A new last_updated.json timestamp changes the tables that use it
+        tables, indexes = cached_state(loader)
+        (data_dir / 'last_updated.json').write_text(json.dumps({'stockData': {'lastUpdated': '2026-09-30 18:00:00'}}))
+        assert sorted(loader.refresh()) == ['monthly', 'stock_data']
+        new_tables, new_indexes = cached_state(loader)
+        assert new_tables['options'] is tables['options'] and new_tables['monthly'] is not tables['monthly']
+        assert new_indexes['_support_index'] is indexes['_support_index']
+        assert new_indexes['_monthly_stats'] is not indexes['_monthly_stats']
+
+
+def test_lru_eviction_and_spill():
+    """Over the budget the least recently used tables are spilled; reloads read the spill, not the CSV."""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = write_data_dir(Path(tmp) / 'data', n_strikes=25)
+        spill_dir = Path(tmp) / 'spill'
+        loader = DataLoader(str(data_dir), memory_budget_mb=3, spill_dir=str(spill_dir))
+        loads = table_loads(loader)
+        for table in ('options', 'stock_data', 'support', 'recovery', 'monthly', 'options'):
+            loads[table]()
+        stats = loader.get_cache_stats()
+        sizes = {entry.split(':')[1]: size for entry, size in stats['entries'].items()}
+        order = list(sizes)
+        assert order == ['stock_data', 'support', 'recovery', 'monthly', 'options'] and stats['spilled'] == []
+
+        # probability_history (~2.8 MB) does not fit next to the others: the least
+        # recently used tables go, and no more than needed
+        loads['probability_history']()
+        stats = loader.get_cache_stats()
+        spilled = stats['spilled']
+        assert spilled and spilled == order[:len(spilled)]
+        assert stats['used_mb'] <= 3 < stats['used_mb'] + sizes[spilled[-1]]
+        assert np.isclose(stats['used_mb'], sum(sizes.values()) + stats['entries']['table:probability_history']
+                          - sum(sizes[table] for table in spilled))
+        assert stats['table_evictions'] == len(spilled) and stats['csv_loads'] == 6
+        assert all(list(spill_dir.glob(f"{table}.*")) for table in spilled)
+
+        # Spilled tables come back equal to the CSV contents without re-reading the CSV
+        reference = table_loads(DataLoader(str(data_dir)))
+        for table in spilled:
+            pd.testing.assert_frame_equal(loads[table](), reference[table]())
+        stats = loader.get_cache_stats()
+        assert stats['spill_reloads'] == len(spilled) and stats['csv_loads'] == 6
+        assert stats['used_mb'] <= 3 and stats['table_evictions'] == len(spilled) + len(stats['spilled'])
+
+        # A changed file is read from the CSV even when its table is spilled
+        for table in stats['spilled']:
+            touch(data_dir / TABLE_SPECS[table]['file_name'])
+            loads[table]()
+        assert loader.get_cache_stats()['csv_loads'] == 6 + len(stats['spilled'])
+        assert loader.get_cache_stats()['spill_reloads'] == len(spilled)
+
+
+def test_parallel_preload():
+    """Tables preloaded by a pool equal sequential loads; cached and missing files are skipped."""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = write_data_dir(tmp)
+        reference = {table: load() for table, load in table_loads(DataLoader(str(data_dir))).items()}
+
+        for use_processes in (False, True):
+            loader = DataLoader(str(data_dir))
+            timings = loader.preload(max_workers=3, use_processes=use_processes)
+            assert sorted(timings) == sorted(PRELOAD_TABLES) and all(t >= 0 for t in timings.values())
+            assert loader.get_cache_stats()['csv_loads'] == len(PRELOAD_TABLES)
+            for table, expected in reference.items():
+                pd.testing.assert_frame_equal(loader._tables[table][2], expected)
+
+        # Cached, unchanged tables are not parsed again; a changed one is
+        tables, _ = cached_state(loader)
+        assert loader.preload(max_workers=3) == {}
+        touch(data_dir / 'support_level_metrics.csv')
+        assert list(loader.preload(max_workers=3)) == ['support']
+        new_tables, _ = cached_state(loader)
+        assert all((new_tables[table] is tables[table]) == (table != 'support') for table in PRELOAD_TABLES)
+
+        # Missing files and a streamed history are skipped (streaming reads the options for expiry dates)
+        (data_dir / 'recovery_report_data.csv').unlink()
+        loader = DataLoader(str(data_dir))
+        loader.stream_probability_history(store_dir=str(Path(tmp) / 'stream'))
+        timings = loader.preload(max_workers=2)
+        assert sorted(timings) == ['monthly', 'stock_data', 'support']
+        assert 'recovery' not in loader._tables and 'probability_history' not in loader._tables
+        assert loader.preload(['options', 'recovery'], max_workers=2) == {}
+        try:
+            loader.preload(['unknown'])
+            assert False, 'expected ValueError'
+        except ValueError:
+            pass
+
+
+def assert_index_equal(result, expected, name: str):
+    """A derived index restored from a snapshot equals the built one."""
+    if isinstance(expected, pd.DataFrame):
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False, obj=name)
+    elif isinstance(expected, pd.Series):
+        pd.testing.assert_series_equal(result, expected, check_dtype=False, obj=name)
+    else:
+        assert list(result) == list(expected), name
+        for stock, (dates, closes) in expected.items():
+            assert np.array_equal(result[stock][0], dates) and np.array_equal(result[stock][1], closes), name
+
+
+def test_snapshot_round_trip():
+    """A snapshot restores equal tables and indexes; tables whose file changed are read from the CSV."""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = write_data_dir(Path(tmp) / 'data')
+        snapshot_path = Path(tmp) / 'data.snapshot'
+        current_date = pd.Timestamp('2026-09-15')
+        loader = DataLoader(str(data_dir))
+        loader.preload()
+        options = loader.load_options_data()
+        expected_inputs = loader.get_scoring_inputs(options, current_date)
+        loader.save_snapshot(snapshot_path)
+        tables, indexes = cached_state(loader)
+        indexes = {attr: index for attr, index in indexes.items() if isinstance(index, (pd.DataFrame, pd.Series, dict))}
+        assert set(indexes) >= {'_support_index', '_probability_peaks', '_monthly_stats', '_stock_prices'}
+
+        restored = DataLoader(str(data_dir))
+        assert sorted(restored.load_snapshot(snapshot_path)) == sorted(PRELOAD_TABLES)
+        for table, df in tables.items():
+            pd.testing.assert_frame_equal(restored._tables[table][2], df, check_dtype=False, obj=table)
+        for attr, index in indexes.items():
+            assert_index_equal(getattr(restored, attr), index, attr)
+        pd.testing.assert_frame_equal(restored.get_scoring_inputs(options, current_date), expected_inputs)
+        pd.testing.assert_frame_equal(
+            restored.get_backtest_panel('2026-07-15', '2026-09-30'),
+            loader.get_backtest_panel('2026-07-15', '2026-09-30'),
+            check_dtype=False
+        )
+        assert restored.get_cache_stats()['csv_loads'] == 0
+
+        # A changed file makes its table stale: skipped, without its indexes, and read from the CSV
+        support_path = data_dir / 'support_level_metrics.csv'
+        support = pd.read_csv(support_path)
+        support['support_strength_score'] = 50.0
+        support.to_csv(support_path, index=False)
+        touch(support_path)
+
+        stale = DataLoader(str(data_dir))
+        assert sorted(stale.load_snapshot(snapshot_path)) == sorted(set(PRELOAD_TABLES) - {'support'})
+        assert 'support' not in stale._tables
+        assert all(getattr(stale, attr) is None for attr in DERIVED_INDEXES['support'])
+        assert stale._monthly_stats is not None
+        assert stale.get_support_metrics_for_stock('AAK', 90)['support_strength_score'] == 50.0
+        assert stale.get_cache_stats()['csv_loads'] == 1
+
+        # Over a populated cache the stale table is left to refresh()
+        assert 'support' not in restored.load_snapshot(snapshot_path)
+        assert restored.refresh() == ['support']
+        assert restored.get_support_metrics_for_stock('AAK', 90)['support_strength_score'] == 50.0
+
+
+if __name__ == '__main__':
+    test_batch_lookups_match_single()
+    test_monthly_stats_as_website()
+    test_refresh_reloads_only_changed_table()
+    test_lru_eviction_and_spill()
+    test_parallel_preload()
+    test_snapshot_round_trip()
+    print("✓ All data loader tests passed")
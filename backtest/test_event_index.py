@@ -0,0 +1,67 @@
+"""
+Checks EventIndex.flags: earnings reports and ex-dates in (date, expiry] are
+flagged per option, the days to the next earnings and dividend event are
+reported, and an index without event data flags nothing. The loader's
+memory estimate of an index counts its arrays.
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_loader import estimate_memory_bytes
+from event_index import EventIndex
+
+
+def make_index() -> EventIndex:
+    """Historical reports for two stocks plus upcoming earnings and an ex-date."""
+    history = pd.DataFrame({
+        'date': pd.to_datetime(['2026-02-10', '2026-05-05', '2026-04-20', '2026-03-01']),
+        'name': ['AAA', 'AAA', 'BBB', 'BBB'],
+        'type_of_event': ['Bokslutskommuniké', 'Kvartalsrapport', 'Kvartalsrapport', 'Other']
+    })
+    upcoming = pd.DataFrame({
+        'date': pd.to_datetime(['2026-08-14', '2026-06-12']),
+        'stock_name': ['AAA', 'BBB'],
+        'event_type': ['Earnings Report', 'Ex-Date'],
+        'is_earnings': [True, False]
+    })
+    return EventIndex.from_frames(history, upcoming)
+
+
+def test_flags_match_direct_computation():
+    """Events in (date, expiry] are flagged and the next event day is reported."""
+    index = make_index()
+    flags = index.flags(
+        ['AAA', 'AAA', 'AAA', 'BBB', 'BBB', 'CCC'],
+        pd.to_datetime(['2026-05-01', '2026-05-05', '2026-05-06', '2026-04-01', '2026-06-01', '2026-05-01']),
+        pd.to_datetime(['2026-05-05', '2026-05-29', '2026-09-18', '2026-04-19', '2026-06-19', '2026-06-19'])
+    )
+
+    assert flags['earnings_before_expiry'].tolist() == [True, False, True, False, False, False]
+    assert flags['dividend_before_expiry'].tolist() == [False, False, False, False, True, False]
+    assert flags['event_before_expiry'].tolist() == [True, False, True, False, True, False]
+    assert np.allclose(flags['days_to_earnings'], [4, 101, 100, 19, np.nan, np.nan], equal_nan=True)
+    assert np.allclose(flags['days_to_dividend'], [np.nan, np.nan, np.nan, 72, 11, np.nan], equal_nan=True)
+
+
+def test_empty_index():
+    """Without event data nothing is flagged."""
+    index = EventIndex.from_frames()
+    flags = index.flags(['AAA'], pd.to_datetime(['2026-05-01']), pd.to_datetime(['2026-06-19']))
+    assert not flags['event_before_expiry'].any()
+    assert flags['days_to_earnings'].isna().all()
+
+
+def test_memory_estimate():
+    """nbytes covers every per-kind array, and the loader's LRU budget uses it."""
+    index = make_index()
+    arrays = sum(array.nbytes for kind in index.days for array in (index.days[kind], index.offsets[kind]))
+    assert index.nbytes > arrays
+    assert estimate_memory_bytes(index) == index.nbytes
+
+
+if __name__ == '__main__':
+    test_flags_match_direct_computation()
+    test_empty_index()
+    test_memory_estimate()
+    print("✓ All event index tests passed")
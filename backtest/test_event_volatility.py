@@ -0,0 +1,98 @@
+"""
+Checks the event-day volatility statistics: counts, quantiles, worst move
+and shares per stock and event type as pandas computes them, the event risk
+of each row's cushion, and an update that recomputes only the appended
+stock and equals a full rebuild. The loader's memory estimate counts the
+moves, statistics and sorted arrays.
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_loader import estimate_memory_bytes
+from event_volatility import ALL_EVENTS, EventVolatility
+
+
+def make_events() -> pd.DataFrame:
+    changes = {
+        'AAA': [-0.12, -0.04, 0.02, 0.05, -0.08, 0.10],
+        'BBB': [0.01, -0.02, 0.03]
+    }
+    rows = []
+    for stock, moves in changes.items():
+        for i, change in enumerate(moves):
+            close = 100 * (1 + change)
+            rows.append({
+                'date': pd.Timestamp('2025-01-30') + pd.DateOffset(months=3 * i),
+                'name': stock,
+                'type_of_event': 'Bokslutskommuniké' if i % 4 == 0 else 'Kvartalsrapport',
+                'low': min(close, 100) - 1,
+                'close': close,
+                'volume_pct_change_from_previous_day': np.inf if i == 1 else 0.5,
+                'close_price_pct_change_from_previous_day': change,
+                'pct_intraday_high_low_movement': -0.03
+            })
+    return pd.DataFrame(rows)
+
+
+def test_group_stats_match_pandas():
+    """Counts, quantiles, worst move and shares per stock and event type, as pandas computes them."""
+    events = make_events()
+    stats = EventVolatility.from_events(events).stats.set_index(['stock_name', 'event_type'])
+    moves = pd.concat([events, events.assign(type_of_event=ALL_EVENTS)])
+    expected = moves.groupby(['name', 'type_of_event'])['close_price_pct_change_from_previous_day']
+
+    assert stats['events'].tolist() == expected.size().tolist()
+    assert np.allclose(stats['p05'], expected.quantile(0.05))
+    assert np.allclose(stats['p50'], expected.median())
+    assert np.allclose(stats['worst_change'], expected.min())
+    assert np.allclose(stats['std_change'], expected.std(ddof=0))
+    assert np.allclose(stats['share_below_5pct'], expected.apply(lambda x: (x <= -0.05).mean()))
+
+    aaa = stats.loc[('AAA', ALL_EVENTS)]
+    assert np.isclose(aaa['negative_rate'], 0.5)
+    assert np.isclose(aaa['worst_intraday_low'], -0.13)
+    assert np.isclose(aaa['mean_volume_change'], 0.5)  # inf volume change ignored
+
+
+def test_event_risk():
+    """Share of event moves at or beyond each row's cushion; unknown stocks get NaN."""
+    volatility = EventVolatility.from_events(make_events())
+    risk = volatility.event_risk(['AAA', 'AAA', 'BBB', 'CCC', 'AAA'], [0.05, 0.08, 0.01, 0.05, np.nan])
+
+    assert risk['event_count'].tolist() == [6, 6, 3, 0, 6]
+    assert np.allclose(risk['event_beyond_cushion'], [2 / 6, 2 / 6, 1 / 3, np.nan, np.nan], equal_nan=True)
+    assert np.isclose(risk.loc[0, 'event_worst_move'], -0.12)
+
+    low = volatility.event_risk(['AAA'], [0.05], measure='intraday_low')
+    assert np.isclose(low.loc[0, 'event_beyond_cushion'], 3 / 6)
+
+
+def test_update_matches_rebuild():
+    """Appending events recomputes only the affected stock and matches a full rebuild."""
+    events = make_events()
+    volatility = EventVolatility.from_events(events[:-1])
+    assert volatility.update(events) == ['BBB']
+    assert volatility.update(events) == []
+
+    rebuilt = EventVolatility.from_events(events)
+    pd.testing.assert_frame_equal(volatility.stats, rebuilt.stats)
+    risk = volatility.event_risk(['AAA', 'BBB'], [0.05, 0.01])
+    pd.testing.assert_frame_equal(risk, rebuilt.event_risk(['AAA', 'BBB'], [0.05, 0.01]))
+
+
+
+def test_memory_estimate():
+    """nbytes covers the moves, statistics and sorted arrays, and the loader's LRU budget uses it."""
+    volatility = EventVolatility.from_events(make_events())
+    assert volatility.nbytes > (volatility.moves.memory_usage(deep=True).sum()
+                                + volatility.stats.memory_usage(deep=True).sum())
+    assert estimate_memory_bytes(volatility) == volatility.nbytes
+
+
+if __name__ == '__main__':
+    test_group_stats_match_pandas()
+    test_event_risk()
+    test_update_matches_rebuild()
+    test_memory_estimate()
+    print("✓ All event volatility tests passed")
@@ -0,0 +1,79 @@
+"""
+Checks the IV screening builder: a row of the published
+IV_PotentialDecline.csv is reproduced from its chain, the at-the-money IV is
+picked per (stock, expiry, date), strikes above the price are ITM, and
+appending twice writes every date once.
+"""
+
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from iv_screening import SCREENING_COLUMNS, append_iv_screening, build_iv_screening
+
+
+def make_chain() -> pd.DataFrame:
+    """Two TRATON expiries on two days; the 2026-09-18 strikes of 2026-08-21 match the published file."""
+    rows = []
+    for date, price in (('2026-08-21', 406.0), ('2026-08-24', 360.0)):
+        for expiry, days, ivs in (('2026-09-18', 20, {345: 0.3964, 405: 0.3044250563718808, 420: 0.31}),
+                                  ('2026-10-16', 40, {345: 0.35, 400: 0.30, 410: 0.29})):
+            for strike, iv in ivs.items():
+                rows.append({
+                    'StockName': 'TRATON', 'OptionName': f'TRA{expiry[5:7]}{strike}', 'Update_date': date,
+                    'ExpiryDate': expiry, 'StockPrice': price, 'StrikePrice': float(strike),
+                    'ImpliedVolatility': iv, 'DaysToExpiry': days
+                })
+    return pd.DataFrame(rows)
+
+
+def test_matches_published_row():
+    """TRATON 8TRA6U345 on 2026-08-21 as in data/IV_PotentialDecline.csv."""
+    screening = build_iv_screening(make_chain())
+    assert list(screening.columns) == SCREENING_COLUMNS
+
+    row = screening[(screening['OptionName'] == 'TRA09345') & (screening['Update_date'] == '2026-08-21')].iloc[0]
+    assert np.isclose(row['IV_ClosestToStrike'], 0.3044250563718808)
+    assert np.isclose(row['IV_UntilExpiryClosestToStrike'], 0.0857620438795545)
+    assert row['LowerBoundClosestToStrike'] == 371.2
+    assert np.isclose(row['ImpliedDownPct'], 0.0857142857142857)
+    assert np.isclose(row['LowerBoundDistanceFromStrike'], 0.0759420289855072)
+    assert np.isclose(row['SafetyMultiple'], 1.7528735632183905)
+    assert np.isclose(row['SigmasToStrike'], 2.9886611978144986)
+    assert np.isclose(row['ProbAssignment'], 0.0014010132473648)
+    assert np.isclose(row['CushionMinusIVPct'], 0.0645320197044334)
+    assert row['SafetyCategory'] == 'Very Safe'
+
+
+def test_closest_strike_per_group():
+    """The at-the-money IV is picked per (stock, expiry, date); strikes above the price are ITM."""
+    screening = build_iv_screening(make_chain()).set_index(['Update_date', 'OptionName'])
+    assert np.isclose(screening.loc[('2026-08-24', 'TRA09345'), 'IV_ClosestToStrike'], 0.3964)
+    assert np.isclose(screening.loc[('2026-08-21', 'TRA10345'), 'IV_ClosestToStrike'], 0.29)
+    assert np.isclose(screening.loc[('2026-08-24', 'TRA10345'), 'IV_ClosestToStrike'], 0.35)
+    assert screening.loc[('2026-08-21', 'TRA09420'), 'SafetyCategory'] == 'ITM (High Risk)'
+    assert screening.loc[('2026-08-21', 'TRA09420'), 'ProbAssignment'] > 0.5
+
+
+def test_append_skips_known_dates():
+    """Appending twice writes every date once."""
+    chain = make_chain()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'IV_PotentialDecline.csv'
+        first = append_iv_screening(chain[chain['Update_date'] == '2026-08-21'], path)
+        second = append_iv_screening(chain, path)
+        third = append_iv_screening(chain, path)
+        saved = pd.read_csv(path, delimiter='|')
+
+    assert (len(first), len(second), len(third)) == (6, 6, 0)
+    assert list(saved.columns) == SCREENING_COLUMNS
+    assert saved['Update_date'].value_counts().to_dict() == {'2026-08-21': 6, '2026-08-24': 6}
+
+
+if __name__ == '__main__':
+    test_matches_published_row()
+    test_closest_strike_per_group()
+    test_append_skips_known_dates()
+    print("✓ All IV screening tests passed")
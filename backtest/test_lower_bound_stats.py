@@ -0,0 +1,73 @@
+"""
+Checks the lower-bound breach analytics: per-expiry bound statistics and
+breach counts (close below the bound, unknown before expiry), monthly hit
+rate trends, and an incremental update that recomputes only the touched
+expiries and equals a full rebuild.
+"""
+
+import numpy as np
+import pandas as pd
+
+from lower_bound_stats import expiry_stats, hit_rate_trends, update_expiry_stats
+
+
+CLOSES = {
+    ('AAA', '2026-01-16'): 100.0,
+    ('AAA', '2026-01-30'): 90.0,
+    ('BBB', '2026-01-16'): 50.0
+}
+
+
+def get_closes(stocks, expiries):
+    """Close on each expiry date; AAA 2026-02-20 has not expired."""
+    return np.array([CLOSES.get((s, str(pd.Timestamp(e).date())), np.nan) for s, e in zip(stocks, expiries)])
+
+
+def make_predictions() -> pd.DataFrame:
+    return pd.DataFrame({
+        'Stock': ['AAA', 'AAA', 'AAA', 'AAA', 'AAA', 'BBB', 'BBB', 'AAA'],
+        'PredictionDate': pd.to_datetime(['2026-01-02', '2026-01-05', '2026-01-06', '2026-01-07',
+                                          '2026-01-08', '2026-01-02', '2026-01-05', '2026-01-09']),
+        'ExpiryDate': pd.to_datetime(['2026-01-16', '2026-01-16', '2026-01-16', '2026-01-30',
+                                      '2026-02-20', '2026-01-16', '2026-01-16', '2026-01-30']),
+        'LowerBound': [95.0, 101.0, 97.0, 92.0, 85.0, 45.0, 48.0, 88.0]
+    })
+
+
+def test_expiry_stats():
+    """Min/max/median/mean, counts and breaches (close below the bound) per stock and expiry."""
+    stats = expiry_stats(make_predictions(), get_closes)
+
+    assert stats[['Stock', 'ExpiryDate']].astype(str).values.tolist() == [
+        ['AAA', '2026-01-16'], ['AAA', '2026-01-30'], ['AAA', '2026-02-20'], ['BBB', '2026-01-16']
+    ]
+    first = stats.iloc[0]
+    assert (first['LowerBound_Min'], first['LowerBound_Max'], first['LowerBound_Median']) == (95.0, 101.0, 97.0)
+    assert np.isclose(first['LowerBound_Mean'], 293 / 3)
+    assert stats['PredictionCount'].tolist() == [3, 2, 1, 2]
+    assert np.allclose(stats['BreachCount'], [1, 1, np.nan, 0], equal_nan=True)
+    assert stats.iloc[1]['LowerBound_Median'] == 90.0
+
+
+def test_hit_rate_trends():
+    """Expiry months with a known close; expiries of a month are pooled."""
+    trends = hit_rate_trends(expiry_stats(make_predictions(), get_closes))
+    assert trends[['Stock', 'Date', 'Total']].values.tolist() == [['AAA', '2026-01', 5], ['BBB', '2026-01', 2]]
+    assert np.allclose(trends['HitRate'], [60.0, 100.0])
+
+
+def test_incremental_update_matches_rebuild():
+    """Recomputing touched expiries gives the same stats as a full rebuild."""
+    predictions = make_predictions()
+    old = expiry_stats(predictions[predictions['PredictionDate'] < '2026-01-08'], get_closes)
+    updated, recomputed = update_expiry_stats(old, predictions, get_closes, '2026-01-08')
+
+    assert recomputed == 2
+    pd.testing.assert_frame_equal(updated, expiry_stats(predictions, get_closes))
+
+
+if __name__ == '__main__':
+    test_expiry_stats()
+    test_hit_rate_trends()
+    test_incremental_update_matches_rebuild()
+    print("✓ All lower bound stats tests passed")
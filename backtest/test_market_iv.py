@@ -0,0 +1,95 @@
+"""
+Checks the MARKET_IV index: MAD outlier exclusion, minimum coverage and
+variance averaging per date as the generator computes them, an incremental
+update that equals computing every date, and the trailing-percentile regime
+bands.
+"""
+
+import numpy as np
+import pandas as pd
+
+from market_iv import MARKET_IV_NAME, market_iv, market_iv_rows, market_regime, update_market_iv
+
+
+def reference_market_iv(iv: np.ndarray):
+    """The per-date computation of the generator script."""
+    iv = iv[~np.isnan(iv)]
+    if len(iv) < 30:
+        return np.nan, len(iv), 0
+    median = np.median(iv)
+    threshold = median + 4 * np.median(np.abs(iv - median)) * 1.4826
+    keep = iv[iv <= threshold]
+    if len(keep) < 30:
+        keep = iv
+    return np.sqrt(np.mean(keep ** 2)), len(keep), len(iv) - len(keep)
+
+
+def make_iv_rows(n_dates: int = 40, n_stocks: int = 45, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    iv = rng.lognormal(np.log(0.25), 0.25, (n_dates, n_stocks))
+    iv[rng.random(iv.shape) < 0.1] = np.nan
+    iv[::7, :3] = 1.5                  # company-specific spikes
+    iv[5, 20:] = np.nan                # below the minimum coverage
+    return pd.DataFrame({
+        'Stock_Name': np.repeat([f'Stock {i}' for i in range(n_stocks)], n_dates),
+        'Date': np.tile(pd.bdate_range('2025-01-02', periods=n_dates), n_stocks),
+        'Stock_Price': 100.0,
+        'IV_30d': iv.T.ravel(),
+        'Method': 'interpolated',
+        'Country': 'SE'
+    })
+
+
+def test_market_iv_matches_reference():
+    """MAD exclusion, minimum coverage and variance averaging per date, as the generator computes them."""
+    rng = np.random.default_rng(1)
+    matrix = rng.lognormal(np.log(0.3), 0.3, (25, 60))
+    matrix[rng.random(matrix.shape) < 0.2] = np.nan
+    matrix[0, :32] = 2.0                  # exclusion would leave < 30 stocks: cancelled
+    matrix[1, 29:] = np.nan               # 29 stocks: no index
+    matrix[2, :5] = 3.0                   # five outliers excluded
+
+    index, n_stocks, n_excluded = market_iv(matrix)
+    expected = np.array([reference_market_iv(row) for row in matrix])
+
+    assert np.allclose(index, expected[:, 0], equal_nan=True, rtol=1e-14)
+    assert n_stocks.tolist() == expected[:, 1].astype(int).tolist()
+    assert n_excluded.tolist() == expected[:, 2].astype(int).tolist()
+    assert n_excluded[0] == 0 and np.isnan(index[1]) and n_excluded[2] >= 5
+
+
+def test_incremental_update_matches_full():
+    """New dates (plus the refreshed last dates) give the same rows as computing every date."""
+    iv_df = make_iv_rows()
+    full = pd.concat([iv_df, market_iv_rows(iv_df)], ignore_index=True)
+    dates = np.sort(iv_df['Date'].unique())
+    partial = full[~((full['Stock_Name'] == MARKET_IV_NAME) & (full['Date'] >= dates[-5]))]
+
+    updated, recomputed = update_market_iv(partial)
+    assert recomputed == 5
+    market = updated[updated['Stock_Name'] == MARKET_IV_NAME].reset_index(drop=True)
+    pd.testing.assert_frame_equal(market, market_iv_rows(iv_df)[market.columns])
+    # Stock rows keep their order, MARKET_IV rows are appended by date
+    assert updated['Stock_Name'].tolist()[:len(iv_df)] == iv_df['Stock_Name'].tolist()
+
+
+def test_market_regime():
+    """Trailing percentile with a minimum history, and regime bands."""
+    market = pd.DataFrame({
+        'Date': pd.bdate_range('2025-01-02', periods=30),
+        'IV_30d': np.r_[np.linspace(0.2, 0.3, 29), 0.1]
+    })
+    regime = market_regime(market, window=10)
+
+    assert regime['market_iv_percentile'].iloc[:9].isna().all()
+    assert regime['market_iv_percentile'].iloc[28] == 1.0
+    assert regime['market_iv_regime'].iloc[28] == 'stress'
+    assert regime['market_iv_percentile'].iloc[29] == 0.1
+    assert regime['market_iv_regime'].iloc[29] == 'low'
+
+
+if __name__ == '__main__':
+    test_market_iv_matches_reference()
+    test_incremental_update_matches_full()
+    test_market_regime()
+    print("✓ All market IV tests passed")
@@ -0,0 +1,69 @@
+"""
+Quick test to validate the Monte Carlo simulator.
+
+Uses a small synthetic option chain so it runs without the data files.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from monte_carlo import MonteCarloSimulator
+
+
+def _synthetic_chain() -> pd.DataFrame:
+    """Three strikes across two expiries on one stock."""
+    return pd.DataFrame({
+        'OptionName': ['TEST1', 'TEST2', 'TEST3'],
+        'StockName': ['TEST', 'TEST', 'TEST'],
+        'StockPrice': [100.0, 100.0, 100.0],
+        'StrikePrice': [90.0, 95.0, 90.0],
+        'DaysToExpiry': [20, 20, 60],
+        'Premium': [100.0, 250.0, 300.0],
+        'NumberOfContractsBasedOnLimit': [10.0, 10.0, 10.0],
+        'ImpliedVolatility': [0.25, 0.25, 0.25]
+    })
+
+
+def test_lognormal_matches_closed_form():
+    """PoW should match N(d2) for the lognormal model within sampling error."""
+    chain = _synthetic_chain()
+    result = MonteCarloSimulator(n_paths=50_000, seed=1).simulate(chain)
+
+    for _, option in chain.iterrows():
+        t = option['DaysToExpiry'] / 252
+        sigma = option['ImpliedVolatility']
+        d2 = (math.log(100.0 / option['StrikePrice']) - 0.5 * sigma ** 2 * t) / (sigma * math.sqrt(t))
+        expected = 0.5 * (1 + math.erf(d2 / math.sqrt(2)))
+        simulated = result.loc[result['OptionName'] == option['OptionName'], 'prob_worthless'].iloc[0]
+        assert abs(simulated - expected) < 0.01
+
+
+def test_results_independent_of_chunk_size():
+    """Seeded blocks make results identical for any memory budget."""
+    chain = _synthetic_chain()
+    small = MonteCarloSimulator(n_paths=5000, max_chunk_mb=0.01).simulate(chain)
+    large = MonteCarloSimulator(n_paths=5000, max_chunk_mb=256).simulate(chain)
+
+    assert np.allclose(small['expected_pnl'], large['expected_pnl'])
+    assert np.allclose(small['prob_worthless'], large['prob_worthless'])
+
+
+def test_bootstrap_uses_historical_returns():
+    """A history with only positive returns can never finish below the strike."""
+    chain = _synthetic_chain()
+    returns = {'TEST': np.full(250, 0.001)}
+    result = MonteCarloSimulator(n_paths=2000, method='bootstrap').simulate(
+        chain, returns_by_stock=returns
+    )
+
+    assert (result['prob_worthless'] == 1.0).all()
+    assert np.allclose(result['expected_pnl'], chain['Premium'])
+
+
+if __name__ == '__main__':
+    test_lognormal_matches_closed_form()
+    test_results_independent_of_chunk_size()
+    test_bootstrap_uses_historical_returns()
+    print("✓ Monte Carlo simulator tests passed")
@@ -0,0 +1,78 @@
+"""
+Quick test to validate the portfolio construction engine.
+
+Compares the vectorized greedy selection with the website's sequential loop
+and the exact solver with brute force, on small random universes.
+"""
+
+import itertools
+
+import numpy as np
+
+from portfolio_engine import exact_select, greedy_select
+
+
+def _website_loop(premium, capital, stocks, target, capital_limit):
+    """Sequential selection as written in PortfolioGenerator.tsx."""
+    used = set()
+    selected = []
+    total_premium = total_capital = 0.0
+    for i in range(len(premium)):
+        if stocks[i] in used:
+            continue
+        if total_premium + premium[i] <= target and (
+            capital_limit is None or total_capital + capital[i] <= capital_limit
+        ):
+            selected.append(i)
+            used.add(stocks[i])
+            total_premium += premium[i]
+            total_capital += capital[i]
+    return selected
+
+
+def test_greedy_matches_website_loop():
+    """Vectorized rounds select exactly what the sequential loop selects."""
+    rng = np.random.default_rng(7)
+    for trial in range(200):
+        n = int(rng.integers(1, 60))
+        premium = rng.integers(1, 300, n).astype(float)
+        capital = rng.integers(1, 100, n) * 1000.0
+        stocks = rng.integers(0, 8, n)
+        target = float(rng.integers(50, 3000))
+        capital_limit = None if trial % 2 else float(rng.integers(5, 200) * 1000)
+
+        selected = greedy_select(premium, capital, stocks, target, capital_limit)
+        assert list(selected) == _website_loop(premium, capital, stocks, target, capital_limit)
+
+
+def test_exact_is_optimal():
+    """Knapsack solution matches brute force over all feasible portfolios."""
+    rng = np.random.default_rng(11)
+    for _ in range(50):
+        n = int(rng.integers(1, 9))
+        premium = rng.integers(1, 100, n).astype(float)
+        capital = rng.integers(1, 10, n) * 10_000.0
+        score = rng.random(n)
+        stocks = rng.integers(0, 4, n)
+        target = float(rng.integers(20, 300))
+        capital_limit = float(rng.integers(1, 40) * 10_000)
+
+        selected = exact_select(score, premium, capital, stocks, target, capital_limit)
+
+        best = 0.0
+        for size in range(n + 1):
+            for combo in itertools.combinations(range(n), size):
+                combo = list(combo)
+                if len(set(stocks[combo])) < len(combo):
+                    continue
+                if premium[combo].sum() > target or capital[combo].sum() > capital_limit:
+                    continue
+                best = max(best, score[combo].sum())
+
+        assert abs(score[selected].sum() - best) < 1e-9
+
+
+if __name__ == '__main__':
+    test_greedy_matches_website_loop()
+    test_exact_is_optimal()
+    print("✓ Portfolio engine tests passed")
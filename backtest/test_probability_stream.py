@@ -0,0 +1,151 @@
+"""
+Checks the probability series store: streaming the CSV in chunks builds the
+same arrays as building from a frame, as-of values and running peaks match
+pandas merge_asof, per-option views share the mapped memory, and a DataLoader
+fed by stream_probability_history answers like one that loads
+probability_history.csv whole.
+"""
+
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DataLoader, PROBABILITY_METHODS
+from probability_stream import ProbabilitySeriesStore, stream_probability_history
+from test_data_loader import write_data_dir
+
+METHODS = ['Weighted_Ensemble', 'Original_Black_Scholes']
+
+
+def make_history(n_options: int = 30, n_dates: int = 40, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2026-01-05', periods=n_dates)
+    history = pd.DataFrame({
+        'OptionName': np.repeat([f'OPT{i}' for i in range(n_options)], n_dates),
+        'Update_date': np.tile(dates, n_options),
+        **{method: rng.random(n_options * n_dates).round(4) for method in METHODS}
+    })
+    # Options with gaps and missing values, rows in date order as the file
+    history = history[rng.random(len(history)) > 0.2]
+    history.loc[history.sample(frac=0.05, random_state=seed).index, METHODS[0]] = np.nan
+    return history.sort_values('Update_date', kind='stable', ignore_index=True)
+
+
+def reference_as_of(history: pd.DataFrame, queries: pd.DataFrame, method: str, peak: bool) -> np.ndarray:
+    """pandas merge_asof over the history, with peaks from a grouped cummax."""
+    history = history.sort_values(['Update_date'], kind='stable')
+    values = history[method].astype(np.float32).astype(np.float64)
+    if peak:
+        values = values.groupby(history['OptionName']).cummax()
+        values = values.groupby(history['OptionName']).ffill()
+    right = history[['OptionName', 'Update_date']].assign(value=values.round(7))
+    left = queries.reset_index().sort_values('Update_date')
+    merged = pd.merge_asof(left, right, on='Update_date', by='OptionName', direction='backward')
+    return merged.sort_values('index')['value'].to_numpy()
+
+
+def make_queries(n: int = 500, seed: int = 1) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'OptionName': rng.choice([f'OPT{i}' for i in range(32)], n),    # OPT30, OPT31 unknown
+        'Update_date': pd.Timestamp('2026-01-01') + pd.to_timedelta(rng.integers(0, 70, n), unit='D')
+    })
+
+
+def test_stream_matches_from_frame():
+    history = make_history()
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / 'probability_history.csv'
+        history.to_csv(csv_path, sep='|', index=False, date_format='%Y-%m-%d')
+        streamed = stream_probability_history(csv_path, methods=METHODS, chunk_rows=97,
+                                              store_dir=Path(tmp) / 'stream').store
+        framed = ProbabilitySeriesStore.from_frame(history, Path(tmp) / 'frame', methods=METHODS)
+
+        assert list(streamed.option_names) == list(framed.option_names)
+        assert np.array_equal(streamed.offsets, framed.offsets)
+        assert np.array_equal(streamed.days, framed.days)
+        assert np.array_equal(streamed.values, framed.values, equal_nan=True)
+        assert isinstance(framed.days, np.memmap)
+        # int32 day + float32 per method, plus one offset per option
+        assert framed.nbytes == len(history) * (4 + 4 * len(METHODS)) + (history['OptionName'].nunique() + 1) * 8
+
+
+def test_as_of_and_peaks_match_reference():
+    history = make_history()
+    queries = make_queries()
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ProbabilitySeriesStore.from_frame(history, tmp, methods=METHODS)
+        for method in METHODS:
+            for peak in (False, True):
+                result = store.as_of(queries['OptionName'], queries['Update_date'], method, peak=peak)
+                expected = reference_as_of(history, queries, method, peak)
+                assert np.allclose(result, expected, equal_nan=True), (method, peak)
+
+        exact = queries.merge(history, on=['OptionName', 'Update_date'], how='left')
+        result = store.lookup(queries['OptionName'], queries['Update_date'], METHODS[1])
+        assert np.allclose(result, exact[METHODS[1]].astype(np.float32).astype(np.float64).round(7), equal_nan=True)
+
+
+def test_view_is_zero_copy():
+    history = make_history()
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ProbabilitySeriesStore.from_frame(history, tmp, methods=METHODS)
+        days, values = store.view('OPT3', METHODS[0])
+        assert np.shares_memory(days, store.days)
+        assert np.shares_memory(values, store.values)
+
+        expected = history[history['OptionName'] == 'OPT3']
+        assert np.array_equal(days, (expected['Update_date'].to_numpy(dtype='datetime64[D]')
+                                     - np.datetime64('1970-01-01', 'D')).astype(np.int32))
+        assert np.allclose(values, expected[METHODS[0]].to_numpy(dtype=np.float32), equal_nan=True)
+
+        days, values = store.view('UNKNOWN')
+        assert len(days) == 0 and values.shape == (0, len(METHODS))
+
+
+def test_loader_stream_matches_load():
+    """A streamed DataLoader gives the peaks, as-of values and panel of a full load."""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = write_data_dir(Path(tmp) / 'data')
+        loaded = DataLoader(str(data_dir))
+        history = loaded.load_probability_history()
+        streamed = DataLoader(str(data_dir))
+        summary = streamed.stream_probability_history(chunk_rows=500, store_dir=str(Path(tmp) / 'stream'))
+        assert summary.n_rows == len(history) and summary.out_of_order_rows == 0
+        assert 'probability_history' not in streamed._tables
+
+        options = loaded.load_options_data()
+        names = list(options['OptionName']) + ['UNKNOWN']
+        for method in PROBABILITY_METHODS:
+            expected = loaded.get_probability_peaks_batch(names, method)
+            assert np.isnan(expected[[0, -1]]).all()
+            assert np.array_equal(streamed.get_probability_peaks_batch(names, method), expected, equal_nan=True)
+
+        queries = make_queries()
+        queries['OptionName'] = np.resize(names, len(queries))
+        queries['Update_date'] = pd.Timestamp('2026-06-25') + pd.to_timedelta(queries.index % 100, unit='D')
+        for method in PROBABILITY_METHODS[:2]:
+            for peak in (False, True):
+                result = summary.store.as_of(queries['OptionName'], queries['Update_date'], method, peak=peak)
+                expected = reference_as_of(history, queries, method, peak)
+                assert np.allclose(result, expected, equal_nan=True), (method, peak)
+
+        for kwargs in ({}, {'rolling_period': [30, 365], 'probability_method': PROBABILITY_METHODS[:2]}):
+            pd.testing.assert_frame_equal(
+                streamed.get_backtest_panel('2026-07-15', '2026-09-30', **kwargs),
+                loaded.get_backtest_panel('2026-07-15', '2026-09-30', **kwargs)
+            )
+        pd.testing.assert_frame_equal(
+            streamed.get_scoring_inputs(options, pd.Timestamp('2026-09-15')),
+            loaded.get_scoring_inputs(options, pd.Timestamp('2026-09-15'))
+        )
+
+
+if __name__ == '__main__':
+    test_stream_matches_from_frame()
+    test_as_of_and_peaks_match_reference()
+    test_view_is_zero_copy()
+    test_loader_stream_matches_load()
+    print("✓ All probability stream tests passed")
@@ -0,0 +1,82 @@
+"""
+Checks the ranking helpers: daily_top_k picks the rows of a full sort per
+day, with ties and missing scores and an optional per-stock cap;
+daily_rank_deciles matches the within-day rank; rank_metrics counts
+precision@K over the settled selections.
+"""
+
+import numpy as np
+import pandas as pd
+
+from ranking import daily_rank_deciles, daily_top_k, rank_metrics
+
+
+def make_rows(n: int = 4000, seed: int = 0):
+    """Random days, stocks and scores with ties and a few missing scores."""
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        'day': rng.integers(0, 30, n),
+        'stock': rng.choice(['AAA', 'BBB', 'CCC', 'DDD', 'EEE'], n),
+        'score': rng.integers(0, 60, n).astype(float)
+    })
+    frame.loc[rng.random(n) < 0.02, 'score'] = np.nan
+    return frame
+
+
+def reference_top_k(frame, k, cap=None):
+    """Full sort per day: score descending, ties in row order, optional per-stock cap."""
+    ranked = frame.dropna(subset=['score']).reset_index().sort_values(
+        ['day', 'score', 'index'], ascending=[True, False, True]
+    )
+    if cap is not None:
+        ranked = ranked[ranked.groupby(['day', 'stock']).cumcount() < cap]
+    return ranked.groupby('day').head(k)['index'].to_numpy()
+
+
+def test_top_k_matches_full_sort():
+    """Partial selection returns the same rows in the same order as a full sort."""
+    frame = make_rows()
+    for k, cap in [(1, None), (7, None), (12, 2), (40, 1)]:
+        rows, ranks = daily_top_k(
+            frame['day'].to_numpy(), frame['score'].to_numpy(), k,
+            stock_codes=frame['stock'].to_numpy(), per_stock_cap=cap
+        )
+        assert np.array_equal(rows, reference_top_k(frame, k, cap))
+        assert np.array_equal(ranks, frame.loc[rows].groupby('day').cumcount().to_numpy())
+
+
+def test_deciles_match_rank():
+    """With distinct scores, decile = floor(10 * rank / n) within each day."""
+    frame = make_rows().dropna(subset=['score'])
+    frame['score'] = frame['score'] + np.random.default_rng(1).random(len(frame))
+    rank = frame.groupby('day')['score'].rank(ascending=False, method='first') - 1
+    size = frame.groupby('day')['score'].transform('size')
+    expected = (10 * rank // size).astype(int).to_numpy()
+    assert np.array_equal(daily_rank_deciles(frame['day'].to_numpy(), frame['score'].to_numpy()), expected)
+
+
+def test_rank_metrics():
+    """Precision@K counts worthless outcomes among the settled top-K rows."""
+    results = pd.DataFrame({
+        'date': pd.to_datetime(['2026-03-02'] * 3 + ['2026-03-03'] * 3),
+        'stock_name': ['AAA', 'BBB', 'CCC', 'AAA', 'BBB', 'CCC'],
+        'composite_score': [90.0, 80.0, 70.0, 60.0, 85.0, 75.0],
+        'outcome': ['worthless', 'ITM', 'worthless', 'worthless', 'worthless', None],
+        'premium': [100.0, 200.0, 300.0, 400.0, 500.0, 600.0]
+    })
+    selections, metrics, deciles = rank_metrics(results, ks=[1, 2])
+
+    assert selections['rank'].tolist() == [1, 2, 1, 2]
+    assert metrics['selected'].tolist() == [2, 4]
+    assert metrics['settled'].tolist() == [2, 3]
+    assert np.allclose(metrics['precision_at_k'], [100.0, 200 / 3])
+    assert np.allclose(metrics['mean_premium'], [300.0, 350.0])
+    assert np.isclose(metrics['base_hit_rate'].iloc[0], 80.0)
+    assert deciles['n'].sum() == len(results)
+
+
+if __name__ == '__main__':
+    test_top_k_matches_full_sort()
+    test_deciles_match_rank()
+    test_rank_metrics()
+    print("✓ All ranking tests passed")
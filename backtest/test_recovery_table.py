@@ -0,0 +1,75 @@
+"""
+Checks RecoveryTable lookups: a stock's own worthless rate is used when it
+has at least min_n recovery candidates and the scenario rate otherwise, with
+the source of each rate reported; unknown bins, thresholds and methods give
+NaN.
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_loader import estimate_memory_bytes
+from recovery_table import SOURCE_MISSING, SOURCE_SCENARIO, SOURCE_STOCK, RecoveryTable
+
+
+def make_recovery() -> pd.DataFrame:
+    """Scenario rows for two bins plus sparse and dense stock rows."""
+    rows = [
+        ('scenario', None, 0.9, 'Bayesian Calibrated', '80-90%', '0-7', 1000, 90.0),
+        ('scenario', None, 0.9, 'Bayesian Calibrated', '70-80%', '0-7', 800, 80.0),
+        ('stock', 'AAA', 0.9, 'Bayesian Calibrated', '80-90%', '0-7', 50, 95.0),
+        ('stock', 'AAA', 0.9, 'Bayesian Calibrated', '70-80%', '0-7', 5, 20.0),
+        ('stock', 'BBB', 0.9, 'Bayesian Calibrated', '80-90%', '0-7', 0, np.nan),
+        ('stock', 'BBB', 0.9, 'Bayesian Calibrated', '60-70%', '8-14', 40, 70.0)
+    ]
+    return pd.DataFrame(rows, columns=[
+        'DataType', 'Stock', 'HistoricalPeakThreshold', 'ProbMethod', 'CurrentProb_Bin', 'DTE_Bin',
+        'RecoveryCandidate_N', 'RecoveryCandidate_WorthlessRate_pct'
+    ])
+
+
+def test_stock_rates_with_fallback():
+    """Stock rates need min_n candidates; otherwise the scenario rate is used."""
+    table = RecoveryTable.from_frame(make_recovery(), min_n=30)
+    rates, sources = table.lookup(
+        ['AAA', 'AAA', 'BBB', 'CCC', 'BBB', 'AAA'],
+        0.9,
+        'Bayesian Calibrated',
+        ['80-90%', '70-80%', '80-90%', '80-90%', '60-70%', '50-60%'],
+        ['0-7', '0-7', '0-7', '0-7', '8-14', '0-7'],
+        return_sources=True
+    )
+
+    expected = np.array([0.95, 0.80, 0.90, 0.90, 0.70, np.nan])
+    assert np.allclose(rates, expected, equal_nan=True)
+    assert list(sources) == [SOURCE_STOCK, SOURCE_SCENARIO, SOURCE_SCENARIO, SOURCE_SCENARIO,
+                             SOURCE_STOCK, SOURCE_MISSING]
+
+    # A lower minimum admits the sparse AAA cell
+    loose = RecoveryTable.from_frame(make_recovery(), min_n=5)
+    assert np.isclose(loose.lookup(['AAA'], 0.9, 'Bayesian Calibrated', ['70-80%'], ['0-7'])[0], 0.20)
+
+
+def test_scenario_lookup_and_unknown_keys():
+    """stocks=None gives scenario rates; unknown thresholds and methods give NaN."""
+    table = RecoveryTable.from_frame(make_recovery())
+    scenario = table.lookup(None, 0.9, 'Bayesian Calibrated', ['80-90%', '70-80%'], ['0-7', '0-7'])
+    assert np.allclose(scenario, [0.90, 0.80])
+
+    assert np.isnan(table.lookup(None, 0.8, 'Bayesian Calibrated', ['80-90%'], ['0-7'])).all()
+    assert np.isnan(table.lookup(['AAA'], 0.9, 'Historical IV', ['80-90%'], ['0-7'])).all()
+
+
+def test_memory_estimate():
+    """The loader's LRU budget counts the table's arrays and labels."""
+    table = RecoveryTable.from_frame(make_recovery())
+    assert table.nbytes > table.rates.nbytes + table.sources.nbytes
+    assert estimate_memory_bytes(table) == table.nbytes
+    assert estimate_memory_bytes({'table': table, 'rates': table.rates}) == table.nbytes + table.rates.nbytes
+
+
+if __name__ == '__main__':
+    test_stock_rates_with_fallback()
+    test_scenario_lookup_and_unknown_keys()
+    test_memory_estimate()
+    print("✓ All recovery table tests passed")
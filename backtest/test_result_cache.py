@@ -0,0 +1,197 @@
+"""
+Checks the backtest result cache: the key changes with the run parameters,
+scoring weights, input fingerprints and module source, and only with them;
+stored results come back equal; entries are evicted by age, then least
+recently used first above the size limit; corrupt entries are dropped. The
+files read only with an option (RESULT_TABLES) are in the key with it.
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from backtest_runner import RESULT_PARAMETERS, parse_args, result_tables
+from data_loader import DataLoader
+from result_cache import ResultCache, source_fingerprint
+from scoring_engine import ScoringEngine
+
+
+def run_key(cache: ResultCache, data_dir: Path, *options: str) -> str:
+    """Result cache key of a run, as backtest_runner.main builds it."""
+    args = parse_args(['--start-date', '2026-08-03', '--end-date', '2026-08-31', '--data-dir', str(data_dir),
+                       *options])
+    params = {name: getattr(args, name) for name in RESULT_PARAMETERS}
+    fingerprints = DataLoader(str(data_dir)).get_fingerprints(result_tables(args))
+    return cache.make_key(params, ScoringEngine().weights, fingerprints)
+
+
+def make_results(n: int = 200, seed: int = 0, start: str = '2026-08-03', days: int = 20) -> pd.DataFrame:
+    """
+    Random backtest results over `days` business days, sorted by date and option.
+
+    Outcomes follow current_probability and agree with expiry_close; options
+    expiring after the last day have neither.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, periods=days)
+    date = dates[rng.integers(0, days, n)]
+    stock_name = rng.choice([f'Stock {i}' for i in range(12)], n)
+    expiry = date + pd.to_timedelta(rng.integers(3, 40, n), 'D')
+    strike = rng.uniform(50, 150, n).round(1)
+    probability = np.round(rng.uniform(0.4, 1.0, n), 3)
+    worthless = rng.random(n) < probability * 0.9
+    expiry_close = strike * np.where(worthless, rng.uniform(1.001, 1.2, n), rng.uniform(0.85, 1.0, n))
+    expiry_close[expiry > dates[-1]] = np.nan
+    outcome = np.where(worthless, 'worthless', 'ITM').astype(object)
+    outcome[np.isnan(expiry_close)] = None
+    return pd.DataFrame({
+        'date': date,
+        'option_name': [f'OPT{i}' for i in range(n)],
+        'stock_name': stock_name,
+        'strike_price': strike,
+        'expiry_date': expiry,
+        'days_to_expiry': (expiry - date).days * 5 // 7,
+        'current_probability': probability,
+        'composite_score': rng.uniform(20, 100, n).round(1),
+        'outcome': outcome,
+        'expiry_close': expiry_close,
+        'premium': rng.uniform(100, 800, n).round()
+    }).sort_values(['date', 'option_name']).reset_index(drop=True)
+
+
+def test_key_sensitivity():
+    """The key changes with the parameters, weights, inputs and source, and only with them."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResultCache(tmp)
+        params = {'start_date': '2026-08-03', 'end_date': '2026-08-31', 'rolling_period': 365}
+        weights = ScoringEngine().weights
+        fingerprints = {'options': (str(Path(tmp) / 'data.csv'), 1, 100, '2026-08-31T18:00:00')}
+        key = cache.make_key(params, weights, fingerprints)
+
+        assert cache.make_key(dict(reversed(params.items())), dict(weights), dict(fingerprints)) == key
+        assert cache.make_key({**params, 'rolling_period': 90}, weights, fingerprints) != key
+        assert cache.make_key(params, ScoringEngine({**weights, 'current_performance': 0}).weights,
+                              fingerprints) != key
+        assert cache.make_key(params, weights, {'options': fingerprints['options'][:1] + (2, 100, None)}) != key
+        assert cache.make_key(params, weights, {**fingerprints, 'events': (None, None, None, None)}) != key
+
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / 'a.py').write_text('x = 1\n')
+        digest = source_fingerprint(tmp, ['a.py', 'b.py'])
+        assert source_fingerprint(tmp, ['a.py', 'b.py']) == digest
+        (Path(tmp) / 'a.py').write_text('x = 2\n')
+        assert source_fingerprint(tmp, ['a.py', 'b.py']) != digest
+        changed = source_fingerprint(tmp, ['a.py', 'b.py'])
+        (Path(tmp) / 'b.py').write_text('')
+        assert source_fingerprint(tmp, ['a.py', 'b.py']) != changed
+
+
+def test_hit_and_miss():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResultCache(tmp)
+        results = make_results()
+        analysis = {'overall_hit_rate': 80.0, 'hit_rates': [{'bucket': '70-80', 'hit_rate_pct': 81.5}]}
+
+        assert cache.get('0' * 64) is None
+        cache.put('1' * 64, results, analysis, {'rolling_period': 365})
+        hit = cache.get('1' * 64)
+        assert hit is not None
+        pd.testing.assert_frame_equal(hit[0], results)
+        assert hit[1] == analysis
+        assert cache.get('0' * 64) is None
+
+        cache.clear()
+        assert cache.get('1' * 64) is None
+
+
+def test_age_and_size_eviction():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResultCache(tmp, max_age_days=30, max_size_mb=None)
+        path = cache.put('a' * 64, make_results(), {})
+        os.utime(path, (time.time() - 31 * 86400,) * 2)
+        assert cache.get('a' * 64) is None and not path.exists()
+
+        path = cache.put('b' * 64, make_results(), {})
+        os.utime(path, (time.time() - 31 * 86400,) * 2)
+        cache.put('c' * 64, make_results(), {})
+        assert not path.exists()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Room for three entries; mtimes set oldest first
+        entry_size = ResultCache(tmp, max_size_mb=None).put('0' * 64, make_results(2000), {}).stat().st_size
+        cache = ResultCache(tmp, max_age_days=None, max_size_mb=3.5 * entry_size / 1024 ** 2)
+        now = time.time()
+        os.utime(cache.cache_dir / ('0' * 64 + '.pkl'), (now - 200,) * 2)
+        for i, key in enumerate(['1' * 64, '2' * 64, '3' * 64]):
+            path = cache.put(key, make_results(2000, seed=i + 1), {})
+            os.utime(path, (now - 100 + i,) * 2)
+        assert sorted(path.stem[0] for path in cache.cache_dir.glob('*.pkl')) == ['1', '2', '3']
+
+        # A hit makes '1' the most recently used, so '2' goes next
+        assert cache.get('1' * 64) is not None
+        cache.put('4' * 64, make_results(2000, seed=4), {})
+        assert sorted(path.stem[0] for path in cache.cache_dir.glob('*.pkl')) == ['1', '3', '4']
+        assert cache.get('2' * 64) is None
+
+
+def test_corrupt_entry_dropped():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResultCache(tmp)
+        path = cache.put('d' * 64, make_results(), {})
+        path.write_bytes(path.read_bytes()[:100])
+        assert cache.get('d' * 64) is None and not path.exists()
+
+        path.write_bytes(b'not a pickle')
+        assert cache.get('d' * 64) is None and not path.exists()
+
+
+def check_file_in_key(file_name: str, *option_sets: tuple):
+    """Changing file_name is a miss with each of option_sets and a hit without them."""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp) / 'data'
+        data_dir.mkdir()
+        file_path = data_dir / file_name
+        file_path.write_text('name|date\nERIC B|2026-07-15\n')
+        cache = ResultCache(Path(tmp) / 'results')
+
+        keys = {options: run_key(cache, data_dir, *options) for options in ((),) + option_sets}
+        for options, key in keys.items():
+            cache.put(key, None, {}, {'options': options})
+
+        file_path.write_text('name|date\nERIC B|2026-07-15\nERIC B|2026-10-14\n')
+        assert cache.get(run_key(cache, data_dir)) is not None
+        for options in option_sets:
+            key = run_key(cache, data_dir, *options)
+            assert key != keys[options], options
+            assert cache.get(key) is None, options
+
+
+def test_event_files_in_key():
+    check_file_in_key('Stock_Events_Volatility_Data.csv', ('--event-flags',), ('--exclude-events', 'earnings'),
+                      ('--event-risk',))
+    check_file_in_key('upcoming_events.csv', ('--event-flags',), ('--exclude-events', 'any'))
+
+
+
+def test_iv_screening_file_in_key():
+    check_file_in_key('IV_PotentialDecline.csv', ('--iv-factors',))
+
+
+
+def test_market_iv_file_in_key():
+    check_file_in_key('iv_per_stock_per_day.csv', ('--market-iv',))
+
+
+if __name__ == '__main__':
+    test_key_sensitivity()
+    test_hit_and_miss()
+    test_age_and_size_eviction()
+    test_corrupt_entry_dropped()
+    test_event_files_in_key()
+    test_iv_screening_file_in_key()
+    test_market_iv_file_in_key()
+    print("✓ All result cache tests passed")
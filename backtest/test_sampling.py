@@ -0,0 +1,93 @@
+"""
+Checks stratified sampling: the per-stratum allocation and weights, that a
+full sample gives the exact hit rates and spread with zero standard error,
+and that over 100 samples of 3% the reweighted hit rate is unbiased and its
+standard error matches the spread of the estimates.
+"""
+
+import numpy as np
+
+from sampling import hit_rate_estimates, sample_strata, spread_estimate, stratified_sample
+from test_result_cache import make_results
+
+
+def make_population(n: int = 40_000, seed: int = 0):
+    """(stocks, days to expiry, probability, settled, worthless) of random backtest results over a year."""
+    results = make_results(n, seed, days=250)
+    return (
+        results['stock_name'].to_numpy(),
+        results['days_to_expiry'].to_numpy(),
+        results['current_probability'].to_numpy(),
+        results['outcome'].notna().to_numpy(),
+        (results['outcome'] == 'worthless').to_numpy()
+    )
+
+
+def test_sample_allocation():
+    """Strata get round(share x size) rows, at least two, with weights that add up to the stratum sizes."""
+    strata = sample_strata(['A', 'A', 'A', 'B', 'B', 'A'], [5, 5, 20, 5, 5, 5], [0.95, 0.95, 0.95, 0.55, np.nan, 0.95])
+    assert list(strata) == [0, 0, 1, 2, 3, 0]
+
+    stocks, days_to_expiry, probability, _, _ = make_population()
+    strata = sample_strata(stocks, days_to_expiry, probability)
+    counts = np.bincount(strata)
+    rows, weights = stratified_sample(strata, 0.05, seed=1)
+
+    assert np.all(np.diff(rows) > 0)
+    taken = np.bincount(strata[rows], minlength=len(counts))
+    assert np.array_equal(taken, np.minimum(counts, np.maximum(np.round(0.05 * counts), 2)))
+    # Weights add up to the stratum sizes
+    assert np.allclose(np.bincount(strata[rows], weights=weights, minlength=len(counts)), counts)
+
+    again, _ = stratified_sample(strata, 0.05, seed=1)
+    assert np.array_equal(rows, again)
+    everything, weights = stratified_sample(strata, 1.0)
+    assert np.array_equal(everything, np.arange(len(strata))) and np.all(weights == 1)
+
+
+def test_full_sample_is_exact():
+    """Sampling every row gives the direct hit rates and spread with zero standard error."""
+    stocks, days_to_expiry, probability, settled, worthless = make_population(5_000)
+    strata = sample_strata(stocks, days_to_expiry, probability)
+    rows, weights = stratified_sample(strata, 1.0)
+    domains = np.column_stack([probability >= 0.8, probability < 0.5, np.zeros(len(rows), dtype=bool)])
+
+    estimates = hit_rate_estimates(strata[rows], weights, settled, worthless, domains)
+    for i in range(2):
+        in_domain = domains[:, i] & settled
+        assert estimates['n'][i] == in_domain.sum()
+        assert np.isclose(estimates['hit_rate_pct'][i], worthless[in_domain].mean() * 100)
+        assert np.isclose(estimates['std_error_pct'][i], 0)
+    assert estimates['n'][2] == 0 and np.isnan(estimates['hit_rate_pct'][2])
+
+    spread, error = spread_estimate(strata[rows], weights, settled, worthless, domains[:, 0], domains[:, 1])
+    assert np.isclose(spread, (worthless[domains[:, 0] & settled].mean()
+                               - worthless[domains[:, 1] & settled].mean()) * 100)
+    assert np.isclose(error, 0)
+
+
+def test_estimates_cover_full_run():
+    """3% samples estimate the full-run hit rate without bias and with the right standard error."""
+    stocks, days_to_expiry, probability, settled, worthless = make_population()
+    strata = sample_strata(stocks, days_to_expiry, probability)
+    truth = worthless[settled].mean() * 100
+
+    estimates, errors = [], []
+    for seed in range(100):
+        rows, weights = stratified_sample(strata, 0.03, seed=seed)
+        estimate = hit_rate_estimates(
+            strata[rows], weights, settled[rows], worthless[rows], np.ones((len(rows), 1), dtype=bool)
+        ).iloc[0]
+        estimates.append(estimate['hit_rate_pct'])
+        errors.append(estimate['std_error_pct'])
+
+    # Unbiased, and the standard error matches the spread over samples
+    assert abs(np.mean(estimates) - truth) < 3 * np.std(estimates) / np.sqrt(len(estimates))
+    assert 0.75 < np.mean(errors) / np.std(estimates) < 1.33
+
+
+if __name__ == '__main__':
+    test_sample_allocation()
+    test_full_sample_is_exact()
+    test_estimates_cover_full_run()
+    print("✓ All sampling tests passed")
@@ -19,6 +19,7 @@ def test_scoring():
     # Initialize data loader
     print("1. Loading data files...")
     loader = DataLoader('../data')
+    loader.preload()
 
     options_df = loader.load_options_data()
     print(f"   ✓ Loaded {len(options_df)} options")
@@ -0,0 +1,220 @@
+"""
+Quick test to validate the scoring service and the batch scoring path.
+
+Runs the HTTP service on a free local port over the synthetic data directory
+of test_data_loader, so it runs without the data files.
+"""
+
+import json
+import math
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+from datetime import datetime
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+
+from data_loader import DataLoader
+from scoring_engine import ScoringEngine, breakdown_to_dict
+from scoring_service import RequestBatcher, ScoringService, make_handler
+from test_data_loader import write_data_dir
+
+AS_OF = datetime(2026, 9, 15)
+
+
+def request(server, path: str, body=None):
+    """(status, JSON payload) of a GET (no body) or POST request."""
+    data = None if body is None else body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+    url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+    try:
+        with opener.open(urllib.request.Request(url, data=data, method='GET' if data is None else 'POST')) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def run_service(data_dir, check):
+    """Start the service on a free port, call check(service, server) and stop it."""
+    service = ScoringService(str(data_dir), as_of=AS_OF)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(service, RequestBatcher(service)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        check(service, server)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def single_score(engine: ScoringEngine, inputs, threshold: float = 0.90):
+    """calculate_score of one row of get_scoring_inputs (NaN passed as None)."""
+    values = {name: None if isinstance(value, float) and math.isnan(value) else value
+              for name, value in inputs.items()}
+    values['current_probability'] = values['current_probability'] or 0
+    values['current_day'] = int(values['current_day'])
+    return engine.calculate_score(historical_peak_threshold=threshold, **values)
+
+
+def test_scores_batch_matches_single():
+    with tempfile.TemporaryDirectory() as tmp:
+        loader = DataLoader(str(write_data_dir(tmp)))
+        options = loader.load_options_data()
+        inputs = loader.get_scoring_inputs(options, AS_OF)
+        engine = ScoringEngine({**ScoringEngine.DEFAULT_WEIGHTS, 'support_strength': 30, 'historical_peak': 0})
+
+        scores, breakdown = engine.calculate_scores_batch(
+            historical_peak_threshold=0.90, **{column: inputs[column].to_numpy() for column in inputs.columns}
+        )
+        # Rows without support, history or a current probability are covered
+        assert inputs[['support_strength_score', 'historical_peak_probability']].isna().any().all()
+        for i, (_, row) in enumerate(inputs.iterrows()):
+            score, factors = single_score(engine, row.to_dict())
+            assert np.isclose(scores[i], score), i
+            for factor, values in factors.items():
+                assert np.isclose(breakdown[factor]['weighted'][i], values['weighted']), (i, factor)
+                assert breakdown[factor]['has_data'][i] == values['has_data'], (i, factor)
+
+
+def random_inputs(n: int, seed: int = 0) -> dict:
+    """Random scoring inputs with ~15% NaN per factor input and values on the normalization edges."""
+    rng = np.random.default_rng(seed)
+
+    def draw(low, high, edges=(), integer=False):
+        values = rng.integers(low, high + 1, n).astype(float) if integer else rng.uniform(low, high, n)
+        if edges:
+            at_edge = rng.random(n) < 0.2
+            values[at_edge] = rng.choice(edges, at_edge.sum())
+        values[rng.random(n) < 0.15] = np.nan
+        return values
+
+    current_day = rng.integers(1, 32, n)
+    typical_low_day = np.clip(current_day + rng.integers(-5, 6, n), 1, 31).astype(float)
+    typical_low_day[rng.random(n) < 0.15] = np.nan
+    return {
+        'support_strength_score': draw(0, 100, (0, 100)),
+        'days_since_last_break': draw(0, 120, (0,), integer=True),
+        'trading_days_per_break': draw(1, 60, (30,)),
+        'current_probability': rng.choice([0.0, 0.5, 0.89, 0.9, 0.95, 1.0], n) * (rng.random(n) < 0.5)
+        + rng.uniform(0.3, 1.0, n) * (rng.random(n) >= 0.5),
+        'historical_peak_probability': draw(0.3, 1.0, (0.9, 0.95, 1.0)),
+        'recovery_advantage': draw(0.4, 1.0, (0.5, 1.0)),
+        'monthly_positive_rate': draw(0, 100, (0, 50, 100)),
+        'monthly_avg_return': draw(-5, 5, (0,)),
+        'typical_low_day': typical_low_day,
+        'current_day': current_day,
+        'current_month_performance': draw(-15, 15, (0,))
+    }
+
+
+def test_breakdown_to_dict_matches_single():
+    """Each row of the batch breakdown is the calculate_score breakdown."""
+    inputs = random_inputs(2000)
+    for weights in (None, {'support_strength': 30, 'days_since_break': 10, 'recovery_advantage': 20,
+                           'historical_peak': 0, 'monthly_seasonality': 25, 'current_performance': 15}):
+        engine = ScoringEngine(weights)
+        for threshold in (0.90, 0.95):
+            scores, breakdown = engine.calculate_scores_batch(historical_peak_threshold=threshold, **inputs)
+            for i in range(len(scores)):
+                score, factors = single_score(engine, {name: values[i] for name, values in inputs.items()}, threshold)
+                assert np.isclose(scores[i], score), i
+                row = breakdown_to_dict(breakdown, i)
+                assert list(row) == list(factors)
+                for factor, expected in factors.items():
+                    result = row[factor]
+                    assert set(result) == set(expected), factor
+                    assert (result['raw'] is None) == (expected['raw'] is None), (i, factor)
+                    if expected['raw'] is not None:
+                        assert np.isclose(result['raw'], expected['raw']), (i, factor)
+                    assert np.isclose(result['normalized'], expected['normalized']), (i, factor)
+                    assert np.isclose(result['weighted'], expected['weighted']), (i, factor)
+                    assert result['has_data'] == expected['has_data'], (i, factor)
+                    assert result['data_status'] == expected['data_status'], (i, factor)
+
+    # Whole-array conversion gives the same fields as arrays
+    arrays = breakdown_to_dict(breakdown)
+    for factor, fields in arrays.items():
+        assert np.array_equal(fields['weighted'], breakdown[factor]['weighted'])
+        assert fields['has_data'].dtype == np.bool_
+
+
+def test_service_scores():
+    def check(service, server):
+        options = service.state.options
+        inputs = service.loader.get_scoring_inputs(options, AS_OF)
+        expected, _ = ScoringEngine().calculate_scores_batch(
+            historical_peak_threshold=0.90, **{column: inputs[column].to_numpy() for column in inputs.columns}
+        )
+
+        status, health = request(server, '/health')
+        assert status == 200 and health['options'] == len(options) and health['as_of'] == '2026-09-15'
+
+        names = list(options['OptionName'][:5])
+        status, payload = request(server, '/score', {'options': names + ['UNKNOWN']})
+        assert status == 200 and payload['results'][-1] is None
+        for i, result in enumerate(payload['results'][:-1]):
+            assert result['option_name'] == names[i]
+            assert np.isclose(result['composite_score'], expected[i])
+            assert set(result['breakdown']) == set(ScoringEngine.DEFAULT_WEIGHTS)
+
+        status, result = request(server, f'/score?option={names[2]}')
+        assert status == 200 and np.isclose(result['composite_score'], expected[2])
+        assert request(server, '/score?option=UNKNOWN')[0] == 404
+
+        # Factors missing from the request weigh 0
+        weights = {'support_strength': 50, 'monthly_seasonality': 50}
+        engine = ScoringEngine({**dict.fromkeys(ScoringEngine.DEFAULT_WEIGHTS, 0), **weights})
+        weighted, _ = engine.calculate_scores_batch(
+            historical_peak_threshold=0.90, **{column: inputs[column].to_numpy()[:1] for column in inputs.columns}
+        )
+        status, result = request(server, '/score', {'option': names[0], 'weights': weights})
+        assert status == 200 and np.isclose(result['composite_score'], weighted[0])
+
+        status, payload = request(server, '/score/universe', {'min_score': 40})
+        scores = [result['composite_score'] for result in payload['results']]
+        assert status == 200 and scores == sorted(scores, reverse=True)
+        assert len(scores) == (expected >= 40).sum()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        run_service(write_data_dir(tmp), check)
+
+
+def test_service_rejects_bad_requests():
+    """Invalid requests get a 400, failures a 500, both with a JSON error."""
+    def check(service, server):
+        name = service.state.options['OptionName'].iloc[0]
+        for body in (
+            {'options': name},
+            {'options': [name, 1]},
+            {'option': [name]},
+            [name],
+            {'option': name, 'weights': [1, 2]},
+            {'option': name, 'weights': {'unknown_factor': 1}},
+            {'option': name, 'probability_method': 'unknown'},
+            {'option': name, 'rolling_period': 100},
+            {'option': name, 'historical_peak_threshold': 0.85},
+            {'rolling_period': 365},
+            b'{not json'
+        ):
+            status, payload = request(server, '/score', body)
+            assert status == 400 and 'error' in payload, body
+        # Rejected settings do not add cached input sets
+        assert len(service.state._inputs) == 1
+
+        status, payload = request(server, '/score', {'option': name, 'rolling_period': [365]})
+        assert status == 500 and 'TypeError' in payload['error']
+
+        assert request(server, '/unknown', {})[0] == 404
+        assert request(server, '/score', {'option': name})[0] == 200
+
+    with tempfile.TemporaryDirectory() as tmp:
+        run_service(write_data_dir(tmp), check)
+
+
+if __name__ == '__main__':
+    test_scores_batch_matches_single()
+    test_breakdown_to_dict_matches_single()
+    test_service_scores()
+    test_service_rejects_bad_requests()
+    print("✓ All scoring service tests passed")
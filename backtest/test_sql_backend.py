@@ -0,0 +1,121 @@
+"""
+Quick test to validate the SQL backend against the pandas DataLoader.
+
+Uses the synthetic data directory of test_data_loader and a temporary
+database, so it runs without the data files.
+"""
+
+import contextlib
+import io
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DataLoader, PROBABILITY_METHODS
+from sql_backend import HAS_DUCKDB, SQLDataLoader
+from test_data_loader import STOCKS, touch, write_data_dir
+
+ENGINES = ['sqlite'] + (['duckdb'] if HAS_DUCKDB else [])
+
+START, END = '2026-07-15', '2026-09-30'
+
+
+def assert_panels_equal(sql_panel: pd.DataFrame, pandas_panel: pd.DataFrame):
+    assert len(pandas_panel) > 0
+    assert sorted(sql_panel.columns) == sorted(pandas_panel.columns)
+    pd.testing.assert_frame_equal(sql_panel[pandas_panel.columns], pandas_panel, check_dtype=False)
+
+
+def test_panel_parity():
+    """Single period, list of periods and list of methods give the pandas panel."""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = write_data_dir(Path(tmp) / 'data')
+        pandas_loader = DataLoader(str(data_dir))
+        for engine in ENGINES:
+            sql_loader = SQLDataLoader(str(data_dir), db_path=str(Path(tmp) / f'backtest.{engine}'), engine=engine)
+            for kwargs in (
+                {},
+                {'rolling_period': 90, 'min_days_since_break': 20, 'max_days_to_expiry': 30},
+                {'rolling_period': [30, 90, 365]},
+                {'probability_method': PROBABILITY_METHODS[:3]},
+                {'stocks': STOCKS[:2]}
+            ):
+                assert_panels_equal(
+                    sql_loader.get_backtest_panel(START, END, **kwargs),
+                    pandas_loader.get_backtest_panel(START, END, **kwargs)
+                )
+
+            panel = pandas_loader.get_backtest_panel(START, END)
+            assert np.allclose(
+                sql_loader.get_expiry_closes(panel['StockName'], panel['ExpiryDate']),
+                pandas_loader.get_expiry_closes(panel['StockName'], panel['ExpiryDate']),
+                equal_nan=True
+            )
+            closes = pandas_loader.get_closes(panel['StockName'], panel['date'])
+            assert not np.isnan(closes).any()
+            assert np.array_equal(sql_loader.get_closes(panel['StockName'], panel['date']), closes)
+            assert np.allclose(
+                sql_loader.get_current_month_performance_batch(STOCKS, pd.Timestamp('2026-09-15')),
+                pandas_loader.get_current_month_performance_batch(STOCKS, pd.Timestamp('2026-09-15')),
+                equal_nan=True
+            )
+            sql_loader.close()
+
+
+def imported_tables(call) -> tuple:
+    """(labels of the tables call() imports into the database, its result), from the import log lines."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        result = call()
+    labels = [line.split(' from ')[0][len('Importing '):] for line in output.getvalue().splitlines()
+              if line.startswith('Importing ')]
+    return labels, result
+
+
+def test_sync_reimports_changed_tables():
+    """Only tables whose file fingerprint changed are re-imported, also by a new loader on the same database."""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = write_data_dir(Path(tmp) / 'data')
+        db_path = str(Path(tmp) / 'backtest.sqlite')
+        open_loader = lambda: SQLDataLoader(str(data_dir), db_path=db_path, engine='sqlite')
+
+        labels, loader = imported_tables(open_loader)
+        assert len(labels) == 5
+        loader.close()
+        labels, loader = imported_tables(open_loader)
+        assert labels == []
+
+        support_path = data_dir / 'support_level_metrics.csv'
+        support = pd.read_csv(support_path)
+        support['days_since_last_break'] = 0.0
+        support.to_csv(support_path, index=False)
+        touch(support_path)
+
+        labels, changed = imported_tables(loader.refresh)
+        assert labels == ['support metrics'] and changed == ['support']
+        assert loader.get_support_metrics_batch(['AAK'], 365)['days_since_last_break'].iloc[0] == 0
+        assert loader._sync_tables() == []
+        loader.close()
+
+        # A new loader picks up a change made while no loader was open
+        touch(data_dir / 'stock_data.csv')
+        labels, loader = imported_tables(open_loader)
+        assert labels == ['stock data']
+
+        # A removed file drops its table
+        (data_dir / 'probability_history.csv').unlink()
+        assert loader._sync_tables() == ['probability_history']
+        try:
+            loader.get_probability_peaks_batch(['AAK'])
+            assert False, 'expected FileNotFoundError'
+        except FileNotFoundError:
+            pass
+        loader.close()
+
+
+if __name__ == '__main__':
+    test_panel_parity()
+    test_sync_reimports_changed_tables()
+    print("✓ All SQL backend tests passed")
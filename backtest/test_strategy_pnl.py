@@ -0,0 +1,81 @@
+"""
+Checks the strategy P&L simulator: every score-threshold and daily top-K
+rule evaluated in one pass gives the positions, premium, assignment loss,
+net P&L and peak capital of a per-rule computation, and malformed rule
+specs are rejected.
+"""
+
+import numpy as np
+import pandas as pd
+
+from strategy_pnl import SHARES_PER_CONTRACT, parse_rules, simulate_strategies
+from test_result_cache import make_results
+
+
+def make_positions(n: int = 3000, seed: int = 0):
+    """Results over 60 business days, random contracts and the results' expiry closes."""
+    results = make_results(n, seed, start='2026-01-05', days=60)
+    contracts = np.random.default_rng(seed).integers(1, 10, n).astype(float)
+    return results, contracts, results['expiry_close'].to_numpy()
+
+
+def brute_force(results, contracts, closes, kind, value):
+    """One rule, one position at a time."""
+    if kind == 'score':
+        selected = results['composite_score'] >= value
+    else:
+        rank = results.groupby('date')['composite_score'].rank(method='first', ascending=False)
+        selected = rank <= value
+    rows = results[selected.to_numpy()]
+    shares = contracts[selected.to_numpy()] * SHARES_PER_CONTRACT
+    loss = np.minimum(closes[selected.to_numpy()] - rows['strike_price'].to_numpy(), 0) * shares
+    settled = ~np.isnan(loss)
+    capital = rows['strike_price'].to_numpy() * shares
+
+    calendar = np.unique(np.concatenate([rows['date'], rows['expiry_date'][settled]]))
+    capital_in_use = [
+        capital[(rows['date'] <= day).to_numpy() & (~settled | (rows['expiry_date'] >= day).to_numpy())].sum()
+        for day in calendar
+    ]
+    return {
+        'positions': len(rows),
+        'premium_collected': rows['premium'].sum(),
+        'assignment_loss': loss[settled].sum(),
+        'max_capital': max(capital_in_use)
+    }
+
+
+def test_rules_match_brute_force():
+    """Every rule evaluated in one pass matches a per-rule computation."""
+    results, contracts, closes = make_positions()
+    rules = ['score:60', 'score:80', 'top:1', 'top:7']
+    summary, equity = simulate_strategies(results, rules, contracts, closes)
+
+    for (name, kind, value), row in zip(parse_rules(rules), summary.itertuples()):
+        expected = brute_force(results, contracts, closes, kind, value)
+        assert row.rule == name
+        assert row.positions == expected['positions']
+        assert np.isclose(row.premium_collected, expected['premium_collected'])
+        assert np.isclose(row.assignment_loss, expected['assignment_loss'])
+        assert np.isclose(row.net_pnl, expected['premium_collected'] + expected['assignment_loss'])
+        assert np.isclose(row.max_capital, expected['max_capital'])
+
+        curve = equity[equity['rule'] == name]
+        assert np.isclose(curve['equity'].iloc[-1], row.net_pnl)
+        assert (curve['drawdown'] <= 0).all()
+
+
+def test_parse_rules_rejects_bad_specs():
+    """Unknown kinds and non-integer K are errors."""
+    for spec in ['best:5', 'top:2.5', 'score:x']:
+        try:
+            parse_rules(spec)
+        except ValueError:
+            continue
+        raise AssertionError(f"{spec} should be rejected")
+
+
+if __name__ == '__main__':
+    test_rules_match_brute_force()
+    test_parse_rules_rejects_bad_specs()
+    print("✓ All strategy P&L tests passed")
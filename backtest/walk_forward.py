@@ -0,0 +1,245 @@
+"""
+Walk-Forward Evaluation with Incremental Statistics
+
+This module slides a train/test window over backtest results month by month:
+calibration and score quartile thresholds are fitted on the previous N
+months and evaluated on the next month.
+
+Results are never re-aggregated per window. WalkForwardStats keeps counts per
+(month, bin, outcome), built with np.bincount as results are added (in one
+call or chunk by chunk). Evaluation takes prefix sums over months once, so
+every window is a difference of two prefix rows and costs O(bins), not O(rows):
+
+- Score bucket counts (the analyze_results buckets) -> hit rate per bucket
+- Composite score histogram (0.1 points) -> train-window quartile thresholds
+  and the out-of-sample top vs bottom quartile spread
+- Probability histogram (0.001) -> isotonic calibration refitted on the
+  training window (calibration.pava on the binned counts) and test Brier
+  scores before and after calibration
+
+Usage:
+    from walk_forward import WalkForwardStats
+
+    stats = WalkForwardStats()
+    stats.add(results_df)
+    windows, buckets = stats.evaluate(train_months=6)
+
+Author: Put Options SE
+Date: February 2026
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from calibration import IsotonicMap, pava
+
+
+# Score buckets of analyze_results: code = searchsorted(edges, score, 'right');
+# code 6 (a score of exactly 100) falls outside every bucket there as well
+SCORE_BUCKET_EDGES = np.array([50, 60, 70, 80, 90, 100])
+SCORE_BUCKET_LABELS = ['<50', '50-60', '60-70', '70-80', '80-90', '90-100']
+
+# Histogram resolutions
+SCORE_RESOLUTION = 0.1
+SCORE_BINS = 1001
+PROBABILITY_RESOLUTION = 0.001
+PROBABILITY_BINS = 1001
+
+
+class WalkForwardStats:
+    """
+    Per-month accumulators of backtest outcomes.
+
+    Every array has one row per calendar month seen so far and a last axis
+    of (ITM, worthless) counts.
+    """
+
+    def __init__(self):
+        self.months: List[np.datetime64] = []
+        self._slots: Dict[np.datetime64, int] = {}
+        self.bucket_counts = np.zeros((0, len(SCORE_BUCKET_EDGES) + 1, 2), dtype=np.int64)
+        self.score_counts = np.zeros((0, SCORE_BINS, 2), dtype=np.int64)
+        self.probability_counts = np.zeros((0, PROBABILITY_BINS, 2), dtype=np.int64)
+        self.brier_sums = np.zeros(0)
+        self.n_rows = 0
+
+    def _month_slots(self, months: np.ndarray) -> np.ndarray:
+        """Slot of every row's month, adding rows to the accumulators for new months."""
+        unique, inverse = np.unique(months, return_inverse=True)
+        new = [month for month in unique if month not in self._slots]
+        if new:
+            for month in new:
+                self._slots[month] = len(self.months)
+                self.months.append(month)
+            grow = len(new)
+            self.bucket_counts = np.concatenate([self.bucket_counts, np.zeros((grow,) + self.bucket_counts.shape[1:], np.int64)])
+            self.score_counts = np.concatenate([self.score_counts, np.zeros((grow,) + self.score_counts.shape[1:], np.int64)])
+            self.probability_counts = np.concatenate(
+                [self.probability_counts, np.zeros((grow,) + self.probability_counts.shape[1:], np.int64)]
+            )
+            self.brier_sums = np.concatenate([self.brier_sums, np.zeros(grow)])
+        return np.array([self._slots[month] for month in unique], dtype=np.int64)[inverse]
+
+    def add(
+        self,
+        results_df: pd.DataFrame,
+        score_col: str = 'composite_score',
+        prob_col: str = 'current_probability',
+        outcome_col: str = 'outcome',
+        date_col: str = 'date'
+    ):
+        """
+        Add backtest results (rows without an outcome are ignored).
+
+        Args:
+            results_df: Backtest results (all at once or one chunk)
+            score_col: Composite score column
+            prob_col: Probability column to calibrate
+            outcome_col: Outcome column ('worthless' / 'ITM')
+            date_col: Scoring date column
+        """
+        known = results_df[results_df[outcome_col].notna()]
+        if len(known) == 0:
+            return
+
+        months = pd.to_datetime(known[date_col]).to_numpy().astype('datetime64[M]')
+        slots = self._month_slots(months)
+        n_months = len(self.months)
+        worthless = (known[outcome_col] == 'worthless').to_numpy(dtype=np.int64)
+
+        def count(codes: np.ndarray, n_codes: int, rows: Optional[np.ndarray] = None) -> np.ndarray:
+            flat = (slots * n_codes + codes) * 2 + worthless
+            if rows is not None:
+                flat = flat[rows]
+            return np.bincount(flat, minlength=n_months * n_codes * 2).reshape(n_months, n_codes, 2)
+
+        scores = known[score_col].to_numpy(dtype=np.float64)
+        bucket_codes = np.searchsorted(SCORE_BUCKET_EDGES, scores, side='right')
+        self.bucket_counts += count(bucket_codes, self.bucket_counts.shape[1])
+
+        score_bins = np.clip(np.floor(scores / SCORE_RESOLUTION), 0, SCORE_BINS - 1)
+        self.score_counts += count(np.nan_to_num(score_bins).astype(np.int64), SCORE_BINS)
+
+        probs = known[prob_col].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(probs)
+        prob_bins = np.clip(np.rint(np.nan_to_num(probs) / PROBABILITY_RESOLUTION), 0, PROBABILITY_BINS - 1)
+        self.probability_counts += count(prob_bins.astype(np.int64), PROBABILITY_BINS, valid)
+        self.brier_sums += np.bincount(
+            slots[valid], weights=(probs[valid] - worthless[valid]) ** 2, minlength=n_months
+        )
+
+        self.n_rows += len(known)
+
+    def _calendar_prefix_sums(self) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Accumulators laid out on consecutive calendar months, cumulated (leading zero row)."""
+        first, last = min(self.months), max(self.months)
+        calendar = np.arange(first, last + np.timedelta64(1, 'M'))
+        positions = (np.array(self.months) - first).astype(np.int64)
+
+        prefix = {}
+        for name in ('bucket_counts', 'score_counts', 'probability_counts', 'brier_sums'):
+            values = getattr(self, name)
+            laid_out = np.zeros((len(calendar),) + values.shape[1:], dtype=values.dtype)
+            laid_out[positions] = values
+            prefix[name] = np.concatenate([np.zeros((1,) + values.shape[1:], values.dtype), np.cumsum(laid_out, axis=0)])
+        return calendar, prefix
+
+    def evaluate(self, train_months: int = 6, min_train_rows: int = 1) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Evaluate every month that has train_months of history before it.
+
+        Args:
+            train_months: Length of the training window in months
+            min_train_rows: Skip test months with fewer training rows
+
+        Returns:
+            Tuple of (windows, buckets)
+            - windows: one row per test month (hit rate, train quartile
+              thresholds, top/bottom quartile hit rates and spread, Brier
+              score raw and calibrated)
+            - buckets: hit rate per score bucket and test month (long format)
+        """
+        if train_months < 1:
+            raise ValueError("train_months must be at least 1")
+        if not self.months:
+            return pd.DataFrame(), pd.DataFrame()
+
+        calendar, prefix = self._calendar_prefix_sums()
+        score_grid = np.round(np.arange(SCORE_BINS) * SCORE_RESOLUTION, 6)
+        prob_grid = np.round(np.arange(PROBABILITY_BINS) * PROBABILITY_RESOLUTION, 6)
+
+        def window(name: str, start: int, end: int) -> np.ndarray:
+            return prefix[name][end] - prefix[name][start]
+
+        windows, buckets = [], []
+        for test in range(train_months, len(calendar)):
+            train_scores = window('score_counts', test - train_months, test).sum(axis=1)
+            test_scores = window('score_counts', test, test + 1)
+            n_train, n_test = int(train_scores.sum()), int(test_scores.sum())
+            if n_test == 0 or n_train < min_train_rows:
+                continue
+
+            # Quartile thresholds from the training histogram (bin of the
+            # order statistic pandas' quantile starts interpolating from)
+            cumulative = np.cumsum(train_scores)
+            top_bin = int(np.searchsorted(cumulative, np.floor((n_train - 1) * 0.75) + 1))
+            bottom_bin = int(np.searchsorted(cumulative, np.floor((n_train - 1) * 0.25) + 1))
+            top = test_scores[top_bin:].sum(axis=0)
+            bottom = test_scores[:bottom_bin + 1].sum(axis=0)
+            top_hit_rate = top[1] / top.sum() * 100 if top.sum() else np.nan
+            bottom_hit_rate = bottom[1] / bottom.sum() * 100 if bottom.sum() else np.nan
+
+            # Isotonic calibration refitted on the training window's probability bins
+            train_probs = window('probability_counts', test - train_months, test)
+            test_probs = window('probability_counts', test, test + 1)
+            n_test_probs = int(test_probs.sum())
+            brier_raw = brier_calibrated = np.nan
+            if n_test_probs:
+                brier_raw = (prefix['brier_sums'][test + 1] - prefix['brier_sums'][test]) / n_test_probs
+                totals = train_probs.sum(axis=1)
+                observed = np.flatnonzero(totals)
+                if len(observed):
+                    values, _, ends = pava(train_probs[observed, 1] / totals[observed], totals[observed])
+                    starts = np.r_[0, ends[:-1]]
+                    iso = IsotonicMap(
+                        prob_grid[observed][starts], prob_grid[observed][ends - 1], values, int(totals.sum())
+                    )
+                    calibrated = iso.apply(prob_grid)
+                    brier_calibrated = float(
+                        (test_probs[:, 1] * (1 - calibrated) ** 2 + test_probs[:, 0] * calibrated ** 2).sum()
+                        / n_test_probs
+                    )
+
+            test_worthless = int(test_scores[:, 1].sum())
+            windows.append({
+                'test_month': str(calendar[test]),
+                'train_start': str(calendar[test - train_months]),
+                'train_end': str(calendar[test - 1]),
+                'train_n': n_train,
+                'test_n': n_test,
+                'worthless_count': test_worthless,
+                'hit_rate_pct': test_worthless / n_test * 100,
+                'top_quartile_threshold': score_grid[top_bin],
+                'bottom_quartile_threshold': score_grid[bottom_bin],
+                'top_quartile_hit_rate': top_hit_rate,
+                'bottom_quartile_hit_rate': bottom_hit_rate,
+                'score_spread': top_hit_rate - bottom_hit_rate,
+                'brier_raw': brier_raw,
+                'brier_calibrated': brier_calibrated
+            })
+
+            test_buckets = window('bucket_counts', test, test + 1)
+            for code, label in enumerate(SCORE_BUCKET_LABELS):
+                n = int(test_buckets[code].sum())
+                if n:
+                    buckets.append({
+                        'test_month': str(calendar[test]),
+                        'score_bucket': label,
+                        'n': n,
+                        'worthless_count': int(test_buckets[code, 1]),
+                        'hit_rate_pct': test_buckets[code, 1] / n * 100
+                    })
+
+        return pd.DataFrame(windows), pd.DataFrame(buckets)